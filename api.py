@@ -1,33 +1,27 @@
 import os
 import requests
-import asyncio
 from flask import Flask, jsonify, request, render_template
 from flask_cors import CORS
 from bson.objectid import ObjectId
 from datetime import datetime, timezone, timedelta
 from modules import player_manager
 # Importa as conexões oficiais do seu bot
-from modules.player.core import users_collection
+from modules.player.core import users_collection, enable_invalidation_publish, publish_player_invalidation
 from modules.database import clans_col
 from modules.game_data.skills import SKILL_DATA, get_skill_data_with_rarity
 app = Flask(__name__)
 CORS(app) 
+# Este processo tem cache próprio: todo save avisa o bot (barramento de invalidação)
+enable_invalidation_publish()
 from modules.webapp_api import webapp_bp
 app.register_blueprint(webapp_bp)
 # Registra as rotas da Defesa do Reino separadamente
 from kingdom_defense.routes_api import kd_api_bp
 app.register_blueprint(kd_api_bp)
 
-def _run_async(coro):
-    """Ferramenta que força funções do Telegram a rodarem com segurança no Flask"""
-    try:
-        return asyncio.run(coro)
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        res = loop.run_until_complete(coro)
-        loop.close()
-        return res
+# Corrotinas do jogo: no loop do bot quando servido pelo main.py
+# (modules/web_server.py); rodando sozinho, um loop por chamada como antes
+from modules.web_server import run_async as _run_async
     
 # ==========================================
 # FUNÇÃO PARA SINCRONIZAR COM O CHAT DO TELEGRAM
@@ -124,8 +118,10 @@ def api_viajar():
         if eh_vip:
             users_collection.update_one(
                 {"_id": busca_id}, 
-                {"$set": {"current_location": destino, "player_state": {"action": "idle"}}}
+                {"$set": {"current_location": destino, "player_state": {"action": "idle"}},
+                 "$inc": {"_version": 1}}
             )
+            publish_player_invalidation(busca_id)
             return jsonify({"sucesso": True, "is_vip": True})
         
         # Se for Free, inicia cronômetro de 6 minutos
@@ -140,8 +136,10 @@ def api_viajar():
                     "finish_time": finish_time.isoformat(),
                     "details": {"destination": destino}
                 }
-            }}
+            },
+             "$inc": {"_version": 1}}
         )
+        publish_player_invalidation(busca_id)
         return jsonify({"sucesso": True, "is_vip": False})
 
     except Exception as e:
@@ -160,8 +158,10 @@ def api_finalizar_viagem():
             destino = estado["details"]["destination"]
             users_collection.update_one(
                 {"_id": busca_id},
-                {"$set": {"current_location": destino, "player_state": {"action": "idle"}}}
+                {"$set": {"current_location": destino, "player_state": {"action": "idle"}},
+                 "$inc": {"_version": 1}}
             )
+            publish_player_invalidation(busca_id)
         return jsonify({"sucesso": True})
     except Exception as e:
         return jsonify({"erro": str(e)}), 500
@@ -301,7 +301,6 @@ def obter_magias_equipadas(user_id):
 # ==========================================
 @app.route('/api/cacar', methods=['POST'])
 def api_cacar():
-    import asyncio
     from handlers.hunt_handler import _pick_monster_template, _build_combat_details_from_template
     from modules.combat import combat_engine, rewards
 
@@ -318,7 +317,8 @@ def api_cacar():
         if pdata.get("energy", 0) < 1: return jsonify({"erro": "Sem energia suficiente (⚡)."})
 
         # Desconta Energia
-        users_collection.update_one({"_id": busca_id}, {"$inc": {"energy": -1}})
+        users_collection.update_one({"_id": busca_id}, {"$inc": {"energy": -1, "_version": 1}})
+        publish_player_invalidation(busca_id)
         pdata["energy"] -= 1
 
         player_lvl = int(pdata.get("level", 1))
@@ -332,17 +332,6 @@ def api_cacar():
         player_stats.pop("_id", None)
         if "max_hp" not in player_stats: player_stats["max_hp"] = pdata.get("max_hp", 100)
 
-        # Helper para Async
-        def rodar_engine(coro):
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    import nest_asyncio
-                    nest_asyncio.apply()
-                    return loop.run_until_complete(coro)
-            except RuntimeError:
-                return asyncio.run(coro)
-            return loop.run_until_complete(coro)
 
         log_batalha = []
         mob_hp = monster_stats.get("max_hp", 50)
@@ -351,7 +340,7 @@ def api_cacar():
         turno = 1
         while p_hp > 0 and mob_hp > 0 and turno <= 20:
             # Player ataca
-            res_p = rodar_engine(combat_engine.processar_acao_combate(
+            res_p = _run_async(combat_engine.processar_acao_combate(
                 attacker_pdata=pdata, attacker_stats=player_stats,
                 target_stats=monster_stats, skill_id=None, attacker_current_hp=p_hp
             ))
@@ -362,7 +351,7 @@ def api_cacar():
             if mob_hp <= 0: break
             
             # Mob ataca
-            res_m = rodar_engine(combat_engine.processar_acao_combate(
+            res_m = _run_async(combat_engine.processar_acao_combate(
                 attacker_pdata={}, attacker_stats=monster_stats,
                 target_stats=player_stats, skill_id=None, attacker_current_hp=mob_hp
             ))
@@ -454,7 +443,8 @@ def api_combate_iniciar():
         if pdata.get("energy", 0) < 1: return jsonify({"erro": "Sem energia suficiente (⚡)."})
 
         # Desconta Energia
-        users_collection.update_one({"_id": busca_id}, {"$inc": {"energy": -1}})
+        users_collection.update_one({"_id": busca_id}, {"$inc": {"energy": -1, "_version": 1}})
+        publish_player_invalidation(busca_id)
         pdata["energy"] -= 1
 
         player_lvl = int(pdata.get("level", 1))
@@ -534,7 +524,6 @@ def api_combate_iniciar():
 
 @app.route('/api/combate/acao', methods=['POST'])
 def api_combate_acao():
-    import asyncio
     from modules.combat import combat_engine, rewards
 
     dados = request.json
@@ -550,16 +539,6 @@ def api_combate_acao():
 
         if not cache: return jsonify({"erro": "Nenhuma batalha ativa."})
 
-        def rodar_engine(coro):
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    import nest_asyncio
-                    nest_asyncio.apply()
-                    return loop.run_until_complete(coro)
-            except RuntimeError:
-                return asyncio.run(coro)
-            return loop.run_until_complete(coro)
 
         log_turno = []
         
@@ -596,7 +575,7 @@ def api_combate_acao():
                 if "cooldowns" not in pdata: pdata["cooldowns"] = {}
                 aplicar_cooldown(pdata, skill_id, raridade_skill)
 
-            res_p = rodar_engine(combat_engine.processar_acao_combate(
+            res_p = _run_async(combat_engine.processar_acao_combate(
                 attacker_pdata=pdata,
                 attacker_stats=cache["player_stats"],
                 target_stats=cache["monster_stats"],
@@ -679,7 +658,7 @@ def api_combate_acao():
             # ==========================================================
             # 3. TURNO DO MONSTRO E DERROTA
             # ==========================================================
-            res_m = rodar_engine(combat_engine.processar_acao_combate(
+            res_m = _run_async(combat_engine.processar_acao_combate(
                 attacker_pdata={}, 
                 attacker_stats=cache["monster_stats"],
                 target_stats=cache["player_stats"],
@@ -779,7 +758,7 @@ def api_autohunt_iniciar():
 
         users_collection.update_one(
             {"_id": busca_id},
-            {"$inc": {"energy": -quantidade},
+            {"$inc": {"energy": -quantidade, "_version": 1},
              "$set": {
                  "player_state": {
                      "action": "auto_hunting",
@@ -788,6 +767,7 @@ def api_autohunt_iniciar():
                  }
              }}
         )
+        publish_player_invalidation(busca_id)
 
         return jsonify({"sucesso": True, "finish_time": finish_time.isoformat()})
 
@@ -9,7 +9,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from config import ADMIN_ID
-from modules.database import db
+from modules.database import db, run_db
 from modules.game_data import regions as game_data_regions
 
 from modules.guild_war.war_event import (
@@ -152,9 +152,9 @@ async def cmd_war_hard_reset(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return
 
     # nomes conforme modules/guild_war/war_event.py (coleções)
-    await asyncio.to_thread(db.get_collection("war_campaigns").delete_many, {})
-    await asyncio.to_thread(db.get_collection("war_signups").delete_many, {})
-    await asyncio.to_thread(db.get_collection("war_scores").delete_many, {})
+    await run_db(db.get_collection("war_campaigns").delete_many, {})
+    await run_db(db.get_collection("war_signups").delete_many, {})
+    await run_db(db.get_collection("war_scores").delete_many, {})
 
     await _reply(
         update,
@@ -19,6 +19,8 @@ from telegram.ext import (
 from modules import player_manager
 # [CORREÇÃO] Importamos a coleção NOVA (users) em vez da legada (players)
 from modules.player.core import users_collection 
+from modules.player import presence
+from modules.database import run_db
 from handlers.admin.utils import (
     ADMIN_LIST,
     parse_hybrid_id,
@@ -57,21 +59,22 @@ async def show_main_management_menu(update: Update, context: ContextTypes.DEFAUL
 
     try:
         # [MIGRAÇÃO] Consultas direcionadas à collection 'users'
-        total_players = await asyncio.to_thread(users_collection.count_documents, {})
+        total_players = await run_db(users_collection.count_documents, {})
         
         inactive_date_limit = datetime.now(timezone.utc) - timedelta(days=INACTIVE_DAYS)
-        inactive_count = await asyncio.to_thread(users_collection.count_documents, 
+        inactive_count = await run_db(users_collection.count_documents, 
             {"last_seen": {"$lt": inactive_date_limit.isoformat()}}
         )
         
         today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-        active_today_count = await asyncio.to_thread(users_collection.count_documents, 
+        active_today_count = await run_db(users_collection.count_documents, 
             {"last_seen": {"$gte": today_start.isoformat()}}
         )
         
         text = [
             "👥 <b>Gestão de Jogadores (Sistema Novo)</b>\n",
             f"<b>Total de Contas:</b> {total_players}",
+            f"<b>Online Agora:</b> {presence.online_count()}",
             f"<b>Ativos Hoje:</b> {active_today_count}",
             f"<b>Inativos (+{INACTIVE_DAYS} dias):</b> {inactive_count}",
             "\nEscolha uma opção:"
@@ -125,16 +128,17 @@ async def list_inactive_players(update: Update, context: ContextTypes.DEFAULT_TY
             ]
         }
         
-        # [MIGRAÇÃO] Uso de users_collection e asyncio.to_thread para não bloquear
-        total_inactive = await asyncio.to_thread(users_collection.count_documents, db_query)
+        # [MIGRAÇÃO] Uso de users_collection e run_db (executor do Mongo) para não bloquear
+        total_inactive = await run_db(users_collection.count_documents, db_query)
         total_pages = math.ceil(total_inactive / PLAYERS_PER_PAGE)
         if total_pages == 0: total_pages = 1
         page = max(1, min(page, total_pages)) 
         
         start_index = (page - 1) * PLAYERS_PER_PAGE
         
-        cursor = users_collection.find(db_query).sort("last_seen", 1).skip(start_index).limit(PLAYERS_PER_PAGE)
-        inactive_list = await asyncio.to_thread(list, cursor)
+        inactive_list = await run_db(
+            lambda: list(users_collection.find(db_query).sort("last_seen", 1).skip(start_index).limit(PLAYERS_PER_PAGE))
+        )
         
         text = [f"👥 <b>Jogadores Inativos (+{INACTIVE_DAYS} dias)</b> - Página {page}/{total_pages}\n"]
         keyboard = []
@@ -219,7 +223,8 @@ async def show_player_detail(update: Update, context: ContextTypes.DEFAULT_TYPE)
         created_at_str = "Desconhecida"
         
     try:
-        last_seen_dt = datetime.fromisoformat(pdata.get("last_seen", ""))
+        # Memória primeiro: o last_seen do documento só anda no flush em lote
+        last_seen_dt = presence.last_seen(target_user_id) or datetime.fromisoformat(pdata.get("last_seen", ""))
         last_seen_str = last_seen_dt.strftime("%d/%m/%Y às %H:%M")
     except Exception:
         last_seen_str = "Desconhecida"
@@ -20,7 +20,9 @@ from telegram.ext import (
 )
 
 from modules.player.core import get_player_data, save_player_data, clear_player_cache, users_collection
+from modules.database import run_db
 from modules.player.queries import find_player_by_name 
+from modules.player.premium_expiry import notify_premium_changed
 from modules.game_data.premium import PREMIUM_TIERS
 from handlers.admin.utils import ensure_admin, parse_hybrid_id
 
@@ -52,12 +54,13 @@ async def _save_and_refresh(user_id, pdata):
         try:
             q = {"_id": ObjectId(user_id)} if ObjectId.is_valid(user_id) else None
             if q:
-                users_collection.update_one(q, {"$set": {
+                await run_db(users_collection.update_one, q, {"$set": {
                     "premium_tier": pdata.get("premium_tier"),
                     "premium_expires_at": pdata.get("premium_expires_at")
                 }})
         except: pass
     await clear_player_cache(user_id)
+    notify_premium_changed(user_id, pdata.get("premium_expires_at"))
 
 # --- FLUXO DO PAINEL ---
 
@@ -9,6 +9,7 @@ from telegram.ext import ContextTypes, CallbackQueryHandler
 # --- Importação do Banco de Dados ---
 # [MIGRAÇÃO] Substituímos players_collection por users_collection
 from modules.player.core import users_collection, clear_all_player_cache
+from modules.database import run_db
 
 # --- Importa a lógica mestre de reset ---
 # Se este arquivo não existir, o import falhará, mas assumimos que o módulo pvp existe.
@@ -152,8 +153,8 @@ async def admin_trigger_pvp_zero_points(update: Update, context: ContextTypes.DE
             count_manual = 0
             
             # --- PASSO 1: O Update Rápido (Pega os Números) ---
-            # Usa asyncio.to_thread para não travar o bot enquanto o Mongo trabalha
-            result = await asyncio.to_thread(users_collection.update_many,
+            # Usa run_db (executor do Mongo) para não travar o bot enquanto o Mongo trabalha
+            result = await run_db(users_collection.update_many,
                 {"pvp_points": {"$gt": 0}}, 
                 {"$set": {"pvp_points": 0}}
             )
@@ -161,7 +162,7 @@ async def admin_trigger_pvp_zero_points(update: Update, context: ContextTypes.DE
             
             # --- PASSO 2: A Varredura Manual (Pega os Textos/Erros) ---
             # Busca IDs e Pontos em uma thread para não bloquear
-            cursor = await asyncio.to_thread(lambda: list(users_collection.find({}, {"pvp_points": 1})))
+            cursor = await run_db(lambda: list(users_collection.find({}, {"pvp_points": 1})))
             
             for doc in cursor:
                 user_id = doc.get("_id")
@@ -175,7 +176,7 @@ async def admin_trigger_pvp_zero_points(update: Update, context: ContextTypes.DE
                     needs_fix = True
                 
                 if needs_fix:
-                    await asyncio.to_thread(users_collection.update_one, {"_id": user_id}, {"$set": {"pvp_points": 0}})
+                    await run_db(users_collection.update_one, {"_id": user_id}, {"$set": {"pvp_points": 0}})
                     count_manual += 1
 
             # --- PASSO 3: Limpar Cache (Nova Função) ---
@@ -26,6 +26,7 @@ from modules.player.queries import find_player_by_name, find_players_by_name_par
 # --- Imports de Banco e Utils ---
 from bson import ObjectId
 from modules.auth_utils import get_current_player_id
+from modules.database import run_db
 from handlers.admin.utils import ensure_admin, ADMIN_LIST, parse_hybrid_id
 
 # --- Imports de Funcionalidades Administrativas ---
@@ -45,7 +46,8 @@ from modules.player.core import (
     clear_player_cache,
     clear_all_player_cache,
     users_collection,
-    _player_cache
+    _player_cache,
+    get_player_cache_stats,
 )
 from modules.player.queries import (
     find_player_by_name,
@@ -53,7 +55,9 @@ from modules.player.queries import (
     delete_player
 )
 from modules.player.inventory import add_item_to_inventory
+from modules.player.premium_expiry import notify_premium_changed
 from modules.player.stats import (
+    get_stats_cache_stats,
     allowed_points_for_level,
     compute_spent_status_points,
     reset_stats_and_refund_points
@@ -498,12 +502,19 @@ async def debug_player_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if users_collection is not None:
         try:
             search_id = ObjectId(uid) if ObjectId.is_valid(uid) else uid
-            in_new = await asyncio.to_thread(users_collection.find_one, {"_id": search_id}) is not None
+            in_new = await run_db(users_collection.find_one, {"_id": search_id}) is not None
         except:
             pass
 
+    cs = get_player_cache_stats()
+    ss = get_stats_cache_stats()
     await update.message.reply_text(
-        f"🔍 <b>Debug Info</b>\n🆔 ID: <code>{uid}</code>\n💾 Cache: {'✅' if in_cache else '❌'}\n☁️ DB Users: {'✅' if in_new else '❌'}",
+        f"🔍 <b>Debug Info</b>\n🆔 ID: <code>{uid}</code>\n💾 Cache: {'✅' if in_cache else '❌'}\n☁️ DB Users: {'✅' if in_new else '❌'}\n\n"
+        f"📊 <b>Cache</b>: {cs['entries']}/{cs['max_entries']} entradas, {cs['bytes'] // 1024} KB\n"
+        f"🎯 Hit rate: {cs['hit_rate']:.1%} ({cs['hits']} hits / {cs['misses']} misses)\n"
+        f"♻️ Evictions: {cs['evictions']} | Expirados: {cs['expirations']} | Invalidados: {cs['invalidations']}\n\n"
+        f"🧮 <b>Stats</b>: {ss['entries']}/{ss['max_entries']} entradas | Hit rate: {ss['hit_rate']:.1%} "
+        f"({ss['hits']} hits / {ss['misses']} misses, {ss['stale']} desatualizados)",
         parse_mode=HTML
     )
 
@@ -527,7 +538,7 @@ async def hard_respec_all_command(update: Update, context: ContextTypes.DEFAULT_
         return
     msg = await update.message.reply_text("⏳ Iniciando Reset Total...")
     count = 0
-    async for uid, _ in iter_players():
+    async for uid, _ in iter_players(projection={"_id": 1}):
         pdata = await get_player_data(uid)
         if pdata:
             await reset_stats_and_refund_points(pdata)
@@ -559,7 +570,7 @@ async def fix_deleted_clan_command(update: Update, context: ContextTypes.DEFAULT
         return
     clan_id = context.args[0]
     count = 0
-    async for uid, pdata in iter_players():
+    async for uid, pdata in iter_players(filter={"clan_id": clan_id}):
         if pdata.get('clan_id') == clan_id:
             pdata['clan_id'] = None
             await save_player_data(uid, pdata)
@@ -609,6 +620,7 @@ async def fix_premium_dates_command(update: Update, context: ContextTypes.DEFAUL
         if needs_fix:
             pdata["premium_expires_at"] = new_date_str
             await save_player_data(uid, pdata)
+            notify_premium_changed(uid, new_date_str)
             fixed += 1
 
         if count % 50 == 0:
@@ -746,7 +758,8 @@ async def ligar_evento_command(update: Update, context: ContextTypes.DEFAULT_TYP
     
     # 2. Avisa o MongoDB para o site enxergar e mudar o botão para vermelho!
     try:
-        users_collection.database["server_state"].update_one(
+        await run_db(
+            users_collection.database["server_state"].update_one,
             {"_id": "eventos_ativos"},
             {"$set": {"defesa_reino": True}},
             upsert=True
@@ -809,7 +822,7 @@ async def _fix_clan_entry(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 async def _fix_clan_perform(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     clan_id = update.message.text
     count = 0
-    async for uid, pdata in iter_players():
+    async for uid, pdata in iter_players(filter={"clan_id": clan_id}):
         if pdata.get('clan_id') == clan_id:
             pdata['clan_id'] = None
             await save_player_data(uid, pdata)
@@ -1089,7 +1102,7 @@ async def _change_id_perform(update: Update, context: ContextTypes.DEFAULT_TYPE)
     if users_collection is not None:
         try:
             oid = ObjectId(old) if ObjectId.is_valid(old) else old
-            pdata = await asyncio.to_thread(users_collection.find_one, {"_id": oid})
+            pdata = await run_db(users_collection.find_one, {"_id": oid})
         except:
             pass
 
@@ -1099,10 +1112,10 @@ async def _change_id_perform(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 final_oid = ObjectId(new) if ObjectId.is_valid(new) else new
                 pdata['_id'] = final_oid
 
-                await asyncio.to_thread(users_collection.replace_one, {"_id": final_oid}, pdata, upsert=True)
+                await run_db(users_collection.replace_one, {"_id": final_oid}, pdata, upsert=True)
 
                 old_oid = ObjectId(old) if ObjectId.is_valid(old) else old
-                await asyncio.to_thread(users_collection.delete_one, {"_id": old_oid})
+                await run_db(users_collection.delete_one, {"_id": old_oid})
 
             await _safe_edit_text(update, context, "✅ ID Trocado (Sistema Novo).")
         except Exception as e:
@@ -12,6 +12,7 @@ from bson import ObjectId
 
 # --- MÓDULOS PRINCIPAIS ---
 from modules import player_manager, game_data, file_ids
+from modules.database import run_db
 from modules.auth_utils import get_current_player_id
 
 EVOLUTION_ITEMS_DATA = {}
@@ -635,7 +636,7 @@ async def market_my(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # 3. Busca Listings
     # A função list_by_seller deve retornar a lista completa
-    all_listings = market_manager.list_by_seller(user_id)
+    all_listings = await run_db(market_manager.list_by_seller, user_id)
     
     if not all_listings:
         await _safe_edit(q, "👤 <b>Minhas Vendas</b>\n\nVocê não tem itens à venda no momento.", 
@@ -755,28 +756,38 @@ async def market_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try: page = int(q.data.split(":")[1]) if ":" in q.data else 1
     except: page = 1
 
+    # --- CORREÇÃO: RETORNADO PARA 5 ITENS ---
+    ITEMS_PER_PAGE = 5 
+
+    # Paginação por cursor: guarda o cursor de início de cada página já vista
+    # (o callback continua "market_list:<página>", curto o bastante p/ o Telegram)
+    cursors = context.user_data.setdefault("market_cursors", {})
+    if page <= 1 or page not in cursors:
+        page = 1
+        cursors.clear()
+    after = cursors.get(page)
+
     try:
         pdata = await player_manager.get_player_data(user_id) or {}
         gold = pdata.get("gold", 0)
         # Lista com suporte a visualizador
-        all_listings = market_manager.list_active(viewer_id=user_id)
+        listings_page, next_cursor = await run_db(
+            market_manager.list_active_page, viewer_id=user_id, page_size=ITEMS_PER_PAGE, after=after
+        )
+        total = await run_db(market_manager.count_active, viewer_id=user_id)
     except Exception as e: 
         logger.error(f"Erro ao listar mercado: {e}")
-        all_listings = []
+        listings_page, next_cursor, total = [], None, 0
     
-    if not all_listings:
+    if not listings_page:
         text_vazio = "📭 <b>O Mercado está vazio no momento.</b>\n\nSeja o primeiro a vender algo!"
         kb_vazio = InlineKeyboardMarkup([[InlineKeyboardButton("⬅️ Voltar", callback_data="market_adventurer")]])
         await _send_smart(q, context, chat_id, text_vazio, kb_vazio, "mercado_aventureiro")
         return
 
-    # --- CORREÇÃO: RETORNADO PARA 5 ITENS ---
-    ITEMS_PER_PAGE = 5 
-    total = len(all_listings)
-    total_pages = max(1, (total + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE)
-    page = max(1, min(page, total_pages))
-    start = (page - 1) * ITEMS_PER_PAGE
-    listings_page = all_listings[start : start + ITEMS_PER_PAGE]
+    if next_cursor:
+        cursors[page + 1] = next_cursor
+    total_pages = max(page + (1 if next_cursor else 0), (total + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE)
 
     header = (f"╭┈┈┈┈┈➤ 🛒 <b>MERCADO ({page}/{total_pages})</b> ┈┈┈┈┈╮\n │ 💰 <b>Seu Saldo:</b> {gold:,} 🪙\n╰┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈➤\n\n")
     body_lines = []
@@ -827,7 +838,7 @@ async def market_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
     nav_row = []
     if page > 1: nav_row.append(InlineKeyboardButton("⬅️ Ant.", callback_data=f"market_list:{page-1}"))
     nav_row.append(InlineKeyboardButton("🔄 Atualizar", callback_data=f"market_list:{page}"))
-    if page < total_pages: nav_row.append(InlineKeyboardButton("Prox. ➡️", callback_data=f"market_list:{page+1}"))
+    if next_cursor: nav_row.append(InlineKeyboardButton("Prox. ➡️", callback_data=f"market_list:{page+1}"))
     if nav_row: keyboard.append(nav_row)
     keyboard.append([InlineKeyboardButton("⬅️ Voltar ao Menu", callback_data="market_adventurer")])
     
@@ -1223,33 +1234,35 @@ async def market_finalize_listing(update: Update, context: ContextTypes.DEFAULT_
     pdata = None; item_payload = {}; seller_name = "Vendedor"; log_item_name = "Item Misterioso"; log_qty = 1
 
     try:
-        pdata = await player_manager.get_player_data(user_id)
-        seller_name = pdata.get("character_name", f"Player {user_id}")
-        item_payload = {}; stock_to_create = 1
-        
-        if pending["type"] == "stack":
-            base_id = pending["base_id"]; lot_size = pending["lot_size"]; stock = pending["qty"]
-            info = _get_item_info(base_id); i_name = info.get("display_name") or base_id
-            log_item_name = f"{i_name} (Lote de {lot_size})"; log_qty = stock
-            total_items_to_remove = stock * lot_size 
-            if player_manager.remove_item_from_inventory(pdata, base_id, total_items_to_remove):
-                item_payload = {"type": "stack", "base_id": base_id, "qty": lot_size}; stock_to_create = stock
-            else:
-                if q: await q.answer("❌ Itens insuficientes.", show_alert=True)
-                return
-        elif pending["type"] == "unique":
-            uid = pending["uid"]; inv = pdata.get("inventory", {})
-            if uid in inv:
-                item_data = inv[uid]; base_id = item_data.get("base_id")
-                info = _get_item_info(base_id); i_name = item_data.get("display_name") or info.get("display_name") or base_id
-                log_item_name = f"{i_name} [{str(item_data.get('rarity','comum')).upper()}]"
-                del inv[uid]; item_payload = {"type": "unique", "item": item_data, "uid": uid}; item_removed_successfully = True; qty = 1 
-            else:
-                if q: await q.answer("❌ Item não encontrado.", show_alert=True)
-                return
+        # Sessão: retira os itens com lock do jogador + CAS (gravado na saída)
+        async with player_manager.player_session(user_id) as pdata:
+            if not pdata: return
+            seller_name = pdata.get("character_name", f"Player {user_id}")
+            item_payload = {}; stock_to_create = 1
+
+            if pending["type"] == "stack":
+                base_id = pending["base_id"]; lot_size = pending["lot_size"]; stock = pending["qty"]
+                info = _get_item_info(base_id); i_name = info.get("display_name") or base_id
+                log_item_name = f"{i_name} (Lote de {lot_size})"; log_qty = stock
+                total_items_to_remove = stock * lot_size 
+                if player_manager.remove_item_from_inventory(pdata, base_id, total_items_to_remove):
+                    item_payload = {"type": "stack", "base_id": base_id, "qty": lot_size}; stock_to_create = stock
+                else:
+                    if q: await q.answer("❌ Itens insuficientes.", show_alert=True)
+                    return
+            elif pending["type"] == "unique":
+                uid = pending["uid"]; inv = pdata.get("inventory", {})
+                if uid in inv:
+                    item_data = inv[uid]; base_id = item_data.get("base_id")
+                    info = _get_item_info(base_id); i_name = item_data.get("display_name") or info.get("display_name") or base_id
+                    log_item_name = f"{i_name} [{str(item_data.get('rarity','comum')).upper()}]"
+                    del inv[uid]; item_payload = {"type": "unique", "item": item_data, "uid": uid}; qty = 1 
+                else:
+                    if q: await q.answer("❌ Item não encontrado.", show_alert=True)
+                    return
 
-        await player_manager.save_player_data(user_id, pdata)
-        market_manager.create_listing(seller_id=user_id, item_payload=item_payload, unit_price=price, quantity=stock_to_create, target_buyer_id=target_id, target_buyer_name=target_name, seller_name=seller_name)
+        item_removed_successfully = True
+        await run_db(market_manager.create_listing, seller_id=user_id, item_payload=item_payload, unit_price=price, quantity=stock_to_create, target_buyer_id=target_id, target_buyer_name=target_name, seller_name=seller_name)
         context.user_data.pop("market_pending", None); context.user_data.pop("market_awaiting_id", None); context.user_data.pop("market_price", None)
         msg_text = f"✅ <b>Anúncio Criado!</b>\n💰 {price:,} Ouro"
         if target_id: msg_text += f"\n🔒 <b>Reservado para:</b> {target_name}"
@@ -1265,12 +1278,13 @@ async def market_finalize_listing(update: Update, context: ContextTypes.DEFAULT_
             
     except Exception as e:
         logger.error(f"ERRO CRÍTICO NA VENDA (USER {user_id}): {e}")
-        if item_removed_successfully and pdata:
+        if item_removed_successfully:
             try:
-                if pending["type"] == "stack": inv = pdata.setdefault("inventory", {}); base_id = pending["base_id"]; qty = pending["qty"]; inv[base_id] = int(inv.get(base_id, 0)) + qty
-                elif pending["type"] == "unique": uid = pending["uid"]; 
-                if "item" in item_payload: pdata.setdefault("inventory", {})[uid] = item_payload["item"]
-                await player_manager.save_player_data(user_id, pdata)
+                # Devolve numa sessão nova: a da retirada já foi gravada
+                async with player_manager.player_session(user_id) as pdata:
+                    if not pdata: raise ValueError("jogador não encontrado")
+                    if pending["type"] == "stack": player_manager.add_item_to_inventory(pdata, pending["base_id"], pending["qty"] * pending["lot_size"])
+                    elif "item" in item_payload: pdata.setdefault("inventory", {})[pending["uid"]] = item_payload["item"]
                 err_msg = "⚠️ <b>Erro no Mercado!</b>\nO sistema detectou uma falha, mas seu item foi <b>DEVOLVIDO</b> ao inventário."
             except Exception as e_rollback: logger.critical(f"FALHA NO ROLLBACK DO JOGADOR {user_id}: {e_rollback}"); err_msg = "❌ <b>Erro Crítico!</b> Contate o suporte. (Cod: ROLLBACK_FAIL)"
         else: err_msg = "❌ Erro ao processar. Nenhum item removido."
@@ -1352,7 +1366,7 @@ async def market_cancel_new(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def market_my(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query; await q.answer()
     user_id = ensure_object_id(get_current_player_id(update, context))
-    listings = market_manager.list_by_seller(user_id)
+    listings = await run_db(market_manager.list_by_seller, user_id)
     
     if not listings:
         await _safe_edit(q, "👤 <b>Minhas Vendas</b>\n\nNenhum item anunciado.", InlineKeyboardMarkup([[InlineKeyboardButton("⬅️ Voltar", callback_data="market_adventurer")]]) )
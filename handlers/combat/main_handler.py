@@ -302,15 +302,14 @@ async def combat_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, ac
     if action == 'combat_flee':
         hp_atual_batalha = battle_cache.get('player_hp')
         context.user_data.pop('battle_cache', None)
-        player_data = await player_manager.get_player_data(user_id)
-        
-        if hp_atual_batalha is not None:
-            player_data['current_hp'] = int(hp_atual_batalha)
+        async with player_manager.player_session(user_id) as player_data:
+            if not player_data: return
+            if hp_atual_batalha is not None:
+                player_data['current_hp'] = int(hp_atual_batalha)
             
-        player_data['player_state'] = {'action': 'idle'}
-        if "cooldowns" in player_data: player_data.pop("cooldowns", None)
+            player_data['player_state'] = {'action': 'idle'}
+            if "cooldowns" in player_data: player_data.pop("cooldowns", None)
 
-        await player_manager.save_player_data(user_id, player_data)
         try: await query.delete_message()
         except: pass
         
@@ -326,114 +325,159 @@ async def combat_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, ac
     # AÇÃO: ATAQUE / SKILL
     # ============================================
     elif action == 'combat_attack':
-        player_data = await player_manager.get_player_data(user_id)
-        if not player_data: return
-                # ============================
-        # EFFECTS: início do turno do jogador (DOT/HOT + expiração)
-        # ============================
+        # Sessão: lock do jogador + UM save com CAS na saída (os save_player_data
+        # abaixo, inclusive os de helpers como a evolução de classe e a dungeon,
+        # viram o save da sessão; exceção descarta o turno inteiro)
+        async with player_manager.player_session(user_id) as player_data:
+            if not player_data: return
+                    # ============================
+            # EFFECTS: início do turno do jogador (DOT/HOT + expiração)
+            # ============================
 
-        # Garantir hp_max para o engine limitar cura corretamente
-        # (o engine usa hp_max ou max_hp)
-        battle_cache["hp_max"] = int(player_stats.get("max_hp", 100))
+            # Garantir hp_max para o engine limitar cura corretamente
+            # (o engine usa hp_max ou max_hp)
+            battle_cache["hp_max"] = int(player_stats.get("max_hp", 100))
 
-        effect_msgs = tick_turn(
-            battle_cache,      # entidade do jogador (usando battle_cache)
-            battle_cache,      # battle (contexto)
-            apply_to_hp_key="player_hp"
-        )
-        if effect_msgs:
-            log.extend(effect_msgs)
-
-        # ============================
-        # EFFECTS: controle (stun/cannot_act)
-        # ============================
-        if not can_act(battle_cache):
-            log.append("💫 Você está impedido de agir!")
-            # Se estiver stunado, o jogador perde a ação, mas o monstro ainda joga.
-            # Forçamos: não usar skill/ataque, e segue para TURNO DO MONSTRO.
-            skip_monster_turn = False
-            player_damage = 0
+            effect_msgs = tick_turn(
+                battle_cache,      # entidade do jogador (usando battle_cache)
+                battle_cache,      # battle (contexto)
+                apply_to_hp_key="player_hp"
+            )
+            if effect_msgs:
+                log.extend(effect_msgs)
 
-            # NÃO retorne aqui — deixe o fluxo seguir para o TURNO DO MONSTRO
-            # Abaixo, vamos pular o processamento do ataque do jogador.
+            # ============================
+            # EFFECTS: controle (stun/cannot_act)
+            # ============================
+            if not can_act(battle_cache):
+                log.append("💫 Você está impedido de agir!")
+                # Se estiver stunado, o jogador perde a ação, mas o monstro ainda joga.
+                # Forçamos: não usar skill/ataque, e segue para TURNO DO MONSTRO.
+                skip_monster_turn = False
+                player_damage = 0
+
+                # NÃO retorne aqui — deixe o fluxo seguir para o TURNO DO MONSTRO
+                # Abaixo, vamos pular o processamento do ataque do jogador.
     
-        battle_cache['turn'] = 'player'
-        skill_id = battle_cache.pop('skill_to_use', None) 
-        action_type = battle_cache.pop('action_type', 'attack')
+            battle_cache['turn'] = 'player'
+            skill_id = battle_cache.pop('skill_to_use', None) 
+            action_type = battle_cache.pop('action_type', 'attack')
         
-        if skill_id:
-            pode_usar, msg_cd = verificar_cooldown(player_data, skill_id)
-            if not pode_usar:
-                if query: await query.answer(msg_cd, show_alert=True)
-                return 
+            if skill_id:
+                pode_usar, msg_cd = verificar_cooldown(player_data, skill_id)
+                if not pode_usar:
+                    if query: await query.answer(msg_cd, show_alert=True)
+                    return 
 
-        skill_info = get_skill_data_with_rarity(player_data, skill_id) if skill_id else None
-        skip_monster_turn = False
-        player_damage = 0 
+            skill_info = get_skill_data_with_rarity(player_data, skill_id) if skill_id else None
+            skip_monster_turn = False
+            player_damage = 0 
         
-        if not can_act(battle_cache):
-            skill_info = None
-            action_type = "attack"
-
-        # --- TURNO DO JOGADOR ---
-        if skill_info:
-            mana_cost = skill_info.get("mana_cost", 0)
-            log.append(f"✨ {skill_info['display_name']}! (-{mana_cost} MP)")
+            if not can_act(battle_cache):
+                skill_info = None
+                action_type = "attack"
+
+            # --- TURNO DO JOGADOR ---
+            if skill_info:
+                mana_cost = skill_info.get("mana_cost", 0)
+                log.append(f"✨ {skill_info['display_name']}! (-{mana_cost} MP)")
             
-            if action_type == 'support':
-                effects = skill_info.get("effects", {})
-                if "party_heal" in effects:
-                    heal_def = effects["party_heal"]
-                    base_heal = 0
-                    if "amount_percent_max_hp" in heal_def:
-                        base_heal = int(player_stats.get('max_hp', 100) * heal_def["amount_percent_max_hp"])
-                    elif heal_def.get("heal_type") == "magic_attack":
-                         base_heal = int(player_stats.get('magic_attack', 10) * heal_def.get("heal_scale", 1.0))
+                if action_type == 'support':
+                    effects = skill_info.get("effects", {})
+                    if "party_heal" in effects:
+                        heal_def = effects["party_heal"]
+                        base_heal = 0
+                        if "amount_percent_max_hp" in heal_def:
+                            base_heal = int(player_stats.get('max_hp', 100) * heal_def["amount_percent_max_hp"])
+                        elif heal_def.get("heal_type") == "magic_attack":
+                             base_heal = int(player_stats.get('magic_attack', 10) * heal_def.get("heal_scale", 1.0))
                     
-                    cur = int(battle_cache.get('player_hp', 0))
-                    mx = int(player_stats.get('max_hp', 100))
+                        cur = int(battle_cache.get('player_hp', 0))
+                        mx = int(player_stats.get('max_hp', 100))
+
+                        # ============================
+                        # EFFECTS: heal pipeline (anti-heal, buffs de cura, etc.)
+                        # ============================
+                        battle_cache["hp_max"] = mx  # garante limite para o engine
+
+                        ctx = CombatContext(
+                            event=EVENT_ON_HEAL,
+                            source=battle_cache,
+                            target=battle_cache,
+                            battle=battle_cache,
+                            heal=int(base_heal),
+                        )
+                        dispatch(EVENT_ON_HEAL, ctx)
+                        final_heal = int(ctx.heal)
+
+                        new_h = min(mx, cur + final_heal)
+                        if new_h > cur:
+                            battle_cache['player_hp'] = new_h
+                            log.append(f"❤️ Cura: +{new_h - cur} HP")
+
+                    skip_monster_turn = True 
+                else:
+                    passive_overrides = _build_passive_overrides_for_player_attack(player_data, battle_cache)
+
+                    res = await combat_engine.processar_acao_combate(
+                        player_data,
+                        player_stats,
+                        monster_stats,
+                        skill_id,
+                        battle_cache.get('player_hp'),
+                        passive_overrides=passive_overrides,
+                    )
+                    player_damage = res["total_damage"]
+                    log.extend(res["log_messages"])
 
                     # ============================
-                    # EFFECTS: heal pipeline (anti-heal, buffs de cura, etc.)
+                    # EFFECTS: aplicar efeitos da skill
                     # ============================
-                    battle_cache["hp_max"] = mx  # garante limite para o engine
-
-                    ctx = CombatContext(
-                        event=EVENT_ON_HEAL,
-                        source=battle_cache,
-                        target=battle_cache,
-                        battle=battle_cache,
-                        heal=int(base_heal),
+                    apply_skill_effects(
+                        skill_id=skill_id,
+                        skill_info=skill_info,
+                        player_id=user_id,
+                        player_stats=player_stats,
+                        battle_cache=battle_cache,
+                        monster_stats=monster_stats,
+                        log=log,
+                        combat_result=res,
                     )
-                    dispatch(EVENT_ON_HEAL, ctx)
-                    final_heal = int(ctx.heal)
 
-                    new_h = min(mx, cur + final_heal)
-                    if new_h > cur:
-                        battle_cache['player_hp'] = new_h
-                        log.append(f"❤️ Cura: +{new_h - cur} HP")
 
-                skip_monster_turn = True 
+
+            
+                raridade = "comum"
+                if player_data.get("skills") and skill_id in player_data["skills"]:
+                    raridade = player_data["skills"][skill_id].get("rarity", "comum")
+                player_data = aplicar_cooldown(player_data, skill_id, raridade)
+
             else:
+                # ATAQUE BÁSICO
+                # Regra de design:
+                # - NÃO aplica DOT ATIVO (bleed)
+                # - PASSIVAS on-hit (ex.: veneno) podem proc-ar aqui
+                log.append("⚔️ Ataque básico.")
+
                 passive_overrides = _build_passive_overrides_for_player_attack(player_data, battle_cache)
 
                 res = await combat_engine.processar_acao_combate(
                     player_data,
                     player_stats,
                     monster_stats,
-                    skill_id,
+                    None,
                     battle_cache.get('player_hp'),
                     passive_overrides=passive_overrides,
                 )
+
                 player_damage = res["total_damage"]
                 log.extend(res["log_messages"])
 
                 # ============================
-                # EFFECTS: aplicar efeitos da skill
+                # PASSIVAS ON-HIT (VENENO ETC)
                 # ============================
-                apply_skill_effects(
-                    skill_id=skill_id,
-                    skill_info=skill_info,
+                apply_on_hit_passives(
+                    player_data=player_data,
                     player_id=user_id,
                     player_stats=player_stats,
                     battle_cache=battle_cache,
@@ -443,390 +487,371 @@ async def combat_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, ac
                 )
 
 
-
-            
-            raridade = "comum"
-            if player_data.get("skills") and skill_id in player_data["skills"]:
-                raridade = player_data["skills"][skill_id].get("rarity", "comum")
-            player_data = aplicar_cooldown(player_data, skill_id, raridade)
-
-        else:
-            # ATAQUE BÁSICO
-            # Regra de design:
-            # - NÃO aplica DOT ATIVO (bleed)
-            # - PASSIVAS on-hit (ex.: veneno) podem proc-ar aqui
-            log.append("⚔️ Ataque básico.")
-
-            passive_overrides = _build_passive_overrides_for_player_attack(player_data, battle_cache)
-
-            res = await combat_engine.processar_acao_combate(
-                player_data,
-                player_stats,
-                monster_stats,
-                None,
-                battle_cache.get('player_hp'),
-                passive_overrides=passive_overrides,
-            )
-
-            player_damage = res["total_damage"]
-            log.extend(res["log_messages"])
-
-            # ============================
-            # PASSIVAS ON-HIT (VENENO ETC)
-            # ============================
-            apply_on_hit_passives(
-                player_data=player_data,
-                player_id=user_id,
-                player_stats=player_stats,
-                battle_cache=battle_cache,
-                monster_stats=monster_stats,
-                log=log,
-                combat_result=res,
-            )
-
-
-            player_damage = res["total_damage"]
-            log.extend(res["log_messages"])
+                player_damage = res["total_damage"]
+                log.extend(res["log_messages"])
 
 
-        if not skip_monster_turn:
-            if 'hp' not in monster_stats:
-                monster_stats['hp'] = monster_stats.get('max_hp', 100)
+            if not skip_monster_turn:
+                if 'hp' not in monster_stats:
+                    monster_stats['hp'] = monster_stats.get('max_hp', 100)
 
-            # ============================
-            # EFFECTS: before damage (jogador -> monstro)
-            # ============================
-            # Garantir hp_max no monstro para o engine (cura/limites futuros)
-            if "hp_max" not in monster_stats:
-                monster_stats["hp_max"] = int(monster_stats.get("max_hp", monster_stats.get("hp", 1)))
+                # ============================
+                # EFFECTS: before damage (jogador -> monstro)
+                # ============================
+                # Garantir hp_max no monstro para o engine (cura/limites futuros)
+                if "hp_max" not in monster_stats:
+                    monster_stats["hp_max"] = int(monster_stats.get("max_hp", monster_stats.get("hp", 1)))
 
-            ctx = CombatContext(
-                event=EVENT_ON_BEFORE_DAMAGE,
-                source=battle_cache,      # jogador (entidade)
-                target=monster_stats,     # monstro
-                battle=battle_cache,      # contexto do combate
-                damage=int(player_damage),
-                damage_type="physical",
-            )
-            dispatch(EVENT_ON_BEFORE_DAMAGE, ctx)
+                ctx = CombatContext(
+                    event=EVENT_ON_BEFORE_DAMAGE,
+                    source=battle_cache,      # jogador (entidade)
+                    target=monster_stats,     # monstro
+                    battle=battle_cache,      # contexto do combate
+                    damage=int(player_damage),
+                    damage_type="physical",
+                )
+                dispatch(EVENT_ON_BEFORE_DAMAGE, ctx)
 
-            final_damage = int(ctx.damage)
-            monster_stats['hp'] = int(monster_stats['hp']) - final_damage
+                final_damage = int(ctx.damage)
+                monster_stats['hp'] = int(monster_stats['hp']) - final_damage
 
             
-        monster_defeated = monster_stats.get('hp', 0) <= 0
-        battle_cache['battle_log'] = log[-12:]
+            monster_defeated = monster_stats.get('hp', 0) <= 0
+            battle_cache['battle_log'] = log[-12:]
         
-        caption_p = await format_combat_message_from_cache(battle_cache)
+            caption_p = await format_combat_message_from_cache(battle_cache)
         
-        if skip_monster_turn:
+            if skip_monster_turn:
             
-            player_data, msgs_cd = iniciar_turno(player_data)
-            if msgs_cd:
-                for msg in msgs_cd: log.append(msg)
-            await player_manager.save_player_data(user_id, player_data)
+                player_data, msgs_cd = iniciar_turno(player_data)
+                if msgs_cd:
+                    for msg in msgs_cd: log.append(msg)
+                await player_manager.save_player_data(user_id, player_data)
             
-            kb = [[InlineKeyboardButton("⚔️ Atacar", callback_data='combat_attack'), InlineKeyboardButton("✨ Skills", callback_data='combat_skill_menu')],
-                  [InlineKeyboardButton("🧪 Poções", callback_data='combat_potion_menu'), InlineKeyboardButton("🏃 Fugir", callback_data='combat_flee')]]
-            await _edit_media_or_caption(context, battle_cache, caption_p, battle_cache['player_media_id'], battle_cache['player_media_type'], InlineKeyboardMarkup(kb))
-            return 
+                kb = [[InlineKeyboardButton("⚔️ Atacar", callback_data='combat_attack'), InlineKeyboardButton("✨ Skills", callback_data='combat_skill_menu')],
+                      [InlineKeyboardButton("🧪 Poções", callback_data='combat_potion_menu'), InlineKeyboardButton("🏃 Fugir", callback_data='combat_flee')]]
+                await _edit_media_or_caption(context, battle_cache, caption_p, battle_cache['player_media_id'], battle_cache['player_media_type'], InlineKeyboardMarkup(kb))
+                return 
             
-        # ============================================
-        # VITÓRIA
-        # ============================================
-        if monster_defeated:
-            if battle_cache.get("_battle_finished"):
-                return
-            battle_cache["_battle_finished"] = True
+            # ============================================
+            # VITÓRIA
+            # ============================================
+            if monster_defeated:
+                if battle_cache.get("_battle_finished"):
+                    return
+                battle_cache["_battle_finished"] = True
             
-            # limpa cooldowns e salva
-            if "cooldowns" in player_data:
-                player_data.pop("cooldowns", None)
-
-            await player_manager.save_player_data(user_id, player_data)
-
-            try:
-                log.append(f"🏆 <b>{monster_stats.get('name')} derrotado!</b>")
-
-                state_action = player_data.get("player_state", {}).get("action")
-
-                # =========================
-                # EVOLUTION COMBAT
-                # =========================
-                if state_action == "evolution_combat":
-                    context.user_data.pop("battle_cache", None)
-
-                    if "cooldowns" in player_data:
-                        player_data.pop("cooldowns", None)
+                # limpa cooldowns e salva
+                if "cooldowns" in player_data:
+                    player_data.pop("cooldowns", None)
 
-                    details = player_data.get("player_state", {}).get("details", {})
-                    target_class = details.get("target_class_reward")
-
-                    success, msg_evo = await class_evolution_service.finalize_evolution(user_id, target_class)
-                    player_data = await player_manager.get_player_data(user_id)
+                await player_manager.save_player_data(user_id, player_data)
 
-                    player_data["player_state"] = {"action": "idle"}
+                try:
+                    log.append(f"🏆 <b>{monster_stats.get('name')} derrotado!</b>")
+
+                    state_action = player_data.get("player_state", {}).get("action")
+
+                    # =========================
+                    # EVOLUTION COMBAT
+                    # =========================
+                    if state_action == "evolution_combat":
+                        context.user_data.pop("battle_cache", None)
+
+                        if "cooldowns" in player_data:
+                            player_data.pop("cooldowns", None)
+
+                        details = player_data.get("player_state", {}).get("details", {})
+                        target_class = details.get("target_class_reward")
+
+                        success, msg_evo = await class_evolution_service.finalize_evolution(user_id, target_class)
+                        player_data = await player_manager.get_player_data(user_id)
+
+                        player_data["player_state"] = {"action": "idle"}
+                        await player_manager.save_player_data(user_id, player_data)
+
+                        media_sucesso = (file_id_manager.get_file_data("media_evolution_success") or {}).get("id")
+                        final_text = (
+                            f"🏆 <b>VITÓRIA LENDÁRIA!</b>\n\n{msg_evo}\n\n"
+                            f"<i>Seus atributos aumentaram e novas habilidades foram desbloqueadas.</i>"
+                        )
+                        kb_fim = [[InlineKeyboardButton("📜 Ver Perfil", callback_data="profile")]]
+
+                        await _edit_media_or_caption(
+                            context,
+                            battle_cache,
+                            final_text,
+                            media_sucesso,
+                            "photo",
+                            InlineKeyboardMarkup(kb_fim),
+                        )
+                        return
+
+                    # =========================
+                    # CASO 1: DUNGEON (NÃO CONTA PARA GUERRA)
+                    # =========================
+                    if in_dungeon:
+                        combat_details_recon = {
+                            "region_key": battle_cache.get("region_key"),
+                            "difficulty": dungeon_ctx.get("difficulty"),
+                            "dungeon_stage": dungeon_ctx.get("floor_idx", 0),
+                            "dungeon_ctx": dungeon_ctx,
+                            "loot_table": monster_stats.get("loot_table", []),
+                            "file_id_name": battle_cache.get("monster_media_id"),
+                        }
+
+                        r_ctx = battle_cache.copy()
+                        r_ctx.update(monster_stats)
+
+                        xp, gold, items = rewards.calculate_victory_rewards(player_data, r_ctx)
+
+                        fmt_items = []
+                        for i in items:
+                            if isinstance(i, str):
+                                fmt_items.append((i, 1, {}))
+                            elif isinstance(i, (list, tuple)):
+                                fmt_items.append((i[0], i[1], {}))
+
+                        pkg = {"xp": xp, "gold": gold, "items": fmt_items}
+                        await dungeons_runtime.advance_after_victory(update, context, user_id, chat_id, combat_details_recon, pkg)
+                        return
+
+                    # =========================
+                    # CASO 2: COMBATE NORMAL
+                    # =========================
+                    durability.apply_end_of_battle_wear(player_data, battle_cache, log)
                     await player_manager.save_player_data(user_id, player_data)
 
-                    media_sucesso = (file_id_manager.get_file_data("media_evolution_success") or {}).get("id")
-                    final_text = (
-                        f"🏆 <b>VITÓRIA LENDÁRIA!</b>\n\n{msg_evo}\n\n"
-                        f"<i>Seus atributos aumentaram e novas habilidades foram desbloqueadas.</i>"
-                    )
-                    kb_fim = [[InlineKeyboardButton("📜 Ver Perfil", callback_data="profile")]]
-
-                    await _edit_media_or_caption(
-                        context,
-                        battle_cache,
-                        final_text,
-                        media_sucesso,
-                        "photo",
-                        InlineKeyboardMarkup(kb_fim),
-                    )
-                    return
-
-                # =========================
-                # CASO 1: DUNGEON (NÃO CONTA PARA GUERRA)
-                # =========================
-                if in_dungeon:
-                    combat_details_recon = {
-                        "region_key": battle_cache.get("region_key"),
-                        "difficulty": dungeon_ctx.get("difficulty"),
-                        "dungeon_stage": dungeon_ctx.get("floor_idx", 0),
-                        "dungeon_ctx": dungeon_ctx,
-                        "loot_table": monster_stats.get("loot_table", []),
-                        "file_id_name": battle_cache.get("monster_media_id"),
-                    }
-
                     r_ctx = battle_cache.copy()
                     r_ctx.update(monster_stats)
 
                     xp, gold, items = rewards.calculate_victory_rewards(player_data, r_ctx)
 
-                    fmt_items = []
+                    player_data["xp"] = player_data.get("xp", 0) + xp
+                    player_data["gold"] = player_data.get("gold", 0) + gold
+
+                    processed_loot = []
                     for i in items:
                         if isinstance(i, str):
-                            fmt_items.append((i, 1, {}))
+                            processed_loot.append((i, 1))
                         elif isinstance(i, (list, tuple)):
-                            fmt_items.append((i[0], i[1], {}))
+                            processed_loot.append((i[0], i[1]))
 
-                    pkg = {"xp": xp, "gold": gold, "items": fmt_items}
-                    await dungeons_runtime.advance_after_victory(update, context, user_id, chat_id, combat_details_recon, pkg)
-                    return
+                    for i_id, qty in processed_loot:
+                        player_manager.add_item_to_inventory(player_data, i_id, qty)
 
-                # =========================
-                # CASO 2: COMBATE NORMAL
-                # =========================
-                durability.apply_end_of_battle_wear(player_data, battle_cache, log)
-                await player_manager.save_player_data(user_id, player_data)
+                    monster_name = monster_stats.get("name", "Inimigo")
+                    xp_str = f"+{xp}"
+                    gold_str = f"+{gold}"
 
-                r_ctx = battle_cache.copy()
-                r_ctx.update(monster_stats)
+                    # últimos eventos (limpos)
+                    final_log_lines = _dedupe_log_lines(log[-20:], limit=10)
 
-                xp, gold, items = rewards.calculate_victory_rewards(player_data, r_ctx)
+                    summary = (
+                        "╭┈➤➤⚔️🏆 𝐕𝐈𝐓𝐎́𝐑𝐈𝐀!\n"
+                        f"├┈➤ Derrotou {monster_name}!\n"
+                        f"├┈┈➤✨ XP: {xp_str}\n"
+                        f"├┈┈➤💰 Ouro: {gold_str}\n"
+                        "├─────────────────────────────┤\n"
+                    )
 
-                player_data["xp"] = player_data.get("xp", 0) + xp
-                player_data["gold"] = player_data.get("gold", 0) + gold
+                    if final_log_lines:
+                        summary += "├┈➤📜 𝐔́𝐥𝐭𝐢𝐦𝐨𝐬 𝐞𝐯𝐞𝐧𝐭𝐨𝐬:\n"
+                        for line in final_log_lines:
+                            summary += f"├┈➤• {line}\n"
 
-                processed_loot = []
-                for i in items:
-                    if isinstance(i, str):
-                        processed_loot.append((i, 1))
-                    elif isinstance(i, (list, tuple)):
-                        processed_loot.append((i[0], i[1]))
+                    summary += "╰─────────────────────────────╯"
 
-                for i_id, qty in processed_loot:
-                    player_manager.add_item_to_inventory(player_data, i_id, qty)
 
-                monster_name = monster_stats.get("name", "Inimigo")
-                xp_str = f"+{xp}"
-                gold_str = f"+{gold}"
+                    if processed_loot:
+                        summary += "\n📦 <b>Loot Encontrado:</b>\n"
+                        for i_id, qty in processed_loot:
+                            item_info = game_data.ITEMS_DATA.get(i_id, {})
+                            i_name = item_info.get("display_name") or i_id.replace("_", " ").title()
+                            i_emoji = item_info.get("emoji", "🎲")
+                            summary += f"• {qty}x {i_emoji} {i_name}\n"
 
-                # últimos eventos (limpos)
-                final_log_lines = _dedupe_log_lines(log[-20:], limit=10)
+                    try:
+                        before_lvl = int(player_data.get("level") or 1)
+                        before_xp = int(player_data.get("xp") or 0)
 
-                summary = (
-                    "╭┈➤➤⚔️🏆 𝐕𝐈𝐓𝐎́𝐑𝐈𝐀!\n"
-                    f"├┈➤ Derrotou {monster_name}!\n"
-                    f"├┈┈➤✨ XP: {xp_str}\n"
-                    f"├┈┈➤💰 Ouro: {gold_str}\n"
-                    "├─────────────────────────────┤\n"
-                )
+                        _, _, lvl_msg = player_manager.check_and_apply_level_up(player_data)
 
-                if final_log_lines:
-                    summary += "├┈➤📜 𝐔́𝐥𝐭𝐢𝐦𝐨𝐬 𝐞𝐯𝐞𝐧𝐭𝐨𝐬:\n"
-                    for line in final_log_lines:
-                        summary += f"├┈➤• {line}\n"
+                        after_lvl = int(player_data.get("level") or before_lvl)
+                        after_xp = int(player_data.get("xp") or before_xp)
 
-                summary += "╰─────────────────────────────╯"
+                        logger.warning(
+                            f"[LEVELUP] before: lvl={before_lvl} xp={before_xp} | "
+                            f"after: lvl={after_lvl} xp={after_xp} | msg={lvl_msg}"
+                        )
 
+                        if lvl_msg:
+                            summary += lvl_msg
 
-                if processed_loot:
-                    summary += "\n📦 <b>Loot Encontrado:</b>\n"
-                    for i_id, qty in processed_loot:
-                        item_info = game_data.ITEMS_DATA.get(i_id, {})
-                        i_name = item_info.get("display_name") or i_id.replace("_", " ").title()
-                        i_emoji = item_info.get("emoji", "🎲")
-                        summary += f"• {qty}x {i_emoji} {i_name}\n"
+                        # ==================================================
+                        # 🐺 DORA — Tutorial de Caça (Pradaria até Nível 5)
+                        # ==================================================
+                        if after_lvl > before_lvl:
+                            try:
+                                from handlers.tutorial.dora_hunting import maybe_notify_level_progress
+                                await maybe_notify_level_progress(update, context, user_id, after_lvl)
+                            except Exception as e:
+                                logger.error(f"[Tutorial Hunting] erro ao notificar progresso: {e}", exc_info=True)
 
-                try:
-                    before_lvl = int(player_data.get("level") or 1)
-                    before_xp = int(player_data.get("xp") or 0)
+                    except Exception as e:
+                        logger.error(f"[LEVELUP] erro ao aplicar level up: {e}", exc_info=True)
 
-                    _, _, lvl_msg = player_manager.check_and_apply_level_up(player_data)
+                        mid = monster_stats.get("id")
+                        if mid:
+                            await mission_manager.update_mission_progress(user_id, "hunt", mid, 1)
 
-                    after_lvl = int(player_data.get("level") or before_lvl)
-                    after_xp = int(player_data.get("xp") or before_xp)
+                    except Exception as e:
+                        logger.exception(f"[LEVELUP] erro em check_and_apply_level_up: {e}")
 
-                    logger.warning(
-                        f"[LEVELUP] before: lvl={before_lvl} xp={before_xp} | "
-                        f"after: lvl={after_lvl} xp={after_xp} | msg={lvl_msg}"
-                    )
 
-                    if lvl_msg:
-                        summary += lvl_msg
+                    stats = await player_manager.get_player_total_stats(player_data)
+                    player_data["current_hp"] = stats.get("max_hp", 100)
+                    player_data["current_mp"] = stats.get("max_mana", 50)
+                    player_data["player_state"] = {"action": "idle"}
 
-                    # ==================================================
-                    # 🐺 DORA — Tutorial de Caça (Pradaria até Nível 5)
-                    # ==================================================
-                    if after_lvl > before_lvl:
-                        try:
-                            from handlers.tutorial.dora_hunting import maybe_notify_level_progress
-                            await maybe_notify_level_progress(update, context, user_id, after_lvl)
-                        except Exception as e:
-                            logger.error(f"[Tutorial Hunting] erro ao notificar progresso: {e}", exc_info=True)
+                    # =========================
+                    # GUERRA DE CLÃ (PVE KILL) - SOMENTE COMBATE NORMAL
+                    # =========================
+                    try:
+                        await try_award_pve_kill_for_guild_war(
+                            player_id=user_id,
+                            player_data=player_data,
+                            region_key=battle_cache.get("region_key"),
+                            game_data_regions_module=game_data_regions,
+                            base_points=3,
+                        )
+                    except Exception:
+                        pass
 
-                except Exception as e:
-                    logger.error(f"[LEVELUP] erro ao aplicar level up: {e}", exc_info=True)
+                    await player_manager.save_player_data(user_id, player_data)
+                    context.user_data.pop("battle_cache", None)
 
-                    mid = monster_stats.get("id")
-                    if mid:
-                        await mission_manager.update_mission_progress(user_id, "hunt", mid, 1)
+                    await _edit_media_or_caption(
+                        context,
+                        battle_cache,
+                        summary,
+                        battle_cache["player_media_id"],
+                        battle_cache["player_media_type"],
+                        kb_voltar,
+                    )
+                    return
 
                 except Exception as e:
-                    logger.exception(f"[LEVELUP] erro em check_and_apply_level_up: {e}")
-
-
-                stats = await player_manager.get_player_total_stats(player_data)
-                player_data["current_hp"] = stats.get("max_hp", 100)
-                player_data["current_mp"] = stats.get("max_mana", 50)
-                player_data["player_state"] = {"action": "idle"}
+                    logger.error(f"Erro vitória: {e}")
+                    player_data["player_state"] = {"action": "idle"}
+                    await player_manager.save_player_data(user_id, player_data)
+                    context.user_data.pop("battle_cache", None)
+                    await context.bot.send_message(chat_id, "⚠️ Erro na vitória.", reply_markup=kb_voltar)
+                    return
 
-                # =========================
-                # GUERRA DE CLÃ (PVE KILL) - SOMENTE COMBATE NORMAL
-                # =========================
-                try:
-                    await try_award_pve_kill_for_guild_war(
-                        player_id=user_id,
-                        player_data=player_data,
-                        region_key=battle_cache.get("region_key"),
-                        game_data_regions_module=game_data_regions,
-                        base_points=3,
-                    )
-                except Exception:
-                    pass
+        # ============================================
+        # TURNO DO MONSTRO
+        # ============================================
+            battle_cache['turn'] = 'monster'
+        
+            # ============================
+            # EFFECTS: início do turno do monstro (DOT/HOT + expiração)
+            # ============================
+            if "hp_max" not in monster_stats:
+                monster_stats["hp_max"] = int(monster_stats.get("max_hp", monster_stats.get("hp", 1)))
 
-                await player_manager.save_player_data(user_id, player_data)
-                context.user_data.pop("battle_cache", None)
+            effect_msgs = tick_turn(
+                monster_stats,
+                battle_cache,
+                apply_to_hp_key="hp"
+            )
+            if effect_msgs:
+                log.extend(effect_msgs)
 
+            # Se o monstro morreu por DOT (bleed/poison), não executa o ataque do monstro
+            if monster_stats.get("hp", 0) <= 0:
+                log.append(f"🏆 <b>{monster_stats.get('name')} derrotado!</b>")
+                battle_cache['battle_log'] = log[-12:]
+                caption_m = await format_combat_message_from_cache(battle_cache)
+                kb = [[InlineKeyboardButton("⚔️ Atacar", callback_data='combat_attack'),
+                       InlineKeyboardButton("✨ Skills", callback_data='combat_skill_menu')],
+                      [InlineKeyboardButton("🧪 Poções", callback_data='combat_potion_menu'),
+                       InlineKeyboardButton("🏃 Fugir", callback_data='combat_flee')]]
                 await _edit_media_or_caption(
                     context,
                     battle_cache,
-                    summary,
-                    battle_cache["player_media_id"],
-                    battle_cache["player_media_type"],
-                    kb_voltar,
+                    caption_m,
+                    battle_cache['monster_media_id'],
+                    battle_cache['monster_media_type'],
+                    InlineKeyboardMarkup(kb)
                 )
                 return
 
-            except Exception as e:
-                logger.error(f"Erro vitória: {e}")
-                player_data["player_state"] = {"action": "idle"}
-                await player_manager.save_player_data(user_id, player_data)
-                context.user_data.pop("battle_cache", None)
-                await context.bot.send_message(chat_id, "⚠️ Erro na vitória.", reply_markup=kb_voltar)
-                return
+            dodge_chance = min((player_stats.get('initiative', 0) * 0.4)/100, 0.75)
+            dodge_chance += player_stats.get('dodge_chance_flat', 0)
+            cannot_miss = monster_stats.get("cannot_be_dodged", False)
 
-    # ============================================
-    # TURNO DO MONSTRO
-    # ============================================
-        battle_cache['turn'] = 'monster'
-        
-        # ============================
-        # EFFECTS: início do turno do monstro (DOT/HOT + expiração)
-        # ============================
-        if "hp_max" not in monster_stats:
-            monster_stats["hp_max"] = int(monster_stats.get("max_hp", monster_stats.get("hp", 1)))
-
-        effect_msgs = tick_turn(
-            monster_stats,
-            battle_cache,
-            apply_to_hp_key="hp"
-        )
-        if effect_msgs:
-            log.extend(effect_msgs)
-
-        # Se o monstro morreu por DOT (bleed/poison), não executa o ataque do monstro
-        if monster_stats.get("hp", 0) <= 0:
-            log.append(f"🏆 <b>{monster_stats.get('name')} derrotado!</b>")
-            battle_cache['battle_log'] = log[-12:]
-            caption_m = await format_combat_message_from_cache(battle_cache)
-            kb = [[InlineKeyboardButton("⚔️ Atacar", callback_data='combat_attack'),
-                   InlineKeyboardButton("✨ Skills", callback_data='combat_skill_menu')],
-                  [InlineKeyboardButton("🧪 Poções", callback_data='combat_potion_menu'),
-                   InlineKeyboardButton("🏃 Fugir", callback_data='combat_flee')]]
-            await _edit_media_or_caption(
-                context,
-                battle_cache,
-                caption_m,
-                battle_cache['monster_media_id'],
-                battle_cache['monster_media_type'],
-                InlineKeyboardMarkup(kb)
-            )
-            return
 
-        dodge_chance = min((player_stats.get('initiative', 0) * 0.4)/100, 0.75)
-        dodge_chance += player_stats.get('dodge_chance_flat', 0)
-        cannot_miss = monster_stats.get("cannot_be_dodged", False)
-
-
-        if not cannot_miss and random.random() < dodge_chance:
-            log.append(f"💨 Você esquivou do ataque de {monster_stats['name']}!")
-            player_data, msgs_cd = iniciar_turno(player_data)
-            if msgs_cd: log.extend(msgs_cd)
-            await player_manager.save_player_data(user_id, player_data)
+            if not cannot_miss and random.random() < dodge_chance:
+                log.append(f"💨 Você esquivou do ataque de {monster_stats['name']}!")
+                player_data, msgs_cd = iniciar_turno(player_data)
+                if msgs_cd: log.extend(msgs_cd)
+                await player_manager.save_player_data(user_id, player_data)
         
-        else:
-            skill_used = None
-            damage_dealt = 0
-            mob_skills = monster_stats.get("skills", [])
+            else:
+                skill_used = None
+                damage_dealt = 0
+                mob_skills = monster_stats.get("skills", [])
             
-            if mob_skills:
-                chosen_id = random.choice(mob_skills)
-                s_data = MONSTER_SKILLS_DB.get(chosen_id)
-                if s_data and random.random() < s_data.get("chance", 0.2):
-                    skill_used = s_data
-
-            if skill_used:
-                action_msg = skill_used.get("log", "{mob} ataca violentamente!").format(mob=monster_stats['name'])
-                log.append(f"⚠️ {action_msg}")
+                if mob_skills:
+                    chosen_id = random.choice(mob_skills)
+                    s_data = MONSTER_SKILLS_DB.get(chosen_id)
+                    if s_data and random.random() < s_data.get("chance", 0.2):
+                        skill_used = s_data
+
+                if skill_used:
+                    action_msg = skill_used.get("log", "{mob} ataca violentamente!").format(mob=monster_stats['name'])
+                    log.append(f"⚠️ {action_msg}")
                 
-                if "heal_pct" in skill_used:
-                    heal_val = int(monster_stats['max_hp'] * skill_used['heal_pct'])
-                    monster_stats['hp'] = min(monster_stats['max_hp'], monster_stats['hp'] + heal_val)
-                    log.append(f"💚 {monster_stats['name']} recuperou {heal_val} HP!")
-                    damage_dealt = 0
+                    if "heal_pct" in skill_used:
+                        heal_val = int(monster_stats['max_hp'] * skill_used['heal_pct'])
+                        monster_stats['hp'] = min(monster_stats['max_hp'], monster_stats['hp'] + heal_val)
+                        log.append(f"💚 {monster_stats['name']} recuperou {heal_val} HP!")
+                        damage_dealt = 0
+                    else:
+                        mult = skill_used.get("damage_mult", 1.0)
+                        is_magic = skill_used.get("magic", False)
+
+                        raw_dmg = int(monster_stats['attack'] * mult)
+                        def_val = (
+                            player_stats.get('magic_resistance', 0)
+                            if is_magic
+                            else player_stats.get('defense', 0)
+                        )
+                        base_dmg = max(1, raw_dmg - int(def_val * 0.5))
+
+                        # ============================
+                        # EFFECTS: before damage (monstro -> jogador)
+                        # ============================
+                        ctx = CombatContext(
+                            event=EVENT_ON_BEFORE_DAMAGE,
+                            source=monster_stats,
+                            target=battle_cache,
+                            battle=battle_cache,
+                            damage=int(base_dmg),
+                            damage_type="magic" if is_magic else "physical",
+                        )
+                        dispatch(EVENT_ON_BEFORE_DAMAGE, ctx)
+
+                        final_taken = int(ctx.damage)
+                        battle_cache['player_hp'] = int(battle_cache.get('player_hp', 0)) - final_taken
+
+                        log.append(f"💥 Recebeu {final_taken} dano! ({skill_used['name']})")
+
+
                 else:
-                    mult = skill_used.get("damage_mult", 1.0)
-                    is_magic = skill_used.get("magic", False)
-
-                    raw_dmg = int(monster_stats['attack'] * mult)
-                    def_val = (
-                        player_stats.get('magic_resistance', 0)
-                        if is_magic
-                        else player_stats.get('defense', 0)
-                    )
-                    base_dmg = max(1, raw_dmg - int(def_val * 0.5))
+                    dmg, is_crit, _ = criticals.roll_damage(monster_stats, player_stats, {})
+                    crit_txt = " (CRÍTICO!)" if is_crit else ""
 
                     # ============================
                     # EFFECTS: before damage (monstro -> jogador)
@@ -836,78 +861,55 @@ async def combat_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, ac
                         source=monster_stats,
                         target=battle_cache,
                         battle=battle_cache,
-                        damage=int(base_dmg),
-                        damage_type="magic" if is_magic else "physical",
+                        damage=int(dmg),
+                        damage_type="physical",
                     )
+                    ctx.flags.is_crit = bool(is_crit)
+
                     dispatch(EVENT_ON_BEFORE_DAMAGE, ctx)
 
                     final_taken = int(ctx.damage)
                     battle_cache['player_hp'] = int(battle_cache.get('player_hp', 0)) - final_taken
 
-                    log.append(f"💥 Recebeu {final_taken} dano! ({skill_used['name']})")
+                    log.append(f"⬅️ Recebeu {final_taken}{crit_txt} dano.")
 
 
-            else:
-                dmg, is_crit, _ = criticals.roll_damage(monster_stats, player_stats, {})
-                crit_txt = " (CRÍTICO!)" if is_crit else ""
-
-                # ============================
-                # EFFECTS: before damage (monstro -> jogador)
-                # ============================
-                ctx = CombatContext(
-                    event=EVENT_ON_BEFORE_DAMAGE,
-                    source=monster_stats,
-                    target=battle_cache,
-                    battle=battle_cache,
-                    damage=int(dmg),
-                    damage_type="physical",
-                )
-                ctx.flags.is_crit = bool(is_crit)
-
-                dispatch(EVENT_ON_BEFORE_DAMAGE, ctx)
-
-                final_taken = int(ctx.damage)
-                battle_cache['player_hp'] = int(battle_cache.get('player_hp', 0)) - final_taken
 
-                log.append(f"⬅️ Recebeu {final_taken}{crit_txt} dano.")
+                if battle_cache['player_hp'] <= 0:
+                    log.append("☠️ <b>Derrota!</b>")
+                    if "cooldowns" in player_data: player_data.pop("cooldowns", None)
 
-
-
-            if battle_cache['player_hp'] <= 0:
-                log.append("☠️ <b>Derrota!</b>")
-                if "cooldowns" in player_data: player_data.pop("cooldowns", None)
-
-                if in_dungeon:
-                    await dungeons_runtime.fail_dungeon_run(update, context, user_id, chat_id, "Derrota")
-                    return
+                    if in_dungeon:
+                        await dungeons_runtime.fail_dungeon_run(update, context, user_id, chat_id, "Derrota")
+                        return
                 
-                xp_loss = int(monster_stats.get('xp_reward', 0) * 0.5)
-                player_data['xp'] = max(0, player_data.get('xp', 0) - xp_loss)
+                    xp_loss = int(monster_stats.get('xp_reward', 0) * 0.5)
+                    player_data['xp'] = max(0, player_data.get('xp', 0) - xp_loss)
                 
-                stats_rec = await player_manager.get_player_total_stats(player_data)
-                player_data['current_hp'] = stats_rec.get('max_hp', 100)
-                player_data['current_mp'] = stats_rec.get('max_mana', 50)
-                player_data['player_state'] = {'action': 'idle'}
+                    stats_rec = await player_manager.get_player_total_stats(player_data)
+                    player_data['current_hp'] = stats_rec.get('max_hp', 100)
+                    player_data['current_mp'] = stats_rec.get('max_mana', 50)
+                    player_data['player_state'] = {'action': 'idle'}
                 
-                await player_manager.save_player_data(user_id, player_data)
-                context.user_data.pop('battle_cache', None)
-                media_derrota = (file_id_manager.get_file_data("media_derrota_cacada") or {}).get('id')
-                defeat_text = f"☠️ <b>Derrota!</b>\n-{xp_loss} XP\n"
+                    await player_manager.save_player_data(user_id, player_data)
+                    context.user_data.pop('battle_cache', None)
+                    media_derrota = (file_id_manager.get_file_data("media_derrota_cacada") or {}).get('id')
+                    defeat_text = f"☠️ <b>Derrota!</b>\n-{xp_loss} XP\n"
 
-                final_log_lines = log[-10:]
-                if final_log_lines:
-                    defeat_text += "\n📜 <b>Últimos eventos:</b>\n"
-                    for line in final_log_lines:
-                        defeat_text += f"• {line}\n"
+                    final_log_lines = log[-10:]
+                    if final_log_lines:
+                        defeat_text += "\n📜 <b>Últimos eventos:</b>\n"
+                        for line in final_log_lines:
+                            defeat_text += f"• {line}\n"
 
-                await _edit_media_or_caption(context, battle_cache, defeat_text, media_derrota, "photo", kb_voltar)
+                    await _edit_media_or_caption(context, battle_cache, defeat_text, media_derrota, "photo", kb_voltar)
 
-                return
+                    return
 
-            player_data, msgs_cd = iniciar_turno(player_data)
-            if msgs_cd:
-                for msg in msgs_cd: log.append(msg)
-            await player_manager.save_player_data(user_id, player_data)
+                player_data, msgs_cd = iniciar_turno(player_data)
+                if msgs_cd:
+                    for msg in msgs_cd: log.append(msg)
+                await player_manager.save_player_data(user_id, player_data)
 
     # Atualização Visual
     battle_cache['battle_log'] = log[-12:]
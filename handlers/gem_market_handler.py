@@ -12,6 +12,7 @@ from telegram.ext import ContextTypes, CallbackQueryHandler
 from modules import player_manager, game_data
 from modules import file_ids 
 from modules import gem_market_manager
+from modules.database import run_db
 from modules import market_utils
 from modules.game_data.items_evolution import EVOLUTION_ITEMS_DATA
 from modules.auth_utils import get_current_player_id
@@ -208,7 +209,7 @@ async def show_buy_items_filtered(update: Update, context: ContextTypes.DEFAULT_
     item_type = parts[1]
     page = int(parts[2]) if len(parts) > 2 else 1
 
-    all_listings = gem_market_manager.list_active(page=1, page_size=200)
+    all_listings = await run_db(gem_market_manager.list_active, page=1, page_size=200)
     if all_listings is None: all_listings = []
 
     filtered = []
@@ -366,7 +367,7 @@ async def gem_market_buy_confirm(update: Update, context: ContextTypes.DEFAULT_T
     try: lid = int(q.data.split(":")[1])
     except: return
 
-    listing = gem_market_manager.get_listing(lid)
+    listing = await run_db(gem_market_manager.get_listing, lid)
     if not listing or not listing.get("active"):
         await q.answer("Item não disponível.", show_alert=True)
         await show_buy_category_menu(update, context); return
@@ -398,7 +399,7 @@ async def gem_market_buy_execute(update: Update, context: ContextTypes.DEFAULT_T
     try: lid = int(q.data.replace("gem_buy_execute_", ""))
     except: await q.answer("ID inválido.", show_alert=True); return
         
-    listing = gem_market_manager.get_listing(lid)
+    listing = await run_db(gem_market_manager.get_listing, lid)
     if not listing or not listing.get("active"):
         await q.answer("Item já vendido!", show_alert=True)
         await gem_market_main(update, context); return
@@ -464,7 +465,7 @@ async def gem_market_my(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query
     await q.answer()
     user_id = get_current_player_id(update, context)
-    my_listings = gem_market_manager.list_by_seller(user_id) 
+    my_listings = await run_db(gem_market_manager.list_by_seller, user_id) 
 
     if not my_listings:
         kb = InlineKeyboardMarkup([[InlineKeyboardButton("⬅️ Voltar", callback_data="gem_market_main")]])
@@ -664,7 +665,7 @@ async def gem_market_price_confirm(update, context):
     payload = {"type": itype, "base_id": market_base_id, "qty": d["pk"]}
     
     try:
-        gem_market_manager.create_listing(seller_id=user_id, item_payload=payload, unit_price=d["price"], quantity=d["lotes"])
+        await run_db(gem_market_manager.create_listing, seller_id=user_id, item_payload=payload, unit_price=d["price"], quantity=d["lotes"])
         
         # NOTIFICAÇÃO DE NOVO ANÚNCIO (NOVO)
         try:
@@ -507,6 +507,12 @@ def _apply_vip_to_player(pdata: dict, uid_str: str, tier: str, days: int):
         # (save_player_data é async, mas aqui estamos num fluxo sync safe ou chamaremos depois)
     except Exception as e:
         logger.error(f"Erro ao salvar VIP no DB: {e}")
+
+    try:
+        from modules.player.premium_expiry import notify_premium_changed
+        notify_premium_changed(uid_str, pdata["premium_expires_at"])
+    except Exception:
+        pass
         
     # Nota: O caller deve chamar save_player_data(uid, pdata) depois para garantir cache update
     return new_exp
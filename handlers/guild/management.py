@@ -9,6 +9,7 @@ from telegram.ext import (
 )
 from bson import ObjectId
 from modules import player_manager, clan_manager, file_ids
+from modules.database import run_db
 from modules.clan_manager import CLAN_RANKS, get_member_rank, check_permission, set_member_rank, get_rank_value
 from modules.auth_utils import get_current_player_id
 from ui.ui_renderer import render_photo_or_text
@@ -208,7 +209,7 @@ async def do_cleanup_apps(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Atualiza DB
     col = _get_clans_collection()
     if col is not None:
-        await col.update_one({"_id": _to_oid(clan_id)}, {"$set": {"pending_applications": kept}})
+        await run_db(col.update_one, {"_id": _to_oid(clan_id)}, {"$set": {"pending_applications": kept}})
 
     # Feedback
     text = (
@@ -263,7 +264,7 @@ async def do_cleanup_members(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     col = _get_clans_collection()
     if col is not None:
-        await col.update_one({"_id": _to_oid(clan_id)}, {"$set": {"members": kept_members}})
+        await run_db(col.update_one, {"_id": _to_oid(clan_id)}, {"$set": {"members": kept_members}})
 
     text = (
         "👥 <b>LIMPEZA DE MEMBROS</b>\n"
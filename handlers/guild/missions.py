@@ -7,7 +7,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CallbackQueryHandler
 
 from modules import player_manager, clan_manager, file_ids
-from modules.database import db
+from modules.database import db, run_db
 from modules.auth_utils import get_current_player_id
 from ui.ui_renderer import render_photo_or_text
 
@@ -253,7 +253,7 @@ async def start_mission_callback(update: Update, context: ContextTypes.DEFAULT_T
     
     try:
         # Salva no banco
-        db.clans.update_one({"_id": clan_id}, {"$set": {"active_mission": new_mission}})
+        await run_db(db.clans.update_one, {"_id": clan_id}, {"$set": {"active_mission": new_mission}})
         clan["active_mission"] = new_mission # Atualiza local
             
         text = (
@@ -307,7 +307,8 @@ async def finish_mission_callback(update: Update, context: ContextTypes.DEFAULT_
     gold = rewards.get("clan_gold") or rewards.get("gold") or 0
     
     # Entrega Recompensas
-    db.clans.update_one(
+    await run_db(
+        db.clans.update_one,
         {"_id": clan_id},
         {
             "$inc": {"prestige_points": xp, "bank": gold},
@@ -348,7 +349,8 @@ async def cancel_mission_callback(update: Update, context: ContextTypes.DEFAULT_
         await query.answer("Sem permissão.", show_alert=True)
         return
 
-    db.clans.update_one(
+    await run_db(
+        db.clans.update_one,
         {"_id": clan_id},
         {"$unset": {"active_mission": ""}}
     )
@@ -1,7 +1,6 @@
 # handlers/hunt_handler.py
 # (VERSÃO BLINDADA: AUTH HÍBRIDA + PROTEÇÃO DE FAKE UPDATE)
 
-import random
 import re
 import unicodedata
 import logging
@@ -18,22 +17,15 @@ from modules.player.premium import PremiumManager
 from modules import auto_hunt_engine
 from handlers.profile_handler import _get_class_media
 from modules.game_data.monsters import MONSTER_SKILLS_DB
+# Monstros: tabelas de spawn pré-compiladas (elite e escala por nível moram lá)
+from modules import spawn_tables
+from modules.spawn_tables import build_combat_details as _build_combat_details_from_template
 
 # ✅ IMPORTAÇÃO PADRÃO DE AUTH (Removemos a função duplicada _get_hunt_user_id)
 from modules.auth_utils import requires_login, get_current_player_id
 
 logger = logging.getLogger(__name__)
 
-# =========================
-# Elites
-# =========================
-DEFAULT_ELITE_CHANCE = getattr(game_data, "ELITE_CHANCE", 0.12)
-ELITE_MULTS = {
-    "hp": 2.0, "attack": 1.4, "defense": 1.3,
-    "initiative_add": 2, "luck_add": 5,
-    "gold": 1.5, "xp": 1.5, "loot_bonus_pct": 10,
-}
-
 # =========================
 # Utils
 # =========================
@@ -46,192 +38,9 @@ def _slugify(text: str) -> str:
 def _get_region_info(region_key: str) -> dict:
     return (getattr(game_data, "REGIONS_DATA", {}) or {}).get(region_key, {}) or {}
 
-def _get_monsters_from_region_dict(region_key: str):
-    md = getattr(game_data, "MONSTERS_DATA", {}) or {}
-    lst = md.get(region_key)
-    return lst if isinstance(lst, list) and lst else None
-
-def _get_monsters_from_region_field(region_key: str):
-    info = _get_region_info(region_key)
-    mons = info.get("monsters")
-    if isinstance(mons, list) and mons: return mons
-    return None
-
-def _lookup_monster_by_id(mon_id: str) -> dict | None:
-    cat = getattr(game_data, "MONSTER_TEMPLATES", {}) or {}
-    v = cat.get(mon_id)
-    return dict(v) if isinstance(v, dict) else None
-
-def _coerce_monster_entry(entry) -> dict | None:
-    if isinstance(entry, dict): return dict(entry)
-    if isinstance(entry, str): return _lookup_monster_by_id(entry)
-    return None
-
 def _pick_monster_template(region_key: str, player_level: int) -> dict:
-    # 1. Busca dados da região para saber a dificuldade real
-    reg_info = _get_region_info(region_key)
-    # Se a região tiver 'min_level', usamos ele. Senão, 1.
-    region_min_lvl = int(reg_info.get("min_level", 1))
-    
-    # O nível base para cálculos será o MAIOR entre: Nível do Jogador ou Nível da Região
-    # Isso impede que um jogador Nível 10 enfrente monstros Nível 10 em uma zona Nível 50.
-    calc_level = max(player_level, region_min_lvl)
-
-    # --- TENTATIVA 1: Monstros Específicos da Lista ---
-    lst = _get_monsters_from_region_dict(region_key)
-    if lst:
-        pool = [e for e in lst if isinstance(e, dict)]
-        if pool: 
-            chosen = dict(random.choice(pool))
-            # Força o min_level do monstro a respeitar a região
-            chosen["min_level"] = max(int(chosen.get("min_level", 1)), region_min_lvl)
-            return chosen
-
-    # --- TENTATIVA 2: Monstros do Campo 'monsters' da Região ---
-    mons = _get_monsters_from_region_field(region_key)
-    if mons:
-        pool = []
-        for e in mons:
-            m = _coerce_monster_entry(e)
-            if m: pool.append(m)
-        if pool: 
-            chosen = dict(random.choice(pool))
-            chosen["min_level"] = max(int(chosen.get("min_level", 1)), region_min_lvl)
-            return chosen
-
-    # --- FALLBACK: Monstro Genérico (Se não achar nada) ---
-    # Agora usa 'calc_level' (Região ou Player) para definir a força base
-    base_hp = 20 + calc_level * 5
-    
-    return {
-        "id": f"generic_{region_key}", 
-        "name": "Criatura Sombria",
-        "hp": base_hp, "max_hp": base_hp,
-        "attack": 3 + calc_level // 2, 
-        "defense": 2,
-        "initiative": 4, "luck": 3,
-        # Define XP/Gold baseados no nível da região também
-        "xp_reward": 5 + (calc_level // 2), 
-        "gold_drop": 2 + (calc_level // 3),
-        "loot_table": [],
-        # Importante: Define o nível mínimo para a função de escala não reduzir depois
-        "min_level": region_min_lvl 
-    }
-
-def _roll_is_elite(luck_stat: int) -> bool:
-    bonus = min(0.08, max(0.0, luck_stat / 2000.0)) 
-    return random.random() < (DEFAULT_ELITE_CHANCE + bonus)
-
-def _apply_elite_scaling(mon: dict) -> dict:
-    m = dict(mon)
-    name = m.get("name") or "Inimigo"
-    m["name"] = f"{name} (🅴🅻I🆃🅴) 👑"
-    m["_elite"] = True
-    
-    # 1. GARANTIA: Se não tiver max_hp, usa o hp atual como base para não zerar
-    if "max_hp" not in m and "hp" in m:
-        m["max_hp"] = m["hp"]
-
-    # 2. ESCALONAMENTO DE NÍVEL (Novo):
-    # Aumenta o nível mínimo do Elite. Se a região for lvl 10, o Elite será calculado como lvl 12+
-    # Isso afeta o cálculo final de stats na próxima etapa (scale_monster_stats)
-    base_min_lvl = int(m.get("min_level", 1))
-    m["min_level"] = base_min_lvl + 3  # Elite é sempre 3 níveis acima da base da região
-
-    # Aplica os multiplicadores (Definidos no ELITE_MULTS reduzido)
-    keys_mult = [("max_hp", "hp"), ("attack", "attack"), ("defense", "defense"), 
-                 ("xp_reward", "xp"), ("gold_drop", "gold")]
-    
-    for k_mon, k_mult in keys_mult:
-        base = int(m.get(k_mon, 0))
-        # Se base for 0 (ex: defesa nula), força pelo menos 1 para o multiplicador funcionar
-        if base == 0 and k_mon in ["attack", "defense"]: 
-            base = 5
-        m[k_mon] = int(base * ELITE_MULTS[k_mult])
-    
-    m["hp"] = m["max_hp"] 
-    m["initiative"] = int(m.get("initiative", 0)) + ELITE_MULTS["initiative_add"]
-    m["luck"] = int(m.get("luck", 0)) + ELITE_MULTS["luck_add"]
-    
-    loot = []
-    for it in (m.get("loot_table") or []):
-        it2 = dict(it)
-        it2["drop_chance"] = min(100.0, float(it2.get("drop_chance", 0.0)) + ELITE_MULTS["loot_bonus_pct"])
-        loot.append(it2)
-    m["loot_table"] = loot
-    
-    return m
-
-def _scale_monster_stats(mon: dict, player_level: int) -> dict:
-    if "max_hp" not in mon and "hp" in mon:
-        mon["max_hp"] = mon["hp"]
-    elif "max_hp" not in mon:
-        mon["max_hp"] = 10 
-
-    min_lvl = mon.get("min_level", 1)
-    max_lvl = mon.get("max_level", player_level + 2)
-    target_lvl = max(min_lvl, min(player_level + random.randint(-1, 1), max_lvl))
-    mon["level"] = target_lvl
-
-    raw_name = mon.get("name", "Inimigo").replace("Lv.", "").strip()
-    raw_name = re.sub(r"^\d+\s+", "", raw_name) 
-    mon["name"] = f"Lv.{target_lvl} {raw_name}"
-
-    if target_lvl <= 1:
-        mon["hp"] = mon["max_hp"]
-        return mon
-
-    GROWTH_HP = 3        
-    GROWTH_ATK = 0.6     
-    GROWTH_DEF = 0.1     
-    GROWTH_XP = 1.5       
-    GROWTH_GOLD = 0.3   
-    
-    scaling_bonus = 1 + (target_lvl * 0.03) 
-
-    base_hp = int(mon.get("max_hp", 10))
-    base_atk = int(mon.get("attack", 2))
-    base_def = int(mon.get("defense", 0))
-    base_xp = int(mon.get("xp_reward", 5))
-    base_gold = int(mon.get("gold_drop", 1))
-
-    mon["max_hp"] = int((base_hp * scaling_bonus) + (target_lvl * GROWTH_HP))
-    mon["hp"] = mon["max_hp"]
-    mon["attack"] = int((base_atk * scaling_bonus) + (target_lvl * GROWTH_ATK))
-    mon["defense"] = int((base_def * scaling_bonus) + (target_lvl * GROWTH_DEF))
-    
-    mon["xp_reward"] = int((base_xp * scaling_bonus) + (target_lvl * GROWTH_XP))
-    mon["gold_drop"] = int((base_gold * scaling_bonus) + (target_lvl * GROWTH_GOLD))
-    
-    return mon
-
-def _build_combat_details_from_template(mon: dict, player_level: int = 1) -> dict:
-    m = mon.copy()
-    
-    if "monster_max_hp" in m: m["max_hp"] = m.pop("monster_max_hp")
-    if "monster_attack" in m: m["attack"] = m.pop("monster_attack")
-    if "monster_defense" in m: m["defense"] = m.pop("monster_defense")
-    if "monster_name" in m: m["name"] = m.pop("monster_name")
-
-    m = _scale_monster_stats(m, player_level)
-    
-    return {
-        "id": m.get("id"),
-        "name": m.get("name"),
-        "level": m.get("level", 1),
-        "hp": int(m.get("hp", 1)),
-        "max_hp": int(m.get("max_hp", 1)), 
-        "attack": int(m.get("attack", 1)),
-        "defense": int(m.get("defense", 0)),
-        "initiative": int(m.get("initiative", 0)),
-        "luck": int(m.get("luck", 0)),
-        "gold_drop": int(m.get("gold_drop", 0)),
-        "xp_reward": int(m.get("xp_reward", 0)),
-        "loot_table": m.get("loot_table", []),
-        "is_elite": bool(m.get("_elite", False) or m.get("is_elite", False)),
-        "is_boss": bool(m.get("is_boss", False)),
-        "skills": m.get("skills", [])
-    }
+    """Um sorteio na tabela da região + cópia rasa (genérico se não houver lista)."""
+    return spawn_tables.pick_template(region_key, player_level)
 
 def _get_monster_media(mon_tpl: dict, region_key: str, is_elite: bool):
     cands = []
@@ -295,13 +104,12 @@ async def start_hunt(
     # --- SETUP DA BATALHA ---
     player_lvl = int(pdata.get("level", 1))
     
-    tpl = _pick_monster_template(region_key, player_lvl)
     total_stats = await player_manager.get_player_total_stats(pdata)
-    
-    is_elite = _roll_is_elite(int(total_stats.get("luck", 5)))
-    if is_elite: tpl = _apply_elite_scaling(tpl)
 
-    monster_stats = _build_combat_details_from_template(tpl, player_level=player_lvl)
+    # Sorteio + elite + stats escalados, tudo da tabela pré-compilada
+    tpl, monster_stats, is_elite = spawn_tables.roll_encounter(
+        region_key, player_lvl, int(total_stats.get("luck", 5))
+    )
     monster_media = _get_monster_media(tpl, region_key, is_elite)
     player_media = _get_class_media(pdata, purpose="combate")
 
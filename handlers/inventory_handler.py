@@ -254,56 +254,54 @@ async def repair_item_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         await query.answer("Item inválido.", show_alert=True)
         return
 
-    player_data = await player_manager.get_player_data(user_id)
-    if not player_data:
-        return
-
-    inv = player_data.get("inventory", {}) or {}
-    inst = inv.get(item_uid)
+    async with player_manager.player_session(user_id) as player_data:
+        if not player_data:
+            return
 
-    # Precisa ser item único
-    if not isinstance(inst, dict):
-        await query.answer("Este item não pode ser reparado.", show_alert=True)
-        return
+        inv = player_data.get("inventory", {}) or {}
+        inst = inv.get(item_uid)
 
-    # Verifica pergaminho
-    if int(inv.get("pergaminho_durabilidade", 0) or 0) <= 0:
-        await query.answer("Você não tem Pergaminho de Durabilidade.", show_alert=True)
-        return
-
-    base_id = inst.get("base_id")
-    if not base_id:
-        await query.answer("Item inválido para reparo.", show_alert=True)
-        return
+        # Precisa ser item único
+        if not isinstance(inst, dict):
+            await query.answer("Este item não pode ser reparado.", show_alert=True)
+            return
 
-    info = _info_for(base_id)
+        # Verifica pergaminho
+        if int(inv.get("pergaminho_durabilidade", 0) or 0) <= 0:
+            await query.answer("Você não tem Pergaminho de Durabilidade.", show_alert=True)
+            return
 
-    # Durabilidade atual
-    cur_d, mx_d = _dur_tuple(inst.get("durability"))
-    if mx_d <= 0:
-        await query.answer("Este item não possui durabilidade.", show_alert=True)
-        return
+        base_id = inst.get("base_id")
+        if not base_id:
+            await query.answer("Item inválido para reparo.", show_alert=True)
+            return
 
-    # Pega durabilidade máxima do item base (se existir)
-    base_dur = info.get("durability")
-    if isinstance(base_dur, (list, tuple)) and len(base_dur) >= 2:
-        try:
-            mx_d = int(base_dur[1])
-        except Exception:
-            pass
+        info = _info_for(base_id)
 
-    # Repara totalmente
-    _set_dur(inst, mx_d, mx_d)
+        # Durabilidade atual
+        cur_d, mx_d = _dur_tuple(inst.get("durability"))
+        if mx_d <= 0:
+            await query.answer("Este item não possui durabilidade.", show_alert=True)
+            return
 
-    # Consome 1 pergaminho
-    ok = player_manager.remove_item_from_inventory(
-        player_data, "pergaminho_durabilidade", 1
-    )
-    if not ok:
-        await query.answer("Erro ao consumir o pergaminho.", show_alert=True)
-        return
+        # Pega durabilidade máxima do item base (se existir)
+        base_dur = info.get("durability")
+        if isinstance(base_dur, (list, tuple)) and len(base_dur) >= 2:
+            try:
+                mx_d = int(base_dur[1])
+            except Exception:
+                pass
+
+        # Consome 1 pergaminho (antes do reparo: se falhar, nada muda)
+        ok = player_manager.remove_item_from_inventory(
+            player_data, "pergaminho_durabilidade", 1
+        )
+        if not ok:
+            await query.answer("Erro ao consumir o pergaminho.", show_alert=True)
+            return
 
-    await player_manager.save_player_data(user_id, player_data)
+        # Repara totalmente
+        _set_dur(inst, mx_d, mx_d)
 
     await query.answer("🛠️ Item reparado com sucesso!", show_alert=True)
 
@@ -543,98 +541,97 @@ async def use_item_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Feedback imediato no botão para parecer responsivo
     # await query.answer("Usando...") 
 
-    player_data = await player_manager.get_player_data(user_id)
-    if not player_data: return
+    async with player_manager.player_session(user_id) as player_data:
+        if not player_data: return
 
-    item_val = player_data.get("inventory", {}).get(item_id)
-    if not item_val:
-        await query.answer("Você não tem mais este item.", show_alert=True)
-        # Tenta voltar para a lista
-        await inventory_menu_callback(update, context)
-        return
+        item_val = player_data.get("inventory", {}).get(item_id)
+        if not item_val:
+            await query.answer("Você não tem mais este item.", show_alert=True)
+            # Tenta voltar para a lista
+            await inventory_menu_callback(update, context)
+            return
 
-    # Info Básica
-    is_unique = isinstance(item_val, dict)
-    base_id = item_val.get("base_id") if is_unique else item_id
-    item_info = _info_for(base_id)
-    item_name = item_info.get("display_name", base_id)
+        # Info Básica
+        is_unique = isinstance(item_val, dict)
+        base_id = item_val.get("base_id") if is_unique else item_id
+        item_info = _info_for(base_id)
+        item_name = item_info.get("display_name", base_id)
 
-    # Extrai Efeitos
-    on_use_data = item_info.get("on_use", {}) or {}
-    effects_data = item_info.get("effects", {}) or {}
-    effect_data_to_use = {**on_use_data, **effects_data}
+        # Extrai Efeitos
+        on_use_data = item_info.get("on_use", {}) or {}
+        effects_data = item_info.get("effects", {}) or {}
+        effect_data_to_use = {**on_use_data, **effects_data}
 
-    if not effect_data_to_use:
-        await query.answer(f"O item '{item_name}' não pode ser usado.", show_alert=True)
-        return
+        if not effect_data_to_use:
+            await query.answer(f"O item '{item_name}' não pode ser usado.", show_alert=True)
+            return
 
-    # Consome 1 unidade
-    if not player_manager.remove_item_from_inventory(player_data, item_id, 1):
-        await query.answer("Erro ao consumir item.", show_alert=True)
-        return
+        # Consome 1 unidade
+        if not player_manager.remove_item_from_inventory(player_data, item_id, 1):
+            await query.answer("Erro ao consumir item.", show_alert=True)
+            return
 
-    # Aplica Efeitos
-    feedback_msg = f"Você usou {item_name}!"
-    effect = effect_data_to_use.get("effect")
-    skill_id = effect_data_to_use.get("skill_id") or effect_data_to_use.get("learn_skill")
-    skin_id = effect_data_to_use.get("skin_id")
+        # Aplica Efeitos
+        feedback_msg = f"Você usou {item_name}!"
+        effect = effect_data_to_use.get("effect")
+        skill_id = effect_data_to_use.get("skill_id") or effect_data_to_use.get("learn_skill")
+        skin_id = effect_data_to_use.get("skin_id")
     
-    try:
-        if (effect == "grant_skill" or "learn_skill" in effect_data_to_use) and skill_id:
-            if skill_id not in skills_data.SKILL_DATA:
-                player_manager.add_item_to_inventory(player_data, item_id, 1)
-                raise ValueError(f"Skill ID {skill_id} inválida.")
+        try:
+            if (effect == "grant_skill" or "learn_skill" in effect_data_to_use) and skill_id:
+                if skill_id not in skills_data.SKILL_DATA:
+                    player_manager.add_item_to_inventory(player_data, item_id, 1)
+                    raise ValueError(f"Skill ID {skill_id} inválida.")
 
-            if "skills" not in player_data: player_data["skills"] = {}
-            if "equipped_skills" not in player_data: player_data["equipped_skills"] = []
+                if "skills" not in player_data: player_data["skills"] = {}
+                if "equipped_skills" not in player_data: player_data["equipped_skills"] = []
 
-            if skill_id in player_data["skills"]:
-                await query.answer("Você já conhece esta habilidade!", show_alert=True)
-                player_manager.add_item_to_inventory(player_data, item_id, 1)
-                return
+                if skill_id in player_data["skills"]:
+                    await query.answer("Você já conhece esta habilidade!", show_alert=True)
+                    player_manager.add_item_to_inventory(player_data, item_id, 1)
+                    return
 
-            player_data["skills"][skill_id] = {"rarity": "comum", "progress": 0}
-            if skill_id not in player_data["equipped_skills"]:
-                player_data["equipped_skills"].append(skill_id)
+                player_data["skills"][skill_id] = {"rarity": "comum", "progress": 0}
+                if skill_id not in player_data["equipped_skills"]:
+                    player_data["equipped_skills"].append(skill_id)
 
-            skill_name_display = skills_data.SKILL_DATA[skill_id].get("display_name", skill_id)
-            feedback_msg = f"📚 Você aprendeu: {skill_name_display}!"
+                skill_name_display = skills_data.SKILL_DATA[skill_id].get("display_name", skill_id)
+                feedback_msg = f"📚 Você aprendeu: {skill_name_display}!"
             
-        elif effect == "grant_skin" and skin_id:
-            skins = player_data.setdefault("unlocked_skins", [])
-            if skin_id not in skins:
-                skins.append(skin_id)
-                feedback_msg = f"🎨 Aparência desbloqueada!"
-            else:
-                feedback_msg = "Você já possui essa aparência."
-        elif effect == "add_pvp_entries":
-            val = effect_data_to_use.get("value", 1)
-            player_manager.add_pvp_entries(player_data, int(val))
-            feedback_msg = f"🎟️ +{val} Entrada(s) na Arena!"
-        elif "heal" in effect_data_to_use:
-            amt = int(effect_data_to_use["heal"])
-            await player_actions.heal_player(player_data, amt)
-            feedback_msg = f"❤️ +{amt} HP!"
-        elif "add_energy" in effect_data_to_use:
-            amt = int(effect_data_to_use["add_energy"])
-            player_actions.add_energy(player_data, amt)
-            feedback_msg = f"⚡ +{amt} Energia!"
-        elif "add_xp" in effect_data_to_use:
-            amt = int(effect_data_to_use["add_xp"])
-            player_data['xp'] = player_data.get('xp', 0) + amt
-            player_manager.check_and_apply_level_up(player_data)
-            feedback_msg = f"🧠 +{amt} XP!"
-        elif "add_mana" in effect_data_to_use:
-            amt = int(effect_data_to_use["add_mana"])
-            await player_actions.add_mana(player_data, amt)
-            feedback_msg = f"💙 +{amt} Mana!"
-
-    except Exception as e:
-        logger.error(f"Erro usando item {item_id}: {e}")
-        player_manager.add_item_to_inventory(player_data, item_id, 1) 
-        feedback_msg = "Erro ao usar item. Devolvido."
-
-    await player_manager.save_player_data(user_id, player_data)
+            elif effect == "grant_skin" and skin_id:
+                skins = player_data.setdefault("unlocked_skins", [])
+                if skin_id not in skins:
+                    skins.append(skin_id)
+                    feedback_msg = f"🎨 Aparência desbloqueada!"
+                else:
+                    feedback_msg = "Você já possui essa aparência."
+            elif effect == "add_pvp_entries":
+                val = effect_data_to_use.get("value", 1)
+                player_manager.add_pvp_entries(player_data, int(val))
+                feedback_msg = f"🎟️ +{val} Entrada(s) na Arena!"
+            elif "heal" in effect_data_to_use:
+                amt = int(effect_data_to_use["heal"])
+                await player_actions.heal_player(player_data, amt)
+                feedback_msg = f"❤️ +{amt} HP!"
+            elif "add_energy" in effect_data_to_use:
+                amt = int(effect_data_to_use["add_energy"])
+                player_actions.add_energy(player_data, amt)
+                feedback_msg = f"⚡ +{amt} Energia!"
+            elif "add_xp" in effect_data_to_use:
+                amt = int(effect_data_to_use["add_xp"])
+                player_data['xp'] = player_data.get('xp', 0) + amt
+                player_manager.check_and_apply_level_up(player_data)
+                feedback_msg = f"🧠 +{amt} XP!"
+            elif "add_mana" in effect_data_to_use:
+                amt = int(effect_data_to_use["add_mana"])
+                await player_actions.add_mana(player_data, amt)
+                feedback_msg = f"💙 +{amt} Mana!"
+
+        except Exception as e:
+            logger.error(f"Erro usando item {item_id}: {e}")
+            player_manager.add_item_to_inventory(player_data, item_id, 1) 
+            feedback_msg = "Erro ao usar item. Devolvido."
+
     await query.answer(feedback_msg, show_alert=True)
 
     # Após usar, REABRE A VIEW DO ITEM (para mostrar a qtd atualizada)
@@ -1,25 +1,34 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from modules.market_manager import list_active, render_listing_line
+from modules.market_manager import list_active_page, render_listing_line
 from modules import player_manager
 from modules.auth_utils import get_current_player_id
+from modules.database import run_db
+
+PAGE_SIZE = 10  # Limite de segurança (mensagem muito grande)
+
 async def open_market(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = get_current_player_id(update, context)
     
     # 1. Pega dados do jogador (Async - Correto)
     pdata = await player_manager.get_player_data(user_id) or {}
 
-    # 2. Pega listagens (Síncrono - CORRIGIDO)
-    # Removemos o 'await' aqui porque list_active lê arquivo JSON localmente.
-    # Adicionamos 'viewer_id' para ver itens privados.
-    # Adicionamos 'page_size' para evitar erro de mensagem muito grande.
-    listings = list_active(
+    # 2. Pega listagens por cursor (keyset): "market_browse:<cursor>" continua
+    # depois do último anúncio mostrado, sem skip.
+    after = None
+    q = update.callback_query
+    if q and q.data and q.data.startswith("market_browse:"):
+        after = q.data.split(":", 1)[1] or None
+        await q.answer()
+
+    # 'viewer_id' para ver itens privados.
+    listings, next_cursor = await run_db(
+        list_active_page,
         sort_by="price", 
         ascending=True, 
-        price_per_unit=True,
         viewer_id=user_id, # <--- Importante para ver itens privados!
-        page=1,
-        page_size=10       # <--- Limite de segurança
+        page_size=PAGE_SIZE,
+        after=after,
     )
 
     lines = []
@@ -46,6 +55,8 @@ async def open_market(update: Update, context: ContextTypes.DEFAULT_TYPE):
             
         buttons.append([InlineKeyboardButton(btn_text, callback_data=f"market_buy_{l['id']}")])
 
+    if next_cursor:
+        buttons.append([InlineKeyboardButton("Próximos ➡️", callback_data=f"market_browse:{next_cursor}")])
     buttons.append([InlineKeyboardButton("⬅️ Voltar", callback_data="market_adventurer")])
 
     text = "📦 <b>Mercado — Anúncios Ativos:</b>\n\n" + "\n".join(lines)
@@ -9,6 +9,7 @@ from telegram.ext import ContextTypes, CallbackQueryHandler
 # --- SEUS MÓDULOS ---
 from modules.auth_utils import get_current_player_id  # <--- ÚNICA FONTE DE VERDADE
 from modules import player_manager, game_data, file_ids, market_manager
+from modules.database import run_db
 from modules.market_manager import render_listing_line as _mm_render_listing_line
 from modules import market_utils
 
@@ -461,7 +462,7 @@ async def market_finalize(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await player_manager.save_player_data(user_id, pdata)
         item_payload = {"type": "unique", "item": item_data, "uid": uid}
 
-    market_manager.create_listing(seller_id=user_id, item_payload=item_payload, unit_price=price, quantity=1)
+    await run_db(market_manager.create_listing, seller_id=user_id, item_payload=item_payload, unit_price=price, quantity=1)
     await q.edit_message_text(f"✅ <b>Venda Criada!</b>\nPreço: {price} ouro.", 
                               reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Voltar", callback_data="market_adventurer")]]),
                               parse_mode="HTML")
@@ -496,7 +497,7 @@ async def market_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # 🔒 SEGURANÇA: ID via Auth Central
     user_id = get_current_player_id(update, context)
     
-    listings = market_manager.list_active()
+    listings = await run_db(market_manager.list_active)
     
     if not listings:
         await _safe_edit(q, "📭 O mercado está vazio.", InlineKeyboardMarkup([[InlineKeyboardButton("⬅️ Voltar", callback_data="market_adventurer")]]))
@@ -557,7 +558,7 @@ async def market_my(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await q.answer("Sessão inválida.", show_alert=True)
         return
 
-    listings = market_manager.list_by_seller(user_id)
+    listings = await run_db(market_manager.list_by_seller, user_id)
     if not listings:
         await _safe_edit(q, "Sem vendas ativas.", InlineKeyboardMarkup([[InlineKeyboardButton("⬅️ Voltar", callback_data="market_adventurer")]]))
         return
@@ -573,7 +574,7 @@ async def market_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query; await q.answer()
     try:
         lid = int(q.data.replace("market_cancel_", ""))
-        market_manager.delete_listing(lid)
+        await run_db(market_manager.delete_listing, lid)
         await q.answer("Cancelado.", show_alert=True)
         await market_my(update, context)
     except: await q.answer("Erro.", show_alert=True)
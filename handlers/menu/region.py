@@ -11,6 +11,7 @@ from pvp import pvp_battle
 from pvp import pvp_utils
 from bson import ObjectId
 from modules.player.core import players_collection  # para acessar database
+from modules.database import run_db
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CallbackQueryHandler
@@ -961,7 +962,8 @@ async def _find_enemy_for_region_war(my_id, my_data: dict, region_key: str):
 
         # 4) Atualiza minha presença AGORA (para eu ser encontrado também)
         now = datetime.now(timezone.utc)
-        WAR_PRESENCE_COL.update_one(
+        await run_db(
+            WAR_PRESENCE_COL.update_one,
             {"player_id": my_oid},
             {"$set": {
                 "player_id": my_oid,
@@ -977,12 +979,12 @@ async def _find_enemy_for_region_war(my_id, my_data: dict, region_key: str):
         cutoff = now - timedelta(seconds=ttl_seconds)
 
         # Pega candidatos na região dentro do TTL
-        candidates = list(WAR_PRESENCE_COL.find({
+        candidates = await run_db(lambda: list(WAR_PRESENCE_COL.find({
             "region_key": str(region_key),
             "last_seen": {"$gte": cutoff},
             "player_id": {"$ne": my_oid},
             "clan_id": {"$ne": str(my_clan_id)},
-        }).limit(30))
+        }).limit(30)))
 
         if not candidates:
             return None, None
@@ -39,10 +39,11 @@ async def finish_refine_job(context: ContextTypes.DEFAULT_TYPE):
         try: await context.bot.delete_message(chat_id, mid)
         except Exception: pass
 
-    pdata = await player_manager.get_player_data(user_id)
-    if not pdata: return
-
-    res = await refining_engine.finish_refine(pdata)
+    # Sessão: o engine carrega/salva por conta própria, mas tudo vira um
+    # único save com CAS (outro clique no meio não apaga o resultado)
+    async with player_manager.player_session(user_id) as pdata:
+        if not pdata: return
+        res = await refining_engine.finish_refine(pdata)
     
     if isinstance(res, str):
         await context.bot.send_message(chat_id, f"❗ {res}")
@@ -87,10 +88,9 @@ async def finish_dismantle_job(context: ContextTypes.DEFAULT_TYPE):
         try: await context.bot.delete_message(chat_id, mid)
         except: pass
 
-    pdata = await player_manager.get_player_data(user_id)
-    if not pdata: return
-
-    res = await dismantle_engine.finish_dismantle(pdata, job.data)
+    async with player_manager.player_session(user_id) as pdata:
+        if not pdata: return
+        res = await dismantle_engine.finish_dismantle(pdata, job.data)
 
     if isinstance(res, str):
         await context.bot.send_message(chat_id, f"❗ {res}")
@@ -123,10 +123,9 @@ async def finish_bulk_dismantle_job(context: ContextTypes.DEFAULT_TYPE):
         try: await context.bot.delete_message(chat_id, mid)
         except: pass
 
-    pdata = await player_manager.get_player_data(user_id)
-    if not pdata: return
-    
-    res = await dismantle_engine.finish_dismantle_batch(pdata, job.data)
+    async with player_manager.player_session(user_id) as pdata:
+        if not pdata: return
+        res = await dismantle_engine.finish_dismantle_batch(pdata, job.data)
     
     if isinstance(res, str):
         await context.bot.send_message(chat_id, f"❗ {res}")
@@ -198,6 +198,7 @@ async def wb_return_to_map(update: Update, context: ContextTypes.DEFAULT_TYPE):
     world_boss_manager.active_fighters.discard(user_id)
     if user_id in world_boss_manager.waiting_queue:
         world_boss_manager.waiting_queue.remove(user_id)
+    world_boss_manager.save_state(players=[user_id])
 
     await send_region_menu(context, user_id, chat_id)
 
@@ -382,6 +383,7 @@ async def wb_router(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     if data == "wb_leave":
         world_boss_manager.active_fighters.discard(user_id)
+        world_boss_manager.save_state(players=[user_id])
         await wb_start_menu(update, context)
         return
 
@@ -496,37 +498,38 @@ async def wb_use_potion(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except:
         return
 
-    pdata = await player_manager.get_player_data(user_id)
+    async with player_manager.player_session(user_id) as pdata:
+        if not pdata:
+            return
 
-    if not player_manager.remove_item_from_inventory(pdata, item_id, 1):
-        await query.answer("Acabou!", show_alert=True)
-        await wb_potion_menu(update, context)
-        return
+        if not player_manager.remove_item_from_inventory(pdata, item_id, 1):
+            await query.answer("Acabou!", show_alert=True)
+            await wb_potion_menu(update, context)
+            return
 
-    item_info = game_data.ITEMS_DATA.get(item_id, {})
-    effects = item_info.get("effects", {})
-    msg_feed = ""
-
-    if 'heal' in effects:
-        await player_actions.heal_player(pdata, effects['heal'])
-        msg_feed = f"Recuperou {effects['heal']} HP"
-    elif 'add_mana' in effects:
-        await player_actions.add_mana(pdata, effects['add_mana'])
-        msg_feed = f"Recuperou {effects['add_mana']} MP"
-    elif 'buff' in effects:
-        player_actions.add_buff(pdata, effects['buff'])
-        msg_feed = "Buff aplicado!"
-
-    state = world_boss_manager.player_states.get(user_id)
-    if state:
-        state['hp'] = pdata.get("current_hp")
-        state['mp'] = pdata.get("current_mp")
-        if msg_feed:
-            current_log = state.get('log', '')
-            state['log'] = current_log + f"\n🧪 {msg_feed}"
-
-    await player_manager.save_player_data(user_id, pdata)
-    world_boss_manager.save_state()
+        item_info = game_data.ITEMS_DATA.get(item_id, {})
+        effects = item_info.get("effects", {})
+        msg_feed = ""
+
+        if 'heal' in effects:
+            await player_actions.heal_player(pdata, effects['heal'])
+            msg_feed = f"Recuperou {effects['heal']} HP"
+        elif 'add_mana' in effects:
+            await player_actions.add_mana(pdata, effects['add_mana'])
+            msg_feed = f"Recuperou {effects['add_mana']} MP"
+        elif 'buff' in effects:
+            player_actions.add_buff(pdata, effects['buff'])
+            msg_feed = "Buff aplicado!"
+
+        state = world_boss_manager.player_states.get(user_id)
+        if state:
+            state['hp'] = pdata.get("current_hp")
+            state['mp'] = pdata.get("current_mp")
+            if msg_feed:
+                current_log = state.get('log', '')
+                state['log'] = current_log + f"\n🧪 {msg_feed}"
+
+    world_boss_manager.save_state(players=[user_id])
     await query.answer(f"🧪 {msg_feed}")
     await wb_fight_screen(update, context)
 
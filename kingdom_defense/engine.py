@@ -10,29 +10,21 @@ from . import leaderboard
 from modules.combat import criticals
 from modules.game_data import items as game_items
 from modules.game_data.monsters import MONSTERS_DATA
-from modules.game_data.skills import SKILL_DATA 
+from modules.skills import skill_registry
 from modules.combat import combat_engine
+from modules.broadcast.dispatcher import start_broadcast
 
 logger = logging.getLogger(__name__)
 
 # ... (Funções _get_player_skill_data_by_rarity e _find_monster_template permanecem iguais) ...
 def _get_player_skill_data_by_rarity(pdata: dict, skill_id: str) -> dict | None:
-    # (Mesmo código anterior)
-    base_skill = SKILL_DATA.get(skill_id)
-    if not base_skill: return None
-    merged_data = base_skill.copy()
-    if "rarity_effects" in base_skill:
-        player_skills = pdata.get("skills", {})
-        rarity = "comum"
-        if isinstance(player_skills, dict):
-            player_skill_instance = player_skills.get(skill_id)
-            if player_skill_instance:
-                rarity = player_skill_instance.get("rarity", "comum")
-        rarity_data = base_skill["rarity_effects"].get(rarity, base_skill["rarity_effects"].get("comum", {}))
-        merged_data.update(rarity_data)
+    # Registro compilado de skills (somente leitura); só copia se for mexer no custo
+    merged_data = skill_registry.player_skill_view(pdata, skill_id)
+    if merged_data is None: return None
     player_class = (pdata.get("class_key") or pdata.get("class") or "").lower()
     high_mana_classes = ["mago", "feiticeiro", "elementalista", "arquimago"]
     if player_class in high_mana_classes:
+        merged_data = merged_data.copy()
         original_cost = merged_data.get("mana_cost", 0)
         new_cost = int(original_cost * 2.0) 
         merged_data["mana_cost"] = new_cost
@@ -72,6 +64,7 @@ class KingdomDefenseManager:
         max_damage = 0
         
         all_participants = list(self.active_fighters) + self.waiting_queue
+        notify_chats = []
         
         # user_id aqui é o PLAYER_ID (ObjectId string)
         for player_id in all_participants:
@@ -97,14 +90,17 @@ class KingdomDefenseManager:
                         }
                     
                     if context and tg_id:
-                        try:
-                            await context.bot.send_message(chat_id=tg_id, text="⚔️ O evento de Defesa do Reino foi encerrado! ⚔️")
-                        except Exception:
-                            pass 
+                        notify_chats.append(tg_id)
                         
             except Exception as e:
                 logger.error(f"Erro ao finalizar evento para {player_id}: {e}")
 
+        if notify_chats:
+            await start_broadcast(
+                context.bot, "⚔️ O evento de Defesa do Reino foi encerrado! ⚔️",
+                kind="kd_end", recipients=notify_chats, parse_mode=None,
+            )
+
         if top_scorer:
             leaderboard.update_top_score(
                 user_id=top_scorer["user_id"],
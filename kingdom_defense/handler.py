@@ -18,7 +18,7 @@ from telegram.ext import ContextTypes, CallbackQueryHandler
 from .engine import event_manager
 from modules import player_manager, file_ids
 from handlers.menu.kingdom import show_kingdom_menu
-from modules.game_data.skills import SKILL_DATA
+from modules.skills import skill_registry
 from modules.game_data.class_evolution import can_player_use_skill
 
 # ✅ player_id via sessão/login (async)
@@ -143,25 +143,15 @@ async def _force_refresh_interface(context, player_id, chat_id, caption, media_k
 # =============================================================================
 
 def _get_player_skill_data_by_rarity(pdata: dict, skill_id: str) -> dict | None:
-    base_skill = SKILL_DATA.get(skill_id)
-    if not base_skill:
+    # Registro compilado de skills (somente leitura); só copia se for mexer no custo
+    merged_data = skill_registry.player_skill_view(pdata, skill_id)
+    if merged_data is None:
         return None
 
-    merged_data = base_skill.copy()
-
-    if "rarity_effects" in base_skill:
-        player_skills = pdata.get("skills", {})
-        rarity = "comum"
-        if isinstance(player_skills, dict):
-            player_skill_instance = player_skills.get(skill_id)
-            if player_skill_instance:
-                rarity = player_skill_instance.get("rarity", "comum")
-        rarity_data = base_skill["rarity_effects"].get(rarity, base_skill["rarity_effects"].get("comum", {}))
-        merged_data.update(rarity_data)
-
     player_class = (pdata.get("class_key") or pdata.get("class") or "").lower()
     high_mana_classes = ["mago", "feiticeiro", "elementalista", "arquimago"]
     if player_class in high_mana_classes:
+        merged_data = merged_data.copy()
         original_cost = merged_data.get("mana_cost", 0)
         new_cost = int(original_cost * 2.0)
         merged_data["mana_cost"] = new_cost
@@ -1,5 +1,4 @@
 # Arquivo: kingdom_defense/routes_api.py
-import asyncio
 from flask import Blueprint, jsonify, request
 from bson.objectid import ObjectId
 
@@ -11,16 +10,8 @@ from kingdom_defense.engine import event_manager
 # Criando o Blueprint (O nosso "mini api.py" isolado)
 kd_api_bp = Blueprint('kd_api', __name__)
 
-# Ferramenta para rodar funções assíncronas do Telegram no Flask
-def _run_async(coro):
-    try:
-        return asyncio.run(coro)
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        res = loop.run_until_complete(coro)
-        loop.close()
-        return res
+# Corrotinas do jogo rodam no loop do bot (ver modules/web_server.py)
+from modules.web_server import run_async as _run_async
 
 # ==========================================
 # ROTA SECRETA DE DEBUG: FORÇAR EVENTO ON
@@ -7,13 +7,10 @@ import asyncio
 import os
 import sys
 import logging
-from threading import Thread
 # Tutorial Dora iniciantes
 #from registries.onboarding import register_onboarding_handlers
 # Telegram Imports
-from flask import send_file
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.request import HTTPXRequest
 from telegram.ext import (
     Application,
     MessageHandler,
@@ -33,8 +30,6 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from dotenv import load_dotenv
 load_dotenv()
 
-from flask import Flask
-
 # --- CONFIGURAÇÕES ---
 from config import (
     ADMIN_ID,
@@ -44,6 +39,7 @@ from config import (
 
 # 🔑 Inicializa o banco ANTES de qualquer handler
 from modules.database import initialize_database
+from modules import update_processing, web_server
 initialize_database()
 
 # ✅ File IDs (Mongo + cache)
@@ -80,36 +76,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# ==============================================================================
-# SERVIDOR WEB (KEEP ALIVE)
-# ==============================================================================
-app = Flask('')
-
-@app.route('/')
-def home():
-    return send_file('index.html')
-
-def run_flask():
-    app.run(host='0.0.0.0', port=8080)
-
-def start_keep_alive():
-    t = Thread(target=run_flask, daemon=True)
-    t.start()
-
 # ==============================================================================
 # TAREFAS DE INICIALIZAÇÃO (POST-INIT)
 # ==============================================================================
 async def post_init_tasks(application: Application):
     """Executado assim que o bot conecta no Telegram"""
 
-    # Evita boss travado após restart
+    # Todos os handlers já registrados: mede a latência de cada um
+    wrapped = update_processing.instrument_handlers(application)
+    logger.info(f"[UPDATES] Latência instrumentada em {wrapped} handlers.")
+
+    # Web app (api.py + blueprints) no mesmo loop: mesmo cache, locks e pool
+    # do Mongo. Substitui o Flask de keep-alive (também responde / e /ping).
+    await web_server.start(application)
+
+    # Boss ativo no reinício: retoma se ainda está no horário (estado recuperado
+    # do log incremental); senão encerra para não ficar travado
     if world_boss_manager and world_boss_manager.is_active:
-        logger.warning("Boss ativo detectado no reinício. Resetando status...")
-        world_boss_manager.end_event(reason="Reinício do Sistema")
+        if world_boss_manager.can_resume():
+            logger.info(f"Boss ativo recuperado após reinício (termina em {world_boss_manager.ends_at}).")
+        else:
+            logger.warning("Boss ativo detectado no reinício fora do horário. Resetando status...")
+            world_boss_manager.end_event(reason="Reinício do Sistema")
 
     # Startup geral
     await run_system_startup_tasks(application)
 
+async def post_shutdown_tasks(application: Application):
+    """Executado ao desligar: grava o que ainda está só em memória."""
+    try:
+        await web_server.shutdown()
+    except Exception as e:
+        logger.warning(f"Falha ao parar o servidor web: {e}")
+
+    try:
+        from modules.player import presence
+        await presence.flush()
+    except Exception as e:
+        logger.warning(f"Falha ao gravar presença no desligamento: {e}")
+
+    try:
+        from modules.broadcast import dispatcher
+        await dispatcher.shutdown()
+    except Exception as e:
+        logger.warning(f"Falha ao gravar progresso dos broadcasts no desligamento: {e}")
+
+    if world_boss_manager:
+        try:
+            await asyncio.to_thread(world_boss_manager.close_state)
+        except Exception as e:
+            logger.warning(f"Falha ao gravar estado do World Boss no desligamento: {e}")
+
+    # Por último: espera as idas ao banco que ainda estão no executor do Mongo
+    try:
+        from modules.database import shutdown_db_executor
+        await asyncio.to_thread(shutdown_db_executor)
+    except Exception as e:
+        logger.warning(f"Falha ao encerrar o executor do banco: {e}")
+
 # ==============================================================================
 # 1. BOAS-VINDAS EM GRUPOS
 # ==============================================================================
@@ -186,27 +210,12 @@ async def master_group_blocker(update: Update, context: ContextTypes.DEFAULT_TYP
 # ==============================================================================
 if __name__ == "__main__":
 
-    # Web Server
-    try:
-        start_keep_alive()
-        logger.info("Web Server OK.")
-    except Exception:
-        pass
-
-    # HTTPX Config
-    request_config = HTTPXRequest(
-        connection_pool_size=8,
-        connect_timeout=60.0,
-        read_timeout=60.0,
-        write_timeout=60.0
-    )
-
-    # Application
+    # Application: updates concorrentes (ordem por jogador) + pools HTTP
+    # separados para envios e get_updates (ver modules/update_processing.py)
     application = (
-        Application.builder()
-        .token(TELEGRAM_TOKEN)
-        .request(request_config)
+        update_processing.configure_builder(Application.builder().token(TELEGRAM_TOKEN))
         .post_init(post_init_tasks)
+        .post_shutdown(post_shutdown_tasks)
         .build()
     )
 
@@ -50,7 +50,8 @@ def get_current_player_id(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 async def get_current_player_id_async(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str | None:
     """
-    Versão robusta: tenta RAM; se falhar, tenta sessão persistente no banco e repõe RAM.
+    Versão robusta: tenta RAM; se falhar, tenta sessão persistente (cache de
+    resolução em memória, depois o banco; ver modules/sessions.py) e repõe RAM.
     Retorna ObjectId string válida ou None.
     """
     # 1) RAM
@@ -2,7 +2,6 @@
 # (VERSÃO FINAL VISUAL: Estilo Box Solicitado + Lógica Blindada)
 
 import logging
-import random
 import asyncio
 import html  # Importante para evitar erros de formatação
 from datetime import datetime, timezone, timedelta
@@ -15,11 +14,14 @@ from bson import ObjectId
 
 # Imports Core
 from modules import player_manager, game_data
+from modules.database import run_db
 from modules import file_ids as file_id_manager
 from modules.auth_utils import get_current_player_id
 
 # Importa o módulo XP
 from modules.game_data import xp as xp_module
+from modules.auto_hunt_resolver import resolve_hunts
+from modules import spawn_tables
 
 logger = logging.getLogger(__name__)
 
@@ -33,80 +35,6 @@ def ensure_object_id(uid):
     if isinstance(uid, str) and ObjectId.is_valid(uid): return ObjectId(uid)
     return uid
 
-# ==============================================================================
-# ⚖️ BALANCEAMENTO
-# ==============================================================================
-def _scale_monster_stats(mon: dict, player_level: int) -> dict:
-    m = mon.copy()
-    
-    if "max_hp" not in m and "hp" in m: m["max_hp"] = m["hp"]
-    elif "max_hp" not in m: m["max_hp"] = 10 
-
-    min_lvl = m.get("min_level", 1)
-    target_lvl = max(min_lvl, min(player_level, min_lvl + 10)) 
-    m["level"] = target_lvl
-
-    raw_name = m.get("name", "Inimigo").replace("Lv.", "").strip()
-    m["name"] = f"Lv.{target_lvl} {raw_name}"
-
-    scaling_bonus = 1 + (target_lvl * 0.05) 
-    m["max_hp"] = int(m.get("max_hp", 10) * scaling_bonus)
-    m["hp"] = m["max_hp"]
-    m["attack"] = int(m.get("attack", 2) * scaling_bonus)
-    
-    base_xp = int(m.get("xp_reward", 5))
-    if base_xp > 50: base_xp = 15 
-
-    final_xp = base_xp + (target_lvl * 2)
-    
-    if player_level > min_lvl + 15:
-        final_xp = max(1, int(final_xp * 0.2)) 
-
-    m["xp_reward"] = final_xp
-    m["gold_drop"] = int(m.get("gold_drop", 1) * scaling_bonus)
-    
-    return m
-
-# ==============================================================================
-# ⚔️ SIMULAÇÃO
-# ==============================================================================
-async def _simulate_single_battle(player_data, player_stats, monster_data):
-    if not monster_data: return {"result": "loss"}
-
-    player_hp = player_stats.get('max_hp', 100)
-    monster_hp = monster_data.get('max_hp', 10)
-    player_atk = player_stats.get('attack', 10)
-    monster_atk = monster_data.get('attack', 2)
-
-    turns = 0
-    while turns < 20:
-        monster_hp -= player_atk
-        if monster_hp <= 0:
-            return {
-                "result": "win", 
-                "xp": monster_data.get("xp_reward", 5), 
-                "gold": monster_data.get("gold_drop", 1), 
-                "items": _roll_loot(monster_data),
-                "monster_id": monster_data.get("id")
-            }
-        
-        player_hp -= monster_atk
-        if player_hp <= 0: 
-            return {"result": "loss"}
-            
-        turns += 1
-        
-    return {"result": "loss"} 
-
-def _roll_loot(monster_data):
-    drops = []
-    for item in monster_data.get("loot_table", []):
-        if random.uniform(0, 100) <= float(item.get("drop_chance", 0)):
-            item_id = item.get("item_id") or item.get("base_id")
-            qty = random.randint(item.get("min", 1), item.get("max", 1))
-            drops.append((item_id, qty))
-    return drops
-
 # ==============================================================================
 # ▶️ START (BACKEND)
 # ==============================================================================
@@ -215,31 +143,14 @@ async def execute_hunt_completion(user_id, chat_id, hunt_count, region_key, cont
     player_stats = await player_manager.get_player_total_stats(player_data)
     old_level = int(player_data.get("level", 1))
 
-    monster_list = game_data.MONSTERS_DATA.get(region_key) or [{"name": "Lobo", "xp_reward": 5, "gold_drop": 2, "id": "wolf"}]
-    
-    total_xp = 0
-    total_gold = 0
-    wins = 0
-    losses = 0
-    total_items = {}
+    # --- SIMULAÇÃO (em lote: modules/auto_hunt_resolver.py) ---
+    # Monstros da região já escalados para a faixa de nível (spawn_tables)
+    monsters = spawn_tables.auto_hunt_monsters(region_key, old_level)
 
-    # --- SIMULAÇÃO ---
-    for _ in range(hunt_count):
-        tpl = random.choice(monster_list)
-        if isinstance(tpl, str): 
-            tpl = game_data.MONSTERS_DATA.get(tpl, {"name": "Mob", "xp_reward": 5})
-        
-        monster = _scale_monster_stats(tpl, old_level)
-        res = await _simulate_single_battle(player_data, player_stats, monster)
-        
-        if res["result"] == "win":
-            wins += 1
-            total_xp += res["xp"]
-            total_gold += res["gold"]
-            for i_id, qty in res.get("items", []):
-                total_items[i_id] = total_items.get(i_id, 0) + qty
-        else:
-            losses += 1
+    summary = resolve_hunts(player_stats, monsters, hunt_count)
+    wins, losses = summary["wins"], summary["losses"]
+    total_xp, total_gold = summary["xp"], summary["gold"]
+    total_items = summary["items"]
 
     # --- RECOMPENSAS ---
     player_manager.add_gold(player_data, total_gold)
@@ -268,9 +179,10 @@ async def execute_hunt_completion(user_id, chat_id, hunt_count, region_key, cont
         )
 
     try:
-        await player_manager.users_collection.update_one(
+        await run_db(
+            player_manager.users_collection.update_one,
             {"_id": db_id}, 
-            {"$set": {"player_state": {"action": "idle"}}}
+            {"$set": {"player_state": {"action": "idle"}}, "$inc": {"_version": 1}}
         )
     except Exception as e:
         logger.error(f"[AutoHunt] Erro ao limpar estado: {e}")
@@ -0,0 +1,276 @@
+# modules/auto_hunt_resolver.py
+# Resolução em LOTE da caçada automática (sem telegram/pymongo).
+#
+# A luta da auto-caçada é determinística (só ataque x HP, sem sorte): o que
+# é aleatório é QUAL monstro aparece e o loot. Então, em vez de simular
+# `hunt_count` lutas uma a uma:
+#   1. sorteia quantas vezes cada monstro apareceu (multinomial);
+#   2. decide vitória/derrota UMA vez por monstro (turnos para matar);
+#   3. para cada entrada da loot_table: nº de drops ~ Binomial(vitórias, chance)
+#      e a quantidade total = soma de drops uniformes em [min, max]
+#      (multinomial sobre os valores possíveis).
+# Custo O(monstros x entradas de loot) em vez de O(hunt_count).
+#
+# resolve_hunts_loop é a referência (o laço antigo), usada pela checagem de
+# equivalência e pelo benchmark: tools/bench_auto_hunt.py.
+
+from __future__ import annotations
+
+import math
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+MAX_TURNS = 20
+
+
+# ==============================================================================
+# ⚖️ BALANCEAMENTO
+# ==============================================================================
+def scale_monster_stats(mon: dict, player_level: int) -> dict:
+    m = mon.copy()
+
+    if "max_hp" not in m and "hp" in m: m["max_hp"] = m["hp"]
+    elif "max_hp" not in m: m["max_hp"] = 10
+
+    min_lvl = m.get("min_level", 1)
+    target_lvl = max(min_lvl, min(player_level, min_lvl + 10))
+    m["level"] = target_lvl
+
+    raw_name = m.get("name", "Inimigo").replace("Lv.", "").strip()
+    m["name"] = f"Lv.{target_lvl} {raw_name}"
+
+    scaling_bonus = 1 + (target_lvl * 0.05)
+    m["max_hp"] = int(m.get("max_hp", 10) * scaling_bonus)
+    m["hp"] = m["max_hp"]
+    m["attack"] = int(m.get("attack", 2) * scaling_bonus)
+
+    base_xp = int(m.get("xp_reward", 5))
+    if base_xp > 50: base_xp = 15
+
+    final_xp = base_xp + (target_lvl * 2)
+
+    if player_level > min_lvl + 15:
+        final_xp = max(1, int(final_xp * 0.2))
+
+    m["xp_reward"] = final_xp
+    m["gold_drop"] = int(m.get("gold_drop", 1) * scaling_bonus)
+
+    return m
+
+
+# ==============================================================================
+# ⚔️ LUTA (determinística)
+# ==============================================================================
+def turns_to_kill(hp, atk) -> Optional[int]:
+    """Golpes até hp <= 0 (None se nunca mata)."""
+    if hp - atk <= 0:
+        return 1
+    if atk <= 0:
+        return None
+    return int(math.ceil(hp / atk))
+
+
+def player_wins(player_stats: dict, monster: dict) -> bool:
+    """
+    Mesmo resultado do laço turno a turno: o jogador bate primeiro, então
+    vence se matar em até MAX_TURNS golpes sobrevivendo aos (golpes - 1) que levou.
+    """
+    k = turns_to_kill(monster.get("max_hp", 10), player_stats.get("attack", 10))
+    if k is None or k > MAX_TURNS:
+        return False
+    if k == 1:
+        return True
+    monster_atk = monster.get("attack", 2)
+    # HP só cai (ou só sobe, com ataque negativo): basta checar o pior golpe
+    hits_taken = k - 1 if monster_atk >= 0 else 1
+    return player_stats.get("max_hp", 100) - hits_taken * monster_atk > 0
+
+
+# ==============================================================================
+# 🎲 SORTEIOS EM LOTE
+# ==============================================================================
+def _binomial(n: int, p: float, rng: random.Random) -> int:
+    """Binomial(n, p) exata em O(1) esperado (BTRS de Hörmann, como o binomialvariate do 3.12)."""
+    if n <= 0 or p <= 0.0:
+        return 0
+    if p >= 1.0:
+        return n
+    native = getattr(rng, "binomialvariate", None)
+    if native is not None:
+        return native(n, p)
+    if p > 0.5:
+        return n - _binomial(n, 1.0 - p, rng)
+    rand = rng.random
+    if n * p < 10.0:
+        # Saltos geométricos entre sucessos
+        x = y = 0
+        c = math.log(1.0 - p)
+        if not c:
+            return x
+        while True:
+            y += math.floor(math.log(1.0 - rand()) / c) + 1
+            if y > n:
+                return x
+            x += 1
+
+    spq = math.sqrt(n * p * (1.0 - p))
+    b = 1.15 + 2.53 * spq
+    a = -0.0873 + 0.0248 * b + 0.01 * p
+    c = n * p + 0.5
+    vr = 0.92 - 4.2 / b
+    setup = False
+    while True:
+        u = rand() - 0.5
+        us = 0.5 - abs(u)
+        k = math.floor((2.0 * a / us + b) * u + c)
+        if k < 0 or k > n:
+            continue
+        v = rand()
+        if us >= 0.07 and v <= vr:
+            return k
+        if not setup:
+            alpha = (2.83 + 5.1 / b) * spq
+            lpq = math.log(p / (1.0 - p))
+            m = math.floor((n + 1) * p)
+            h = math.lgamma(m + 1) + math.lgamma(n - m + 1)
+            setup = True
+        v *= alpha / (a / (us * us) + b)
+        if math.log(v) <= h - math.lgamma(k + 1) - math.lgamma(n - k + 1) + (k - m) * lpq:
+            return k
+
+
+def _multinomial_uniform(n: int, categories: int, rng: random.Random) -> List[int]:
+    """n sorteios uniformes entre `categories` opções -> contagem por opção."""
+    counts = []
+    left = n
+    for i in range(categories - 1):
+        if left <= 0:
+            counts.append(0)
+            continue
+        got = _binomial(left, 1.0 / (categories - i), rng)
+        counts.append(got)
+        left -= got
+    counts.append(max(0, left))
+    return counts
+
+
+def _sum_uniform_ints(n: int, lo: int, hi: int, rng: random.Random) -> int:
+    """Soma de n randint(lo, hi) independentes."""
+    if hi < lo:
+        raise ValueError(f"empty range for randint ({lo}, {hi + 1}, {hi + 1 - lo})")
+    if n <= 0:
+        return 0
+    width = hi - lo + 1
+    if width == 1:
+        return n * lo
+    if n <= width:
+        return sum(rng.randint(lo, hi) for _ in range(n))
+    counts = _multinomial_uniform(n, width, rng)
+    return n * lo + sum(i * c for i, c in enumerate(counts))
+
+
+def _drop_chance(item: dict) -> float:
+    return min(1.0, max(0.0, float(item.get("drop_chance", 0)) / 100.0))
+
+
+# ==============================================================================
+# ▶️ RESOLUÇÃO
+# ==============================================================================
+def _empty_summary() -> Dict[str, Any]:
+    return {"wins": 0, "losses": 0, "xp": 0, "gold": 0, "items": {}}
+
+
+def resolve_hunts(
+    player_stats: dict,
+    monsters: List[dict],
+    hunt_count: int,
+    rng: Optional[random.Random] = None,
+) -> Dict[str, Any]:
+    """
+    monsters: templates JÁ escalados (scale_monster_stats), sorteados com a
+    mesma chance cada. Retorna {"wins", "losses", "xp", "gold", "items": {id: qtd}}.
+    """
+    rng = rng or random.Random()
+    out = _empty_summary()
+    if hunt_count <= 0:
+        return out
+    if not monsters:
+        out["losses"] = hunt_count
+        return out
+
+    appearances = _multinomial_uniform(hunt_count, len(monsters), rng)
+    items = out["items"]
+    for monster, seen in zip(monsters, appearances):
+        if not seen:
+            continue
+        if not player_wins(player_stats, monster):
+            out["losses"] += seen
+            continue
+        out["wins"] += seen
+        out["xp"] += seen * monster.get("xp_reward", 5)
+        out["gold"] += seen * monster.get("gold_drop", 1)
+        for entry in monster.get("loot_table", []):
+            drops = _binomial(seen, _drop_chance(entry), rng)
+            if not drops:
+                continue
+            item_id = entry.get("item_id") or entry.get("base_id")
+            qty = _sum_uniform_ints(drops, entry.get("min", 1), entry.get("max", 1), rng)
+            items[item_id] = items.get(item_id, 0) + qty
+    return out
+
+
+# ==============================================================================
+# 🧪 REFERÊNCIA (laço antigo, uma luta por vez)
+# ==============================================================================
+def simulate_single_battle(player_stats: dict, monster_data: dict) -> bool:
+    player_hp = player_stats.get('max_hp', 100)
+    monster_hp = monster_data.get('max_hp', 10)
+    player_atk = player_stats.get('attack', 10)
+    monster_atk = monster_data.get('attack', 2)
+
+    turns = 0
+    while turns < MAX_TURNS:
+        monster_hp -= player_atk
+        if monster_hp <= 0:
+            return True
+        player_hp -= monster_atk
+        if player_hp <= 0:
+            return False
+        turns += 1
+    return False
+
+
+def roll_loot(monster_data: dict, rng=random) -> List[Tuple[Any, int]]:
+    drops = []
+    for item in monster_data.get("loot_table", []):
+        if rng.uniform(0, 100) <= float(item.get("drop_chance", 0)):
+            item_id = item.get("item_id") or item.get("base_id")
+            qty = rng.randint(item.get("min", 1), item.get("max", 1))
+            drops.append((item_id, qty))
+    return drops
+
+
+def resolve_hunts_loop(
+    player_stats: dict,
+    monsters: List[dict],
+    hunt_count: int,
+    rng: Optional[random.Random] = None,
+) -> Dict[str, Any]:
+    rng = rng or random.Random()
+    out = _empty_summary()
+    if not monsters:
+        out["losses"] = max(0, hunt_count)
+        return out
+
+    items = out["items"]
+    for _ in range(hunt_count):
+        monster = rng.choice(monsters)
+        if simulate_single_battle(player_stats, monster):
+            out["wins"] += 1
+            out["xp"] += monster.get("xp_reward", 5)
+            out["gold"] += monster.get("gold_drop", 1)
+            for i_id, qty in roll_loot(monster, rng):
+                items[i_id] = items.get(i_id, 0) + qty
+        else:
+            out["losses"] += 1
+    return out
@@ -0,0 +1,377 @@
+# modules/broadcast/dispatcher.py
+# Motor ÚNICO de broadcast (anúncios globais, avisos de evento, prêmios).
+#
+# Antes: cada anúncio iterava os documentos dos jogadores e mandava DM uma a
+# uma com sleep(0.05)/sleep(1) no chute, tentando send_video -> send_photo ->
+# send_message POR destinatário e engolindo qualquer erro (inclusive
+# RetryAfter). Reinício no meio = anúncio perdido ou reenviado do zero.
+#
+# Agora:
+#   - destinatários: UMA agregação projetada (só o chat id), já deduplicada
+#   - ChatRateLimiter (rate_limit.py) compartilhado: limite global + por chat,
+#     e RetryAfter pausa todos os envios pelo tempo pedido
+#   - TimedOut (pedido já saiu, entrega incerta) NÃO é reenviado: conta como
+#     enviado e o progresso avança; só erro de conexão antes do envio repete
+#   - BROADCAST_CONCURRENCY enviadores em paralelo (latência da API sobreposta)
+#   - tipo de mídia resolvido UMA vez por job (file_ids ou 1º envio) e lembrado
+#   - job persistido em broadcast_jobs: lista congelada de destinatários +
+#     progresso (checkpoint a cada BROADCAST_CHECKPOINT_EVERY envios e no
+#     desligamento). No startup, resume_pending_broadcasts() continua de onde
+#     parou: só o que saiu depois do último checkpoint pode repetir.
+#
+# Uso:
+#     from modules.broadcast.dispatcher import start_broadcast
+#     await start_broadcast(bot, texto, key="wb_start:...", reply_markup=kb)
+#     await start_broadcast(bot, None, personal={chat_id: "texto só dele"})
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+from telegram import InlineKeyboardMarkup
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+
+from modules.database import db, run_db
+from modules.player.core import users_collection
+from modules.player.queries import iter_player_batches
+from .rate_limit import ChatRateLimiter
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "8"))
+BROADCAST_CHECKPOINT_EVERY = int(os.getenv("BROADCAST_CHECKPOINT_EVERY", "100"))
+MAX_ATTEMPTS = 4
+
+MEDIA_VIDEO, MEDIA_PHOTO, MEDIA_NONE = "video", "photo", "none"
+
+jobs_col = db["broadcast_jobs"] if db is not None else None
+
+_limiter = ChatRateLimiter()
+_runs: Dict[str, "BroadcastRun"] = {}
+_media_types: Dict[str, str] = {}  # file_id -> tipo já descoberto
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _chat_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value not in (None, "", 0) else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _unique(chat_ids: Iterable[Any]) -> List[int]:
+    seen, out = set(), []
+    for c in chat_ids:
+        c = _chat_int(c)
+        if c is not None and c not in seen:
+            seen.add(c)
+            out.append(c)
+    return out
+
+
+def _retry_seconds(e: RetryAfter) -> float:
+    delay = e.retry_after
+    return float(delay.total_seconds() if hasattr(delay, "total_seconds") else delay)
+
+
+# ==============================================================================
+# DESTINATÁRIOS
+# ==============================================================================
+_CHAT_FIELD = {"$cond": [{"$ifNull": ["$last_chat_id", False]}, "$last_chat_id", "$telegram_id_owner"]}
+
+
+async def recipient_chat_ids(filter: Optional[Dict[str, Any]] = None) -> List[int]:
+    """Chat ids distintos dos jogadores (last_chat_id, senão telegram_id_owner)."""
+    if users_collection is None:
+        return []
+    pipeline = [
+        {"$match": filter or {}},
+        {"$project": {"_id": 0, "chat": {"$convert": {"input": _CHAT_FIELD, "to": "long",
+                                                         "onError": None, "onNull": None}}}},
+        {"$match": {"chat": {"$ne": None}}},
+        {"$group": {"_id": "$chat"}},
+        {"$sort": {"_id": 1}},
+    ]
+    try:
+        rows = await run_db(lambda: list(users_collection.aggregate(pipeline, allowDiskUse=True)))
+        return _unique(r["_id"] for r in rows)
+    except Exception as e:
+        # Mongita (DEV) não tem $convert/$group: mesma projeção, dedup aqui
+        logger.info(f"[BROADCAST] Agregação indisponível ({e}); usando find projetado.")
+        chats = []
+        async for batch in iter_player_batches(filter, {"last_chat_id": 1, "telegram_id_owner": 1}, batch_size=1000):
+            chats.extend(d.get("last_chat_id") or d.get("telegram_id_owner") for d in batch)
+        return sorted(_unique(chats))
+
+
+# ==============================================================================
+# EXECUÇÃO DE UM JOB
+# ==============================================================================
+class BroadcastRun:
+    def __init__(self, bot, job: Dict[str, Any]):
+        self.bot = bot
+        self.job = job
+        self.key = job["_id"]
+        self.recipients: List[int] = job.get("recipients") or []
+        self.personal: Dict[str, str] = job.get("personal") or {}
+        markup = job.get("reply_markup")
+        self.markup = InlineKeyboardMarkup.de_json(markup, bot) if markup else None
+        self.media_lock = asyncio.Lock()
+
+        self.watermark = int(job.get("next_index", 0))
+        self.done_ahead = set(job.get("done_ahead") or [])
+        self.sent = int(job.get("sent", 0))
+        self.failed = int(job.get("failed", 0))
+        self._since_checkpoint = 0
+        self._checkpoint_lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    # --- envio ---------------------------------------------------------------
+    async def _send(self, chat_id: int, media_type: Optional[str]) -> None:
+        job = self.job
+        text = self.personal.get(str(chat_id), job.get("text"))
+        common = {"chat_id": chat_id, "parse_mode": job.get("parse_mode"), "reply_markup": self.markup}
+        media_id = job.get("media_id")
+        if media_id and media_type == MEDIA_VIDEO:
+            await self.bot.send_video(video=media_id, caption=text, **common)
+        elif media_id and media_type == MEDIA_PHOTO:
+            await self.bot.send_photo(photo=media_id, caption=text, **common)
+        else:
+            await self.bot.send_message(text=text, **common)
+
+    async def _send_resolving(self, chat_id: int) -> None:
+        """Tipo da mídia desconhecido: descobre no 1º envio e vale para o job todo."""
+        async with self.media_lock:
+            if self.job.get("media_type"):
+                return await self._send(chat_id, self.job["media_type"])
+            for media_type in (MEDIA_VIDEO, MEDIA_PHOTO, MEDIA_NONE):
+                try:
+                    await self._send(chat_id, media_type)
+                except BadRequest as e:
+                    if media_type == MEDIA_NONE:
+                        raise
+                    logger.debug(f"[BROADCAST] {self.key}: mídia não é {media_type} ({e})")
+                    continue
+                self.job["media_type"] = media_type
+                _media_types[self.job["media_id"]] = media_type
+                return
+
+    async def _deliver(self, chat_id: int) -> bool:
+        for attempt in range(MAX_ATTEMPTS):
+            await _limiter.acquire(chat_id)
+            try:
+                if self.job.get("media_id") and not self.job.get("media_type"):
+                    await self._send_resolving(chat_id)
+                else:
+                    await self._send(chat_id, self.job.get("media_type"))
+                return True
+            except RetryAfter as e:
+                logger.warning(f"[BROADCAST] Flood control: pausa de {_retry_seconds(e):.1f}s.")
+                _limiter.pause(_retry_seconds(e))
+            except (Forbidden, BadRequest):
+                return False  # bloqueou o bot / chat não existe: não adianta repetir
+            except TimedOut:
+                # o pedido já saiu e o Telegram pode ter entregue: reenviar
+                # arrisca DM duplicada. Conta como enviado (sem confirmação).
+                logger.debug(f"[BROADCAST] {self.key}: timeout ao enviar para {chat_id}; sem reenvio.")
+                return True
+            except NetworkError:  # falha de conexão antes do envio: seguro repetir
+                await asyncio.sleep(2 ** attempt)
+            except Exception as e:
+                logger.warning(f"[BROADCAST] {self.key}: erro ao enviar para {chat_id}: {e}")
+                return False
+        return False
+
+    # --- progresso -----------------------------------------------------------
+    def _complete(self, index: int, ok: bool) -> None:
+        if ok:
+            self.sent += 1
+        else:
+            self.failed += 1
+        self.done_ahead.add(index)
+        while self.watermark in self.done_ahead:
+            self.done_ahead.discard(self.watermark)
+            self.watermark += 1
+        self._since_checkpoint += 1
+
+    async def checkpoint(self, status: str = "running") -> None:
+        if jobs_col is None:
+            return
+        async with self._checkpoint_lock:
+            self._since_checkpoint = 0
+            fields = {
+                "status": status,
+                "next_index": self.watermark,
+                "done_ahead": sorted(self.done_ahead),
+                "sent": self.sent,
+                "failed": self.failed,
+                "media_type": self.job.get("media_type"),
+                "updated_at": _utcnow(),
+            }
+            update = {"$set": fields}
+            if status != "running":
+                # Lista congelada só serve para retomar
+                update["$unset"] = {"recipients": "", "personal": ""}
+            try:
+                await run_db(jobs_col.update_one, {"_id": self.key}, update)
+            except Exception as e:
+                logger.warning(f"[BROADCAST] Falha no checkpoint de {self.key}: {e}")
+
+    async def run(self) -> None:
+        pending = iter([i for i in range(self.watermark, len(self.recipients)) if i not in self.done_ahead])
+
+        async def sender():
+            for index in pending:  # iterador compartilhado: cada índice sai uma vez
+                self._complete(index, await self._deliver(self.recipients[index]))
+                if self._since_checkpoint >= BROADCAST_CHECKPOINT_EVERY:
+                    await self.checkpoint()
+
+        started = _utcnow()
+        try:
+            workers = max(1, min(BROADCAST_CONCURRENCY, len(self.recipients) - self.watermark))
+            await asyncio.gather(*(sender() for _ in range(workers)))
+        except asyncio.CancelledError:
+            await asyncio.shield(self.checkpoint())
+            raise
+        except Exception as e:
+            logger.error(f"[BROADCAST] {self.key} falhou: {e}")
+            await self.checkpoint("failed")
+            return
+        finally:
+            _runs.pop(self.key, None)
+
+        await self.checkpoint("done")
+        secs = (_utcnow() - started).total_seconds()
+        logger.info(
+            f"[BROADCAST] {self.key}: {self.sent} enviados, {self.failed} falhas "
+            f"({len(self.recipients)} destinos, {secs:.1f}s)."
+        )
+
+
+def _spawn(bot, job: Dict[str, Any]) -> BroadcastRun:
+    run = BroadcastRun(bot, job)
+    _runs[run.key] = run
+    run.task = asyncio.create_task(run.run(), name=f"broadcast:{run.key}")
+    return run
+
+
+# ==============================================================================
+# API
+# ==============================================================================
+async def start_broadcast(
+    bot,
+    text: Optional[str],
+    *,
+    key: Optional[str] = None,
+    kind: str = "generic",
+    recipients: Optional[Iterable[Any]] = None,
+    personal: Optional[Dict[Any, str]] = None,
+    media_id: Optional[str] = None,
+    media_type: Optional[str] = None,
+    reply_markup: Optional[InlineKeyboardMarkup] = None,
+    parse_mode: Optional[str] = "HTML",
+) -> Optional[str]:
+    """
+    Agenda um broadcast em segundo plano e retorna a chave do job.
+    recipients: chat ids (None = todos os jogadores); personal: {chat_id: texto}
+    sobrepõe `text` por destinatário. Mesma `key` não envia duas vezes.
+    """
+    personal = {str(_chat_int(c)): t for c, t in (personal or {}).items() if _chat_int(c) is not None}
+    if recipients is None:
+        recipients = [int(c) for c in personal] if personal else await recipient_chat_ids()
+    recipients = _unique(recipients)
+    if not recipients:
+        return None
+
+    key = key or f"{kind}:{uuid.uuid4().hex[:12]}"
+    if key in _runs:
+        return key
+    job = {
+        "_id": key,
+        "kind": kind,
+        "status": "running",
+        "text": text,
+        "parse_mode": parse_mode,
+        "media_id": media_id,
+        "media_type": media_type or (_media_types.get(media_id) if media_id else None),
+        "reply_markup": reply_markup.to_dict() if reply_markup else None,
+        "recipients": recipients,
+        "personal": personal,
+        "next_index": 0,
+        "done_ahead": [],
+        "sent": 0,
+        "failed": 0,
+        "created_at": _utcnow(),
+        "updated_at": _utcnow(),
+    }
+    if jobs_col is not None:
+        try:
+            await run_db(jobs_col.insert_one, job)
+        except DuplicateKeyError:
+            existing = await run_db(jobs_col.find_one, {"_id": key})
+            if not existing or existing.get("status") != "running":
+                logger.info(f"[BROADCAST] {key} já foi enviado; ignorando.")
+                return key
+            job = existing  # mesmo anúncio interrompido: continua de onde parou
+        except Exception as e:
+            logger.warning(f"[BROADCAST] Sem persistência para {key} ({e}); enviando mesmo assim.")
+
+    _spawn(bot, job)
+    logger.info(f"[BROADCAST] {key}: {len(recipients)} destinos na fila.")
+    return key
+
+
+def ensure_broadcast_indexes() -> None:
+    if jobs_col is None:
+        return
+    try:
+        jobs_col.create_index("status")
+    except Exception as e:
+        logger.warning(f"[BROADCAST] Falha ao criar índice: {e}")
+
+
+async def resume_pending_broadcasts(bot) -> int:
+    """Startup: retoma os jobs que estavam no meio quando o bot caiu/reiniciou."""
+    if jobs_col is None:
+        return 0
+    try:
+        jobs = await run_db(lambda: list(jobs_col.find({"status": "running"})))
+    except Exception as e:
+        logger.error(f"[BROADCAST] Falha ao buscar jobs pendentes: {e}")
+        return 0
+    resumed = 0
+    for job in jobs:
+        if job["_id"] in _runs:
+            continue
+        left = len(job.get("recipients") or []) - int(job.get("next_index", 0))
+        logger.info(f"[BROADCAST] Retomando {job['_id']} ({left} restantes).")
+        _spawn(bot, job)
+        resumed += 1
+    return resumed
+
+
+async def shutdown() -> None:
+    """Desligamento: interrompe os envios gravando o progresso de cada job."""
+    runs = list(_runs.values())
+    for run in runs:
+        if run.task:
+            run.task.cancel()
+    await asyncio.gather(*(r.task for r in runs if r.task), return_exceptions=True)
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "active": {k: {"sent": r.sent, "failed": r.failed, "left": len(r.recipients) - r.watermark}
+                   for k, r in _runs.items()},
+        "limiter_waited_s": round(_limiter.waited, 1),
+        "limiter_pauses": _limiter.pauses,
+    }
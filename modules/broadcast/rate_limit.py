@@ -0,0 +1,88 @@
+# modules/broadcast/rate_limit.py
+# Limites de envio do Telegram para broadcasts (módulo puro, só asyncio).
+#
+# Telegram (bots): ~30 mensagens/s no total, 1/s por chat privado e ~20/min
+# por grupo. Antes cada laço de envio usava sleep(0.05)/sleep(1) no chute.
+#
+# - TokenBucket: taxa global com rajada, na forma "tempo virtual" (GCRA):
+#   reserve() já devolve QUANDO a vaga abre, então os enviadores esperam em
+#   ordem (FIFO) sem laço de tentativa, e reservas para o futuro (chat ainda
+#   no intervalo, pausa de RetryAfter) não viram rajada quando a espera acaba.
+# - ChatRateLimiter: bucket global + intervalo mínimo por chat + pausa global
+#   quando o Telegram responde RetryAfter (flood control vale para o bot todo).
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Callable, Dict, Optional
+
+BROADCAST_RATE_PER_SEC = float(os.getenv("BROADCAST_RATE_PER_SEC", "25"))
+PRIVATE_CHAT_INTERVAL = 1.0   # 1 msg/s por chat privado
+GROUP_CHAT_INTERVAL = 3.0     # 20 msg/min por grupo (chat_id negativo)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = max(0.001, float(rate))
+        self.capacity = max(1.0, float(capacity if capacity is not None else rate))
+        self._clock = clock
+        self._interval = 1.0 / self.rate
+        self._tolerance = (self.capacity - 1.0) * self._interval
+        self._tat = clock()  # "theoretical arrival time" do próximo token
+
+    def reserve(self, at: Optional[float] = None) -> float:
+        """Reserva um token para `at` (ou agora). Retorna o instante em que ele vale."""
+        at = self._clock() if at is None else at
+        ready = max(at, self._tat - self._tolerance)
+        self._tat = max(self._tat, ready) + self._interval
+        return ready
+
+    def available(self, now: Optional[float] = None) -> float:
+        """Tokens livres agora (0 se há fila)."""
+        now = self._clock() if now is None else now
+        return max(0.0, min(self.capacity, (now - self._tat) / self._interval + self.capacity))
+
+
+class ChatRateLimiter:
+    def __init__(self, rate: float = BROADCAST_RATE_PER_SEC, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.bucket = TokenBucket(rate, burst, clock)
+        self._chat_next: Dict[int, float] = {}
+        self._paused_until = 0.0
+        self.waited = 0.0
+        self.pauses = 0
+
+    @staticmethod
+    def chat_interval(chat_id: int) -> float:
+        return GROUP_CHAT_INTERVAL if chat_id < 0 else PRIVATE_CHAT_INTERVAL
+
+    def pause(self, seconds: float) -> None:
+        """RetryAfter: ninguém envia até passar o tempo pedido pelo Telegram."""
+        until = self._clock() + max(0.0, float(seconds))
+        if until > self._paused_until:
+            self._paused_until = until
+            self.pauses += 1
+
+    def reserve(self, chat_id: int) -> float:
+        """Reserva a vaga (chat + global) e devolve quantos segundos esperar."""
+        now = self._clock()
+        start = max(now, self._paused_until, self._chat_next.get(chat_id, 0.0))
+        ready = self.bucket.reserve(start)
+        self._chat_next[chat_id] = ready + self.chat_interval(chat_id)
+        if len(self._chat_next) > 4096:
+            self._chat_next = {c: t for c, t in self._chat_next.items() if t > now}
+        return ready - now
+
+    async def acquire(self, chat_id: int) -> None:
+        while True:
+            wait = self.reserve(chat_id)
+            if wait > 0:
+                self.waited += wait
+                await asyncio.sleep(wait)
+            # Um RetryAfter pode ter chegado enquanto esperava
+            if self._clock() >= self._paused_until:
+                return
@@ -9,7 +9,7 @@ from datetime import timedelta
 # Para resolver nomes dos clãs no ranking
 from modules import clan_manager 
 from bson import ObjectId
-from modules.database import db
+from modules.database import db, run_db
 
 logger = logging.getLogger(__name__)
 UTC = timezone.utc
@@ -282,7 +282,7 @@ async def get_war_targets_in_region(current_user_id: str, region_key: str) -> li
     cid = campaign.get("campaign_id")
 
     # 3. Busca jogadores (Exclui meu clã e eu mesmo)
-    candidates = await asyncio.to_thread(
+    candidates = await run_db(
         lambda: list(db.players.find(
             {
                 "current_location": region_key,
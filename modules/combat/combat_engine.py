@@ -4,7 +4,7 @@
 import random
 import logging
 from typing import Optional, Dict, Any
-from modules.skills.skill_canonical_adapter import adapt_skill_to_canon
+from modules.skills import skill_registry
 from modules.game_data.skills import SKILL_DATA
 
 from modules.combat import criticals
@@ -13,24 +13,8 @@ from modules.combat import durability
 logger = logging.getLogger(__name__)
 
 def _get_player_skill_data_by_rarity(pdata: dict, skill_id: str) -> Optional[dict]:
-    """Busca os dados base da skill e aplica os efeitos da raridade."""
-    base_skill = SKILL_DATA.get(skill_id)
-
-    if not base_skill: return None
-
-    if "rarity_effects" not in base_skill:
-        return base_skill.copy()
-
-    player_skills = pdata.get("skills", {})
-    rarity = "comum"
-    if isinstance(player_skills, dict):
-        skill_inst = player_skills.get(skill_id)
-        if skill_inst: rarity = skill_inst.get("rarity", "comum")
-
-    merged_data = base_skill.copy()
-    rarity_data = base_skill["rarity_effects"].get(rarity, base_skill["rarity_effects"].get("comum", {}))
-    merged_data.update(rarity_data)
-    return merged_data
+    """Dados da skill com a raridade do jogador (registro compilado, somente leitura)."""
+    return skill_registry.player_skill_view(pdata, skill_id)
 
 async def processar_acao_combate(
     attacker_pdata: dict,
@@ -54,11 +38,8 @@ async def processar_acao_combate(
             .get("rarity", "comum")
         )
 
-        canon = adapt_skill_to_canon(
-            skills_db=SKILL_DATA,
-            skill_id=skill_id,
-            rarity=rarity,
-        )
+        # Canônico pré-compilado por (skill, raridade): nada é remontado por ação
+        canon = skill_registry.canonical(skill_id, rarity)
         canon_effects = (canon or {}).get("effects", {}) or {}
         
         # ======= LÓGICA DE CONSUMO DE MANA =======
@@ -4,9 +4,17 @@
 from __future__ import annotations
 
 import os
+import asyncio
+import functools
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
 import pymongo
 import certifi
+from pymongo import monitoring
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +27,13 @@ clans_col = None  # necessário para clãs/guerras
 # Configuração
 BOT_MODE = os.environ.get("BOT_MODE", "prod").lower()
 MONGO_CONNECTION_STRING = os.environ.get("MONGO_CONNECTION_STRING")
+MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME", "eldora_db")
+
+# Pool do cliente ÚNICO do processo (core, sessions, mercado, jobs... usam
+# todos o mesmo). O executor do run_db tem o mesmo tamanho do maxPoolSize.
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000"))
 
 
 def _get_mongo_uri_fallback() -> str | None:
@@ -35,12 +50,147 @@ def _get_mongo_uri_fallback() -> str | None:
 
 
 
+# ==============================================================================
+# MÉTRICAS DO POOL (checkout de conexões)
+# ==============================================================================
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Conexões abertas/em uso e espera no checkout, somando todos os servidores."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.created = 0
+        self.closed = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    # --- conexões ---
+    def connection_created(self, event) -> None:
+        with self._lock:
+            self.created += 1
+
+    def connection_closed(self, event) -> None:
+        with self._lock:
+            self.closed += 1
+
+    # --- checkout (o evento roda na thread que pediu a conexão) ---
+    def connection_check_out_started(self, event) -> None:
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event) -> None:
+        started = getattr(self._local, "started", None)
+        waited = time.perf_counter() - started if started is not None else 0.0
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def connection_check_out_failed(self, event) -> None:
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event) -> None:
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    # --- eventos de pool sem métrica própria ---
+    def pool_created(self, event) -> None: pass
+    def pool_ready(self, event) -> None: pass
+    def pool_cleared(self, event) -> None: pass
+    def pool_closed(self, event) -> None: pass
+    def connection_ready(self, event) -> None: pass
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open": self.created - self.closed,
+                "created": self.created,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "wait_avg_ms": (self.wait_total / self.checkouts * 1000) if self.checkouts else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+def pool_stats() -> Dict[str, Any]:
+    return {
+        **pool_metrics.as_dict(),
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+    }
+
+
+def report_line() -> str:
+    s = pool_stats()
+    return (
+        f"[MONGO] conexões abertas={s['open']} em_uso={s['in_use']} (pico {s['max_in_use']}/"
+        f"{s['max_pool_size']}) | checkouts={s['checkouts']} falhas={s['checkout_failures']} "
+        f"espera média={s['wait_avg_ms']:.1f}ms máx={s['wait_max_ms']:.0f}ms"
+    )
+
+
+# ==============================================================================
+# CLIENTE ÚNICO
+# ==============================================================================
+_client_lock = threading.Lock()
+
+
+def get_mongo_uri() -> str | None:
+    return MONGO_CONNECTION_STRING or _get_mongo_uri_fallback()
+
+
+def create_client(uri: str, **overrides: Any) -> pymongo.MongoClient:
+    """
+    MongoClient com o pool configurado e as métricas ligadas. connect=False:
+    nenhuma conexão (nem handshake TLS) até a primeira operação.
+    """
+    options: Dict[str, Any] = {
+        "tlsCAFile": certifi.where(),
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "connect": False,
+        "event_listeners": [pool_metrics],
+    }
+    options.update(overrides)
+    return pymongo.MongoClient(uri, **options)
+
+
+def get_client() -> Any:
+    """O cliente do processo (criado na primeira chamada). None sem URI."""
+    if client is None:
+        initialize_database()
+    return client
+
+
+def get_db() -> Any:
+    """Banco principal (eldora_db) do cliente único. None se não configurado."""
+    if db is None:
+        initialize_database()
+    return db
+
+
 def initialize_database() -> None:
-    global client, db, players_col, clans_col, MONGO_CONNECTION_STRING
+    with _client_lock:
+        # Idempotente (não reabre conexão)
+        if db is not None:
+            return
+        _initialize_locked()
 
-    # Idempotente (não reabre conexão)
-    if db is not None:
-        return
+
+def _initialize_locked() -> None:
+    global client, db, players_col, clans_col, MONGO_CONNECTION_STRING
 
     if BOT_MODE == "dev":
         # === MODO LOCAL (MONGITA) ===
@@ -71,30 +221,82 @@ def initialize_database() -> None:
             return
 
         try:
-            ca = certifi.where()
-            client = pymongo.MongoClient(MONGO_CONNECTION_STRING, tlsCAFile=ca)
-            client.admin.command("ping")  # Teste rápido
-            db = client.get_database("eldora_db")
-            logger.info("✅ MongoDB Atlas conectado (eldora_db).")
+            # Conexão preguiçosa: o primeiro acesso ao banco abre o pool
+            client = create_client(MONGO_CONNECTION_STRING)
+            db = client.get_database(MONGO_DB_NAME)
+            logger.info(
+                f"✅ MongoDB configurado ({MONGO_DB_NAME}, pool {MONGO_MIN_POOL_SIZE}-{MONGO_MAX_POOL_SIZE}, "
+                f"espera máx {MONGO_WAIT_QUEUE_TIMEOUT_MS}ms)."
+            )
         except Exception as e:
-            logger.exception(f"❌ Falha ao conectar no MongoDB: {e}")
+            logger.exception(f"❌ Falha ao configurar o MongoDB: {e}")
             return
 
     # Define as coleções
     try:
         players_col = db.get_collection("players")
         clans_col = db.get_collection("clans")
-
-        # Índices (não críticos)
-        try:
-            players_col.create_index("character_name_normalized")
-        except Exception:
-            pass
-
     except Exception as e:
         logger.exception(f"❌ Falha ao preparar coleções: {e}")
         return
 
 
-# Inicializa ao importar (mantém seu comportamento atual)
+def ensure_database_indexes() -> None:
+    """Índices gerais (não críticos). Chamado no startup, não no import."""
+    if players_col is None:
+        return
+    try:
+        players_col.create_index("character_name_normalized")
+    except Exception:
+        pass
+
+
+# Inicializa ao importar (só configura o cliente; a conexão abre na 1ª operação)
 initialize_database()
+
+
+# ==============================================================================
+# CAMADA ASSÍNCRONA (REPOSITÓRIO)
+# ==============================================================================
+# O pymongo é síncrono. Em vez de asyncio.to_thread (que usa o executor padrão,
+# compartilhado com tudo e dimensionado pela CPU), toda ida ao banco de dentro
+# de corrotinas passa por um executor PRÓPRIO com o mesmo tamanho do pool de
+# conexões do Mongo: nunca há mais threads esperando do que conexões livres.
+#
+# Uso:
+#     from modules.database import run_db
+#     doc = await run_db(users_col.find_one, {"_id": oid})
+#     docs = await run_db(lambda: list(users_col.find({...}).limit(50)))
+#
+# Cursores não atravessam threads: consuma o cursor dentro do run_db.
+# tools/lint_sync_mongo.py falha se aparecer chamada síncrona dentro de async def.
+
+_db_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(max_workers=MONGO_MAX_POOL_SIZE, thread_name_prefix="mongo")
+    return _db_executor
+
+
+async def run_db(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Executa uma chamada síncrona do pymongo no executor dedicado."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_db_executor() -> None:
+    """No desligamento (post_shutdown): espera as idas ao banco em andamento."""
+    global _db_executor
+    if _db_executor is not None:
+        _db_executor.shutdown(wait=True)
+        _db_executor = None
+
+
+def get_collection(name: str) -> Any:
+    """Coleção SÍNCRONA do banco principal (para usar com run_db)."""
+    if db is None:
+        return None
+    return db.get_collection(name)
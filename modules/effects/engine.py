@@ -1,11 +1,13 @@
 # modules/effects/engine.py
 from __future__ import annotations
 
+from types import MappingProxyType
 from typing import Any, Dict, List, Optional, Tuple
 
 from modules.effects.models import (
     CombatContext,
     EffectInstance,
+    EffectSet,
     EVENT_ON_APPLY,
     EVENT_ON_REFRESH,
     EVENT_ON_EXPIRE,
@@ -16,6 +18,7 @@ from modules.effects.models import (
     EVENT_ON_HEAL,
 )
 from modules.effects.registry import (
+    EffectTemplate,
     get_effect_template,
     # modifier keys
     MOD_DAMAGE_DEALT_MULT,
@@ -31,47 +34,123 @@ from modules.effects.registry import (
 # -----------------------------------------------------------------------------
 # Convenção simples:
 # - "entidade" é um dict (player_data ou monster_stats do battle_cache)
-# - efeitos ativos ficam em entity["_effects"] como lista de dict (serializado)
-# - o engine converte para EffectInstance quando processa
+# - efeitos ativos ficam em entity["_effects"]
+#     * no banco / vindo do banco: lista de dict (serializado)
+#     * em memória, depois do 1º uso pelo engine: EffectSet (registros com
+#       __slots__ + agregado de modifiers em cache)
+# - a conversão de volta para lista de dict só acontece nas bordas de
+#   persistência (serialize_effects, chamado pelo save do jogador) ou em
+#   cópias (copy/deepcopy/pickle do EffectSet devolvem a lista de dict)
 # -----------------------------------------------------------------------------
 
 EFFECTS_KEY = "_effects"  # não conflita com seus campos atuais
 
+_EMPTY_MODS: Dict[str, Any] = {}
+_DELTA_MODS = (MOD_DAMAGE_DEALT_MULT, MOD_DAMAGE_TAKEN_MULT, MOD_HEAL_RECEIVED_MULT)
 
-def _ensure_effects(entity: Dict[str, Any]) -> List[EffectInstance]:
+
+# -----------------------------------------------------------------------------
+# Templates internados: o que o engine precisa de cada EffectTemplate,
+# montado uma vez por effect_id (e refeito se o registry trocar o template)
+# -----------------------------------------------------------------------------
+class _CompiledEffect:
+    __slots__ = ("tpl", "tags", "tagset", "rules", "modifiers", "tick_damage", "tick_heal")
+
+    def __init__(self, tpl: EffectTemplate):
+        self.tpl = tpl
+        self.tags: Tuple[str, ...] = tuple(tpl.tags or [])
+        self.tagset = frozenset(self.tags)
+        # somente leitura: compartilhado por todas as instâncias deste efeito
+        self.rules = MappingProxyType({
+            "max_stacks": int(tpl.max_stacks or 1),
+            "stack_mode": tpl.stack_mode or "refresh_duration",
+            "exclusive_group": tpl.exclusive_group,
+            "priority": int(tpl.priority or 100),
+        })
+        self.modifiers = tuple((tpl.modifiers or {}).items())
+
+        tick = tpl.tick or {}
+        td = tick.get(TICK_DAMAGE)
+        self.tick_damage = None
+        if td is not None and td.get("at") == "on_turn_start":
+            self.tick_damage = (int(td.get("base", 0)), int(td.get("per_stack", 0)))
+        th = tick.get(TICK_HEAL)
+        self.tick_heal = None
+        if th is not None and th.get("at") == "on_turn_start":
+            self.tick_heal = (int(th.get("base", 0)), int(th.get("per_stack", 0)))
+
+
+_compiled: Dict[str, _CompiledEffect] = {}
+
+
+def _compiled_effect(effect_id: str) -> Optional[_CompiledEffect]:
+    tpl = get_effect_template(effect_id)
+    if not tpl:
+        return None
+    ce = _compiled.get(effect_id)
+    if ce is None or ce.tpl is not tpl:
+        ce = _compiled[effect_id] = _CompiledEffect(tpl)
+    return ce
+
+
+def _load_instance(d: Dict[str, Any]) -> EffectInstance:
+    """dict persistido -> registro; tags/rules iguais aos do template são internados."""
+    inst = EffectInstance.from_dict(d)
+    ce = _compiled_effect(inst.effect_id)
+    if ce is not None:
+        if tuple(inst.tags) == ce.tags:
+            inst.tags = ce.tags
+        if inst.rules == ce.rules:
+            inst.rules = ce.rules
+    return inst
+
+
+def _ensure_effects(entity: Dict[str, Any]) -> EffectSet:
     raw = entity.get(EFFECTS_KEY)
+    if type(raw) is EffectSet:
+        return raw
     if not raw:
         entity[EFFECTS_KEY] = []
-        return []
+        return EffectSet()
 
     out: List[EffectInstance] = []
-    changed = False
     for it in raw:
         if isinstance(it, EffectInstance):
             out.append(it)
         elif isinstance(it, dict):
-            out.append(EffectInstance.from_dict(it))
-            changed = True
-        else:
-            changed = True
+            out.append(_load_instance(it))
 
-    if changed:
-        entity[EFFECTS_KEY] = [e.to_dict() for e in out]
-    return out
+    effects = EffectSet(out)
+    entity[EFFECTS_KEY] = effects
+    return effects
+
+
+def _save_effects(entity: Dict[str, Any], effects: EffectSet, items: Optional[List[EffectInstance]] = None) -> None:
+    """Troca a lista de registros (se mudou) e invalida o agregado. Não serializa."""
+    if items is not None:
+        effects.items = items
+    effects.changed()
+    entity[EFFECTS_KEY] = effects
 
 
-def _save_effects(entity: Dict[str, Any], effects: List[EffectInstance]) -> None:
-    entity[EFFECTS_KEY] = [e.to_dict() for e in effects]
+def serialize_effects(entity: Dict[str, Any]) -> None:
+    """
+    Borda de persistência: devolve entity["_effects"] ao formato do banco
+    (lista de dict). O próximo uso pelo engine recria o EffectSet.
+    """
+    raw = entity.get(EFFECTS_KEY) if isinstance(entity, dict) else None
+    if type(raw) is EffectSet:
+        entity[EFFECTS_KEY] = raw.to_list()
 
 
-def _find_effects_by_id(effects: List[EffectInstance], effect_id: str) -> List[EffectInstance]:
-    return [e for e in effects if e.effect_id == effect_id]
+def _find_effects_by_id(effects: EffectSet, effect_id: str) -> List[EffectInstance]:
+    return [e for e in effects.items if e.effect_id == effect_id]
 
 
-def _remove_by_uid(effects: List[EffectInstance], uid: str) -> Tuple[List[EffectInstance], Optional[EffectInstance]]:
+def _remove_by_uid(effects: EffectSet, uid: str) -> Tuple[List[EffectInstance], Optional[EffectInstance]]:
     removed = None
     kept = []
-    for e in effects:
+    for e in effects.items:
         if e.uid == uid and removed is None:
             removed = e
         else:
@@ -79,17 +158,65 @@ def _remove_by_uid(effects: List[EffectInstance], uid: str) -> Tuple[List[Effect
     return kept, removed
 
 
-def _remove_exclusive_group(entity: Dict[str, Any], effects: List[EffectInstance], group: str) -> List[EffectInstance]:
+def _remove_exclusive_group(effects: EffectSet, group: str) -> List[EffectInstance]:
     kept = []
-    for e in effects:
-        tpl = get_effect_template(e.effect_id)
-        if tpl and tpl.exclusive_group == group:
+    for e in effects.items:
+        ce = _compiled_effect(e.effect_id)
+        if ce and ce.tpl.exclusive_group == group:
             # remove (expire)
             continue
         kept.append(e)
     return kept
 
 
+def _priority(e: EffectInstance) -> int:
+    return int((e.rules or {}).get("priority", 100))
+
+
+def _aggregate(effects: EffectSet) -> Dict[str, Any]:
+    """
+    Consolida modifiers de todos os efeitos (ordem de prioridade, menor primeiro).
+    - *_mult soma (ex.: -0.30 + 0.15 = -0.15)
+    - flags booleanas: True se algum setar True
+    """
+    out: Dict[str, Any] = {}
+    has_shield = False
+    for e in sorted(effects.items, key=_priority):
+        if e.effect_id == "shield":
+            has_shield = True
+        ce = _compiled_effect(e.effect_id)
+        if not ce:
+            continue
+
+        for k, v in ce.modifiers:
+            if k in _DELTA_MODS:
+                out[k] = float(out.get(k, 0.0)) + float(v)  # soma de deltas
+            elif k == MOD_CANNOT_ACT:
+                if bool(v):
+                    out[k] = True
+            elif k == MOD_SHIELD_FLAT:
+                # shield é tratado no pipeline de dano via meta["shield_value"]
+                out[k] = True
+            else:
+                # fallback
+                out[k] = v
+
+    effects.has_shield = has_shield
+    effects.mods = out
+    return out
+
+
+def _mods_of(entity: Dict[str, Any]) -> Dict[str, Any]:
+    """Agregado em cache (somente leitura) — recalcula só depois de mudanças."""
+    effects = _ensure_effects(entity)
+    if not effects.items:
+        return _EMPTY_MODS
+    mods = effects.mods
+    if mods is None:
+        mods = _aggregate(effects)
+    return mods
+
+
 # -----------------------------------------------------------------------------
 # API pública do EffectEngine
 # -----------------------------------------------------------------------------
@@ -111,15 +238,16 @@ def apply_effect(
     Aplica um efeito em target.
     Retorna (ok, msg_curta).
     """
-    tpl = get_effect_template(effect_id)
-    if not tpl:
+    ce = _compiled_effect(effect_id)
+    if not ce:
         return False, f"Efeito desconhecido: {effect_id}"
+    tpl = ce.tpl
 
     effects = _ensure_effects(target)
 
     # exclusive group (ex.: posture/aura)
     if tpl.exclusive_group:
-        effects = _remove_exclusive_group(target, effects, tpl.exclusive_group)
+        effects.items = _remove_exclusive_group(effects, tpl.exclusive_group)
 
     # procura existentes do mesmo effect_id
     existing = _find_effects_by_id(effects, effect_id)
@@ -143,7 +271,7 @@ def apply_effect(
             e.potency = max(float(e.potency), float(potency))
             e.dispellable = final_dispellable
             if meta:
-                e.meta.update(meta)
+                e.update_meta(meta)
 
         elif mode == "add_duration":
             if not e.permanent:
@@ -154,7 +282,7 @@ def apply_effect(
             e.potency = max(float(e.potency), float(potency))
             e.dispellable = final_dispellable
             if meta:
-                e.meta.update(meta)
+                e.update_meta(meta)
 
         elif mode == "increase_potency":
             # stacks sobem até max
@@ -166,7 +294,7 @@ def apply_effect(
                 e.remaining = max(e.remaining, int(duration_turns))
             e.dispellable = final_dispellable
             if meta:
-                e.meta.update(meta)
+                e.update_meta(meta)
 
         else:  # refresh_duration (default)
             if e.stacks < max_stacks:
@@ -176,12 +304,12 @@ def apply_effect(
             e.potency = max(float(e.potency), float(potency))
             e.dispellable = final_dispellable
             if meta:
-                e.meta.update(meta)
+                e.update_meta(meta)
 
         _save_effects(target, effects)
         return True, f"{tpl.name} atualizado"
 
-    # cria nova instância
+    # cria nova instância (tags/rules internados no template)
     inst = EffectInstance(
         effect_id=tpl.effect_id,
         kind=tpl.kind,
@@ -193,21 +321,16 @@ def apply_effect(
         stacks=max(1, int(stacks)),
         potency=float(potency),
         dispellable=final_dispellable,
-        tags=list(tpl.tags or []),
-        rules={
-            "max_stacks": int(tpl.max_stacks or 1),
-            "stack_mode": tpl.stack_mode or "refresh_duration",
-            "exclusive_group": tpl.exclusive_group,
-            "priority": int(tpl.priority or 100),
-        },
-        meta=dict(meta or {}),
+        tags=ce.tags,
+        rules=ce.rules,
+        meta=dict(meta) if meta else None,
     )
 
     # shield usa potency como “valor do escudo” (saldo)
     if tpl.effect_id == "shield":
-        inst.meta["shield_value"] = int(round(float(potency)))
+        inst.update_meta({"shield_value": int(round(float(potency)))})
 
-    effects.append(inst)
+    effects.items.append(inst)
     _save_effects(target, effects)
     return True, f"{tpl.name} aplicado"
 
@@ -217,7 +340,7 @@ def remove_effect_by_uid(target: Dict[str, Any], uid: str) -> Tuple[bool, str]:
     new_list, removed = _remove_by_uid(effects, uid)
     if not removed:
         return False, "Efeito não encontrado"
-    _save_effects(target, new_list)
+    _save_effects(target, effects, new_list)
     tpl = get_effect_template(removed.effect_id)
     return True, f"{tpl.name if tpl else removed.effect_id} removido"
 
@@ -232,7 +355,7 @@ def dispel(target: Dict[str, Any], *, remove_debuffs: bool = True, tags: Optiona
     removed_count = 0
     tagset = set(tags or [])
 
-    for e in effects:
+    for e in effects.items:
         if removed_count >= max_remove:
             kept.append(e)
             continue
@@ -241,23 +364,23 @@ def dispel(target: Dict[str, Any], *, remove_debuffs: bool = True, tags: Optiona
             kept.append(e)
             continue
 
-        tpl = get_effect_template(e.effect_id)
-        if not tpl:
+        ce = _compiled_effect(e.effect_id)
+        if not ce:
             kept.append(e)
             continue
 
-        if remove_debuffs and tpl.kind != "debuff":
+        if remove_debuffs and ce.tpl.kind != "debuff":
             kept.append(e)
             continue
 
-        if tagset and not (set(tpl.tags or []) & tagset):
+        if tagset and not (ce.tagset & tagset):
             kept.append(e)
             continue
 
         # remove
         removed_count += 1
 
-    _save_effects(target, kept)
+    _save_effects(target, effects, kept)
     return removed_count
 
 
@@ -265,45 +388,15 @@ def can_act(entity: Dict[str, Any]) -> bool:
     """
     Retorna False se algum efeito ativo bloquear ação (ex.: stun).
     """
-    mods = get_modifiers(entity)
-    return not bool(mods.get(MOD_CANNOT_ACT))
+    return not bool(_mods_of(entity).get(MOD_CANNOT_ACT))
 
 
 def get_modifiers(entity: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Consolida modifiers de todos os efeitos ativos no entity.
-    Regras:
-    - *_mult soma (ex.: -0.30 + 0.15 = -0.15)
-    - flags booleanas: True se algum setar True
+    Consolida modifiers de todos os efeitos ativos no entity (cópia do
+    agregado em cache; ver _aggregate para as regras de soma).
     """
-    effects = _ensure_effects(entity)
-
-    # ordena por prioridade (menor primeiro)
-    effects_sorted = sorted(
-        effects,
-        key=lambda e: int((e.rules or {}).get("priority", 100))
-    )
-
-    out: Dict[str, Any] = {}
-    for e in effects_sorted:
-        tpl = get_effect_template(e.effect_id)
-        if not tpl:
-            continue
-
-        for k, v in (tpl.modifiers or {}).items():
-            if k in (MOD_DAMAGE_DEALT_MULT, MOD_DAMAGE_TAKEN_MULT, MOD_HEAL_RECEIVED_MULT):
-                out[k] = float(out.get(k, 0.0)) + float(v)  # soma de deltas
-            elif k == MOD_CANNOT_ACT:
-                if bool(v):
-                    out[k] = True
-            elif k == MOD_SHIELD_FLAT:
-                # shield é tratado no pipeline de dano via meta["shield_value"]
-                out[k] = True
-            else:
-                # fallback
-                out[k] = v
-
-    return out
+    return dict(_mods_of(entity))
 
 
 def _apply_shield_if_any(target: Dict[str, Any], damage: int) -> int:
@@ -315,15 +408,18 @@ def _apply_shield_if_any(target: Dict[str, Any], damage: int) -> int:
         return 0
 
     effects = _ensure_effects(target)
-    if not effects:
+    if not effects.items:
+        return damage
+    if effects.mods is None:
+        _aggregate(effects)
+    if not effects.has_shield:
         return damage
 
-    changed = False
-    for e in effects:
+    for e in effects.items:
         if e.effect_id != "shield":
             continue
 
-        shield_val = int(e.meta.get("shield_value", 0))
+        shield_val = int(e.get_meta("shield_value", 0))
         if shield_val <= 0:
             continue
 
@@ -331,23 +427,43 @@ def _apply_shield_if_any(target: Dict[str, Any], damage: int) -> int:
         absorbed = min(shield_val, damage)
         shield_val -= absorbed
         damage -= absorbed
-        e.meta["shield_value"] = shield_val
-        changed = True
+        e.update_meta({"shield_value": shield_val})
 
         # remove se zerou
         if shield_val <= 0:
             e.remaining = 0  # marca como expirado (tick vai limpar)
-            changed = True
 
         if damage <= 0:
             break
 
-    if changed:
-        _save_effects(target, effects)
-
     return damage
 
 
+def _damage_pipeline(source: Dict[str, Any], target: Dict[str, Any], damage: int) -> int:
+    # 1) Modificadores do source (dano causado)
+    dmg = int(damage)
+    dealt_delta = float(_mods_of(source).get(MOD_DAMAGE_DEALT_MULT, 0.0))
+    if dealt_delta != 0.0:
+        dmg = int(round(dmg * (1.0 + dealt_delta)))
+
+    # 2) Modificadores do target (dano recebido)
+    taken_delta = float(_mods_of(target).get(MOD_DAMAGE_TAKEN_MULT, 0.0))
+    if taken_delta != 0.0:
+        dmg = int(round(dmg * (1.0 + taken_delta)))
+
+    # 3) Shield (absorção)
+    dmg = _apply_shield_if_any(target, dmg)
+    return max(0, int(dmg))
+
+
+def _heal_pipeline(target: Dict[str, Any], heal: int) -> int:
+    heal = int(heal)
+    heal_delta = float(_mods_of(target).get(MOD_HEAL_RECEIVED_MULT, 0.0))
+    if heal_delta != 0.0:
+        heal = int(round(heal * (1.0 + heal_delta)))
+    return max(0, int(heal))
+
+
 def dispatch(event: str, ctx: CombatContext) -> None:
     """
     Dispara um evento do engine.
@@ -358,35 +474,11 @@ def dispatch(event: str, ctx: CombatContext) -> None:
     ctx.event = event
 
     if event == EVENT_ON_BEFORE_DAMAGE:
-        # 1) Modificadores do source (dano causado)
-        src_mods = get_modifiers(ctx.source)
-        dmg = int(ctx.damage)
-
-        dealt_delta = float(src_mods.get(MOD_DAMAGE_DEALT_MULT, 0.0))
-        if dealt_delta != 0.0:
-            dmg = int(round(dmg * (1.0 + dealt_delta)))
-
-        # 2) Modificadores do target (dano recebido)
-        tgt_mods = get_modifiers(ctx.target)
-        taken_delta = float(tgt_mods.get(MOD_DAMAGE_TAKEN_MULT, 0.0))
-        if taken_delta != 0.0:
-            dmg = int(round(dmg * (1.0 + taken_delta)))
-
-        # 3) Shield (absorção)
-        dmg = _apply_shield_if_any(ctx.target, dmg)
-
-        ctx.damage = max(0, int(dmg))
+        ctx.damage = _damage_pipeline(ctx.source, ctx.target, ctx.damage)
         return
 
     if event == EVENT_ON_HEAL:
-        tgt_mods = get_modifiers(ctx.target)
-        heal = int(ctx.heal)
-
-        heal_delta = float(tgt_mods.get(MOD_HEAL_RECEIVED_MULT, 0.0))
-        if heal_delta != 0.0:
-            heal = int(round(heal * (1.0 + heal_delta)))
-
-        ctx.heal = max(0, int(heal))
+        ctx.heal = _heal_pipeline(ctx.target, ctx.heal)
         return
 
     # outros eventos ficam prontos para expansão
@@ -401,90 +493,68 @@ def tick_turn(entity: Dict[str, Any], battle: Dict[str, Any], *, apply_to_hp_key
     """
     msgs: List[str] = []
     effects = _ensure_effects(entity)
-    if not effects:
+    if not effects.items:
         return msgs
 
     # 1) aplicar ticks em on_turn_start
-    for e in list(effects):
+    for e in list(effects.items):
         if e.is_expired():
             continue
 
-        tpl = get_effect_template(e.effect_id)
-        if not tpl or not tpl.tick:
+        ce = _compiled_effect(e.effect_id)
+        if not ce:
             continue
 
         # tick dano
-        if TICK_DAMAGE in tpl.tick:
-            td = tpl.tick[TICK_DAMAGE]
-            if td.get("at") == "on_turn_start":
-                base = int(td.get("base", 0))
-                per_stack = int(td.get("per_stack", 0))
-
-                # Se o efeito tiver dot_tick, ele manda no dano por stack (escala com ATK do aplicador)
-                dot_tick = e.meta.get("dot_tick")
-                if dot_tick is not None:
-                    dmg = int(dot_tick) * max(1, int(e.stacks))
-                else:
-                    dmg = int(round((base + per_stack * max(0, e.stacks)) * float(e.potency)))
-
-                if dmg > 0:
-                    # DOT passa pelo pipeline (shield e dano recebido)
-                    ctx = CombatContext(
-                        event=EVENT_ON_BEFORE_DAMAGE,
-                        source=entity,     # para DOT, source pode ser o próprio (MVP)
-                        target=entity,
-                        battle=battle,
-                        damage=dmg,
-                        damage_type=str(td.get("damage_type", "true")),
-                    )
-                    dispatch(EVENT_ON_BEFORE_DAMAGE, ctx)
-                    final = int(ctx.damage)
-
-                    # aplica dano final
-                    hp = int(entity.get(apply_to_hp_key, 0))
-                    hp = max(0, hp - final)
-                    entity[apply_to_hp_key] = hp
-
-                    if final > 0:
-                        msgs.append(f"⛔ {tpl.name}: -{final} HP")
+        if ce.tick_damage is not None:
+            base, per_stack = ce.tick_damage
+
+            # Se o efeito tiver dot_tick, ele manda no dano por stack (escala com ATK do aplicador)
+            dot_tick = e.get_meta("dot_tick")
+            if dot_tick is not None:
+                dmg = int(dot_tick) * max(1, int(e.stacks))
+            else:
+                dmg = int(round((base + per_stack * max(0, e.stacks)) * float(e.potency)))
+
+            if dmg > 0:
+                # DOT passa pelo pipeline (shield e dano recebido); para DOT,
+                # source é o próprio (MVP)
+                final = _damage_pipeline(entity, entity, dmg)
+
+                # aplica dano final
+                hp = int(entity.get(apply_to_hp_key, 0))
+                hp = max(0, hp - final)
+                entity[apply_to_hp_key] = hp
+
+                if final > 0:
+                    msgs.append(f"⛔ {ce.tpl.name}: -{final} HP")
 
         # tick cura
-        if TICK_HEAL in tpl.tick:
-            th = tpl.tick[TICK_HEAL]
-            if th.get("at") == "on_turn_start":
-                base = int(th.get("base", 0))
-                per_stack = int(th.get("per_stack", 0))
-                heal = int(round((base + per_stack * max(0, e.stacks)) * float(e.potency)))
-                if heal > 0:
-                    ctx = CombatContext(
-                        event=EVENT_ON_HEAL,
-                        source=entity,
-                        target=entity,
-                        battle=battle,
-                        heal=heal,
-                    )
-                    dispatch(EVENT_ON_HEAL, ctx)
-                    final = int(ctx.heal)
-
-                    hp = int(entity.get(apply_to_hp_key, 0))
-                    max_hp = int(entity.get("hp_max", entity.get("max_hp", 0)) or 0)
-                    if max_hp > 0:
-                        hp = min(max_hp, hp + final)
-                    else:
-                        hp = hp + final
-
-                    entity[apply_to_hp_key] = hp
-                    if final > 0:
-                        msgs.append(f"✅ {tpl.name}: +{final} HP")
+        if ce.tick_heal is not None:
+            base, per_stack = ce.tick_heal
+            heal = int(round((base + per_stack * max(0, e.stacks)) * float(e.potency)))
+            if heal > 0:
+                final = _heal_pipeline(entity, heal)
+
+                hp = int(entity.get(apply_to_hp_key, 0))
+                max_hp = int(entity.get("hp_max", entity.get("max_hp", 0)) or 0)
+                if max_hp > 0:
+                    hp = min(max_hp, hp + final)
+                else:
+                    hp = hp + final
+
+                entity[apply_to_hp_key] = hp
+                if final > 0:
+                    msgs.append(f"✅ {ce.tpl.name}: +{final} HP")
 
     # 2) tick duração e expirar
     expired_ids: List[str] = []
-    for e in effects:
+    for e in effects.items:
         if not e.permanent:
             e.tick()
 
     kept: List[EffectInstance] = []
-    for e in effects:
+    for e in effects.items:
         if e.is_expired():
             tpl = get_effect_template(e.effect_id)
             expired_ids.append(tpl.name if tpl else e.effect_id)
@@ -494,6 +564,9 @@ def tick_turn(entity: Dict[str, Any], battle: Dict[str, Any], *, apply_to_hp_key
     if expired_ids:
         for name in expired_ids:
             msgs.append(f"⌛ {name} terminou")
+        # agregado só muda quando algum efeito sai
+        _save_effects(entity, effects, kept)
+    else:
+        entity[EFFECTS_KEY] = effects
 
-    _save_effects(entity, kept)
     return msgs
@@ -1,8 +1,9 @@
 # modules/effects/models.py
 from __future__ import annotations
 
+import itertools
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Literal
+from typing import Any, Dict, Iterator, List, Literal, Mapping, Optional, Sequence
 from uuid import uuid4
 
 # -----------------------------
@@ -77,36 +78,63 @@ class CombatContext:
 # -----------------------------
 # Instância de efeito ativo
 # -----------------------------
-@dataclass
+# uid barato: prefixo aleatório do processo + contador (antes: um uuid4 por
+# instância). Só precisa ser único dentro da lista de efeitos da entidade.
+_UID_PREFIX = uuid4().hex[:12]
+_uid_seq = itertools.count(1)
+
+
+def new_uid() -> str:
+    return f"{_UID_PREFIX}{next(_uid_seq):x}"
+
+
 class EffectInstance:
     """
     Um efeito ativo em uma entidade (jogador/monstro).
     - effect_id aponta para o template no registry.
     - uid identifica essa instância (para remover/atualizar com precisão).
-    """
-    effect_id: str
-    kind: EffectKind
-
-    uid: str = field(default_factory=lambda: uuid4().hex)
-
-    source_id: Optional[str] = None        # player_id / monster_id / skill_id etc.
-    source_type: Optional[str] = None      # "skill" | "rune" | "class" | "tower" | "mob" etc.
-
-    duration_kind: DurationKind = "turns"
-    remaining: int = 0                     # turnos restantes (0 = expira)
-    permanent: bool = False                # se True, ignora remaining
-
-    stacks: int = 1
-    potency: float = 1.0                   # intensidade (ex.: 0.3 = -30% cura)
-    dispellable: bool = True
 
-    tags: List[str] = field(default_factory=list)
-
-    # regras úteis (stack, refresh, exclusive group etc.)
-    rules: Dict[str, Any] = field(default_factory=dict)
+    Registro com __slots__. tags/rules costumam ser os do template (o engine
+    compartilha uma cópia somente leitura entre todas as instâncias) e meta
+    só existe quando há algo para guardar (None = vazio).
+    """
+    __slots__ = (
+        "effect_id", "kind", "uid", "source_id", "source_type",
+        "duration_kind", "remaining", "permanent", "stacks", "potency",
+        "dispellable", "tags", "rules", "meta",
+    )
 
-    # metadata livre (floor, seed, rarity etc.)
-    meta: Dict[str, Any] = field(default_factory=dict)
+    def __init__(
+        self,
+        effect_id: str,
+        kind: EffectKind,
+        uid: Optional[str] = None,
+        source_id: Optional[str] = None,       # player_id / monster_id / skill_id etc.
+        source_type: Optional[str] = None,     # "skill" | "rune" | "class" | "tower" | "mob" etc.
+        duration_kind: DurationKind = "turns",
+        remaining: int = 0,                    # turnos restantes (0 = expira)
+        permanent: bool = False,               # se True, ignora remaining
+        stacks: int = 1,
+        potency: float = 1.0,                  # intensidade (ex.: 0.3 = -30% cura)
+        dispellable: bool = True,
+        tags: Sequence[str] = (),
+        rules: Optional[Mapping[str, Any]] = None,   # stack, refresh, exclusive group etc.
+        meta: Optional[Dict[str, Any]] = None,       # metadata livre (floor, seed, rarity etc.)
+    ):
+        self.effect_id = effect_id
+        self.kind = kind
+        self.uid = uid or new_uid()
+        self.source_id = source_id
+        self.source_type = source_type
+        self.duration_kind = duration_kind
+        self.remaining = remaining
+        self.permanent = permanent
+        self.stacks = stacks
+        self.potency = potency
+        self.dispellable = dispellable
+        self.tags = tags
+        self.rules = rules if rules is not None else {}
+        self.meta = meta or None
 
     def is_expired(self) -> bool:
         if self.permanent:
@@ -122,6 +150,14 @@ class EffectInstance:
         if self.duration_kind == "turns":
             self.remaining -= 1
 
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        return self.meta.get(key, default) if self.meta else default
+
+    def update_meta(self, values: Dict[str, Any]) -> None:
+        if self.meta is None:
+            self.meta = {}
+        self.meta.update(values)
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "effect_id": self.effect_id,
@@ -137,7 +173,7 @@ class EffectInstance:
             "dispellable": self.dispellable,
             "tags": list(self.tags),
             "rules": dict(self.rules),
-            "meta": dict(self.meta),
+            "meta": dict(self.meta or {}),
         }
 
     @staticmethod
@@ -145,7 +181,7 @@ class EffectInstance:
         return EffectInstance(
             effect_id=str(d.get("effect_id", "")),
             kind=d.get("kind", "buff"),
-            uid=str(d.get("uid") or uuid4().hex),
+            uid=str(d.get("uid") or new_uid()),
             source_id=d.get("source_id"),
             source_type=d.get("source_type"),
             duration_kind=d.get("duration_kind", "turns"),
@@ -158,3 +194,70 @@ class EffectInstance:
             rules=dict(d.get("rules", {}) or {}),
             meta=dict(d.get("meta", {}) or {}),
         )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, EffectInstance):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"EffectInstance({self.to_dict()!r})"
+
+
+# -----------------------------
+# Efeitos ativos de UMA entidade
+# -----------------------------
+class EffectSet:
+    """
+    Container em memória de entity["_effects"]: lista de EffectInstance +
+    agregado de modifiers em cache (o engine calcula e invalida quando
+    efeitos entram, expiram ou saem).
+
+    O formato persistido continua sendo a lista de dicts (to_list). Ela é
+    gerada só nas bordas: engine.serialize_effects antes de gravar no banco,
+    e em qualquer cópia (copy/deepcopy/pickle), que devolve a lista de dicts.
+    """
+    __slots__ = ("items", "mods", "has_shield")
+
+    def __init__(self, items: Optional[List[EffectInstance]] = None):
+        self.items: List[EffectInstance] = items if items is not None else []
+        self.mods: Optional[Dict[str, Any]] = None   # None = recalcular
+        self.has_shield = False
+
+    def changed(self) -> None:
+        self.mods = None
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [e.to_dict() for e in self.items]
+
+    def __iter__(self) -> Iterator[EffectInstance]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, idx: int) -> EffectInstance:
+        return self.items[idx]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, EffectSet):
+            return self.to_list() == other.to_list()
+        if isinstance(other, list):
+            return self.to_list() == [e.to_dict() if isinstance(e, EffectInstance) else e for e in other]
+        return NotImplemented
+
+    __hash__ = None
+
+    def __copy__(self) -> List[Dict[str, Any]]:
+        return self.to_list()
+
+    def __deepcopy__(self, memo) -> List[Dict[str, Any]]:
+        return self.to_list()
+
+    def __reduce__(self):
+        return (list, (self.to_list(),))
+
+    def __repr__(self) -> str:
+        return f"EffectSet({self.items!r})"
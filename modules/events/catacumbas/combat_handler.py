@@ -8,6 +8,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CallbackQueryHandler
 
 from modules import player_manager
+from modules.database import run_db
 from modules.combat import criticals, combat_engine
 from handlers.profile_handler import _get_class_media
 from modules.auth_utils import get_current_player_id
@@ -670,7 +671,7 @@ async def leave_active_raid_cb(update: Update, context: ContextTypes.DEFAULT_TYP
     if not raw_id or str(raw_id) == "None":
         # Vai buscar pelo ID do Telegram como fallback
         from modules.database import get_collection
-        doc = await get_collection("players").find_one({"telegram_id": update.effective_user.id})
+        doc = await run_db(get_collection("players").find_one, {"telegram_id": update.effective_user.id})
         if doc:
             raw_id = str(doc["_id"])
 
@@ -5,6 +5,7 @@ import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ForceReply
 from telegram.ext import ContextTypes, CallbackQueryHandler, MessageHandler, filters, CommandHandler
 from modules import player_manager
+from modules.database import run_db
 from modules.auth_utils import get_current_player_id
 from . import combat_handler
 
@@ -253,7 +254,7 @@ async def _get_safe_id(update: Update, context: ContextTypes.DEFAULT_TYPE) -> st
     if not user_id:
         telegram_id = update.effective_user.id
         from modules.database import get_collection
-        doc = await get_collection("players").find_one({"telegram_id": telegram_id})
+        doc = await run_db(get_collection("players").find_one, {"telegram_id": telegram_id})
         if doc:
             user_id = str(doc["_id"])
             
@@ -371,7 +372,7 @@ async def process_code_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
         players_col = get_collection("players")
         
         # Procura um jogador que tenha este telegram_id
-        player_doc = await players_col.find_one({"telegram_id": telegram_id})
+        player_doc = await run_db(players_col.find_one, {"telegram_id": telegram_id})
         if player_doc:
             user_id = str(player_doc["_id"])
             print(f"[DEBUG-CATACUMBAS] Recuperação de ID bem sucedida via Telegram ID: {user_id}")
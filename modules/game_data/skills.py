@@ -2902,27 +2902,9 @@ def get_skill_data_with_rarity(player_data: dict, skill_id: str) -> dict | None:
     """
     Retorna os dados da skill (SKILL_DATA) mesclados com os efeitos 
     da raridade que o jogador possui.
-    """
-    base_skill = SKILL_DATA.get(skill_id)
-    if not base_skill: 
-        return None
-
-    # Se a skill não tem variação de raridade, retorna o base direto
-    if "rarity_effects" not in base_skill:
-        return base_skill.copy()
 
-    # Verifica qual raridade o jogador tem
-    player_skills = player_data.get("skills", {})
-    rarity = "comum"
-    
-    if isinstance(player_skills, dict):
-        player_skill_instance = player_skills.get(skill_id)
-        if player_skill_instance:
-            rarity = player_skill_instance.get("rarity", "comum")
-
-    # Cria uma cópia para não alterar o original e mescla os efeitos
-    merged_data = base_skill.copy()
-    rarity_data = base_skill["rarity_effects"].get(rarity, base_skill["rarity_effects"].get("comum", {}))
-    merged_data.update(rarity_data)
-    
-    return merged_data
\ No newline at end of file
+    Vem do registro compilado (modules/skills/skill_registry.py): visão
+    SOMENTE LEITURA; para alterar, use .copy().
+    """
+    from modules.skills.skill_registry import player_skill_view
+    return player_skill_view(player_data, skill_id)
\ No newline at end of file
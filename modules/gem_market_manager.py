@@ -1,14 +1,13 @@
 # modules/gem_market_manager.py
 from __future__ import annotations
-import os
 import html
-import certifi
 from datetime import datetime, timezone
 from typing import Optional, Dict, List, Tuple
 import logging
-from pymongo import MongoClient, ReturnDocument
+from pymongo import ReturnDocument
 import asyncio 
 from modules import player_manager 
+from modules.database import run_db, get_db
 
 # Importa a lista de itens de evolução
 try:
@@ -16,27 +15,30 @@ try:
 except ImportError:
     EVOLUTION_ITEMS_DATA = {} 
 
-MONGO_CONN_STR = os.getenv("MONGO_CONNECTION_STRING")
 log = logging.getLogger(__name__)
 
-# Configuração do DB
+# Configuração do DB (cliente único do processo, modules/database.py)
 try:
-    ca = certifi.where()
-    client = MongoClient(MONGO_CONN_STR, tlsCAFile=ca)
-    db = client["eldora_db"] 
+    db = get_db()
+    if db is None:
+        raise RuntimeError("MongoDB não configurado")
     gem_market_col = db["gem_market_listings"]
     counters_col = db["counters"]
     players_col = db["users"] 
-    
-    # Cria índices se não existirem
-    gem_market_col.create_index("id", unique=True)
-    gem_market_col.create_index("active")
-    gem_market_col.create_index("seller_id")
     log.info("✅ CONEXÃO COM MONGODB BEM SUCEDIDA (MERCADO DE GEMAS)!")
 except Exception as e:
     log.critical(f"🔥 FALHA CRÍTICA (GEMAS): {e}")
     gem_market_col = None
 
+
+def ensure_gem_market_indexes() -> None:
+    """Cria índices se não existirem (chamado no startup, não no import)."""
+    if gem_market_col is None:
+        return
+    gem_market_col.create_index("id", unique=True)
+    gem_market_col.create_index("active")
+    gem_market_col.create_index("seller_id")
+
 # ==============================================================================
 # CONFIGURAÇÃO DE PREÇOS
 # ==============================================================================
@@ -159,7 +161,7 @@ async def cancel_listing(*, seller_id: str, listing_id: int) -> dict:
     if gem_market_col is None: raise GemMarketError("MongoDB não conectado.")
     
     # 1. Busca e valida permissão/status
-    listing = gem_market_col.find_one({"id": int(listing_id)})
+    listing = await run_db(gem_market_col.find_one, {"id": int(listing_id)})
     if not listing: raise ListingNotFound("Anúncio não existe.")
     if not listing.get("active"): raise ListingInactive("Anúncio já inativo.")
     
@@ -174,7 +176,8 @@ async def cancel_listing(*, seller_id: str, listing_id: int) -> dict:
     total_return_qty = quantity_left * pack_qty
     
     # 2. Atualiza o status no MongoDB
-    result = gem_market_col.update_one(
+    result = await run_db(
+        gem_market_col.update_one,
         {"id": int(listing_id), "active": True},
         {"$set": {"active": False}}
     )
@@ -209,7 +212,7 @@ async def purchase_listing(
     buyer_id = str(buyer_pdata.get("user_id") or buyer_pdata.get("_id"))
     seller_id = str(seller_pdata.get("user_id") or seller_pdata.get("_id"))
     
-    listing = gem_market_col.find_one({"id": listing_id})
+    listing = await run_db(gem_market_col.find_one, {"id": listing_id})
     if not listing or not listing.get("active"): raise ListingNotFound("Anúncio não ativo.")
     
     if str(listing["seller_id"]) == buyer_id: 
@@ -230,7 +233,8 @@ async def purchase_listing(
     update_doc = {"quantity": remaining_qty}
     if remaining_qty <= 0: update_doc["active"] = False
         
-    result_update_listing = gem_market_col.update_one(
+    result_update_listing = await run_db(
+        gem_market_col.update_one,
         {"_id": listing["_id"], "active": True, "quantity": available}, 
         {"$set": update_doc}
     )
@@ -242,7 +246,8 @@ async def purchase_listing(
     from bson import ObjectId
     try:
         seller_oid = ObjectId(seller_id) if ObjectId.is_valid(seller_id) else seller_id
-        result_payment = players_col.update_one(
+        result_payment = await run_db(
+            players_col.update_one,
             {"_id": seller_oid}, 
             {"$inc": {"gems": total_price_gems}}
         )
@@ -8,7 +8,7 @@ import random
 import asyncio
 import logging
 
-from modules.database import db  # pymongo sync
+from modules.database import db, run_db  # pymongo sync (run_db = executor do Mongo)
 
 logger = logging.getLogger(__name__)
 
@@ -60,14 +60,14 @@ async def get_campaign(campaign_id: str) -> Optional[Dict[str, Any]]:
     col = _col()
     if col is None:
         return None
-    return await asyncio.to_thread(col.find_one, {"campaign_id": str(campaign_id)})
+    return await run_db(col.find_one, {"campaign_id": str(campaign_id)})
 
 
 async def get_latest_campaign() -> Optional[Dict[str, Any]]:
     col = _col()
     if col is None:
         return None
-    return await asyncio.to_thread(col.find_one, {}, sort=[("created_at", -1)])
+    return await run_db(col.find_one, {}, sort=[("created_at", -1)])
 
 
 async def upsert_campaign(payload: Dict[str, Any]) -> None:
@@ -84,7 +84,7 @@ async def upsert_campaign(payload: Dict[str, Any]) -> None:
     payload.setdefault("updated_at", now_iso)
     payload.setdefault("created_at", now_iso)
 
-    await asyncio.to_thread(
+    await run_db(
         col.update_one,
         {"campaign_id": payload["campaign_id"]},
         {"$set": payload},
@@ -116,7 +116,7 @@ async def set_campaign_phase(
     if extra_set:
         payload.update(extra_set)
 
-    await asyncio.to_thread(
+    await run_db(
         col.update_one,
         {"campaign_id": str(campaign_id)},
         {"$set": payload},
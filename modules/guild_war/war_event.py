@@ -6,7 +6,7 @@ import asyncio
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional, List, Tuple
 
-from modules.database import db
+from modules.database import db, run_db
 
 from .campaign import ensure_weekly_campaign, set_campaign_phase
 from .region import CampaignPhase
@@ -52,7 +52,7 @@ class WarSignupRepo:
     async def get(self, campaign_id: str, clan_id: str) -> Optional[Dict[str, Any]]:
         cid = _norm_id(campaign_id)
         gid = _norm_id(clan_id)
-        return await asyncio.to_thread(self.col.find_one, {"campaign_id": cid, "clan_id": gid})
+        return await run_db(self.col.find_one, {"campaign_id": cid, "clan_id": gid})
 
     async def upsert_add_member(
         self,
@@ -93,7 +93,7 @@ class WarSignupRepo:
         if mid:
             update_doc["$addToSet"] = {"member_ids": mid}
 
-        await asyncio.to_thread(
+        await run_db(
             self.col.update_one,
             {"campaign_id": cid, "clan_id": gid},
             update_doc,
@@ -112,7 +112,7 @@ class WarSignupRepo:
         cid = _norm_id(campaign_id)
         gid = _norm_id(clan_id)
         mid = _norm_id(member_id)
-        await asyncio.to_thread(
+        await run_db(
             self.col.update_one,
             {"campaign_id": cid, "clan_id": gid},
             {"$pull": {"member_ids": mid}, "$set": {"updated_at": _now_utc().isoformat()}},
@@ -140,7 +140,7 @@ class WarScoreRepo:
     async def get(self, campaign_id: str, clan_id: str) -> Dict[str, Any]:
         cid = _norm_id(campaign_id)
         gid = _norm_id(clan_id)
-        doc = await asyncio.to_thread(self.col.find_one, {"campaign_id": cid, "clan_id": gid})
+        doc = await run_db(self.col.find_one, {"campaign_id": cid, "clan_id": gid})
         if not doc:
             return {"campaign_id": cid, "clan_id": gid, "total": 0, "pve": 0, "pvp": 0}
         return {
@@ -161,7 +161,7 @@ class WarScoreRepo:
             return await self.get(cid, gid)
 
         now_iso = _now_utc().isoformat()
-        await asyncio.to_thread(
+        await run_db(
             self.col.update_one,
             {"campaign_id": cid, "clan_id": gid},
             {
@@ -175,11 +175,11 @@ class WarScoreRepo:
 
     async def reset_campaign(self, campaign_id: str) -> None:
         cid = _norm_id(campaign_id)
-        await asyncio.to_thread(self.col.delete_many, {"campaign_id": cid})
+        await run_db(self.col.delete_many, {"campaign_id": cid})
 
     async def top_clans(self, campaign_id: str, limit: int = 5) -> List[Dict[str, Any]]:
         cid = _norm_id(campaign_id)
-        cursor = await asyncio.to_thread(
+        cursor = await run_db(
             lambda: list(self.col.find({"campaign_id": cid}).sort("total", -1).limit(int(limit)))
         )
         out: List[Dict[str, Any]] = []
@@ -211,7 +211,7 @@ async def start_week_prep(game_data_regions_module, now: Optional[datetime] = No
     await WarScoreRepo().reset_campaign(campaign_id)
 
     # opcional: limpar inscrições da campanha (recomeço de teste rápido)
-    await asyncio.to_thread(_get_col(WAR_SIGNUPS_COLLECTION).delete_many, {"campaign_id": campaign_id})
+    await run_db(_get_col(WAR_SIGNUPS_COLLECTION).delete_many, {"campaign_id": campaign_id})
 
     campaign["phase"] = CampaignPhase.PREP.value
     campaign["signup_open"] = True
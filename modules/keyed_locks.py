@@ -0,0 +1,90 @@
+# modules/keyed_locks.py
+# Locks assíncronos por chave (módulo puro, só asyncio).
+#
+# Usado para serializar updates do mesmo usuário (update_processing) e
+# sessões do mesmo jogador (player/session.py). Cada chave ganha um
+# asyncio.Lock sob demanda (FIFO) e ele some quando ninguém mais o usa,
+# então a memória acompanha só quem está ativo.
+# KeyedGate soma a isso o limite global de updates em execução.
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, Hashable, List, Optional
+
+
+class KeyedLocks:
+    """Um asyncio.Lock por chave, criado sob demanda e descartado sem uso."""
+
+    def __init__(self) -> None:
+        self._locks: Dict[Hashable, List[Any]] = {}  # chave -> [lock, usuários]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def locked(self, key: Hashable) -> bool:
+        entry = self._locks.get(key)
+        return entry is not None and entry[0].locked()
+
+    async def acquire(self, key: Hashable) -> None:
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            await entry[0].acquire()
+        except BaseException:
+            self._release_ref(key, entry)
+            raise
+
+    def release(self, key: Hashable) -> None:
+        entry = self._locks[key]
+        entry[0].release()
+        self._release_ref(key, entry)
+
+    def _release_ref(self, key: Hashable, entry: List[Any]) -> None:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._locks[key]
+
+
+class KeyedGate:
+    """
+    Ordem por chave + limite global de execução.
+
+    A vaga global só é pedida DEPOIS do lock da chave: quem espera na fila
+    da própria chave não ocupa vaga, então uma chave travada (um jogador
+    preso num handler lento) não atrasa as outras.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.locks = KeyedLocks()
+        self._slots = asyncio.Semaphore(limit)
+        self.waiting_key = 0
+        self.waiting_slot = 0
+        self.running = 0
+
+    async def acquire(self, key: Optional[Hashable]) -> None:
+        if key is not None:
+            self.waiting_key += 1
+            try:
+                await self.locks.acquire(key)
+            finally:
+                self.waiting_key -= 1
+        self.waiting_slot += 1
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            if key is not None:
+                self.locks.release(key)
+            raise
+        finally:
+            self.waiting_slot -= 1
+        self.running += 1
+
+    def release(self, key: Optional[Hashable]) -> None:
+        self.running -= 1
+        self._slots.release()
+        if key is not None:
+            self.locks.release(key)
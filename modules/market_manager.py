@@ -2,33 +2,28 @@
 # (VERSÃO CORRIGIDA: Suporte Híbrido ObjectId + Int)
 
 from __future__ import annotations
+import html
 import logging
-import os
 from datetime import datetime, timezone
 from typing import Optional, List, Tuple, Union
-from pymongo import MongoClient
+from pymongo import ReturnDocument
 from bson import ObjectId # Importante
 
 from modules import player_manager
+from modules.database import run_db, get_db
+from modules.player.changeset import bump_version
 
 # --- CONFIGURAÇÃO DE LOGGING ---
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
-# --- CONFIGURAÇÃO DO BANCO DE DADOS ---
-MONGO_CONN_STR = os.getenv("MONGO_CONNECTION_STRING") or os.getenv("MONGO_URL")
-if not MONGO_CONN_STR:
-    MONGO_CONN_STR = "mongodb://localhost:27017/rpg_bot"
-
+# --- CONFIGURAÇÃO DO BANCO DE DADOS (cliente único, modules/database.py) ---
 try:
-    import certifi
-    ca = certifi.where()
-    client = MongoClient(MONGO_CONN_STR, tlsCAFile=ca)
-    db = client["eldora_db"] 
+    db = get_db()
+    if db is None:
+        raise RuntimeError("MongoDB não configurado")
     market_col = db["market_listings"]
     counters_col = db["counters"]
-    market_col.create_index("id", unique=True)
-    market_col.create_index("active")
 except Exception as e:
     log.critical(f"🔥 FALHA AO CONECTAR MONGODB (MARKET): {e}")
     market_col = None
@@ -73,6 +68,66 @@ def _validate_price_qty(unit_price: int, quantity: int):
     if unit_price <= 0: raise InvalidListing("Preço deve ser maior que 0.")
     if quantity <= 0: raise InvalidListing("Quantidade deve ser maior que 0.")
 
+# =========================
+# IDs normalizados + índices
+# =========================
+# seller_id / target_buyer_id são SEMPRE string (antes misturava int e str,
+# o que obrigava um $or de 5 variantes em toda listagem).
+# visible_to: quem enxerga o anúncio -> ["*"] (público) ou [comprador, vendedor].
+PUBLIC_VISIBILITY = "*"
+
+def _norm_uid(uid) -> Optional[str]:
+    if uid is None or uid == "": return None
+    return str(uid)
+
+def _visible_to(seller_id: Optional[str], target_buyer_id: Optional[str]) -> List[str]:
+    if target_buyer_id is None:
+        return [PUBLIC_VISIBILITY]
+    return [target_buyer_id, seller_id]
+
+# Índices de navegação: igualdade (active, região, item, visibilidade) + chave de ordenação + _id
+MARKET_INDEXES = [
+    ([("id", 1)], {"unique": True}),
+    ([("active", 1), ("visible_to", 1), ("_id", -1)], {}),
+    ([("active", 1), ("visible_to", 1), ("unit_price", 1), ("_id", 1)], {}),
+    ([("active", 1), ("region_key", 1), ("item.base_id", 1), ("visible_to", 1), ("_id", -1)], {}),
+    ([("active", 1), ("region_key", 1), ("item.base_id", 1), ("visible_to", 1), ("unit_price", 1), ("_id", 1)], {}),
+    ([("seller_id", 1), ("active", 1)], {}),
+]
+
+def ensure_market_indexes() -> None:
+    if market_col is None: return
+    for keys, opts in MARKET_INDEXES:
+        try:
+            market_col.create_index(keys, **opts)
+        except Exception as e:
+            log.warning(f"⚠️ [MARKET] Falha ao criar índice {keys}: {e}")
+
+def normalize_market_ids() -> int:
+    """Migração idempotente: IDs numéricos -> string e preenche visible_to."""
+    if market_col is None: return 0
+    target = {"$cond": [
+        {"$eq": [{"$ifNull": ["$target_buyer_id", None]}, None]}, None, {"$toString": "$target_buyer_id"}
+    ]}
+    res = market_col.update_many(
+        {"$or": [
+            {"seller_id": {"$type": "number"}},
+            {"target_buyer_id": {"$type": "number"}},
+            {"visible_to": {"$exists": False}},
+        ]},
+        [
+            {"$set": {"seller_id": {"$toString": "$seller_id"}, "target_buyer_id": target}},
+            {"$set": {"visible_to": {"$cond": [
+                {"$eq": ["$target_buyer_id", None]},
+                [PUBLIC_VISIBILITY],
+                ["$target_buyer_id", "$seller_id"],
+            ]}}},
+        ],
+    )
+    if res.modified_count:
+        log.info(f"[MARKET] {res.modified_count} anúncios normalizados (IDs string + visible_to).")
+    return res.modified_count
+
 # =========================
 # CRUD
 # =========================
@@ -102,16 +157,12 @@ def create_listing(
         raise InvalidListing(f"🚫 Este item ('{base_id}') não pode ser comercializado aqui.")
 
     lid = _get_next_sequence("market_id")
-
-    def _safe_id(uid):
-        if uid is None: return None
-        if isinstance(uid, int): return uid
-        if isinstance(uid, str) and uid.isdigit(): return int(uid)
-        return str(uid) 
+    seller_key = _norm_uid(seller_id)
+    target_key = _norm_uid(target_buyer_id)
 
     listing = {
         "id": lid,
-        "seller_id": _safe_id(seller_id),
+        "seller_id": seller_key,
         "seller_name": str(seller_name) if seller_name else None,
         "item": item_payload,
         "unit_price": int(unit_price),
@@ -119,14 +170,86 @@ def create_listing(
         "created_at": _now_iso(),
         "region_key": region_key,
         "active": True,
-        "target_buyer_id": _safe_id(target_buyer_id),
-        "target_buyer_name": str(target_buyer_name) if target_buyer_name else None
+        "target_buyer_id": target_key,
+        "target_buyer_name": str(target_buyer_name) if target_buyer_name else None,
+        "visible_to": _visible_to(seller_key, target_key),
     }
 
     market_col.insert_one(listing)
     log.info(f"[MARKET] Item #{lid} criado por {seller_id}.")
     return listing
 
+def _active_query(region_key: Optional[str], base_id: Optional[str], viewer_id) -> dict:
+    query = {"active": True}
+    if region_key: query["region_key"] = region_key
+    if base_id: query["item.base_id"] = base_id
+    viewer = _norm_uid(viewer_id)
+    # Sem $or: um único campo multikey cobre público + privado + próprios
+    query["visible_to"] = {"$in": [PUBLIC_VISIBILITY, viewer]} if viewer else PUBLIC_VISIBILITY
+    return query
+
+def _sort_spec(sort_by: str, ascending: bool) -> List[Tuple[str, int]]:
+    # "created_at" ordena por _id: o ObjectId carrega o instante da criação
+    sort_dir = 1 if ascending else -1
+    if sort_by == "price":
+        return [("unit_price", sort_dir), ("_id", sort_dir)]
+    return [("_id", sort_dir)]
+
+def _encode_cursor(doc: dict, sort_by: str) -> str:
+    if sort_by == "price":
+        return f"{int(doc.get('unit_price', 0))}_{doc['_id']}"
+    return str(doc["_id"])
+
+def _keyset_filter(cursor: str, sort_by: str, ascending: bool) -> dict:
+    """Continua DEPOIS do último item da página anterior (sem skip)."""
+    op = "$gt" if ascending else "$lt"
+    try:
+        if sort_by == "price":
+            price_s, oid_s = cursor.split("_", 1)
+            price, oid = int(price_s), ObjectId(oid_s)
+            return {"$or": [
+                {"unit_price": {op: price}},
+                {"unit_price": price, "_id": {op: oid}},
+            ]}
+        return {"_id": {op: ObjectId(cursor)}}
+    except Exception:
+        raise InvalidListing("Cursor de paginação inválido.")
+
+def list_active_page(
+    *,
+    region_key: Optional[str] = None,
+    base_id: Optional[str] = None,
+    sort_by: str = "created_at",
+    ascending: bool = False,
+    page_size: int = 20,
+    viewer_id: Optional[Union[int, str]] = None,
+    after: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Paginação por cursor (keyset). Retorna (anúncios, cursor_da_próxima)
+    — cursor None quando não há próxima página. O custo não cresce com a
+    profundidade da página.
+    """
+    if market_col is None: return [], None
+    query = _active_query(region_key, base_id, viewer_id)
+    if after:
+        query = {"$and": [query, _keyset_filter(after, sort_by, ascending)]}
+
+    docs = list(market_col.find(query).sort(_sort_spec(sort_by, ascending)).limit(page_size + 1))
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+        return docs, _encode_cursor(docs[-1], sort_by)
+    return docs, None
+
+def count_active(
+    *,
+    region_key: Optional[str] = None,
+    base_id: Optional[str] = None,
+    viewer_id: Optional[Union[int, str]] = None,
+) -> int:
+    if market_col is None: return 0
+    return market_col.count_documents(_active_query(region_key, base_id, viewer_id))
+
 def list_active(
     *,
     region_key: Optional[str] = None,
@@ -138,44 +261,31 @@ def list_active(
     price_per_unit: bool = False,
     viewer_id: Optional[Union[int, str]] = None
 ) -> List[dict]:
+    """Compatibilidade (página numerada). Para navegar, prefira list_active_page."""
     if market_col is None: return []
-    query = {"active": True}
-
-    if region_key: query["region_key"] = region_key
-    if base_id: query["item.base_id"] = base_id
-
-    if viewer_id:
-        vid_str = str(viewer_id)
-        vid_val = int(viewer_id) if str(viewer_id).isdigit() else viewer_id
-        
-        query["$or"] = [
-            {"target_buyer_id": None},
-            {"target_buyer_id": vid_val},
-            {"target_buyer_id": vid_str},
-            {"seller_id": vid_val},
-            {"seller_id": vid_str}
-        ]
-    else:
-        query["target_buyer_id"] = None
-
-    sort_dir = 1 if ascending else -1
-    mongo_sort = [("created_at", sort_dir)]
-    if sort_by == "price":
-        mongo_sort = [("unit_price", sort_dir)]
-
+    query = _active_query(region_key, base_id, viewer_id)
     skip = (max(1, page) - 1) * page_size
-    cursor = market_col.find(query).sort(mongo_sort).skip(skip).limit(page_size)
+    cursor = market_col.find(query).sort(_sort_spec(sort_by, ascending)).skip(skip).limit(page_size)
     return list(cursor)
 
 def list_by_seller(seller_id: Union[int, str]) -> List[dict]:
     if market_col is None: return []
-    sid_val = int(seller_id) if str(seller_id).isdigit() else seller_id
-    sid_str = str(seller_id)
-    # Busca tanto por ID antigo quanto novo
-    return list(market_col.find({
-        "active": True, 
-        "$or": [{"seller_id": sid_val}, {"seller_id": sid_str}]
-    }))
+    return list(market_col.find({"active": True, "seller_id": _norm_uid(seller_id)}))
+
+def render_listing_line(listing: dict, viewer_player_data: Optional[dict] = None, show_price_per_unit: bool = False) -> str:
+    """Linha curta de um anúncio (HTML) para listagens simples."""
+    item = listing.get("item", {}) or {}
+    if item.get("type") == "stack":
+        base_id = item.get("base_id") or "?"
+        info = (game_data.ITEMS_DATA.get(base_id, {}) if game_data else {}) or {}
+        name = f"{info.get('display_name') or base_id.replace('_', ' ').title()} x{item.get('qty', 1)}"
+    else:
+        inst = item.get("item", {}) or {}
+        name = inst.get("display_name") or "Item"
+    price = int(listing.get("unit_price", 0))
+    price_txt = f"{price:,} 🪙" + ("/lote" if show_price_per_unit else "")
+    lock = " 🔒" if listing.get("target_buyer_id") is not None else ""
+    return f"#{listing.get('id')} <b>{html.escape(str(name))}</b> — {price_txt} (estoque {int(listing.get('quantity', 0))}){lock}"
 
 def get_listing(listing_id: Union[int, str, ObjectId]) -> Optional[dict]:
     """
@@ -208,11 +318,122 @@ def delete_listing(listing_id: Union[int, str, ObjectId]):
         listing = get_listing(listing_id)
         if listing:
             # Usa o _id recuperado para garantir update correto
-            market_col.update_one({"_id": listing["_id"]}, {"$set": {"active": False}})
+            market_col.update_one({"_id": listing["_id"]}, {"$set": {"active": False, "cancelled": True}})
 
 # ==============================================================================
 #  FUNÇÃO DE COMPRA
 # ==============================================================================
+# Compra atômica, sem "ler -> conferir -> gravar":
+#   1. reserva o estoque com UM find_one_and_update condicional
+#      (active=True e quantity >= n); desativa no mesmo update se zerar;
+#   2. debita o comprador com $inc condicional (gold >= total) e entrega o
+#      item no MESMO update_one;
+#   3. credita o vendedor com $inc.
+# Se o passo 2 falhar (saldo), o passo 1 é desfeito (rollback compensatório).
+# Dois compradores nunca levam a mesma unidade: o Mongo serializa o passo 1.
+
+def _player_query_id(user_id: Union[int, str, ObjectId]) -> Tuple[str, Union[int, str, ObjectId]]:
+    """(coleção, _id) do jogador: users (ObjectId) ou players (legado int)."""
+    if isinstance(user_id, ObjectId):
+        return "users", user_id
+    if isinstance(user_id, int) or (isinstance(user_id, str) and user_id.isdigit()):
+        return "players", int(user_id)
+    if ObjectId.is_valid(str(user_id)):
+        return "users", ObjectId(str(user_id))
+    return "users", user_id
+
+def _inventory_path(key: str) -> str:
+    key = str(key)
+    if not key or "." in key or key.startswith("$"):
+        raise InvalidPurchase("Item com identificador inválido para o mercado.")
+    return f"inventory.{key}"
+
+def _build_delivery_update(item_payload: dict, quantity: int, buyer_inventory: dict) -> dict:
+    """$inc/$set que entrega o item do anúncio (mesmas regras do inventory.py)."""
+    import uuid
+
+    item_type = item_payload.get("type")
+    if item_type == "stack":
+        base_id = item_payload.get("base_id")
+        total_items = quantity * int(item_payload.get("qty", 1))
+        # Mesma regra do add_item_to_inventory: não empilha sobre item único
+        if isinstance(buyer_inventory.get(base_id), dict):
+            return {"$set": {_inventory_path(f"{base_id}_{str(uuid.uuid4())[:8]}"): total_items}}
+        return {"$inc": {_inventory_path(base_id): total_items}}
+
+    if item_type == "unique":
+        base_item = item_payload.get("item", {}) or {}
+        to_set = {}
+        for _ in range(quantity):
+            inst = dict(base_item)
+            uid = inst.get("uuid") if quantity == 1 else None
+            uid = uid or str(uuid.uuid4())
+            inst["uuid"] = uid
+            to_set[_inventory_path(uid)] = inst
+        return {"$set": to_set}
+
+    return {}
+
+def _reserve_stock(listing_oid, quantity: int) -> Optional[dict]:
+    """Passo 1: baixa o estoque só se ainda houver (e desativa ao zerar)."""
+    new_qty = {"$subtract": ["$quantity", quantity]}
+    return market_col.find_one_and_update(
+        {"_id": listing_oid, "active": True, "quantity": {"$gte": quantity}},
+        [{"$set": {"quantity": new_qty, "active": {"$gt": [new_qty, 0]}}}],
+        return_document=ReturnDocument.AFTER,
+    )
+
+def _release_stock(listing_oid, quantity: int) -> bool:
+    """
+    Rollback do passo 1. Anúncio cancelado no meio da compra não volta a
+    ficar ativo: retorna False e as unidades vão para o vendedor
+    (_refund_to_seller), já que o cancelamento só devolveu o que sobrou.
+    """
+    res = market_col.update_one(
+        {"_id": listing_oid, "cancelled": {"$ne": True}},
+        {"$inc": {"quantity": quantity}, "$set": {"active": True}},
+    )
+    return bool(res.matched_count)
+
+async def _refund_to_seller(listing: dict, quantity: int) -> int:
+    """Devolve `quantity` lotes do anúncio ao inventário do vendedor."""
+    from modules.player import inventory as inv_module
+
+    seller_id = listing["seller_id"]
+    item_payload = listing.get("item", {})
+    item_type = item_payload.get("type")
+    items_refunded_count = 0
+
+    async with player_manager.player_session(seller_id) as seller_data:
+        if not seller_data:
+            raise MarketError("Erro: Conta vendedora não encontrada.")
+
+        if item_type == "stack":
+            base_id = item_payload.get("base_id")
+            stack_size = int(item_payload.get("qty", 1))
+            total_to_give = quantity * stack_size
+            inv_module.add_item_to_inventory(seller_data, base_id, total_to_give)
+            items_refunded_count = total_to_give
+
+        elif item_type == "unique":
+            base_item_data = item_payload.get("item", {}).copy()
+            for _ in range(quantity):
+                inv_module.add_unique_item(seller_data, base_item_data)
+            items_refunded_count = quantity
+
+    return items_refunded_count
+
+async def _rollback_reservation(listing: dict, quantity: int) -> None:
+    if not await run_db(_release_stock, listing["_id"], quantity):
+        try:
+            refunded = await _refund_to_seller(listing, quantity)
+        except Exception as e:
+            log.critical(
+                f"🔥 [MARKET] Reembolso NÃO gravado: anúncio {listing.get('id')} x{quantity} "
+                f"para o vendedor {listing.get('seller_id')}: {e}"
+            )
+            raise
+        log.info(f"♻️ [MARKET] Anúncio {listing.get('id')} cancelado durante a compra: {refunded} itens devolvidos ao vendedor.")
 
 async def purchase_listing(
     *,
@@ -221,11 +442,12 @@ async def purchase_listing(
     quantity: int = 1, 
     context=None
 ) -> Tuple[dict, int]:
-    
-    from modules.player import inventory as inv_module
+    if market_col is None: raise MarketError("Banco de dados offline.")
+    quantity = int(quantity)
+    if quantity <= 0: raise InvalidPurchase("Quantidade inválida.")
 
-    # --- Validações ---
-    listing = get_listing(listing_id)
+    # --- Validações (sem estado mutável: o estoque é conferido no update) ---
+    listing = await run_db(get_listing, listing_id)
     if not listing: raise ListingNotFound("Anúncio não encontrado.")
     if not listing.get("active"): raise ListingInactive("Anúncio inativo ou já vendido.")
     
@@ -241,118 +463,96 @@ async def purchase_listing(
         if str(target) != buyer_id_str:
             raise PermissionDenied(f"🔒 Item reservado para: {listing.get('target_buyer_name')}")
 
-    available = int(listing.get("quantity", 0))
-    if quantity > available:
-        raise InsufficientQuantity(f"Estoque insuficiente ({available} disponíveis).")
-
-    # --- Cálculos ---
     item_payload = listing.get("item", {})
     unit_price = int(listing["unit_price"])
     total_price = unit_price * quantity
 
-    # --- A. PROCESSAMENTO DO COMPRADOR ---
+    buyer_col, buyer_qid = _player_query_id(buyer_id)
     buyer_data = await player_manager.get_player_data(buyer_id)
     if not buyer_data: raise ValueError("Comprador não encontrado.")
+    delivery = _build_delivery_update(item_payload, quantity, buyer_data.get("inventory", {}) or {})
+
+    # --- 1. RESERVA DO ESTOQUE (atômica) ---
+    reserved = await run_db(_reserve_stock, listing["_id"], quantity)
+    if reserved is None:
+        current = await run_db(market_col.find_one, {"_id": listing["_id"]}, {"active": 1, "quantity": 1})
+        if not current or not current.get("active"):
+            raise ListingInactive("Anúncio inativo ou já vendido.")
+        raise InsufficientQuantity(f"Estoque insuficiente ({int(current.get('quantity', 0))} disponíveis).")
+
+    # --- 2. COMPRADOR: débito condicional + entrega do item (1 update) ---
+    # _version sobe: uma player_session aberta no comprador perde o CAS e
+    # refaz as mudanças sobre o ouro debitado / item entregue
+    buyer_update = {"$inc": {"gold": -total_price}}
+    for op, fields in delivery.items():
+        buyer_update.setdefault(op, {}).update(fields)
+    buyer_update = bump_version(buyer_update)
 
-    buyer_gold = int(buyer_data.get("gold", 0))
-    if buyer_gold < total_price:
+    try:
+        res = await run_db(
+            db[buyer_col].update_one,
+            {"_id": buyer_qid, "gold": {"$gte": total_price}},
+            buyer_update,
+        )
+    except Exception:
+        await _rollback_reservation(listing, quantity)
+        raise
+    if not res.matched_count:
+        await _rollback_reservation(listing, quantity)
         raise ValueError(f"Saldo insuficiente. Necessário: {total_price:,} 🪙")
+    await player_manager.clear_player_cache(buyer_id)
 
-    # 1. Remove o Ouro
-    buyer_data["gold"] = buyer_gold - total_price
-
-    # 2. Adiciona o Item
-    item_type = item_payload.get("type")
-    
-    if item_type == "stack":
-        base_id = item_payload.get("base_id")
-        stack_size = int(item_payload.get("qty", 1))
-        total_items_to_give = quantity * stack_size
-        inv_module.add_item_to_inventory(buyer_data, base_id, total_items_to_give)
-        
-    elif item_type == "unique":
-        base_item_data = item_payload.get("item", {}).copy()
-        for _ in range(quantity):
-            inv_module.add_unique_item(buyer_data, base_item_data)
-
-    # 3. SALVA O COMPRADOR
-    await player_manager.save_player_data(buyer_id, buyer_data)
-
-    # --- B. ATUALIZAÇÃO DO ANÚNCIO (Usando _id) ---
-    new_qty = available - quantity
-    update_doc = {"quantity": new_qty}
-    if new_qty <= 0: update_doc["active"] = False
-    
-    # IMPORTANTE: Usa o _id do documento recuperado
-    market_col.update_one({"_id": listing["_id"]}, {"$set": update_doc})
-    
-    # --- C. PAGAMENTO AO VENDEDOR ---
+    # --- 3. PAGAMENTO AO VENDEDOR ---
     try:
-        seller_data = await player_manager.get_player_data(seller_id)
-        if seller_data:
-            current_seller_gold = int(seller_data.get("gold", 0))
-            seller_data["gold"] = current_seller_gold + total_price
-            await player_manager.save_player_data(seller_id, seller_data)
-        else:
-            # Fallback para Legacy
-            if isinstance(seller_id, int) or (isinstance(seller_id, str) and seller_id.isdigit()):
-                db["players"].update_one({"_id": int(seller_id)}, {"$inc": {"gold": total_price}})
-            else:
-                from bson import ObjectId
-                q_id = ObjectId(seller_id) if ObjectId.is_valid(seller_id) else seller_id
-                db["users"].update_one({"_id": q_id}, {"$inc": {"gold": total_price}})
-            
+        seller_col, seller_qid = _player_query_id(seller_id)
+        res = await run_db(db[seller_col].update_one, {"_id": seller_qid}, bump_version({"$inc": {"gold": total_price}}))
+        if not res.matched_count:
+            log.error(f"🔥 [MARKET] Vendedor {seller_id} não encontrado para receber {total_price} (anúncio {listing.get('id')}).")
+        await player_manager.clear_player_cache(seller_id)
     except Exception as e:
         log.error(f"🔥 [MARKET] Erro pagando vendedor {seller_id}: {e}")
 
-    listing["quantity"] = new_qty
-    listing["active"] = (new_qty > 0)
-    
-    return listing, total_price
+    return reserved, total_price
 
 # =========================
 #  FUNÇÃO DE CANCELAMENTO
 # =========================
 
 async def cancel_listing(listing_id: Union[int, str, ObjectId]) -> bool:
-    from modules.player import inventory as inv_module
-
-    listing = get_listing(listing_id)
+    listing = await run_db(get_listing, listing_id)
     if not listing: raise ListingNotFound("Anúncio não encontrado.")
     if not listing.get("active"): raise ListingInactive("Este anúncio já foi finalizado ou cancelado.")
 
-    seller_id = listing["seller_id"] 
-    quantity_left = int(listing.get("quantity", 0))
+    if not await player_manager.get_player_data(listing["seller_id"]):
+        raise MarketError("Erro: Conta vendedora não encontrada.")
+
+    # Desativa primeiro (atômico): o estoque devolvido é o que sobrou no
+    # instante do cancelamento, sem corrida com uma compra simultânea.
+    # `cancelled` impede que o rollback dessa compra reative o anúncio.
+    closed = await run_db(
+        market_col.find_one_and_update,
+        {"_id": listing["_id"], "active": True},
+        {"$set": {"active": False, "cancelled": True}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not closed:
+        raise ListingInactive("Este anúncio já foi finalizado ou cancelado.")
 
+    quantity_left = int(closed.get("quantity", 0))
     if quantity_left <= 0:
-        market_col.update_one({"_id": listing["_id"]}, {"$set": {"active": False}})
         return True
 
-    seller_data = await player_manager.get_player_data(seller_id)
-    if not seller_data:
-        raise MarketError("Erro: Conta vendedora não encontrada.")
-
-    item_payload = listing.get("item", {})
-    item_type = item_payload.get("type")
-    items_refunded_count = 0
+    try:
+        items_refunded_count = await _refund_to_seller(listing, quantity_left)
+    except Exception:
+        # Nada voltou ao inventário: reabre o anúncio (o estoque continua lá)
+        # para o vendedor tentar de novo
+        await run_db(
+            market_col.update_one,
+            {"_id": listing["_id"]},
+            {"$set": {"active": True}, "$unset": {"cancelled": ""}},
+        )
+        raise
 
-    if item_type == "stack":
-        base_id = item_payload.get("base_id")
-        stack_size = int(item_payload.get("qty", 1))
-        total_to_give = quantity_left * stack_size
-        inv_module.add_item_to_inventory(seller_data, base_id, total_to_give)
-        items_refunded_count = total_to_give
-
-    elif item_type == "unique":
-        base_item_data = item_payload.get("item", {}).copy()
-        for _ in range(quantity_left):
-            inv_module.add_unique_item(seller_data, base_item_data)
-        items_refunded_count = quantity_left
-
-    await player_manager.save_player_data(seller_id, seller_data)
-    
-    # IMPORTANTE: Usa _id para cancelar
-    market_col.update_one({"_id": listing["_id"]}, {"$set": {"active": False}})
-    
     log.info(f"♻️ [MARKET] Anúncio {listing_id} cancelado. {items_refunded_count} itens devolvidos.")
     return listing
\ No newline at end of file
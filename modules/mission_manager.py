@@ -10,7 +10,7 @@ from bson import ObjectId
 
 from modules import player_manager, guild_system, game_data
 # Importamos a coleção do DB
-from modules.database import db
+from modules.database import db, run_db
 
 logger = logging.getLogger(__name__)
 
@@ -149,8 +149,8 @@ async def update_mission_progress(player_id: PlayerId, action_type: str, target_
     clan_id = player_data.get("clan_id")
     if clan_id:
         try:
-            # Sem 'await' pois o driver é síncrono
-            clan = db.clans.find_one({"_id": clan_id}, {"active_mission": 1})
+            # Driver síncrono: vai para o executor do banco (não trava o loop)
+            clan = await run_db(db.clans.find_one, {"_id": clan_id}, {"active_mission": 1})
             active_mission = clan.get("active_mission") if clan else None
 
             if active_mission:
@@ -178,7 +178,8 @@ async def update_mission_progress(player_id: PlayerId, action_type: str, target_
                     if match_clan:
                         print(f"[MISSION DEBUG] Atualizando banco de dados (+{quantity})...")
                         # Update atômico no DB do Clã (seguro para concorrência)
-                        db.clans.update_one(
+                        await run_db(
+                            db.clans.update_one,
                             {"_id": clan_id},
                             {"$inc": {"active_mission.current_progress": int(quantity)}}
                         )
@@ -14,6 +14,7 @@ from telegram.ext import Application
 from . import core
 from .premium import PremiumManager
 from .core import get_player_data, save_player_data, users_collection  # <--- Importando users_collection
+from modules.database import run_db
 from .inventory import add_item_to_inventory
 from modules import game_data
 from .stats import get_player_total_stats
@@ -48,25 +49,17 @@ def _ival(x, default=0):
 # -------------------------
 # Energia (LÓGICA BLINDADA PARA LENDA/VIP)
 # -------------------------
+BASE_MAX_ENERGY = 20
+# Bônus de energia máxima por tier (usado também no pipeline do regen em massa)
+ENERGY_TIER_BONUS = {"lenda": 15, "vip": 10, "premium": 5, "admin": 50}
+
 def get_player_max_energy(player_data: dict) -> int:
     """
     Calcula energia máxima.
     BLINDAGEM: Se o tier diz 'lenda', recebe o bônus, independente da data.
     """
-    base_max = 20
     tier = str(player_data.get("premium_tier", "free")).lower()
-
-    bonus = 0
-    if tier == "lenda":
-        bonus = 15
-    elif tier == "vip":
-        bonus = 10
-    elif tier == "premium":
-        bonus = 5
-    elif tier == "admin":
-        bonus = 50
-
-    return base_max + bonus
+    return BASE_MAX_ENERGY + ENERGY_TIER_BONUS.get(tier, 0)
 
 def spend_energy(player_data: dict, amount: int = 1) -> bool:
     amount = max(0, int(amount))
@@ -102,6 +95,45 @@ def sanitize_and_cap_energy(player_data: dict):
         player_data["energy_last_ts"] = anchor.isoformat()
     player_data.pop("last_energy_ts", None)
 
+def build_energy_regen_update(include_non_premium: bool, now_iso: Optional[str] = None) -> tuple[dict, list]:
+    """
+    Regen de energia em massa: (filtro, pipeline) para UM update_many.
+    Mesma regra do job antigo, mas calculada dentro do Mongo:
+      - +1 de energia, limitado à energia máxima do tier (get_player_max_energy);
+      - premium ativo regenera todo tick; free só quando include_non_premium.
+    Premium ativo = tier != free e premium_expires_at no futuro (igual a
+    PremiumManager.is_premium). As datas são ISO em UTC, então a comparação
+    de string é cronológica; datas BSON são comparadas com $$NOW.
+    """
+    now_iso = now_iso or utcnow().isoformat()
+
+    tier = {"$toLower": {"$ifNull": ["$premium_tier", "free"]}}
+    max_energy = {"$add": [BASE_MAX_ENERGY, {"$switch": {
+        "branches": [{"case": {"$eq": [tier, t]}, "then": bonus} for t, bonus in ENERGY_TIER_BONUS.items()],
+        "default": 0,
+    }}]}
+    # _ival(): aceita int/float/str numérica; lixo vira 0
+    cur_energy = {"$floor": {"$convert": {"input": "$energy", "to": "double", "onError": 0, "onNull": 0}}}
+
+    conds = [{"$lt": [cur_energy, max_energy]}]
+    if not include_non_premium:
+        expires = "$premium_expires_at"
+        conds.append({"$ne": [tier, "free"]})
+        conds.append({"$cond": [
+            {"$eq": [{"$type": expires}, "date"]},
+            {"$gt": [expires, "$$NOW"]},
+            {"$and": [{"$eq": [{"$type": expires}, "string"]}, {"$gt": [expires, now_iso]}]},
+        ]})
+
+    flt = {"$expr": {"$and": conds}}
+    # _version sobe junto: uma player_session aberta que gasta energia perde
+    # o CAS e refaz o gasto ($inc, INC_FIELDS) sobre a energia regenerada
+    pipeline = [{"$set": {
+        "energy": {"$toInt": {"$min": [max_energy, {"$add": [cur_energy, 1]}]}},
+        "_version": {"$add": [{"$ifNull": ["$_version", 0]}, 1]},
+    }}]
+    return flt, pipeline
+
 # -------------------------
 # Regeneração (VELOCIDADE VIP)
 # -------------------------
@@ -378,10 +410,10 @@ async def check_stale_actions_on_startup(application: Application):
     query = {"player_state.action": {"$in": actions_to_check}}
 
     try:
-        cursor = users_collection.find(query)
+        docs = await run_db(lambda: list(users_collection.find(query)))
 
         restored_count = 0
-        for pdata in cursor:
+        for pdata in docs:
             user_id = str(pdata.get("_id"))
             chat_id = pdata.get("last_chat_id")
 
@@ -0,0 +1,197 @@
+# modules/player/cache.py
+# Cache LRU de jogadores (limite por entradas e/ou bytes, TTL por entrada,
+# contadores de hit/miss/eviction) + barramento local de invalidação.
+#
+# - Leitura devolve CÓPIA PROFUNDA: handlers podem mutar à vontade sem
+#   contaminar o cache (antes o dict(...) raso compartilhava o inventário).
+# - Cada entrada guarda também a "foto" do último estado persistido, usada
+#   pelo update parcial do core (ver changeset.py).
+# - Thread-safe (RLock): o Flask roda requisições em threads.
+#
+# Módulo puro (sem pymongo/bson).
+
+from __future__ import annotations
+
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def approx_size(obj: Any) -> int:
+    """Estimativa barata do tamanho (bytes) de um documento JSON-like."""
+    if isinstance(obj, dict):
+        return 16 + sum(len(str(k)) + approx_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return 8 + sum(approx_size(v) for v in obj)
+    if isinstance(obj, str):
+        return 4 + len(obj)
+    return 8
+
+
+class _Entry:
+    __slots__ = ("value", "snapshot", "expires_at", "size")
+
+    def __init__(self, value: Dict[str, Any], snapshot: Optional[Dict[str, Any]], expires_at: float, size: int):
+        self.value = value
+        self.snapshot = snapshot
+        self.expires_at = expires_at
+        self.size = size
+
+
+class PlayerCache:
+    """
+    LRU com TTL. Os valores guardados são privados: nunca saem sem cópia.
+    """
+
+    def __init__(self, max_entries: int = 5000, max_bytes: Optional[int] = None, ttl: float = 30.0):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.ttl = float(ttl)
+
+        self._data: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ------------------------------------------------------------------
+    # Internos (chamar com lock)
+    # ------------------------------------------------------------------
+    def _drop(self, key: str) -> Optional[_Entry]:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def _live_entry(self, key: str) -> Optional[_Entry]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._drop(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _enforce_limits(self) -> None:
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes and len(self._data) > 1
+        ):
+            _, entry = self._data.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cópia profunda do valor em cache (ou None se ausente/expirado)."""
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            value = entry.value
+        return copy.deepcopy(value)
+
+    def get_with_snapshot(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(cópia profunda do valor, foto persistida) — (None, None) se ausente/expirado."""
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                self.misses += 1
+                return None, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            value, snapshot = entry.value, entry.snapshot
+        return copy.deepcopy(value), snapshot
+
+    def get_snapshot(self, key: str) -> Optional[Dict[str, Any]]:
+        """Foto do último estado persistido (somente leitura!)."""
+        with self._lock:
+            entry = self._live_entry(key)
+            return entry.snapshot if entry is not None else None
+
+    def put(self, key: str, value: Dict[str, Any], persisted: bool = False) -> Dict[str, Any]:
+        """
+        Guarda uma cópia profunda de `value`.
+        persisted=True -> o valor é exatamente o que está no banco (vira a foto).
+        Devolve o objeto armazenado (vira a base do PlayerDoc que gravou).
+        """
+        stored = copy.deepcopy(value)
+        size = approx_size(stored)
+        with self._lock:
+            old = self._drop(key)
+            snapshot = stored if persisted else (old.snapshot if old is not None else None)
+            self._data[key] = _Entry(stored, snapshot, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            self._enforce_limits()
+        return stored
+
+    def invalidate(self, key: str) -> bool:
+        with self._lock:
+            dropped = self._drop(key) is not None
+            if dropped:
+                self.invalidations += 1
+            return dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return isinstance(key, str) and self._live_entry(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# ==============================================================================
+# BARRAMENTO LOCAL DE INVALIDAÇÃO
+# ==============================================================================
+# Outros caches derivados do jogador (ex.: stats) se inscrevem aqui.
+# key=None significa "invalidar tudo".
+_listeners: List[Callable[[Optional[str]], None]] = []
+
+
+def subscribe_invalidation(callback: Callable[[Optional[str]], None]) -> None:
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+def notify_invalidation(key: Optional[str]) -> None:
+    for cb in list(_listeners):
+        try:
+            cb(key)
+        except Exception as e:
+            logger.warning(f"[CACHE] listener de invalidação falhou: {e}")
@@ -0,0 +1,242 @@
+# modules/player/changeset.py
+# Rastreamento de alterações (dirty tracking) do documento do jogador.
+#
+# O core guarda uma "foto" (snapshot) do documento como ele está no Mongo.
+# Na hora de salvar, comparamos a foto com o dict atual e geramos apenas
+# os operadores $set / $unset / $inc dos caminhos que realmente mudaram,
+# em vez de reenviar o documento inteiro com replace_one.
+#
+# Módulo puro (sem pymongo/bson) para poder ser usado em benchmarks.
+
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+# Contadores aditivos: quando mudam de int para int viram $inc com a
+# DIFERENÇA (sem filtro pelo valor antigo). Assim um ganho/gasto feito por
+# outro processo entre a leitura e o save (web app, mercado, loot do World
+# Boss, regen de energia em massa) é somado, e não sobrescrito pelo valor
+# final deste processo.
+INC_FIELDS = frozenset({"gold", "gems", "xp", "pvp_points", "energy"})
+
+# Saldos que nunca ficam negativos. Um débito ($inc < 0) calculado sobre uma
+# base velha pode não caber no saldo atual (o mercado debita no servidor):
+# o update leva o filtro {campo: {$gte: débito}} (debit_guard) e, se não
+# casar, quem grava relê o saldo e limita o débito a ele (clamp_debits).
+NON_NEGATIVE_FIELDS = frozenset({"gold", "gems"})
+
+# Versão do documento (CAS do player_session). Nunca entra no diff: quem
+# grava acrescenta o $inc (bump_version) e o CAS filtra por ela (version_filter).
+VERSION_FIELD = "_version"
+
+# Nunca entram no update (imutáveis no Mongo / controlados por quem grava).
+_IGNORED_TOP_LEVEL = frozenset({"_id", VERSION_FIELD})
+
+_MISSING = object()
+
+
+def take_snapshot(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Cópia profunda do documento, isolada das mutações dos handlers."""
+    return copy.deepcopy(doc)
+
+
+class PlayerDoc(dict):
+    """
+    Documento do jogador entregue aos handlers: um dict comum que lembra a
+    foto (base) de onde saiu. O save compara com ESTA base, e não com o que
+    estiver no cache na hora: se o cache foi invalidado (web app, mercado,
+    loot do World Boss) ou outro handler gravou no meio, só as mudanças deste
+    dict vão para o banco e as escritas dos outros são preservadas.
+
+    Cópias (copy/deepcopy/pickle) saem como dict comum, sem a base.
+    """
+    __slots__ = ("base",)
+
+    def __init__(self, data: Dict[str, Any], base: Optional[Dict[str, Any]] = None):
+        super().__init__(data)
+        self.base = base
+
+    def __copy__(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo) -> Dict[str, Any]:
+        return copy.deepcopy(dict(self), memo)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+def base_of(doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return doc.base if isinstance(doc, PlayerDoc) else None
+
+
+def set_base(doc: Dict[str, Any], base: Optional[Dict[str, Any]]) -> None:
+    """Depois de gravar: o que este dict escreveu passa a ser a base dele."""
+    if isinstance(doc, PlayerDoc):
+        doc.base = base
+
+
+def _is_int(v: Any) -> bool:
+    return isinstance(v, int) and not isinstance(v, bool)
+
+
+def _safe_key(key: Any) -> bool:
+    """Chaves que podem virar caminho pontuado no Mongo."""
+    return isinstance(key, str) and key != "" and "." not in key and not key.startswith("$")
+
+
+def diff_paths(
+    original: Dict[str, Any],
+    current: Dict[str, Any],
+    prefix: str = "",
+) -> List[Tuple[str, Any, Any]]:
+    """
+    Compara dois dicts e devolve [(caminho, valor_antigo, valor_novo)].
+    Desce recursivamente em sub-dicts; listas e escalares são atômicos.
+    Valor novo == _MISSING indica remoção.
+    """
+    out: List[Tuple[str, Any, Any]] = []
+
+    for key, new_val in current.items():
+        if not prefix and key in _IGNORED_TOP_LEVEL:
+            continue
+        path = f"{prefix}{key}"
+        old_val = original.get(key, _MISSING)
+
+        if old_val is _MISSING:
+            out.append((path, _MISSING, new_val))
+            continue
+
+        if isinstance(old_val, dict) and isinstance(new_val, dict):
+            # Sub-dict com chaves "perigosas" (com ponto/$) vai inteiro.
+            if all(_safe_key(k) for k in new_val) and all(_safe_key(k) for k in old_val):
+                out.extend(diff_paths(old_val, new_val, prefix=f"{path}."))
+            elif old_val != new_val:
+                out.append((path, old_val, new_val))
+            continue
+
+        if type(old_val) is not type(new_val) or old_val != new_val:
+            out.append((path, old_val, new_val))
+
+    for key, old_val in original.items():
+        if not prefix and key in _IGNORED_TOP_LEVEL:
+            continue
+        if key not in current:
+            out.append((f"{prefix}{key}", old_val, _MISSING))
+
+    return out
+
+
+def build_update(original: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Gera o documento de update ({"$set": ..., "$unset": ..., "$inc": ...})
+    com apenas o que mudou. Retorna {} se nada mudou.
+    """
+    if not all(_safe_key(k) for k in current if k not in _IGNORED_TOP_LEVEL):
+        # Chave de topo inválida para update parcial: quem chama usa replace_one.
+        raise ValueError("chave de topo não suportada em update parcial")
+
+    set_ops: Dict[str, Any] = {}
+    unset_ops: Dict[str, Any] = {}
+    inc_ops: Dict[str, Any] = {}
+
+    for path, old_val, new_val in diff_paths(original, current):
+        if new_val is _MISSING:
+            unset_ops[path] = ""
+        elif path in INC_FIELDS and _is_int(old_val) and _is_int(new_val):
+            inc_ops[path] = new_val - old_val
+        else:
+            set_ops[path] = new_val
+
+    update: Dict[str, Dict[str, Any]] = {}
+    if set_ops:
+        update["$set"] = set_ops
+    if unset_ops:
+        update["$unset"] = unset_ops
+    if inc_ops:
+        update["$inc"] = inc_ops
+    return update
+
+
+def bump_version(update: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Cópia do update com +1 em _version."""
+    out = {k: dict(v) for k, v in update.items()}
+    out.setdefault("$inc", {})[VERSION_FIELD] = 1
+    return out
+
+
+def debit_guard(update: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Filtro extra do update: cada débito de NON_NEGATIVE_FIELDS cabe no saldo."""
+    inc = update.get("$inc") or {}
+    return {
+        path: {"$gte": -delta}
+        for path, delta in inc.items()
+        if path in NON_NEGATIVE_FIELDS and delta < 0
+    }
+
+
+def clamp_debits(update: Dict[str, Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Cópia do update com cada débito limitado ao saldo de `current` (o saldo
+    vai a 0, nunca abaixo). Saldo ausente/inválido conta como 0.
+    """
+    out = {k: dict(v) for k, v in update.items()}
+    inc = out.get("$inc")
+    if not inc:
+        return out
+    for path in [p for p, d in inc.items() if p in NON_NEGATIVE_FIELDS and d < 0]:
+        have = current.get(path)
+        have = max(0, int(have)) if isinstance(have, (int, float)) and not isinstance(have, bool) else 0
+        inc[path] = max(inc[path], -have)
+        if not inc[path]:
+            del inc[path]
+    if not inc:
+        del out["$inc"]
+    return out
+
+
+def version_filter(version: int) -> Dict[str, Any]:
+    """Filtro do compare-and-swap. Documento antigo sem o campo = versão 0."""
+    if version:
+        return {VERSION_FIELD: version}
+    return {VERSION_FIELD: {"$in": [0, None]}}
+
+
+def apply_update(doc: Dict[str, Any], update: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aplica $set/$unset/$inc (caminhos pontuados) numa cópia de `doc`, como o
+    Mongo faria. Usado para refazer as mudanças de uma sessão sobre a versão
+    mais nova do documento depois de um conflito.
+    Levanta ValueError se um caminho atravessa algo que não é dict.
+    """
+    out = copy.deepcopy(doc)
+
+    def parent_of(path: str, create: bool):
+        node = out
+        parts = path.split(".")
+        for part in parts[:-1]:
+            child = node.get(part, _MISSING)
+            if child is _MISSING or child is None:
+                if not create:
+                    return None, parts[-1]
+                child = node[part] = {}
+            elif not isinstance(child, dict):
+                raise ValueError(f"caminho {path!r} atravessa um valor que não é dict")
+            node = child
+        return node, parts[-1]
+
+    for path, value in update.get("$set", {}).items():
+        node, leaf = parent_of(path, create=True)
+        node[leaf] = copy.deepcopy(value)
+    for path in update.get("$unset", {}):
+        node, leaf = parent_of(path, create=False)
+        if node is not None:
+            node.pop(leaf, None)
+    for path, delta in update.get("$inc", {}).items():
+        node, leaf = parent_of(path, create=True)
+        current = node.get(leaf, 0)
+        if not _is_int(current) and not isinstance(current, float):
+            raise ValueError(f"$inc em valor não numérico: {path!r}")
+        node[leaf] = current + delta
+    return out
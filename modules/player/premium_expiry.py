@@ -0,0 +1,212 @@
+# modules/player/premium_expiry.py
+# Agendador de expiração de planos Premium.
+#
+# Antes: a cada 60s o watchdog varria TODOS os jogadores e montava um
+# PremiumManager por documento. Agora:
+#   - índice em premium_expires_at + consulta por faixa (só os vencidos);
+#   - min-heap com as próximas expirações (carregado no startup) e UM job
+#     one-shot na JobQueue armado para a expiração mais próxima. Quando ele
+#     dispara, rebaixa quem venceu e rearma para a próxima.
+#   - quem concede/renova plano chama notify_premium_changed() para entrar
+#     na fila na hora (a varredura periódica continua como rede de segurança).
+
+from __future__ import annotations
+
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from bson import ObjectId
+
+from modules.database import run_db
+from .core import users_collection, clear_player_cache
+
+logger = logging.getLogger(__name__)
+
+# Quanto à frente o heap enxerga (a varredura periódica recarrega)
+HEAP_HORIZON = timedelta(hours=6)
+JOB_NAME = "premium_expiry_next"
+
+_PROJECTION = {"premium_tier": 1, "premium_expires_at": 1, "last_chat_id": 1, "telegram_id_owner": 1}
+
+_heap: List[Tuple[datetime, str]] = []
+_job_queue = None
+_armed_at: Optional[datetime] = None
+_on_expire: Optional[Callable[[Any, Dict[str, Any]], Awaitable[None]]] = None
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse_expiry(raw: Any) -> Optional[datetime]:
+    """Mesma regra do PremiumManager.expiration_date (aceita ISO, 'Z' e datetime)."""
+    if not raw:
+        return None
+    if isinstance(raw, datetime):
+        return raw if raw.tzinfo else raw.replace(tzinfo=timezone.utc)
+    try:
+        dt = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+        return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+    except Exception:
+        return None
+
+
+def _is_paid_tier(tier: Any) -> bool:
+    return bool(tier) and tier != "free"
+
+
+# ==============================================================================
+# CONSULTAS INDEXADAS
+# ==============================================================================
+def ensure_premium_indexes() -> None:
+    if users_collection is None:
+        return
+    try:
+        users_collection.create_index("premium_expires_at")
+    except Exception as e:
+        logger.warning(f"[PREMIUM] Falha ao criar índice premium_expires_at: {e}")
+
+
+def _expiry_range(lt: datetime, gte: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Faixa em premium_expires_at para ISO string e para data BSON (tipos não se misturam no Mongo)."""
+    iso_cond: Dict[str, Any] = {"$lt": lt.isoformat()}
+    dt_cond: Dict[str, Any] = {"$lt": lt}
+    if gte is not None:
+        iso_cond["$gte"] = gte.isoformat()
+        dt_cond["$gte"] = gte
+    return [{"premium_expires_at": iso_cond}, {"premium_expires_at": dt_cond}]
+
+
+async def find_expired_players(now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Só os planos pagos vencidos (ou sem data): consulta por faixa no índice."""
+    if users_collection is None:
+        return []
+    now = now or _utcnow()
+    query = {
+        "premium_tier": {"$nin": ["free", None]},
+        "$or": _expiry_range(now) + [{"premium_expires_at": None}],
+    }
+    docs = await run_db(lambda: list(users_collection.find(query, _PROJECTION)))
+    # Datas ISO em formatos exóticos: confirma com o parser do PremiumManager
+    out = []
+    for d in docs:
+        exp = _parse_expiry(d.get("premium_expires_at"))
+        if exp is None or exp < now:
+            out.append(d)
+    return out
+
+
+async def downgrade_if_expired(user_id: Union[str, ObjectId]) -> Optional[Dict[str, Any]]:
+    """
+    Rebaixa para free SE ainda estiver vencido. O update é condicional aos
+    valores lidos, então uma renovação concorrente não é atropelada.
+    Retorna o documento (projeção) rebaixado ou None.
+    """
+    if users_collection is None:
+        return None
+    oid = user_id if isinstance(user_id, ObjectId) else (ObjectId(user_id) if ObjectId.is_valid(str(user_id)) else None)
+    if oid is None:
+        return None
+
+    doc = await run_db(users_collection.find_one, {"_id": oid}, _PROJECTION)
+    if not doc or not _is_paid_tier(doc.get("premium_tier")):
+        return None
+
+    exp = _parse_expiry(doc.get("premium_expires_at"))
+    if exp is not None and exp >= _utcnow():
+        return None
+
+    res = await run_db(
+        users_collection.update_one,
+        {"_id": oid, "premium_tier": doc.get("premium_tier"), "premium_expires_at": doc.get("premium_expires_at")},
+        # _version sobe: uma player_session aberta perde o CAS e não regrava o tier antigo
+        {"$set": {"premium_tier": "free", "premium_expires_at": None}, "$inc": {"_version": 1}},
+    )
+    if not res.modified_count:
+        return None
+
+    await clear_player_cache(oid)
+    return doc
+
+
+# ==============================================================================
+# HEAP + JOB ONE-SHOT
+# ==============================================================================
+def attach(job_queue, on_expire: Callable[[Any, Dict[str, Any]], Awaitable[None]]) -> None:
+    """on_expire(context, doc) é chamado para cada jogador rebaixado (avisar por DM)."""
+    global _job_queue, _on_expire
+    _job_queue = job_queue
+    _on_expire = on_expire
+
+
+async def load_upcoming(horizon: timedelta = HEAP_HORIZON) -> int:
+    """(Re)carrega o heap com as expirações dos próximos `horizon`."""
+    global _heap
+    if users_collection is None:
+        return 0
+    now = _utcnow()
+    query = {
+        "premium_tier": {"$nin": ["free", None]},
+        "$or": _expiry_range(now + horizon, gte=now),
+    }
+    docs = await run_db(lambda: list(users_collection.find(query, {"premium_expires_at": 1})))
+
+    heap = []
+    for d in docs:
+        exp = _parse_expiry(d.get("premium_expires_at"))
+        if exp is not None:
+            heap.append((exp, str(d["_id"])))
+    heapq.heapify(heap)
+    _heap = heap
+    _arm()
+    return len(heap)
+
+
+def notify_premium_changed(user_id: Union[str, ObjectId], expires_at: Any) -> None:
+    """
+    Chamar em TODA escrita de premium_expires_at (conceder, renovar, corrigir,
+    remover). expires_at=None (plano removido) não agenda nada; entradas
+    antigas no heap são inofensivas (o downgrade confere o banco).
+    """
+    exp = _parse_expiry(expires_at)
+    if exp is None or exp - _utcnow() > HEAP_HORIZON:
+        return
+    heapq.heappush(_heap, (exp, str(user_id)))
+    _arm()
+
+
+def _arm() -> None:
+    """Garante um único job one-shot marcado para a expiração mais próxima."""
+    global _armed_at
+    if _job_queue is None or not _heap:
+        return
+    head = _heap[0][0]
+    if _armed_at is not None and _armed_at <= head:
+        return
+    for job in _job_queue.get_jobs_by_name(JOB_NAME):
+        job.schedule_removal()
+    _armed_at = head
+    # +1s de folga: o downgrade confere "exp < agora"
+    when = max(head + timedelta(seconds=1), _utcnow())
+    _job_queue.run_once(_fire, when=when, name=JOB_NAME)
+
+
+async def _fire(context) -> None:
+    global _armed_at
+    _armed_at = None
+    now = _utcnow()
+    due = []
+    while _heap and _heap[0][0] <= now:
+        due.append(heapq.heappop(_heap)[1])
+
+    for uid in dict.fromkeys(due):
+        try:
+            doc = await downgrade_if_expired(uid)
+            if doc and _on_expire is not None:
+                await _on_expire(context, doc)
+        except Exception as e:
+            logger.error(f"[PREMIUM] Erro ao expirar {uid}: {e}")
+
+    _arm()
@@ -0,0 +1,117 @@
+# modules/player/presence.py
+# Presença (last_seen) dos jogadores.
+#
+# Antes: o middleware global carregava o jogador e chamava save_player_data
+# em TODO update do Telegram (cada clique = regravar o documento).
+# Agora: touch() só anota em memória; um job periódico grava tudo com UM
+# bulk_write de $set (no máximo uma escrita por jogador por janela).
+#
+# Consultas (processo do bot, usadas pelo painel de gestão de jogadores):
+#   - last_seen: valor em memória, mais novo que o do documento em cache
+#   - online_count: quem interagiu dentro de ONLINE_WINDOW
+# Outros processos leem o campo last_seen do Mongo (atrasado no máximo uma
+# janela de flush).
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Union
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from modules.database import run_db
+from .core import users_collection
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_FLUSH_SECONDS = int(os.getenv("PRESENCE_FLUSH_SECONDS", "30"))
+ONLINE_WINDOW = timedelta(minutes=5)
+# Memória: esquece quem não aparece há mais que isso (o Mongo guarda o resto)
+_RETAIN = timedelta(hours=24)
+
+_seen: Dict[str, datetime] = {}
+_dirty: Dict[str, datetime] = {}
+_lock = threading.Lock()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _key(user_id: Union[str, ObjectId]) -> Optional[str]:
+    key = str(user_id) if user_id else None
+    return key if key and ObjectId.is_valid(key) else None
+
+
+# ==============================================================================
+# ESCRITA (barata: só memória)
+# ==============================================================================
+def touch(user_id: Union[str, ObjectId], when: Optional[datetime] = None) -> None:
+    key = _key(user_id)
+    if key is None:
+        return
+    when = when or _utcnow()
+    with _lock:
+        _seen[key] = when
+        _dirty[key] = when
+
+
+def ensure_presence_indexes() -> None:
+    if users_collection is None:
+        return
+    try:
+        users_collection.create_index("last_seen")
+    except Exception as e:
+        logger.warning(f"[PRESENCE] Falha ao criar índice last_seen: {e}")
+
+
+def pending() -> int:
+    return len(_dirty)
+
+
+async def flush() -> int:
+    """Grava os last_seen pendentes num único bulk_write. Retorna quantos."""
+    with _lock:
+        batch = dict(_dirty)
+        _dirty.clear()
+    if not batch or users_collection is None:
+        return 0
+
+    ops = [
+        UpdateOne({"_id": ObjectId(key)}, {"$set": {"last_seen": when.isoformat()}})
+        for key, when in batch.items()
+    ]
+    try:
+        await run_db(users_collection.bulk_write, ops, ordered=False)
+    except Exception as e:
+        logger.warning(f"[PRESENCE] Falha no flush ({len(ops)} jogadores): {e}")
+        # Devolve para a próxima janela, sem atropelar toques mais novos
+        with _lock:
+            for key, when in batch.items():
+                if key not in _dirty or _dirty[key] < when:
+                    _dirty[key] = when
+        return 0
+
+    cutoff = _utcnow() - _RETAIN
+    with _lock:
+        for key in [k for k, ts in _seen.items() if ts < cutoff and k not in _dirty]:
+            del _seen[key]
+    return len(ops)
+
+
+# ==============================================================================
+# CONSULTAS (processo do bot)
+# ==============================================================================
+def last_seen(user_id: Union[str, ObjectId]) -> Optional[datetime]:
+    key = _key(user_id)
+    return _seen.get(key) if key else None
+
+
+def online_count(within: timedelta = ONLINE_WINDOW) -> int:
+    cutoff = _utcnow() - within
+    with _lock:
+        return sum(1 for ts in _seen.values() if ts >= cutoff)
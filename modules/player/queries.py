@@ -5,10 +5,13 @@ from __future__ import annotations
 import re as _re
 import logging
 import asyncio
+import itertools
 from typing import Iterator, Tuple, Optional, Union, Dict, Any, List
 from bson import ObjectId
 from datetime import datetime, timezone
 
+from modules.database import run_db
+
 # Imports do Core (Garante que usamos a conexão centralizada)
 from .core import users_collection, get_player_data, save_player_data, clear_player_cache
 from .core import get_legacy_data_by_telegram_id
@@ -53,7 +56,7 @@ async def find_player_by_name(name: str) -> Optional[Tuple[str, dict]]:
                 {"character_name": {"$regex": f"^{_re.escape(raw_text)}$", "$options": "i"}}
             ]
         }
-        doc = await asyncio.to_thread(users_collection.find_one, query_norm)
+        doc = await run_db(users_collection.find_one, query_norm)
         if doc:
             return (str(doc['_id']), await get_player_data(str(doc['_id'])))
 
@@ -65,7 +68,7 @@ async def find_player_by_name(name: str) -> Optional[Tuple[str, dict]]:
             {"tg_username": {"$regex": f"^{_re.escape(user_text)}$", "$options": "i"}}
         ]
     }
-    doc = await asyncio.to_thread(users_collection.find_one, query_user)
+    doc = await run_db(users_collection.find_one, query_user)
     if doc:
         return (str(doc['_id']), await get_player_data(str(doc['_id'])))
 
@@ -80,7 +83,7 @@ async def find_player_by_name(name: str) -> Optional[Tuple[str, dict]]:
                 {"name_normalized": {"$regex": norm_text, "$options": "i"}}
             ]
         }
-        doc = await asyncio.to_thread(users_collection.find_one, aggressive_query)
+        doc = await run_db(users_collection.find_one, aggressive_query)
         if doc:
             return (str(doc['_id']), await get_player_data(str(doc['_id'])))
     except: pass
@@ -111,7 +114,7 @@ async def find_players_by_name_partial(query: str) -> List[Tuple[str, dict]]:
     def _run_query():
         return list(users_collection.find(q).limit(10))
     
-    docs = await asyncio.to_thread(_run_query)
+    docs = await run_db(_run_query)
     
     for doc in docs:
         uid = str(doc["_id"])
@@ -126,7 +129,7 @@ async def find_by_username(username: str) -> Optional[dict]:
     if not u: return None
     
     q = {"$or": [{"username": u}, {"telegram_username": u}, {"tg_username": u}]}
-    doc = await asyncio.to_thread(users_collection.find_one, q)
+    doc = await run_db(users_collection.find_one, q)
     
     if doc: 
         return await get_player_data(str(doc['_id']))
@@ -196,7 +199,7 @@ async def delete_player(user_id: str) -> bool:
     if users_collection is not None:
         try:
             oid = ObjectId(user_id) if ObjectId.is_valid(user_id) else user_id
-            await asyncio.to_thread(users_collection.delete_one, {"_id": oid})
+            await run_db(users_collection.delete_one, {"_id": oid})
         except: 
             pass 
             
@@ -224,18 +227,54 @@ def iter_player_ids() -> Iterator[str]:
         logger.error(f"Erro em iter_player_ids: {e}")
         return iter([])
 
-async def iter_players():
+def _next_batch(cursor, size: int) -> List[dict]:
+    """Puxa até `size` docs do cursor (roda no executor do Mongo)."""
+    return list(itertools.islice(cursor, size))
+
+async def iter_player_batches(
+    filter: Optional[Dict[str, Any]] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    batch_size: int = 200,
+    sort: Optional[List[Tuple[str, int]]] = None,
+    limit: int = 0,
+):
     """
-    Itera sobre todos os jogadores de forma segura para PyMongo + Asyncio.
+    Itera páginas (listas) de documentos de jogadores.
+    O filtro, a projeção e a ordenação rodam no servidor; o cursor só é
+    tocado dentro do executor do Mongo (página a página), então o event
+    loop nunca bloqueia esperando a rede.
     """
-    if users_collection is not None:
-        try:
-            cursor = users_collection.find({})
-            for doc in cursor:
-                yield str(doc["_id"]), doc
-                await asyncio.sleep(0)
-        except Exception as e:
-            logger.error(f"Erro em iter_players: {e}")
+    if users_collection is None:
+        return
+    try:
+        cursor = await run_db(
+            users_collection.find, filter or {}, projection,
+            batch_size=batch_size, sort=sort, limit=limit,
+        )
+        while True:
+            batch = await run_db(_next_batch, cursor, batch_size)
+            if not batch:
+                break
+            yield batch
+            await asyncio.sleep(0)
+    except Exception as e:
+        logger.error(f"Erro em iter_player_batches: {e}")
+
+async def iter_players(
+    filter: Optional[Dict[str, Any]] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    batch_size: int = 200,
+    sort: Optional[List[Tuple[str, int]]] = None,
+    limit: int = 0,
+):
+    """
+    Itera (user_id_str, doc) sobre os jogadores.
+    Sem argumentos mantém o comportamento antigo (todos, documento inteiro).
+    ⚠️ Com `projection` o doc é PARCIAL: não passe para save_player_data.
+    """
+    async for batch in iter_player_batches(filter, projection, batch_size, sort, limit):
+        for doc in batch:
+            yield str(doc["_id"]), doc
 
 # ==============================================================================
 # MIGRAÇÃO
@@ -254,7 +293,7 @@ async def check_migration_status(telegram_id: int) -> Tuple[bool, bool, Optional
         try:
             # 🎯 CORREÇÃO: Removido o telegram_owner_id velho, agora busca só pelo padrão correto
             q = {"telegram_id": telegram_id}
-            doc = await asyncio.to_thread(users_collection.find_one, q)
+            doc = await run_db(users_collection.find_one, q)
             already_migrated = (doc is not None)
         except Exception as e:
             logger.error(f"Erro ao checar status de migração (novo): {e}")
@@ -0,0 +1,196 @@
+# modules/player/session.py
+# Sessão do jogador: lock por jogador + um load + um save com CAS (_version).
+#
+# Antes: cada handler fazia get_player_data -> mexe no dict -> save_player_data.
+# Com updates concorrentes (ou o api.py gravando o mesmo jogador), duas cópias
+# do documento eram alteradas em paralelo e a última gravação apagava a outra.
+#
+# Agora:
+#   async with player_session(user_id) as pdata:
+#       if not pdata: return
+#       ...mexe em pdata...
+#   # saiu sem exceção -> grava UMA vez (só o que mudou); com exceção -> descarta
+#   # falha ao gravar -> a exceção sai do `async with` (nada foi salvo)
+#
+#   - lock por jogador (KeyedLocks): sessões do mesmo jogador neste processo
+#     rodam uma de cada vez, em ordem de chegada
+#   - dentro da sessão, get_player_data/save_player_data do MESMO jogador (na
+#     mesma task) usam o documento da sessão: helpers antigos que carregam e
+#     salvam por conta própria não geram idas extras ao banco
+#   - na saída: compare-and-swap em _version. Se outro processo/task gravou
+#     antes (conflito), relê o documento, refaz as mudanças da sessão sobre a
+#     versão nova (apply_update: $inc soma, $set/$unset por caminho) e tenta de
+#     novo. Esgotadas as tentativas, grava com save_player_data (último vence,
+#     por campo) e conta como "forçado".
+#   - sessão aninhada do mesmo jogador na mesma task reaproveita a de fora
+#     (sem deadlock, sem save intermediário)
+#
+# O lock vale dentro do loop do bot. Entre processos (api.py) quem protege é
+# o _version: todo save_player_data incrementa a versão.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
+from bson import ObjectId
+
+from modules.keyed_locks import KeyedLocks
+from .changeset import apply_update, build_update, set_base, take_snapshot
+from .core import (
+    get_player_data,
+    reload_player_data,
+    save_player_data,
+    save_player_if_version,
+    set_session_lookup,
+)
+
+logger = logging.getLogger(__name__)
+
+PLAYER_SESSION_RETRIES = int(os.getenv("PLAYER_SESSION_RETRIES", "3"))
+
+_locks = KeyedLocks()
+# chave do jogador -> sessão aberta (herdado por tasks filhas; ver _lookup)
+_open: ContextVar[Optional[Dict[str, "_Session"]]] = ContextVar("player_sessions", default=None)
+
+_stats: Dict[str, int] = {
+    "sessions": 0,     # sessões abertas (fora as aninhadas)
+    "nested": 0,       # sessões que reaproveitaram uma de fora
+    "lock_waits": 0,   # tiveram que esperar outra sessão do mesmo jogador
+    "saves": 0,        # gravações via CAS
+    "unchanged": 0,    # saíram sem mudar nada (nenhuma ida ao banco)
+    "discarded": 0,    # saíram com exceção (mudanças descartadas)
+    "conflicts": 0,    # CAS falhou (outro escritor no meio)
+    "rebased": 0,      # conflito resolvido refazendo as mudanças
+    "forced": 0,       # tentativas esgotadas -> save_player_data
+    "errors": 0,       # erro de banco ao gravar
+}
+
+
+class _Session:
+    __slots__ = ("data", "owner", "open")
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self.data = data
+        self.owner = asyncio.current_task()
+        self.open = True
+
+
+def _lookup(key: str) -> Optional[Dict[str, Any]]:
+    """Documento da sessão aberta deste jogador NA TASK ATUAL (ou None)."""
+    sessions = _open.get()
+    if not sessions:
+        return None
+    session = sessions.get(key)
+    if session is None or not session.open or session.owner is not asyncio.current_task():
+        return None
+    return session.data
+
+
+set_session_lookup(_lookup)
+
+
+@asynccontextmanager
+async def player_session(user_id: Union[str, ObjectId, None]) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Abre o jogador com lock exclusivo; entrega o dict (ou None se não existe).
+    Saída normal grava as mudanças (CAS em _version); exceção descarta.
+    """
+    key = str(user_id) if user_id else ""
+    if not ObjectId.is_valid(key):
+        yield None
+        return
+
+    outer = _lookup(key)
+    if outer is not None:
+        _stats["nested"] += 1
+        yield outer
+        return
+
+    if _locks.locked(key):
+        _stats["lock_waits"] += 1
+    await _locks.acquire(key)
+    try:
+        data = await get_player_data(key)
+        if not data:
+            yield None
+            return
+
+        _stats["sessions"] += 1
+        base = take_snapshot(data)
+        session = _Session(data)
+        token = _open.set({**(_open.get() or {}), key: session})
+        try:
+            yield data
+        except BaseException:
+            _stats["discarded"] += 1
+            raise
+        finally:
+            session.open = False
+            _open.reset(token)
+
+        await _commit(key, base, data)
+    finally:
+        _locks.release(key)
+
+
+async def _commit(key: str, base: Dict[str, Any], data: Dict[str, Any]) -> None:
+    try:
+        if build_update(base, data) == {}:
+            _stats["unchanged"] += 1
+            return
+    except ValueError:
+        pass  # chave de topo inválida: save_player_if_version usa replace
+
+    try:
+        for attempt in range(PLAYER_SESSION_RETRIES + 1):
+            if await save_player_if_version(key, base, data):
+                _stats["saves"] += 1
+                if attempt:
+                    _stats["rebased"] += 1
+                return
+
+            _stats["conflicts"] += 1
+            fresh = await reload_player_data(key)
+            if fresh is None:
+                raise LookupError(f"jogador {key} sumiu do banco durante a sessão; nada gravado")
+            try:
+                merged = apply_update(fresh, build_update(base, data))
+            except ValueError:
+                break
+            # O handler continua vendo o resultado final no próprio dict
+            data.clear()
+            data.update(merged)
+            base = fresh
+
+        _stats["forced"] += 1
+        logger.warning(f"[SESSION] Conflitos seguidos em {key}; gravando sem CAS.")
+        # diff contra a última versão lida do banco (não contra a base original)
+        set_base(data, base)
+        await save_player_data(key, data, strict=True)
+    except Exception as e:
+        _stats["errors"] += 1
+        logger.error(f"[SESSION] Erro ao gravar jogador {key}: {e}")
+        # Quem usa a sessão age sobre estado externo depois do bloco (anúncio,
+        # reembolso): sem gravação, o bloco não pode terminar como sucesso
+        raise
+
+
+# ==============================================================================
+# MÉTRICAS
+# ==============================================================================
+def session_stats() -> Dict[str, int]:
+    return {**_stats, "locked_players": len(_locks)}
+
+
+def report_line() -> str:
+    s = session_stats()
+    return (
+        f"[SESSION] sessões={s['sessions']} aninhadas={s['nested']} esperas={s['lock_waits']} | "
+        f"gravações={s['saves']} sem_mudança={s['unchanged']} descartadas={s['discarded']} | "
+        f"conflitos={s['conflicts']} refeitos={s['rebased']} forçados={s['forced']} erros={s['errors']}"
+    )
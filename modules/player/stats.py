@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 import logging
+from functools import lru_cache
 from typing import Dict, Optional, Tuple, Any, List, Union
 
 # --- IMPORTS ---
@@ -11,6 +12,9 @@ from modules.game_data.classes import CLASSES_DATA, get_stat_modifiers
 from modules import game_data, clan_manager
 from modules.game_data.class_evolution import get_evolution_options, get_class_ancestry
 
+from .cache import subscribe_invalidation
+from .stats_cache import StatsCache
+
 # Tenta importar o módulo de balanceamento
 try:
     from modules import balance
@@ -83,7 +87,10 @@ def _ival(x: Any, default: int = 0) -> int:
 def _get_class_key_normalized(pdata: dict) -> str:
     raw_class = pdata.get("class_key") or pdata.get("class") or pdata.get("classe")
     if not raw_class: return "_default"
-    
+    return _normalize_class_key(str(raw_class))
+
+@lru_cache(maxsize=1024)
+def _normalize_class_key(raw_class: str) -> str:
     norm = str(raw_class).strip().lower().replace("_", " ") 
     raw_clean = str(raw_class).strip().lower()
     
@@ -112,6 +119,7 @@ def _get_class_key_normalized(pdata: dict) -> str:
     
     return "_default"
 
+@lru_cache(maxsize=1024)
 def _map_stat_name(raw_key: str) -> str | None:
     if not raw_key: return None
     k = str(raw_key).lower().strip().replace("_", "").replace(" ", "")
@@ -123,11 +131,197 @@ def _map_stat_name(raw_key: str) -> str | None:
     if k in ("sorte", "luck", "luk", "critico", "crt", "chance"): return "luck"
     return None
 
+# ========================================
+# 2b. TABELAS PRÉ-COMPILADAS
+# ========================================
+# Montadas uma vez no import (compile_stat_tables): baseline por nível,
+# curva pontos -> efeito do balance.py e o perfil de cada classe
+# (razões de evolução, mágica/agilidade). O cálculo de status vira
+# consulta em tabela; o que não estiver nelas cai no cálculo direto.
+
+STAT_TABLE_LEVEL_CAP = 300
+STAT_TABLE_POINTS_CAP = 500
+
+_BASELINE_TABLE: Dict[str, List[Dict[str, int]]] = {}               # ckey -> [nível-1]
+_EFFECT_TABLE: Dict[Tuple[str, str], Tuple[List[float], bool]] = {}  # (stat, classe) -> (curva, saturou)
+_CLASS_PROFILE: Dict[Tuple[str, str], Dict[str, Any]] = {}           # (ckey, classe real) -> perfil
+
+def _build_class_profile(ckey: str, real_class_key: str) -> Dict[str, Any]:
+    # Razões de evolução (Guerreiro -> Templário): None = não escalona
+    ratios = None
+    if real_class_key and real_class_key != ckey and real_class_key != "_default":
+        current_mods = get_stat_modifiers(real_class_key)
+        base_mods = get_stat_modifiers(ckey)
+        if current_mods and base_mods:
+            ratios = {}
+            for stat_k in PROFILE_KEYS:
+                mod_k = "hp" if stat_k == "max_hp" else stat_k
+                if stat_k == "magic_attack": mod_k = "inteligencia"
+
+                mod_curr = float(current_mods.get(mod_k, 1.0))
+                # Fallback Mago: Se não tiver inteligencia, usa attack
+                if stat_k == "magic_attack" and mod_curr == 1.0:
+                    mod_curr = float(current_mods.get("attack", 1.0))
+
+                mod_base = float(base_mods.get(mod_k, 1.0))
+                if stat_k == "magic_attack" and mod_base == 1.0:
+                    mod_base = float(base_mods.get("attack", 1.0))
+
+                if mod_base > 0:
+                    ratios[stat_k] = mod_curr / mod_base
+
+    try:
+        ancestry = get_class_ancestry(real_class_key)
+    except Exception:
+        ancestry = []
+
+    return {
+        "ratios": ratios,
+        "is_magic": real_class_key in MAGIC_CLASSES or any(c in MAGIC_CLASSES for c in ancestry),
+        "is_agility": real_class_key in AGILITY_CLASSES or any(c in AGILITY_CLASSES for c in ancestry),
+    }
+
+def _build_effect_curve(stat: str, class_key: str) -> Tuple[List[float], bool]:
+    """Efeito acumulado para 0..N pontos. Para quando bate o hardcap (saturou)."""
+    max_total = balance.STAT_RULES[stat]["hardcap"] * float(balance.STAT_RULES[stat]["per_point"])
+    curve: List[float] = []
+    for n in range(STAT_TABLE_POINTS_CAP + 1):
+        val = balance.effect_from_points(stat, n, class_key)
+        curve.append(val)
+        if val >= max_total:
+            return curve, True
+    return curve, False
+
+def compile_stat_tables() -> None:
+    """(Re)monta as tabelas. Chamar de novo se os dados de classe mudarem em runtime."""
+    _BASELINE_TABLE.clear()
+    _EFFECT_TABLE.clear()
+    _CLASS_PROFILE.clear()
+
+    for ckey in CLASS_PROGRESSIONS:
+        _BASELINE_TABLE[ckey] = [
+            _build_class_baseline(ckey, lvl) for lvl in range(1, STAT_TABLE_LEVEL_CAP + 1)
+        ]
+
+    real_keys = {""} | {str(k).lower() for k in CLASSES_DATA} | set(CLASS_PROGRESSIONS)
+    for real in real_keys:
+        ckey = _normalize_class_key(real) if real else "_default"
+        _CLASS_PROFILE[(ckey, real)] = _build_class_profile(ckey, real)
+        if balance:
+            for stat in balance.STAT_RULES:
+                _EFFECT_TABLE[(stat, real)] = _build_effect_curve(stat, real)
+
+def reset_stat_tables() -> None:
+    """Esvazia as tabelas (tudo volta ao cálculo direto). Usado no benchmark."""
+    _BASELINE_TABLE.clear()
+    _EFFECT_TABLE.clear()
+    _CLASS_PROFILE.clear()
+
+def _baseline_row(ckey: str, lvl: int) -> Dict[str, int]:
+    """Baseline do nível (SOMENTE LEITURA quando vem da tabela)."""
+    rows = _BASELINE_TABLE.get(ckey)
+    if rows is not None and 1 <= lvl <= len(rows):
+        return rows[lvl - 1]
+    return _build_class_baseline(ckey, lvl)
+
+def _effect_lookup(stat: str, points: int, class_key: str) -> float:
+    entry = _EFFECT_TABLE.get((stat, class_key))
+    if entry is not None:
+        curve, saturated = entry
+        if 0 <= points < len(curve):
+            return curve[points]
+        if saturated and points >= len(curve):
+            return curve[-1]
+    return balance.effect_from_points(stat, points, class_key)
+
+def _class_profile(ckey: str, real_class_key: str) -> Dict[str, Any]:
+    prof = _CLASS_PROFILE.get((ckey, real_class_key))
+    if prof is None:
+        prof = _build_class_profile(ckey, real_class_key)
+    return prof
+
 # ========================================
 # 3. CÁLCULO TOTAL DE STATUS (CORE ENGINE)
 # ========================================
 
+# Cache do total por jogador, validado pelo fingerprint das entradas.
+# O barramento do cache de jogadores também derruba a entrada.
+_stats_cache = StatsCache()
+subscribe_invalidation(_stats_cache.invalidate)
+
+def _stats_cache_key(player_data: dict) -> Optional[str]:
+    pid = player_data.get("_id") or player_data.get("user_id")
+    return str(pid) if pid else None
+
+def _stats_fingerprint(player_data: dict, ally_user_ids: list = None) -> tuple:
+    """
+    Tudo que muda o resultado de get_player_total_stats. Barato de montar:
+    só lê campos do próprio documento (nada de Mongo).
+    """
+    from modules.player.premium import PremiumManager
+
+    inventory = player_data.get("inventory", {}) or {}
+    equipped = player_data.get("equipment", {}) or {}
+    gear = []
+    if isinstance(equipped, dict):
+        for slot, uid in sorted(equipped.items(), key=lambda kv: str(kv[0])):
+            inst = inventory.get(uid) if uid else None
+            if not isinstance(inst, dict):
+                gear.append((slot, uid))
+                continue
+            # Durabilidade entra só como "quebrado ou não" (muda a cada luta)
+            gear.append((
+                slot, uid, inst.get("base_id") or inst.get("id"), is_item_broken(inst),
+                repr(inst.get("stats") or inst.get("attributes")),
+                repr(inst.get("enchantments")), repr(inst.get("sockets")),
+            ))
+
+    skills = player_data.get("skills", {})
+    skills_fp = tuple(sorted(
+        (str(k), str(v.get("rarity", "comum")))
+        for k, v in skills.items() if isinstance(v, dict)
+    )) if isinstance(skills, dict) else ()
+
+    clan_id = player_data.get("clan_id")
+    try:
+        is_prem = PremiumManager(player_data).is_premium()
+    except Exception:
+        is_prem = False
+
+    return (
+        player_data.get("level"),
+        player_data.get("class_key"), player_data.get("class"), player_data.get("classe"),
+        repr(player_data.get("invested")),
+        tuple(gear),
+        skills_fp,
+        clan_id, clan_manager.get_clan_buff_version(clan_id) if clan_id else 0,
+        player_data.get("premium_tier"), is_prem,
+        tuple(sorted(str(a) for a in ally_user_ids)) if ally_user_ids else (),
+    )
+
+def get_stats_cache_stats() -> Dict[str, Any]:
+    """Métricas do cache de stats (hit rate, stale, evictions) para painel admin."""
+    return _stats_cache.stats()
+
+def clear_stats_cache(user_id: Union[str, None] = None) -> None:
+    _stats_cache.invalidate(str(user_id) if user_id is not None else None)
+
 async def get_player_total_stats(player_data: dict, ally_user_ids: list = None) -> dict:
+    """Total de status do jogador (memoizado pelo fingerprint das entradas)."""
+    key = _stats_cache_key(player_data)
+    if key is None:
+        return await _compute_player_total_stats(player_data, ally_user_ids)
+
+    fingerprint = _stats_fingerprint(player_data, ally_user_ids)
+    cached = _stats_cache.get(key, fingerprint)
+    if cached is not None:
+        return cached
+
+    total = await _compute_player_total_stats(player_data, ally_user_ids)
+    _stats_cache.put(key, fingerprint, total)
+    return total
+
+async def _compute_player_total_stats(player_data: dict, ally_user_ids: list = None) -> dict:
     from modules import player_manager
     from modules.player.premium import PremiumManager 
 
@@ -140,38 +334,24 @@ async def get_player_total_stats(player_data: dict, ally_user_ids: list = None)
     # ----------------------------------------------------
     # PASSO 1: BASE DA CLASSE (FIXO DA TABELA)
     # ----------------------------------------------------
-    class_baseline = _compute_class_baseline_for_level(ckey, lvl)
+    class_baseline = _baseline_row(ckey, lvl)
     total: Dict[str, Any] = {} 
     
     for k in _BASELINE_KEYS:
         total[k] = class_baseline.get(k, 0)
     total['magic_attack'] = class_baseline.get('magic_attack', 0)
 
+    # Razões de evolução + flags mágica/agilidade (pré-compiladas por classe)
+    profile = _class_profile(ckey, real_class_key)
+
     # ----------------------------------------------------
     # PASSO 2: ESCALONAMENTO DE EVOLUÇÃO (BASE)
     # Aplica multiplicadores de classe na BASE para refletir a evolução (ex: Guerreiro -> Templário)
     # ----------------------------------------------------
-    if real_class_key and real_class_key != ckey and real_class_key != "_default":
-        current_mods = get_stat_modifiers(real_class_key)
-        base_mods = get_stat_modifiers(ckey)
-        
-        if current_mods and base_mods:
-            for stat_k in list(total.keys()):
-                mod_k = "hp" if stat_k == "max_hp" else stat_k
-                if stat_k == "magic_attack": mod_k = "inteligencia"
-
-                mod_curr = float(current_mods.get(mod_k, 1.0))
-                # Fallback Mago: Se não tiver inteligencia, usa attack
-                if stat_k == "magic_attack" and mod_curr == 1.0:
-                    mod_curr = float(current_mods.get("attack", 1.0))
-
-                mod_base = float(base_mods.get(mod_k, 1.0))
-                if stat_k == "magic_attack" and mod_base == 1.0:
-                    mod_base = float(base_mods.get("attack", 1.0))
-
-                if mod_base > 0:
-                    ratio = mod_curr / mod_base
-                    total[stat_k] = int(total[stat_k] * ratio)
+    ratios = profile["ratios"]
+    if ratios:
+        for stat_k, ratio in ratios.items():
+            total[stat_k] = int(total[stat_k] * ratio)
 
     # ----------------------------------------------------
     # PASSO 3: PONTOS INVESTIDOS (COM BALANCE.PY)
@@ -202,7 +382,7 @@ async def get_player_total_stats(player_data: dict, ally_user_ids: list = None)
                 total[target_key] += (n_clicks * gain_per_click)
             else:
                 # Cálculo da Curva (Balance)
-                added_val = balance.effect_from_points(balance_key, n_clicks, real_class_key)
+                added_val = _effect_lookup(balance_key, n_clicks, real_class_key)
                 
                 if target_key not in total: total[target_key] = 0
                 total[target_key] += int(added_val)
@@ -338,14 +518,7 @@ async def get_player_total_stats(player_data: dict, ally_user_ids: list = None)
     # PASSO 6: CORREÇÕES ESPECÍFICAS DE CLASSE (Mago/Ladino)
     # ----------------------------------------------------
     
-    # Verifica se é classe mágica
-    is_magic = False
-    if real_class_key in MAGIC_CLASSES: is_magic = True
-    else:
-        try:
-            ancestry = get_class_ancestry(real_class_key)
-            if any(c in MAGIC_CLASSES for c in ancestry): is_magic = True
-        except: pass
+    is_magic = profile["is_magic"]
 
     # === CORREÇÃO: MAGO CONVERTE ATAQUE EM MAGIA ===
     if is_magic:
@@ -358,13 +531,7 @@ async def get_player_total_stats(player_data: dict, ally_user_ids: list = None)
         # total["attack"] = int(total["attack"] * 0.3) 
 
     # Bônus de Agilidade para classes de Destreza
-    is_agility = False
-    if real_class_key in AGILITY_CLASSES: is_agility = True
-    else:
-        try:
-            ancestry = get_class_ancestry(real_class_key)
-            if any(c in AGILITY_CLASSES for c in ancestry): is_agility = True
-        except: pass
+    is_agility = profile["is_agility"]
 
     if is_agility:
         ini_bonus = int(total.get('initiative', 0) * 0.15)
@@ -440,6 +607,10 @@ async def reset_stats_and_refund_points(pdata: dict) -> int:
     return should_have_points
 
 def _compute_class_baseline_for_level(class_key: str, level: int) -> dict:
+    lvl = max(1, int(level or 1))
+    return dict(_baseline_row((class_key or "").lower(), lvl))
+
+def _build_class_baseline(class_key: str, level: int) -> dict:
     lvl = max(1, int(level or 1))
     ckey = (class_key or "").lower()
     
@@ -656,4 +827,7 @@ def _get_default_baseline_from_new_player() -> dict: return {"max_hp": 50, "atta
 def _ensure_base_stats_block_inplace(pdata: dict) -> bool: return False
 def _current_invested_delta_over_baseline(pdata: dict, baseline: dict) -> dict: return {}
 async def _apply_class_progression_sync_inplace(pdata: dict) -> bool: return False
-def _sync_stat_points_to_level_cap_inplace(pdata: dict) -> bool: return False
\ No newline at end of file
+def _sync_stat_points_to_level_cap_inplace(pdata: dict) -> bool: return False
+
+# Tabelas prontas já no import (startup)
+compile_stat_tables()
@@ -0,0 +1,100 @@
+# modules/player/stats_cache.py
+# Cache do resultado de get_player_total_stats, por jogador, validado por
+# uma "impressão digital" (fingerprint) das entradas do cálculo.
+#
+# - Cada jogador guarda só o ÚLTIMO resultado + o fingerprint que o gerou.
+#   Se o fingerprint mudou (subiu de nível, trocou item, encantou...), o
+#   resultado é descartado e recalculado ("stale").
+# - TTL como rede de segurança para entradas que o fingerprint não enxerga
+#   (ex.: auras de aliados).
+# - Contadores para conferir o hit rate em produção.
+#
+# Módulo puro (sem pymongo/bson).
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def copy_stats(total: Dict[str, Any]) -> Dict[str, Any]:
+    """Cópia barata de um dict de stats (só 'resistance' e afins são aninhados)."""
+    return {k: (dict(v) if isinstance(v, dict) else v) for k, v in total.items()}
+
+
+class StatsCache:
+    """LRU com TTL: key -> (fingerprint, stats)."""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300.0):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+
+        self._data: "OrderedDict[str, Tuple[Hashable, Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str, fingerprint: Hashable) -> Optional[Dict[str, Any]]:
+        """Cópia do resultado se o fingerprint bater (senão None)."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            fp, total, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            if fp != fingerprint:
+                del self._data[key]
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return copy_stats(total)
+
+    def put(self, key: str, fingerprint: Hashable, total: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (fingerprint, copy_stats(total), time.monotonic() + self.ttl)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Optional[str]) -> None:
+        """key=None limpa tudo (mesmo contrato do barramento do cache de jogadores)."""
+        with self._lock:
+            if key is None:
+                self.invalidations += len(self._data)
+                self._data.clear()
+            elif self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "stale": self.stale,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
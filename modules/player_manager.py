@@ -23,6 +23,9 @@ from .player.core import (
     clear_all_player_cache,
 )
 
+# Sessão (lock por jogador + save único com CAS em _version)
+from .player.session import player_session
+
 # Queries & Busca
 from .player.queries import (
     create_new_player,
@@ -31,12 +34,15 @@ from .player.queries import (
     find_player_by_name,
     find_player_by_name_norm,
     iter_players,
+    iter_player_batches,
     iter_player_ids,  # essencial para jobs/handlers
 )
 
 # Stats & Nível
 from .player.stats import (
     get_player_total_stats,
+    get_stats_cache_stats,
+    clear_stats_cache,
     get_player_dodge_chance,
     get_player_double_attack_chance,
     check_and_apply_level_up,
@@ -139,6 +145,7 @@ async def get_player_data(user_id: Union[str, ObjectId, None]):
         if tier not in ["free", "admin"]:
             try:
                 from datetime import datetime, timezone
+                from modules.player.premium_expiry import notify_premium_changed
 
                 expires_at = pdata.get("premium_expires_at")
                 if expires_at:
@@ -150,6 +157,7 @@ async def get_player_data(user_id: Union[str, ObjectId, None]):
                         pdata["premium_tier"] = "free"
                         pdata["premium_expires_at"] = None
                         await _save_player_data_core(real_id, pdata)
+                        notify_premium_changed(real_id, None)
             except Exception:
                 pass
 
@@ -0,0 +1,122 @@
+# modules/session_cache.py
+# Cache em memória da resolução telegram_id -> player_id (active_sessions).
+#
+# - Positivo: jogador logado. TTL longo; quem muda a sessão (save/clear em
+#   modules/sessions.py) atualiza o cache na hora, o TTL é só rede de
+#   segurança.
+# - Negativo: "sem sessão". TTL curto; sem ele, quem não está logado gerava
+#   uma ida ao Mongo em TODO update.
+# - warm(): carga em lote no startup, sem sobrescrever o que já foi resolvido.
+# - Contadores para conferir o hit rate em produção.
+#
+# Módulo puro (sem pymongo/bson).
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+class SessionResolutionCache:
+    """LRU com TTL positivo/negativo: telegram_id -> player_id (ou None)."""
+
+    def __init__(self, max_entries: int = 50000, ttl: float = 3600.0, negative_ttl: float = 30.0):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self.negative_ttl = float(negative_ttl)
+
+        self._data: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.warmed = 0
+
+    def get(self, telegram_id: str) -> Tuple[bool, Optional[str]]:
+        """(achou, player_id). achou=True com player_id=None = "sem sessão" cacheado."""
+        with self._lock:
+            entry = self._data.get(telegram_id)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            player_id, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[telegram_id]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(telegram_id)
+            if player_id is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, player_id
+
+    def _store(self, telegram_id: str, player_id: Optional[str]) -> None:
+        ttl = self.ttl if player_id is not None else self.negative_ttl
+        self._data.pop(telegram_id, None)
+        self._data[telegram_id] = (player_id, time.monotonic() + ttl)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def put(self, telegram_id: str, player_id: Optional[str]) -> None:
+        """player_id=None grava o negativo (sem sessão)."""
+        with self._lock:
+            self._store(telegram_id, player_id)
+
+    def fill(self, telegram_id: str, player_id: Optional[str]) -> bool:
+        """
+        Grava o resultado de uma consulta ao banco só se ninguém gravou a chave
+        enquanto a consulta rodava (um save/clear no meio é mais novo).
+        """
+        with self._lock:
+            if telegram_id in self._data:
+                return False
+            self._store(telegram_id, player_id)
+            return True
+
+    def warm(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Carga inicial; chaves já resolvidas (mais novas) são mantidas."""
+        loaded = 0
+        with self._lock:
+            for telegram_id, player_id in pairs:
+                if telegram_id in self._data:
+                    continue
+                if len(self._data) >= self.max_entries:
+                    break
+                self._store(telegram_id, player_id)
+                loaded += 1
+            self.warmed += loaded
+        return loaded
+
+    def invalidate(self, telegram_id: Optional[str]) -> None:
+        """telegram_id=None limpa tudo."""
+        with self._lock:
+            if telegram_id is None:
+                self._data.clear()
+            else:
+                self._data.pop(telegram_id, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.negative_hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_rate": ((self.hits + self.negative_hits) / total) if total else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "warmed": self.warmed,
+            }
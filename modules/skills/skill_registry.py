@@ -0,0 +1,191 @@
+# modules/skills/skill_registry.py
+# Registro COMPILADO e imutável de skills por (skill_id, raridade).
+#
+# Antes: cada uso de skill refazia o trabalho a partir do SKILL_DATA:
+#   - get_skill_data_with_rarity copiava o dict base e mesclava a raridade
+#     (e o kingdom_defense/combat_engine tinham cópias próprias dessa função)
+#   - processar_acao_combate chamava adapt_skill_to_canon, que remontava as
+#     estruturas canônicas (dano, multi-hit, execute, passivas) a cada ação
+#
+# Agora compile_registry() (startup; se ninguém chamar, roda no 1º acesso)
+# monta UMA vez, para cada skill e cada raridade do rarity_effects:
+#   - skill_view: base + raridade mesclados (mesmo resultado de antes)
+#   - canonical:  saída do adapt_skill_to_canon
+# Os dois são entregues como visões SOMENTE LEITURA (FrozenDict/FrozenList:
+# continuam sendo dict/list para isinstance, json e bson, mas qualquer
+# escrita levanta TypeError). Quem precisa alterar faz .copy() — sai um dict
+# comum, raso, como a cópia que get_skill_data_with_rarity devolvia.
+#
+# Benchmark: tools/bench_skill_registry.py
+
+from __future__ import annotations
+
+import copy
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from modules.game_data.skills import SKILL_DATA
+from modules.skills.skill_canonical_adapter import adapt_skill_to_canon
+
+DEFAULT_RARITY = "comum"
+
+
+# ==============================================================================
+# VISÕES SOMENTE LEITURA
+# ==============================================================================
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__}: dados de skill são somente leitura (use .copy())")
+
+
+class FrozenDict(dict):
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo) -> dict:
+        return {copy.deepcopy(k, memo): copy.deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class FrozenList(list):
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo) -> list:
+        return [copy.deepcopy(v, memo) for v in self]
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def freeze(obj: Any, memo: Optional[Dict[int, Tuple[Any, Any]]] = None) -> Any:
+    """
+    Cópia profunda imutável; estruturas repetidas (memo) são congeladas uma vez.
+    O memo guarda também o original: sem isso um dict temporário coletado
+    liberaria o id() para outro objeto e o memo devolveria a cópia errada.
+    """
+    if memo is None:
+        memo = {}
+    if isinstance(obj, (FrozenDict, FrozenList)):
+        return obj
+    if isinstance(obj, (dict, list)):
+        hit = memo.get(id(obj))
+        if hit is not None:
+            return hit[1]
+        if isinstance(obj, dict):
+            frozen = FrozenDict((k, freeze(v, memo)) for k, v in obj.items())
+        else:
+            frozen = FrozenList(freeze(v, memo) for v in obj)
+        memo[id(obj)] = (obj, frozen)
+        return frozen
+    return obj
+
+
+# ==============================================================================
+# COMPILAÇÃO
+# ==============================================================================
+_lock = threading.Lock()
+_views: Dict[Tuple[str, Optional[str]], FrozenDict] = {}
+_canon: Dict[Tuple[str, str], FrozenDict] = {}
+_compiled = False
+
+
+def compile_registry() -> int:
+    """Compila todas as (skill, raridade) do SKILL_DATA. Devolve quantas."""
+    global _views, _canon, _compiled
+    memo: Dict[int, Tuple[Any, Any]] = {}
+    views: Dict[Tuple[str, Optional[str]], FrozenDict] = {}
+    canon: Dict[Tuple[str, str], FrozenDict] = {}
+
+    for skill_id, base in SKILL_DATA.items():
+        if not isinstance(base, dict):
+            continue
+        reffs = base.get("rarity_effects")
+        # None = visão usada para raridade ausente/desconhecida (cai na comum,
+        # ou no base puro se nem a comum existir) — igual ao .get(r, comum) antigo
+        fallback = dict(base)
+        if isinstance(reffs, dict):
+            fallback.update(reffs.get(DEFAULT_RARITY, {}))
+        views[(skill_id, None)] = freeze(fallback, memo)
+
+        if isinstance(reffs, dict):
+            for rarity, rarity_data in reffs.items():
+                merged = dict(base)
+                merged.update(rarity_data)
+                views[(skill_id, rarity)] = freeze(merged, memo)
+            rarities = set(reffs) | {DEFAULT_RARITY}
+        else:
+            rarities = {DEFAULT_RARITY}
+
+        for rarity in rarities:
+            canon[(skill_id, rarity)] = freeze(
+                adapt_skill_to_canon(skills_db=SKILL_DATA, skill_id=skill_id, rarity=rarity), memo
+            )
+
+    with _lock:
+        _views, _canon, _compiled = views, canon, True
+    return len(views)
+
+
+def _ensure_compiled() -> None:
+    if not _compiled:
+        with _lock:
+            if _compiled:
+                return
+        compile_registry()
+
+
+# ==============================================================================
+# CONSULTA
+# ==============================================================================
+def player_skill_rarity(pdata: dict, skill_id: str) -> Optional[str]:
+    """Raridade que o jogador tem da skill (comum se não tiver registro)."""
+    player_skills = (pdata or {}).get("skills", {})
+    if isinstance(player_skills, dict):
+        inst = player_skills.get(skill_id)
+        if inst:
+            return inst.get("rarity", DEFAULT_RARITY)
+    return DEFAULT_RARITY
+
+
+def skill_view(skill_id: str, rarity: Optional[str] = DEFAULT_RARITY) -> Optional[FrozenDict]:
+    """Dados da skill já mesclados com a raridade (somente leitura) ou None."""
+    _ensure_compiled()
+    view = _views.get((skill_id, rarity))
+    if view is None:
+        view = _views.get((skill_id, None))
+    return view
+
+
+def player_skill_view(pdata: dict, skill_id: str) -> Optional[FrozenDict]:
+    return skill_view(skill_id, player_skill_rarity(pdata, skill_id))
+
+
+def canonical(skill_id: str, rarity: Optional[str] = DEFAULT_RARITY) -> FrozenDict:
+    """adapt_skill_to_canon(SKILL_DATA, skill_id, rarity), memorizado e somente leitura."""
+    _ensure_compiled()
+    rarity = rarity or DEFAULT_RARITY
+    canon = _canon.get((skill_id, rarity))
+    if canon is None:
+        canon = freeze(adapt_skill_to_canon(skills_db=SKILL_DATA, skill_id=skill_id, rarity=rarity))
+        # Raridade fora do rarity_effects: guarda (conjunto pequeno); skill
+        # inexistente não (ids vêm de dados do jogador)
+        if skill_id in SKILL_DATA:
+            _canon[(skill_id, rarity)] = canon
+    return canon
+
+
+def registry_stats() -> Dict[str, int]:
+    return {"views": len(_views), "canonical": len(_canon)}
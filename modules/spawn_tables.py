@@ -0,0 +1,352 @@
+# modules/spawn_tables.py
+# Tabelas de spawn PRÉ-COMPILADAS por região (caça manual e auto-caçada).
+#
+# Antes: a cada caçada, _pick_monster_template relia REGIONS_DATA, percorria
+# MONSTERS_DATA[região], filtrava/convertia as entradas, copiava os dicts e
+# forçava o min_level da região; o elite era refeito (cópia + multiplicadores
+# + loot) e a escala por nível recalculada do zero. A auto-caçada reescalava a
+# lista inteira da região a cada conclusão.
+#
+# Agora (compile_all() no startup; região que faltar compila no 1º uso):
+#   - SpawnTable por região: templates normalizados (min_level da região já
+#     aplicado), pesos acumulados (spawn_weight, padrão 1 = sorteio uniforme
+#     como o random.choice antigo) e a variante elite de cada um pronta
+#   - pick: UM sorteio ponderado (bisect) + cópia rasa
+#   - combat_details: stats escalados memorizados por (monstro, elite, nível
+#     alvo); dado o nível alvo a escala é determinística, então o sorteio de
+#     -1/0/+1 continua igual e só o cálculo deixa de se repetir
+#   - auto_hunt_monsters: lista escalada por faixa de nível do jogador; acima
+#     de (maior min_level + 15) a escala da auto-caçada satura e todos os
+#     níveis altos caem na mesma faixa
+#
+# Tudo que sai daqui é cópia rasa de dados compartilhados: quem recebe pode
+# trocar chaves de topo, não mexer nas listas internas (loot_table, skills).
+#
+# Benchmark: tools/bench_spawn_tables.py
+
+from __future__ import annotations
+
+import random
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+from modules import game_data
+from modules.auto_hunt_resolver import scale_monster_stats as scale_auto_hunt_monster
+
+# =========================
+# Elites
+# =========================
+DEFAULT_ELITE_CHANCE = getattr(game_data, "ELITE_CHANCE", 0.12)
+ELITE_MULTS = {
+    "hp": 2.0, "attack": 1.4, "defense": 1.3,
+    "initiative_add": 2, "luck_add": 5,
+    "gold": 1.5, "xp": 1.5, "loot_bonus_pct": 10,
+}
+
+AUTO_HUNT_FALLBACK = [{"name": "Lobo", "xp_reward": 5, "gold_drop": 2, "id": "wolf"}]
+
+GROWTH_HP = 3
+GROWTH_ATK = 0.6
+GROWTH_DEF = 0.1
+GROWTH_XP = 1.5
+GROWTH_GOLD = 0.3
+
+_LEVEL_PREFIX = re.compile(r"^\d+\s+")
+
+
+def roll_is_elite(luck_stat: int) -> bool:
+    bonus = min(0.08, max(0.0, luck_stat / 2000.0))
+    return random.random() < (DEFAULT_ELITE_CHANCE + bonus)
+
+
+def apply_elite_scaling(mon: dict) -> dict:
+    m = dict(mon)
+    name = m.get("name") or "Inimigo"
+    m["name"] = f"{name} (🅴🅻I🆃🅴) 👑"
+    m["_elite"] = True
+
+    # 1. GARANTIA: Se não tiver max_hp, usa o hp atual como base para não zerar
+    if "max_hp" not in m and "hp" in m:
+        m["max_hp"] = m["hp"]
+
+    # 2. ESCALONAMENTO DE NÍVEL:
+    # Elite é sempre 3 níveis acima da base da região (afeta a escala final)
+    base_min_lvl = int(m.get("min_level", 1))
+    m["min_level"] = base_min_lvl + 3
+
+    keys_mult = [("max_hp", "hp"), ("attack", "attack"), ("defense", "defense"),
+                 ("xp_reward", "xp"), ("gold_drop", "gold")]
+
+    for k_mon, k_mult in keys_mult:
+        base = int(m.get(k_mon, 0))
+        # Se base for 0 (ex: defesa nula), força pelo menos 1 para o multiplicador funcionar
+        if base == 0 and k_mon in ["attack", "defense"]:
+            base = 5
+        m[k_mon] = int(base * ELITE_MULTS[k_mult])
+
+    m["hp"] = m["max_hp"]
+    m["initiative"] = int(m.get("initiative", 0)) + ELITE_MULTS["initiative_add"]
+    m["luck"] = int(m.get("luck", 0)) + ELITE_MULTS["luck_add"]
+
+    loot = []
+    for it in (m.get("loot_table") or []):
+        it2 = dict(it)
+        it2["drop_chance"] = min(100.0, float(it2.get("drop_chance", 0.0)) + ELITE_MULTS["loot_bonus_pct"])
+        loot.append(it2)
+    m["loot_table"] = loot
+
+    return m
+
+
+# =========================
+# Escala por nível (caça manual)
+# =========================
+def target_level(mon: dict, player_level: int, delta: int) -> int:
+    min_lvl = mon.get("min_level", 1)
+    max_lvl = mon.get("max_level", player_level + 2)
+    return max(min_lvl, min(player_level + delta, max_lvl))
+
+
+def scale_to_level(mon: dict, target_lvl: int) -> dict:
+    """Escala mon (no lugar) para o nível alvo já sorteado."""
+    if "max_hp" not in mon and "hp" in mon:
+        mon["max_hp"] = mon["hp"]
+    elif "max_hp" not in mon:
+        mon["max_hp"] = 10
+
+    mon["level"] = target_lvl
+
+    raw_name = mon.get("name", "Inimigo").replace("Lv.", "").strip()
+    raw_name = _LEVEL_PREFIX.sub("", raw_name)
+    mon["name"] = f"Lv.{target_lvl} {raw_name}"
+
+    if target_lvl <= 1:
+        mon["hp"] = mon["max_hp"]
+        return mon
+
+    scaling_bonus = 1 + (target_lvl * 0.03)
+
+    base_hp = int(mon.get("max_hp", 10))
+    base_atk = int(mon.get("attack", 2))
+    base_def = int(mon.get("defense", 0))
+    base_xp = int(mon.get("xp_reward", 5))
+    base_gold = int(mon.get("gold_drop", 1))
+
+    mon["max_hp"] = int((base_hp * scaling_bonus) + (target_lvl * GROWTH_HP))
+    mon["hp"] = mon["max_hp"]
+    mon["attack"] = int((base_atk * scaling_bonus) + (target_lvl * GROWTH_ATK))
+    mon["defense"] = int((base_def * scaling_bonus) + (target_lvl * GROWTH_DEF))
+
+    mon["xp_reward"] = int((base_xp * scaling_bonus) + (target_lvl * GROWTH_XP))
+    mon["gold_drop"] = int((base_gold * scaling_bonus) + (target_lvl * GROWTH_GOLD))
+
+    return mon
+
+
+def scale_monster_stats(mon: dict, player_level: int) -> dict:
+    return scale_to_level(mon, target_level(mon, player_level, random.randint(-1, 1)))
+
+
+def _normalize_template(mon: dict) -> dict:
+    m = mon.copy()
+    if "monster_max_hp" in m: m["max_hp"] = m.pop("monster_max_hp")
+    if "monster_attack" in m: m["attack"] = m.pop("monster_attack")
+    if "monster_defense" in m: m["defense"] = m.pop("monster_defense")
+    if "monster_name" in m: m["name"] = m.pop("monster_name")
+    return m
+
+
+def _details(m: dict) -> dict:
+    return {
+        "id": m.get("id"),
+        "name": m.get("name"),
+        "level": m.get("level", 1),
+        "hp": int(m.get("hp", 1)),
+        "max_hp": int(m.get("max_hp", 1)),
+        "attack": int(m.get("attack", 1)),
+        "defense": int(m.get("defense", 0)),
+        "initiative": int(m.get("initiative", 0)),
+        "luck": int(m.get("luck", 0)),
+        "gold_drop": int(m.get("gold_drop", 0)),
+        "xp_reward": int(m.get("xp_reward", 0)),
+        "loot_table": m.get("loot_table", []),
+        "is_elite": bool(m.get("_elite", False) or m.get("is_elite", False)),
+        "is_boss": bool(m.get("is_boss", False)),
+        "skills": m.get("skills", [])
+    }
+
+
+def build_combat_details(mon: dict, player_level: int = 1) -> dict:
+    """combat_details de um template avulso (sorteia o nível alvo)."""
+    m = _normalize_template(mon)
+    return _details(scale_monster_stats(m, player_level))
+
+
+# =========================
+# Entradas da região
+# =========================
+def _get_region_info(region_key: str) -> dict:
+    return (getattr(game_data, "REGIONS_DATA", {}) or {}).get(region_key, {}) or {}
+
+
+def _coerce_monster_entry(entry) -> dict | None:
+    if isinstance(entry, dict): return dict(entry)
+    if isinstance(entry, str):
+        v = (getattr(game_data, "MONSTER_TEMPLATES", {}) or {}).get(entry)
+        return dict(v) if isinstance(v, dict) else None
+    return None
+
+
+def _region_entries(region_key: str) -> List[dict]:
+    """Mesma ordem de busca do _pick_monster_template antigo."""
+    md = getattr(game_data, "MONSTERS_DATA", {}) or {}
+    lst = md.get(region_key)
+    if isinstance(lst, list) and lst:
+        pool = [dict(e) for e in lst if isinstance(e, dict)]
+        if pool:
+            return pool
+
+    mons = _get_region_info(region_key).get("monsters")
+    if isinstance(mons, list) and mons:
+        return [m for m in (_coerce_monster_entry(e) for e in mons) if m]
+    return []
+
+
+def generic_monster(region_key: str, player_level: int, region_min_lvl: int) -> dict:
+    """Monstro genérico para região sem lista (força pelo nível da região)."""
+    calc_level = max(player_level, region_min_lvl)
+    base_hp = 20 + calc_level * 5
+
+    return {
+        "id": f"generic_{region_key}",
+        "name": "Criatura Sombria",
+        "hp": base_hp, "max_hp": base_hp,
+        "attack": 3 + calc_level // 2,
+        "defense": 2,
+        "initiative": 4, "luck": 3,
+        "xp_reward": 5 + (calc_level // 2),
+        "gold_drop": 2 + (calc_level // 3),
+        "loot_table": [],
+        # Importante: Define o nível mínimo para a função de escala não reduzir depois
+        "min_level": region_min_lvl
+    }
+
+
+# ==============================================================================
+# TABELA DE UMA REGIÃO
+# ==============================================================================
+class SpawnTable:
+    __slots__ = ("region_key", "min_level", "templates", "elites", "cum_weights", "total_weight",
+                 "_details", "_auto_source", "_auto_cap", "_auto")
+
+    def __init__(self, region_key: str) -> None:
+        self.region_key = region_key
+        self.min_level = int(_get_region_info(region_key).get("min_level", 1))
+
+        templates = []
+        for m in _region_entries(region_key):
+            # Força o min_level do monstro a respeitar a região
+            m["min_level"] = max(int(m.get("min_level", 1)), self.min_level)
+            templates.append(m)
+        self.templates: Tuple[dict, ...] = tuple(templates)
+        self.elites: Tuple[dict, ...] = tuple(apply_elite_scaling(m) for m in templates)
+
+        weights = [max(0.0, float(m.get("spawn_weight", 1))) for m in templates]
+        self.cum_weights: Tuple[float, ...] = tuple(accumulate(weights))
+        self.total_weight = self.cum_weights[-1] if self.cum_weights else 0.0
+
+        self._details: Dict[Tuple[int, bool, int], dict] = {}
+
+        # Auto-caçada: entradas cruas de MONSTERS_DATA (sem o min_level da
+        # região, como antes)
+        md = getattr(game_data, "MONSTERS_DATA", {}) or {}
+        raw = [e for e in (md.get(region_key) or AUTO_HUNT_FALLBACK) if isinstance(e, dict)]
+        self._auto_source: Tuple[dict, ...] = tuple(raw)
+        self._auto_cap = max((int(m.get("min_level", 1)) for m in raw), default=1) + 16
+        self._auto: Dict[int, Tuple[dict, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    # --- caça manual ---
+    def pick_index(self) -> int:
+        if self.total_weight <= 0:
+            return random.randrange(len(self.templates))
+        idx = bisect_right(self.cum_weights, random.random() * self.total_weight)
+        return min(idx, len(self.templates) - 1)
+
+    def template(self, idx: int, elite: bool = False) -> dict:
+        return dict((self.elites if elite else self.templates)[idx])
+
+    def combat_details(self, idx: int, elite: bool, player_level: int) -> dict:
+        tpl = (self.elites if elite else self.templates)[idx]
+        key = (idx, elite, target_level(tpl, player_level, random.randint(-1, 1)))
+        details = self._details.get(key)
+        if details is None:
+            details = _details(scale_to_level(_normalize_template(tpl), key[2]))
+            self._details[key] = details
+        return dict(details)
+
+    def roll(self, player_level: int, luck: int) -> Tuple[dict, dict, bool]:
+        """(template, combat_details, is_elite) de um encontro."""
+        if not self.templates:
+            tpl = generic_monster(self.region_key, player_level, self.min_level)
+            is_elite = roll_is_elite(luck)
+            if is_elite:
+                tpl = apply_elite_scaling(tpl)
+            return tpl, build_combat_details(tpl, player_level), is_elite
+
+        idx = self.pick_index()
+        is_elite = roll_is_elite(luck)
+        return self.template(idx, is_elite), self.combat_details(idx, is_elite, player_level), is_elite
+
+    # --- auto-caçada ---
+    def auto_hunt_monsters(self, player_level: int) -> List[dict]:
+        band = min(int(player_level), self._auto_cap)
+        scaled = self._auto.get(band)
+        if scaled is None:
+            scaled = tuple(scale_auto_hunt_monster(m, band) for m in self._auto_source)
+            self._auto[band] = scaled
+        return list(scaled)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"monsters": len(self.templates), "scaled": len(self._details), "auto_bands": len(self._auto)}
+
+
+# ==============================================================================
+# REGISTRO
+# ==============================================================================
+_tables: Dict[str, SpawnTable] = {}
+
+
+def get_table(region_key: str) -> SpawnTable:
+    table = _tables.get(region_key)
+    if table is None:
+        table = _tables[region_key] = SpawnTable(region_key)
+    return table
+
+
+def compile_all() -> int:
+    """Compila todas as regiões conhecidas (chamar no startup)."""
+    regions = set(getattr(game_data, "MONSTERS_DATA", {}) or {})
+    regions |= set(getattr(game_data, "REGIONS_DATA", {}) or {})
+    for region_key in regions:
+        _tables[region_key] = SpawnTable(region_key)
+    return len(regions)
+
+
+def pick_template(region_key: str, player_level: int) -> dict:
+    table = get_table(region_key)
+    if not table.templates:
+        return generic_monster(region_key, player_level, table.min_level)
+    return table.template(table.pick_index())
+
+
+def roll_encounter(region_key: str, player_level: int, luck: int) -> Tuple[dict, dict, bool]:
+    return get_table(region_key).roll(player_level, luck)
+
+
+def auto_hunt_monsters(region_key: str, player_level: int) -> List[dict]:
+    return get_table(region_key).auto_hunt_monsters(player_level)
@@ -0,0 +1,252 @@
+# modules/update_processing.py
+# Processamento CONCORRENTE de updates do Telegram com ordem por jogador.
+#
+# Antes: Application sem concurrent_updates -> um update por vez. Um handler
+# preso numa ida ao Mongo (ou num timeout de 60s) segurava TODOS os jogadores.
+#
+# Agora:
+#   - UserOrderedApplication: updates do MESMO usuário (chave de serialização)
+#     rodam em fila, na ordem de chegada -> cliques de um jogador continuam
+#     sequenciais, conversas não se embaralham
+#   - até UPDATE_CONCURRENCY updates EXECUTANDO ao mesmo tempo, com vaga
+#     pedida só depois do lock do usuário (KeyedGate). O semáforo do PTB
+#     (concurrent_updates) é tomado ANTES de process_update, então ele fica
+#     folgado (UPDATE_MAX_PENDING): se fosse o limite real, os cliques
+#     enfileirados de um jogador travado ocupariam as vagas de todo mundo
+#   - pools HTTP separados: bot (envios, dimensionado pela concorrência) e
+#     get_updates (long polling, 1 conexão basta)
+#   - métricas: fila de updates, em execução, esperando o próprio jogador e
+#     latência por handler (instrument_handlers). Relatório: report_line().
+#
+# Feito sobre Application.process_update (e não BaseUpdateProcessor, que só
+# existe a partir do PTB 20.4; o requirements fixa 20.3).
+# UPDATE_CONCURRENCY=1 volta ao modo sequencial antigo.
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+
+from telegram import Update
+from telegram.ext import Application, ApplicationHandlerStop, BaseHandler, ConversationHandler
+from telegram.request import HTTPXRequest
+
+from modules.keyed_locks import KeyedGate
+
+logger = logging.getLogger(__name__)
+
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", "32"))
+# Teto do PTB: updates aceitos (executando + esperando usuário/vaga)
+UPDATE_MAX_PENDING = int(os.getenv("UPDATE_MAX_PENDING", "4096"))
+UPDATE_METRICS_SECONDS = int(os.getenv("UPDATE_METRICS_SECONDS", "300"))
+BOT_POOL_SIZE = int(os.getenv("BOT_POOL_SIZE", str(max(8, UPDATE_CONCURRENCY + 8))))
+GET_UPDATES_POOL_SIZE = int(os.getenv("GET_UPDATES_POOL_SIZE", "1"))
+SLOW_HANDLER_SECONDS = float(os.getenv("SLOW_HANDLER_SECONDS", "5"))
+HTTP_TIMEOUT = 60.0
+
+_LATENCY_SAMPLES = 256
+
+
+# ==============================================================================
+# MÉTRICAS
+# ==============================================================================
+class LatencyStats:
+    __slots__ = ("count", "total", "max", "errors", "_samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self._samples: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+
+    def add(self, seconds: float, error: bool = False) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.errors += int(error)
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "max_ms": self.max * 1000,
+            "errors": self.errors,
+        }
+
+
+_handler_stats: Dict[str, LatencyStats] = {}
+_update_stats = LatencyStats()
+
+
+def _record(name: str, seconds: float, error: bool) -> None:
+    stats = _handler_stats.get(name)
+    if stats is None:
+        stats = _handler_stats[name] = LatencyStats()
+    stats.add(seconds, error)
+    if seconds >= SLOW_HANDLER_SECONDS:
+        logger.warning(f"[UPDATES] Handler lento: {name} levou {seconds:.1f}s")
+
+
+# ==============================================================================
+# ORDEM POR JOGADOR
+# ==============================================================================
+def serialization_key(update: Any) -> Optional[Hashable]:
+    """Updates com a mesma chave rodam em ordem; None = sem restrição."""
+    if not isinstance(update, Update):
+        return None
+    user = update.effective_user
+    if user is not None:
+        return ("u", user.id)
+    chat = update.effective_chat
+    if chat is not None:
+        return ("c", chat.id)
+    return None
+
+
+class UserOrderedApplication(Application):
+    """Application que serializa updates do mesmo usuário no modo concorrente."""
+
+    _gate = KeyedGate(UPDATE_CONCURRENCY)
+
+    async def process_update(self, update: object) -> None:
+        key = serialization_key(update)
+        # Primeiro await da task: as tasks chegam aqui na ordem em que os
+        # updates foram recebidos e o Lock do usuário atende em FIFO; só
+        # então a task disputa uma das UPDATE_CONCURRENCY vagas
+        await self._gate.acquire(key)
+        started = time.perf_counter()
+        try:
+            await super().process_update(update)
+        finally:
+            _update_stats.add(time.perf_counter() - started)
+            self._gate.release(key)
+
+
+# ==============================================================================
+# CONFIGURAÇÃO DO BUILDER
+# ==============================================================================
+def configure_builder(builder):
+    """Aplica concorrência + pools separados no ApplicationBuilder."""
+    builder = builder.request(HTTPXRequest(
+        connection_pool_size=BOT_POOL_SIZE,
+        connect_timeout=HTTP_TIMEOUT,
+        read_timeout=HTTP_TIMEOUT,
+        write_timeout=HTTP_TIMEOUT,
+    )).get_updates_request(HTTPXRequest(
+        connection_pool_size=GET_UPDATES_POOL_SIZE,
+        connect_timeout=HTTP_TIMEOUT,
+        read_timeout=HTTP_TIMEOUT,
+        write_timeout=HTTP_TIMEOUT,
+    ))
+    if UPDATE_CONCURRENCY > 1:
+        pending = max(UPDATE_MAX_PENDING, UPDATE_CONCURRENCY)
+        builder = builder.application_class(UserOrderedApplication).concurrent_updates(pending)
+    logger.info(
+        f"[UPDATES] concorrência={UPDATE_CONCURRENCY} pendentes_max={UPDATE_MAX_PENDING} "
+        f"pool_bot={BOT_POOL_SIZE} pool_get_updates={GET_UPDATES_POOL_SIZE}"
+    )
+    return builder
+
+
+# ==============================================================================
+# LATÊNCIA POR HANDLER
+# ==============================================================================
+def _callback_name(callback: Callable) -> str:
+    module = getattr(callback, "__module__", "") or ""
+    name = getattr(callback, "__qualname__", None) or getattr(callback, "__name__", repr(callback))
+    return f"{module.rsplit('.', 1)[-1]}.{name}" if module else name
+
+
+def _timed(callback: Callable) -> Callable:
+    if getattr(callback, "_timed", False) or not asyncio.iscoroutinefunction(callback):
+        return callback
+    name = _callback_name(callback)
+
+    @functools.wraps(callback)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        error = False
+        try:
+            return await callback(*args, **kwargs)
+        except ApplicationHandlerStop:
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            _record(name, time.perf_counter() - started, error)
+
+    wrapper._timed = True
+    return wrapper
+
+
+def _walk(handler: BaseHandler):
+    if isinstance(handler, ConversationHandler):
+        for h in handler.entry_points:
+            yield from _walk(h)
+        for hs in handler.states.values():
+            for h in hs:
+                yield from _walk(h)
+        for h in handler.fallbacks:
+            yield from _walk(h)
+    elif hasattr(handler, "callback"):
+        yield handler
+
+
+def instrument_handlers(application: Application) -> int:
+    """Envolve o callback de cada handler registrado com medição de tempo."""
+    wrapped = 0
+    for group in application.handlers.values():
+        for handler in group:
+            for h in _walk(handler):
+                new_cb = _timed(h.callback)
+                if new_cb is not h.callback:
+                    h.callback = new_cb
+                    wrapped += 1
+    return wrapped
+
+
+# ==============================================================================
+# RELATÓRIO
+# ==============================================================================
+def stats(application: Optional[Application] = None, top: int = 10) -> Dict[str, Any]:
+    queue = getattr(application, "update_queue", None) if application else None
+    handlers = sorted(_handler_stats.items(), key=lambda kv: kv[1].percentile(0.95), reverse=True)
+    gate = UserOrderedApplication._gate
+    return {
+        "queued": queue.qsize() if queue is not None else 0,
+        "in_flight": gate.running,
+        "waiting_same_user": gate.waiting_key,
+        "waiting_slot": gate.waiting_slot,
+        "active_users": len(gate.locks),
+        "updates": _update_stats.as_dict(),
+        "handlers": {name: s.as_dict() for name, s in handlers[:top]},
+    }
+
+
+def report_line(application: Optional[Application] = None, top: int = 3) -> str:
+    s = stats(application, top)
+    u = s["updates"]
+    slow = ", ".join(f"{n} p95={h['p95_ms']:.0f}ms" for n, h in s["handlers"].items())
+    return (
+        f"[UPDATES] fila={s['queued']} executando={s['in_flight']} "
+        f"esperando_jogador={s['waiting_same_user']} esperando_vaga={s['waiting_slot']} "
+        f"| {u['count']} updates "
+        f"p50={u['p50_ms']:.0f}ms p95={u['p95_ms']:.0f}ms max={u['max_ms']:.0f}ms"
+        + (f" | mais lentos: {slow}" if slow else "")
+    )
@@ -0,0 +1,272 @@
+# modules/web_server.py
+# Web app (api.py + blueprints) servido DENTRO do processo do bot, no mesmo
+# event loop do PTB.
+#
+# Antes: api.py rodava como outro processo/thread Flask. Cada rota que chamava
+# código do jogo (async) criava um event loop novo (asyncio.run) por chamada,
+# com cache de jogadores próprio (sincronizado pelo barramento de invalidação)
+# e pool do Mongo próprio. O main.py ainda subia um Flask de keep-alive na 8080.
+#
+# Agora:
+#   - start(application) sobe um servidor ASGI (uvicorn) como task do loop do
+#     bot; o app Flask entra pelo WsgiBridge: as views síncronas rodam num pool
+#     de WEB_WORKERS threads (em paralelo), o loop nunca bloqueia
+#   - run_async(coro) (usado pelas rotas no lugar dos _run_async locais) manda a
+#     corrotina para o loop do bot: mesmo cache de jogadores, mesmo
+#     player_session/locks, mesmo pool do Mongo, zero criação de loop
+#   - sem loop do bot registrado (python api.py sozinho) volta ao modo antigo
+#
+# As rotas continuam sendo Flask (templates, blueprints, CORS, request/jsonify);
+# só o transporte e a ponte para o async mudaram.
+# WEB_SERVER_ENABLED=0 desliga o servidor embutido.
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+WEB_SERVER_ENABLED = os.getenv("WEB_SERVER_ENABLED", "1") != "0"
+WEB_HOST = os.getenv("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.getenv("PORT", "8080"))
+WEB_COROUTINE_TIMEOUT = float(os.getenv("WEB_COROUTINE_TIMEOUT", "30"))
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "16"))
+
+T = TypeVar("T")
+
+_bot_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[int] = None
+_server = None
+_bridge: Optional["WsgiBridge"] = None
+_server_task: Optional[asyncio.Task] = None
+
+
+# ==============================================================================
+# PONTE THREAD (view Flask) -> LOOP DO BOT
+# ==============================================================================
+def set_bot_loop(loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """Registra o loop do PTB como destino das corrotinas das rotas."""
+    global _bot_loop, _loop_thread
+    _bot_loop = loop
+    _loop_thread = threading.get_ident() if loop is not None else None
+
+
+def _run_in_new_loop(coro: Awaitable[T]) -> T:
+    """Modo antigo (api.py rodando sozinho): um loop por chamada."""
+    try:
+        return asyncio.run(coro)
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop.close()
+
+
+def run_async(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    Roda uma corrotina do jogo a partir de uma view síncrona e devolve o
+    resultado. Com o bot no ar, executa no loop dele (a thread da view espera).
+    """
+    loop = _bot_loop
+    if loop is None or loop.is_closed():
+        return _run_in_new_loop(coro)
+    if threading.get_ident() == _loop_thread:
+        # Esperar aqui travaria o próprio loop
+        raise RuntimeError("run_async chamado de dentro do loop do bot; use await")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout if timeout is not None else WEB_COROUTINE_TIMEOUT)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+# ==============================================================================
+# WSGI (Flask) -> ASGI
+# ==============================================================================
+def _environ(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ: Dict[str, Any] = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_LENGTH":
+            continue
+        if name != "CONTENT_TYPE":
+            name = f"HTTP_{name}"
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+class WsgiBridge:
+    """
+    App ASGI que roda um app WSGI num pool de threads próprio.
+    As respostas do api.py são pequenas (JSON/HTML/imagens estáticas), então
+    o corpo é montado inteiro na thread e enviado de uma vez.
+    """
+
+    def __init__(self, wsgi_app: Callable, workers: int = WEB_WORKERS):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="web")
+
+    def _call(self, environ: Dict[str, Any]):
+        response: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+            return chunks.append
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    chunks.append(chunk)
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
+        return response["status"], response["headers"], b"".join(chunks)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        loop = asyncio.get_running_loop()
+        status, headers, payload = await loop.run_in_executor(
+            self.executor, self._call, _environ(scope, bytes(body))
+        )
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": payload})
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+
+
+# ==============================================================================
+# SERVIDOR ASGI
+# ==============================================================================
+def build_asgi_app() -> WsgiBridge:
+    """App Flask do api.py (com os blueprints) pronto para o uvicorn."""
+    import api
+    from modules.player.core import enable_invalidation_publish
+
+    # Mesmo processo, mesmo cache: o barramento só serve para processos externos
+    enable_invalidation_publish(False)
+    return WsgiBridge(api.app)
+
+
+def _embedded_server_class():
+    import uvicorn
+
+    class EmbeddedServer(uvicorn.Server):
+        """Sem handlers de sinal próprios: quem desliga o processo é o PTB."""
+
+        def install_signal_handlers(self) -> None:
+            pass
+
+        @contextlib.contextmanager
+        def capture_signals(self):
+            yield
+
+    return uvicorn, EmbeddedServer
+
+
+async def _serve(server) -> None:
+    try:
+        await server.serve()
+    except SystemExit:
+        # uvicorn encerra com sys.exit se não consegue abrir a porta; numa task
+        # isso derrubaria o loop (e o bot) junto
+        logger.error(f"[WEB] Servidor web não subiu em {WEB_HOST}:{WEB_PORT} (porta ocupada?).")
+    except Exception as e:
+        logger.error(f"[WEB] Servidor web parou: {e}")
+
+
+async def start(application: Any = None) -> bool:
+    """Sobe o servidor web como task do loop atual (chamar no post_init)."""
+    global _server, _server_task, _bridge
+    if not WEB_SERVER_ENABLED or _server_task is not None:
+        return False
+
+    set_bot_loop(asyncio.get_running_loop())
+    try:
+        uvicorn, EmbeddedServer = _embedded_server_class()
+        _bridge = build_asgi_app()
+    except ImportError as e:
+        logger.warning(f"[WEB] Servidor web desativado (dependência ausente: {e}).")
+        return False
+
+    config = uvicorn.Config(
+        _bridge,
+        host=WEB_HOST,
+        port=WEB_PORT,
+        loop="none",
+        lifespan="off",
+        log_level="warning",
+        access_log=False,
+    )
+    _server = EmbeddedServer(config)
+    _server_task = asyncio.create_task(_serve(_server), name="web_server")
+    logger.info(f"[WEB] API servida no loop do bot em {WEB_HOST}:{WEB_PORT}")
+    return True
+
+
+async def shutdown(timeout: float = 10.0) -> None:
+    """Para de aceitar conexões e espera as requisições em andamento."""
+    global _server, _server_task, _bridge
+    task, server, bridge = _server_task, _server, _bridge
+    _server_task = _server = _bridge = None
+    if task is None:
+        return
+    server.should_exit = True
+    try:
+        await asyncio.wait_for(task, timeout)
+    except asyncio.TimeoutError:
+        server.force_exit = True
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    finally:
+        set_bot_loop(None)
+        if bridge is not None:
+            bridge.close()
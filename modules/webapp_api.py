@@ -1,5 +1,4 @@
 # modules/webapp_api.py
-import asyncio
 import traceback
 from flask import Blueprint, jsonify, request
 from bson import ObjectId
@@ -7,16 +6,8 @@ from bson import ObjectId
 # Cria o Blueprint (Mini-Aplicativo)
 webapp_bp = Blueprint('webapp_bp', __name__)
 
-def _run_async(coro):
-    """Ferramenta interna para rodar funções Async do Telegram no Flask"""
-    try:
-        return asyncio.run(coro)
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        res = loop.run_until_complete(coro)
-        loop.close()
-        return res
+# Corrotinas do jogo rodam no loop do bot (ver modules/web_server.py)
+from modules.web_server import run_async as _run_async
 
 # ==========================================
 # ROTA DE PERFIL COMPLETO (TRANSFERIDA DO API.PY)
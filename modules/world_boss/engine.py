@@ -1,26 +1,32 @@
 # modules/world_boss/engine.py
 # (VERSÃO CORRIGIDA: Anti-Spam de Contas Múltiplas + Notificação Admin)
 
-import json
-import os
 import random
 import time
 import logging
 import asyncio
 import html
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime, timedelta, timezone
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from telegram.error import Forbidden, TelegramError
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 from modules import player_manager, game_data, file_ids
 from modules.combat import criticals, combat_engine
 from modules.player import stats as player_stats_engine
+from modules.player.core import users_collection
+from modules.player.changeset import bump_version
+from modules.database import run_db
 from modules.cooldowns import verificar_cooldown, aplicar_cooldown, iniciar_turno
 from modules.game_data.skills import SKILL_DATA, get_skill_data_with_rarity
 from modules.game_data.skins import SKIN_CATALOG
 from modules.combat.party_engine import process_party_effects
+from modules.broadcast.dispatcher import start_broadcast
+from .state_store import BossStateStore
 
 logger = logging.getLogger(__name__)
 
@@ -81,7 +87,9 @@ class WorldBossManager:
         self.hazard_turns = 0
         self.damage_leaderboard = {}
         self.last_hitter_id = None
-        
+        self.ends_at = None  # ISO UTC; permite retomar o evento após reinício
+
+        self._store = BossStateStore(BOSS_STATE_FILE)
         self.load_state()
 
         if not self.entities:
@@ -113,32 +121,34 @@ class WorldBossManager:
         }
 
     # --- PERSISTÊNCIA ---
-    def save_state(self):
-        data = {
-            "is_active": self.is_active,
-            "location": self.location,
-            "entities": self.entities,
-            "active_fighters": list(self.active_fighters), 
-            "waiting_queue": self.waiting_queue,
-            "player_states": {str(k): v for k, v in self.player_states.items()},
-            "environment_hazard": self.environment_hazard,
-            "hazard_turns": self.hazard_turns,
-            "damage_leaderboard": self.damage_leaderboard,
-            "last_hitter_id": str(self.last_hitter_id) if self.last_hitter_id else None
-        }
+    # Incremental: state_store.py (log de deltas + snapshot atômico, fora do loop)
+    def save_state(self, players=None, full=False):
+        """players: quem pode ter mudado (None = todos); full: snapshot completo."""
         try:
-            with open(BOSS_STATE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self._store.capture(self, players=players, full=full)
         except Exception as e:
             logger.error(f"Erro ao salvar estado do World Boss: {e}")
 
-    def load_state(self):
-        if not os.path.exists(BOSS_STATE_FILE): return
+    def flush_state(self):
+        self._store.flush()
 
+    def close_state(self):
+        self._store.close()
+
+    def can_resume(self) -> bool:
+        """Evento ativo com horário de término conhecido e ainda no futuro."""
+        if not self.is_active or not self.ends_at:
+            return False
         try:
-            with open(BOSS_STATE_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
+            return datetime.fromisoformat(self.ends_at) > datetime.now(timezone.utc)
+        except (TypeError, ValueError):
+            return False
+
+    def load_state(self):
+        try:
+            data = self._store.load()
+            if data is None: return
+
             self.is_active = data.get("is_active", False)
             self.location = data.get("location", "Terras Devastadas")
             self.entities = data.get("entities", {})
@@ -150,6 +160,8 @@ class WorldBossManager:
             self.hazard_turns = data.get("hazard_turns", 0)
             self.damage_leaderboard = data.get("damage_leaderboard", {})
             self.last_hitter_id = str(data.get("last_hitter_id")) if data.get("last_hitter_id") else None
+            self.ends_at = data.get("ends_at")
+            self._store.prime(self)
             logger.info("Estado do World Boss carregado com sucesso.")
         except Exception as e:
             logger.error(f"Erro ao carregar estado do World Boss: {e}")
@@ -176,9 +188,10 @@ class WorldBossManager:
         if self.environment_hazard: txt += "🔥 𝘾𝘼𝙈𝙋𝙊 𝙀𝙈 𝘾𝙃𝘼𝙈𝘼𝙎!"
         return txt
 
-    def start_event(self):
+    def start_event(self, ends_at=None):
         if self.is_active: return {"error": "𝕁𝕒́ 𝕒𝕥𝕚𝕧𝕠."}
         self.is_active = True
+        self.ends_at = ends_at.astimezone(timezone.utc).isoformat() if ends_at else None
         self.location = random.choice(POSSIBLE_LOCATIONS)
         self.active_fighters.clear()
         self.waiting_queue.clear()
@@ -187,14 +200,15 @@ class WorldBossManager:
         self.environment_hazard = False
         self.hazard_turns = 0
         self._reset_entities()
-        self.save_state()
+        self.save_state(full=True)
         return {"success": True, "location": self.location}
 
     def end_event(self, reason="Ｔｅｍｐｏ　ｅｓｇｏｔａｄｏ"):
         active_status = self.is_active
         self.is_active = False
+        self.ends_at = None
         self.active_fighters.clear()
-        self.save_state()
+        self.save_state(full=True)
         if not active_status: return {}
         return {
             "leaderboard": self.damage_leaderboard.copy(),
@@ -212,11 +226,11 @@ class WorldBossManager:
         if len(self.active_fighters) < self.max_concurrent_fighters:
             self.active_fighters.add(user_id)
             await self._setup_player_state(user_id, player_data)
-            self.save_state()
+            self.save_state(players=[user_id])
             return "active"
         else:
             self.waiting_queue.append(user_id)
-            self.save_state()
+            self.save_state(players=[user_id])
             return "waiting"
 
     async def _setup_player_state(self, user_id, player_data):
@@ -234,7 +248,7 @@ class WorldBossManager:
         user_id = str(user_id)
         if user_id in self.player_states and target_key in self.entities:
             self.player_states[user_id]['current_target'] = target_key
-            self.save_state()
+            self.save_state(players=[user_id])
             return True
         return False
 
@@ -256,6 +270,7 @@ class WorldBossManager:
             return {"error": "𝗔𝗹𝘃𝗼 𝗷𝗮́ 𝗱𝗲𝗿𝗿𝗼𝘁𝗮𝗱𝗼! 𝗘𝘀𝗰𝗼𝗹𝗵𝗮 𝗼𝘂𝘁𝗿𝗼."}
 
         logs = []
+        touched = [user_id]  # quem pode ter mudado (escopo do save_state)
         p_stats = await player_manager.get_player_total_stats(player_data)
         current_mp_db = player_data.get("current_mp", 0)
         state['mp'] = current_mp_db 
@@ -304,6 +319,7 @@ class WorldBossManager:
 
             if skill_type == "support":
                 support_logs = process_party_effects(user_id, caster_name, s_info, p_stats, self.player_states)
+                touched = None
                 logs.extend(support_logs)
                 if not support_logs: logs.append("✨ Skill de suporte usada.")
             else:
@@ -321,10 +337,11 @@ class WorldBossManager:
             target["alive"] = False
             logs.append(f"💀 {target['name']} 𝗙𝗢𝗜 𝗗𝗘𝗥𝗥𝗢𝗧𝗔𝗗𝗢!")
             if target_key == "boss":
-                self.save_state()
+                self.save_state(players=touched)
                 return {"boss_defeated": True, "log": "𝗢 𝗥𝗘𝗜 𝗖𝗔𝗜𝗨!"}
 
-        await self._process_mobs_turn(user_id, state, p_stats, logs)
+        if await self._process_mobs_turn(user_id, state, p_stats, logs) and touched is not None:
+            touched = list(self.active_fighters)
 
         if state['hp'] <= 0:
             has_miracle = False
@@ -343,7 +360,7 @@ class WorldBossManager:
                 
                 real_id = player_data.get("_id", user_id)
                 await player_manager.save_player_data(real_id, player_data)
-                self.save_state()
+                self.save_state(players=touched)
                 return {"respawning": True, "wait_time": 60, "state": state}
 
         player_data, msgs_cd = iniciar_turno(player_data)
@@ -357,10 +374,12 @@ class WorldBossManager:
         
         real_id = player_data.get("_id", user_id)
         await player_manager.save_player_data(real_id, player_data)
-        self.save_state() 
+        self.save_state(players=touched)
         return {"success": True, "state": state}
     
     async def _process_mobs_turn(self, user_id, state, p_stats, logs):
+        """Retorna True se o meteoro atingiu os outros lutadores."""
+        aoe = False
         if self.environment_hazard:
             burn_dmg = int(state['max_hp'] * 0.05) 
             state['hp'] -= burn_dmg
@@ -372,7 +391,7 @@ class WorldBossManager:
         if boss.get("is_stunned", False):
             logs.append(f"💫 <b>Boss Atordoado!</b>")
             boss["is_stunned"] = False 
-            return 
+            return aoe
 
         if boss["alive"]:
             boss["turn_counter"] += 1
@@ -385,6 +404,7 @@ class WorldBossManager:
                 for fid in list(self.active_fighters):
                     if fid != user_id and fid in self.player_states:
                         self.player_states[fid]['hp'] -= aoe_dmg
+                        aoe = True
             else:
                 edmg, icrit, _ = criticals.roll_damage(boss["stats"], p_stats, {})
                 state['hp'] -= edmg
@@ -395,6 +415,7 @@ class WorldBossManager:
             if w["alive"]:
                 dmg = int(w["stats"]["attack"] * 0.5)
                 state['hp'] -= dmg
+        return aoe
 
     def get_battle_view(self, user_id):
         return self.player_states.get(str(user_id))
@@ -405,16 +426,72 @@ world_boss_manager = WorldBossManager()
 # --- NOTIFICAÇÕES E ANÚNCIOS (AQUI ESTÁ A CORREÇÃO) ---
 # ======================================================
 
-async def _send_dm_to_winner(context: ContextTypes.DEFAULT_TYPE, chat_id: int, loot_messages: list[str]):
-    if not loot_messages: return
+def _winner_dm_text(loot_messages: list[str]) -> str:
     loot_str = "\n".join([f"• {item}" for item in loot_messages])
-    message = (
+    return (
         f"🎉 𝑹𝒆𝒄𝒐𝒎𝒑𝒆𝒏𝒔𝒂𝒔 𝒅𝒐 𝑫𝒆𝒎𝒐̂𝒏𝒊𝒐 𝑫𝒊𝒎𝒆𝒏𝒔𝒊𝒐𝒏𝒂𝒍 🎉\n\n"
         f"𝑷𝒂𝒓𝒂𝒃𝒆́𝒏𝒔! 𝑷𝒐𝒓 𝒔𝒖𝒂 𝒃𝒓𝒂𝒗𝒖𝒓𝒂 𝒏𝒂 𝒃𝒂𝒕𝒂𝒍𝒉𝒂, 𝒗𝒐𝒄𝒆̂ 𝒓𝒆𝒄𝒆𝒃𝒆𝒖:\n{loot_str}"
     )
+
+# ======================================================
+# --- LOOT EM LOTE ---
+# ======================================================
+# Antes: get_player_data + save_player_data (documento inteiro) por
+# participante, mais uma leitura extra para cada nome do top 3.
+# Agora: 1) UMA busca projetada de todos  2) prêmios calculados em memória
+# 3) UM bulk_write só com $inc (deltas: não atropela o resto do documento)
+# 4) DMs pelo dispatcher de broadcast. Cada fase é cronometrada no log.
+
+_LOOT_BASE_PROJECTION = {
+    "character_name": 1, "last_chat_id": 1, "telegram_id_owner": 1,
+    "xp": 1, "level": 1, "current_hp": 1, "stat_points": 1,
+    "class_key": 1, "class": 1, "classe": 1,
+}
+_LEVEL_FIELDS = ("xp", "level", "current_hp", "stat_points")
+
+
+def _loot_projection() -> dict:
+    """Só as entradas do inventário que o evento pode premiar."""
+    reward_ids = [f"caixa_{s}" for s in SKIN_REWARD_POOL] + [f"tomo_{s}" for s in SKILL_REWARD_POOL]
+    reward_ids += [t[0] for t in LOOT_REWARD_POOL]
+    return {**_LOOT_BASE_PROJECTION, **{f"inventory.{i}": 1 for i in reward_ids}}
+
+
+async def _fetch_participants(uids: list) -> dict:
+    oids = [ObjectId(u) for u in uids if ObjectId.is_valid(u)]
+    if not oids or users_collection is None:
+        return {}
+    docs = await run_db(lambda: list(users_collection.find({"_id": {"$in": oids}}, _loot_projection())))
+    return {str(d["_id"]): d for d in docs}
+
+
+def _inventory_ops(doc: dict, items: dict, inc: dict, set_: dict) -> None:
+    """Mesma regra do add_item_to_inventory: item único (dict) na chave não empilha."""
+    inventory = doc.get("inventory") or {}
+    for item_id, qty in items.items():
+        if isinstance(inventory.get(item_id), dict):
+            set_[f"inventory.{item_id}_{str(uuid.uuid4())[:8]}"] = qty
+        else:
+            inc[f"inventory.{item_id}"] = inc.get(f"inventory.{item_id}", 0) + qty
+
+
+def _level_deltas(doc: dict, xp: int) -> tuple[dict, str]:
+    """Aplica XP + level up numa cópia mínima e devolve só os deltas ($inc)."""
+    mini = {k: doc[k] for k in _LOOT_BASE_PROJECTION if k in doc}
+    before = {k: int(mini.get(k, 0) or 0) for k in _LEVEL_FIELDS}
+    player_manager.add_xp(mini, xp)
+    level_up_msg = ""
     try:
-        await context.bot.send_message(chat_id=chat_id, text=message, parse_mode='HTML')
-    except (Forbidden, TelegramError): pass
+        _, _, level_up_msg = player_manager.check_and_apply_level_up(mini)
+    except Exception:
+        pass
+    deltas = {}
+    for k in _LEVEL_FIELDS:
+        diff = int(mini.get(k, 0) or 0) - before[k]
+        if diff:
+            deltas[k] = diff
+    return deltas, level_up_msg
+
 
 async def distribute_loot_and_announce(context: ContextTypes.DEFAULT_TYPE, battle_results: dict):
     leaderboard = battle_results.get("participants", {}) 
@@ -433,109 +510,133 @@ async def distribute_loot_and_announce(context: ContextTypes.DEFAULT_TYPE, battl
     total_gold_distributed = 0
     total_xp_distributed = 0
     last_hit_msg = ""
-    
-    # --- TOP 3 ---
-    ranking_data = []
-    for uid_raw, dmg in leaderboard.items():
-        ranking_data.append((str(uid_raw), dmg))
+    timings = {}
+
+    damage = {
+        str(uid): (dmg.get("damage", 0) if isinstance(dmg, dict) else dmg) or 0
+        for uid, dmg in leaderboard.items()
+    }
+
+    # --- 1. BUSCA (uma consulta para todos) ---
+    t0 = time.perf_counter()
+    docs = await _fetch_participants(list(damage))
+    timings["fetch"] = time.perf_counter() - t0
 
-    sorted_ranking = sorted(ranking_data, key=lambda item: item[1], reverse=True)
+    # --- TOP 3 (nomes vêm da mesma busca) ---
+    sorted_ranking = sorted(damage.items(), key=lambda item: item[1], reverse=True)
     
     top_3_msg = []
     medals = ["🥇", "🥈", "🥉"]
     for i, (uid, dmg) in enumerate(sorted_ranking[:3]):
-        pdata = await player_manager.get_player_data(uid)
+        pdata = docs.get(uid)
         safe_name = html.escape(pdata.get('character_name', 'Herói') if pdata else "Herói")
         medal = medals[i] if i < 3 else "🏅"
         top_3_msg.append(f"{medal} {safe_name} (<code>{dmg:,}</code> pts)")
 
-    # --- LOOP DISTRIBUIÇÃO ---
-    for user_id_raw, dmg_val in leaderboard.items():
-        uid = str(user_id_raw)
-        dmg = dmg_val['damage'] if isinstance(dmg_val, dict) else dmg_val
-        
+    # --- 2. CÁLCULO (memória) ---
+    t0 = time.perf_counter()
+    ops = []
+    rewarded = []
+    dms = {}
+    for uid, dmg in damage.items():
         if dmg <= 0: continue
-        
-        pdata = await player_manager.get_player_data(uid)
+        pdata = docs.get(uid)
         if not pdata: continue
         
         total_participants += 1
+        if not boss_defeated: continue
 
-        if boss_defeated:
-            try:
-                player_name = html.escape(pdata.get("character_name", f"Guerreiro"))
-                loot_won_messages = []
-                player_mudou = False
-
-                # 1. Prêmios Fixos
-                player_manager.add_gold(pdata, PARTICIPATION_GOLD)
-                loot_won_messages.append(f"💰 <b>Ouro:</b> +{PARTICIPATION_GOLD}")
-                total_gold_distributed += PARTICIPATION_GOLD
-                
-                player_manager.add_xp(pdata, PARTICIPATION_XP)
-                loot_won_messages.append(f"✨ <b>XP:</b> +{PARTICIPATION_XP}")
-                total_xp_distributed += PARTICIPATION_XP
-                
-                try:
-                    _, _, level_up_msg = player_manager.check_and_apply_level_up(pdata)
-                    if level_up_msg: loot_won_messages.append(level_up_msg)
-                except: pass
+        try:
+            player_name = html.escape(pdata.get("character_name", f"Guerreiro"))
+            loot_won_messages = []
+            items = {}
+
+            # 1. Prêmios Fixos
+            loot_won_messages.append(f"💰 <b>Ouro:</b> +{PARTICIPATION_GOLD}")
+            total_gold_distributed += PARTICIPATION_GOLD
+            loot_won_messages.append(f"✨ <b>XP:</b> +{PARTICIPATION_XP}")
+            total_xp_distributed += PARTICIPATION_XP
+
+            inc, level_up_msg = _level_deltas(pdata, PARTICIPATION_XP)
+            if level_up_msg: loot_won_messages.append(level_up_msg)
+            inc["gold"] = PARTICIPATION_GOLD
+
+            # 2. Gacha Loot
+            roll_rare = random.random() * 100
+            
+            # Chance da Skin (Ex: 2.0%)
+            if roll_rare <= SKIN_CHANCE: 
+                chosen_skin = random.choice(SKIN_REWARD_POOL)
+                items[f"caixa_{chosen_skin}"] = 1
+                d_name = SKIN_CATALOG.get(chosen_skin, {}).get("name", chosen_skin)
+                loot_won_messages.append(f"🎨 <b>SKIN RARA:</b> {d_name}")
+                skin_winners_msg.append(f"• {player_name} obteve <b>{d_name}</b>!")
                 
-                player_mudou = True
+            # Chance da Skill (Ex: 0.09%) - Acumulativo
+            # Se roll_rare for maior que 2.0 mas menor que 2.09, cai aqui.
+            elif roll_rare <= (SKIN_CHANCE + SKILL_CHANCE):
+                chosen_skill = random.choice(SKILL_REWARD_POOL)
+                items[f"tomo_{chosen_skill}"] = 1
+                d_name = SKILL_DATA.get(chosen_skill, {}).get("display_name", chosen_skill)
+                loot_won_messages.append(f"📚 <b>TÉCNICA:</b> {d_name}")
+                skill_winners_msg.append(f"• {player_name} obteve <b>{d_name}</b>!")
+
+            # Loot Comum (50% de chance)
+            if random.random() * 100 <= 50.0:
+                item_id_common, q_min, q_max = random.choice(LOOT_REWARD_POOL)
+                qty = random.randint(q_min, q_max)
+                items[item_id_common] = items.get(item_id_common, 0) + qty
+                d_name = game_data.ITEMS_DATA.get(item_id_common, {}).get("display_name", item_id_common)
+                loot_won_messages.append(f"📦 <b>Loot:</b> {d_name} (x{qty})")
+                loot_summary[d_name] = loot_summary.get(d_name, 0) + qty
+
+            set_ = {}
+            _inventory_ops(pdata, items, inc, set_)
+            update = {"$inc": inc}
+            if set_: update["$set"] = set_
+            ops.append(UpdateOne({"_id": pdata["_id"]}, bump_version(update)))
+            rewarded.append(uid)
+
+            # 3. DM (enviada depois, em paralelo)
+            target_chat_id = pdata.get("last_chat_id") or pdata.get("telegram_id_owner")
+            if target_chat_id:
+                dms[target_chat_id] = _winner_dm_text(loot_won_messages)
 
-                # 2. Gacha Loot (AGORA CORRIGIDO PARA USAR AS VARIÁVEIS)
-                roll_rare = random.random() * 100
-                rare_item_id = None
-                
-                # Chance da Skin (Ex: 2.0%)
-                if roll_rare <= SKIN_CHANCE: 
-                    chosen_skin = random.choice(SKIN_REWARD_POOL)
-                    rare_item_id = f"caixa_{chosen_skin}"
-                    skn_id = rare_item_id.replace("caixa_", "")
-                    d_name = SKIN_CATALOG.get(skn_id, {}).get("name", skn_id)
-                    loot_won_messages.append(f"🎨 <b>SKIN RARA:</b> {d_name}")
-                    skin_winners_msg.append(f"• {player_name} obteve <b>{d_name}</b>!")
-                    
-                # Chance da Skill (Ex: 0.09%) - Acumulativo
-                # Se roll_rare for maior que 2.0 mas menor que 2.09, cai aqui.
-                elif roll_rare <= (SKIN_CHANCE + SKILL_CHANCE):
-                    chosen_skill = random.choice(SKILL_REWARD_POOL)
-                    rare_item_id = f"tomo_{chosen_skill}"
-                    sk_id = rare_item_id.replace("tomo_", "")
-                    d_name = SKILL_DATA.get(sk_id, {}).get("display_name", sk_id)
-                    loot_won_messages.append(f"📚 <b>TÉCNICA:</b> {d_name}")
-                    skill_winners_msg.append(f"• {player_name} obteve <b>{d_name}</b>!")
-
-                if rare_item_id:
-                    player_manager.add_item_to_inventory(pdata, rare_item_id, 1)
-                    player_mudou = True
-
-                # Loot Comum (50% de chance)
-                if random.random() * 100 <= 50.0:
-                    loot_tuple = random.choice(LOOT_REWARD_POOL)
-                    item_id_common = loot_tuple[0]
-                    qty = random.randint(loot_tuple[1], loot_tuple[2])
-                    player_manager.add_item_to_inventory(pdata, item_id_common, qty)
-                    player_mudou = True
-                    d_name = game_data.ITEMS_DATA.get(item_id_common, {}).get("display_name", item_id_common)
-                    loot_won_messages.append(f"📦 <b>Loot:</b> {d_name} (x{qty})")
-                    loot_summary[d_name] = loot_summary.get(d_name, 0) + qty
-
-                if player_mudou:
-                    await player_manager.save_player_data(uid, pdata)
-                
-                # 3. Enviar DM
-                target_chat_id = pdata.get("last_chat_id") or pdata.get("telegram_id_owner")
-                if target_chat_id:
-                    try:
-                        await _send_dm_to_winner(context, int(target_chat_id), loot_won_messages)
-                    except: pass
+            if uid == last_hitter_id:
+                last_hit_msg = f"💥 <b>Golpe Final:</b> {player_name}"
+
+        except Exception as e:
+            logger.error(f"[WB_LOOT] Erro ao processar player {uid}: {e}")
+    timings["compute"] = time.perf_counter() - t0
 
-                if uid == last_hitter_id:
-                    last_hit_msg = f"💥 <b>Golpe Final:</b> {player_name}"
+    # --- 3. GRAVAÇÃO (um bulk_write) ---
+    t0 = time.perf_counter()
+    if ops:
+        try:
+            await run_db(users_collection.bulk_write, ops, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            logger.error(f"[WB_LOOT] {len(errors)}/{len(ops)} prêmios falharam: {errors[:3]}")
+        except Exception as e:
+            logger.error(f"[WB_LOOT] Falha ao gravar prêmios ({len(ops)} jogadores): {e}")
+        # Cache guardava o documento antigo: próxima leitura vem do banco
+        for uid in rewarded:
+            await player_manager.clear_player_cache(uid)
+    timings["write"] = time.perf_counter() - t0
+
+    # --- 4. DMs (dispatcher: concorrente e no limite do Telegram) ---
+    t0 = time.perf_counter()
+    if dms:
+        try:
+            await start_broadcast(context.bot, None, kind="wb_loot", personal=dms)
+        except Exception as e:
+            logger.error(f"[WB_LOOT] Falha ao agendar DMs: {e}")
+    timings["notify"] = time.perf_counter() - t0
 
-            except Exception as e:
-                logger.error(f"[WB_LOOT] Erro ao processar player {uid}: {e}")
+    logger.info(
+        f"[WB_LOOT] {total_participants} participantes, {len(ops)} premiados | "
+        + " ".join(f"{k}={v * 1000:.1f}ms" for k, v in timings.items())
+    )
 
     # --- ANÚNCIO CANAL ---
     separator = "━━━━━━━━━━━━━━━━━━"
@@ -590,10 +691,12 @@ async def broadcast_boss_announcement(application, location_key: str, forced_med
     location_name = (game_data.REGIONS_DATA.get(location_key) or {}).get("display_name", location_key)
     
     media_id = forced_media_id
+    media_type = None  # forçado: tipo descoberto no 1º envio do broadcast
     if not media_id:
         try:
             file_ids.refresh_cache()
             media_id = file_ids.get_file_id("boss_raid")
+            media_type = file_ids.get_file_type("boss_raid")
         except: pass
 
     # --- TEXTO DA DM ---
@@ -618,69 +721,28 @@ async def broadcast_boss_announcement(application, location_key: str, forced_med
     except Exception as e:
         logger.error(f"Erro broadcast canal: {e}")
 
-    # 2. ENVIA PARA OS JOGADORES (COM ANTI-DUP)
-    sent_chat_ids = set() # ✅ SET para evitar duplicação por Telegram ID
-    count = 0
-    
-    async for _oid, pdata in player_manager.iter_players():
-        try:
-            target_chat_id = pdata.get("last_chat_id")
-            if not target_chat_id: target_chat_id = pdata.get("telegram_id_owner")
-            
-            if not target_chat_id: continue
-                
-            chat_id_int = int(target_chat_id)
-            
-            # ✅ VERIFICA SE JÁ ENVIOU PARA ESTE ID
-            if chat_id_int in sent_chat_ids:
-                continue
-                
-            sent_chat_ids.add(chat_id_int)
-            sent = False
-            
-            if media_id:
-                try:
-                    await application.bot.send_video(chat_id=chat_id_int, video=media_id, caption=anuncio_dm, parse_mode='HTML', reply_markup=kb_dm)
-                    sent = True
-                except:
-                    try:
-                        await application.bot.send_photo(chat_id=chat_id_int, photo=media_id, caption=anuncio_dm, parse_mode='HTML', reply_markup=kb_dm)
-                        sent = True
-                    except: pass
-            
-            if not sent:
-                await application.bot.send_message(chat_id=chat_id_int, text=anuncio_dm, parse_mode='HTML', reply_markup=kb_dm)
-            
-            count += 1
-            if count % 20 == 0: await asyncio.sleep(1)
-            else: await asyncio.sleep(0.05) 
-        except: continue
+    # 2. DM PARA OS JOGADORES: broadcast em segundo plano (dedup por chat,
+    # limite do Telegram e retomada após reinício ficam no dispatcher)
+    stamp = world_boss_manager.ends_at or datetime.now(timezone.utc).strftime("%Y%m%d%H%M")
+    await start_broadcast(
+        application.bot, anuncio_dm, key=f"wb_start:{location_key}:{stamp}", kind="world_boss_start",
+        media_id=media_id, media_type=media_type, reply_markup=kb_dm,
+    )
 
 async def end_world_boss_job(context: ContextTypes.DEFAULT_TYPE):
+    stamp = world_boss_manager.ends_at or datetime.now(timezone.utc).strftime("%Y%m%d%H%M")
     battle_results = world_boss_manager.end_event(reason="Tempo esgotado")
     await distribute_loot_and_announce(context, battle_results)
     
-    # ✅ TAMBÉM ADICIONADO ANTI-DUP NO FIM
-    sent_chat_ids = set()
-    
-    async for user_id, pdata in player_manager.iter_players():
-        try:
-            target_chat_id = pdata.get("last_chat_id") or pdata.get("telegram_id_owner")
-            if not target_chat_id: continue
-            
-            chat_id_int = int(target_chat_id)
-            if chat_id_int in sent_chat_ids: continue
-            
-            sent_chat_ids.add(chat_id_int)
-            
-            await context.bot.send_message(chat_id=chat_id_int, text="⏳ 𝗢 𝘁𝗲𝗺𝗽𝗼 𝗮𝗰𝗮𝗯𝗼𝘂! 𝗢 𝗗𝗲𝗺𝗼̂𝗻𝗶𝗼 𝗗𝗶𝗺𝗲𝗻𝘀𝗶𝗼𝗻𝗮𝗹 𝗱𝗲𝘀𝗮𝗽𝗮𝗿𝗲𝗰𝗲𝘂...")
-            await asyncio.sleep(0.05) 
-        except: continue
+    await start_broadcast(
+        context.bot, "⏳ 𝗢 𝘁𝗲𝗺𝗽𝗼 𝗮𝗰𝗮𝗯𝗼𝘂! 𝗢 𝗗𝗲𝗺𝗼̂𝗻𝗶𝗼 𝗗𝗶𝗺𝗲𝗻𝘀𝗶𝗼𝗻𝗮𝗹 𝗱𝗲𝘀𝗮𝗽𝗮𝗿𝗲𝗰𝗲𝘂...",
+        key=f"wb_end:{stamp}", kind="world_boss_end", parse_mode=None,
+    )
 
 async def iniciar_world_boss_job(context: ContextTypes.DEFAULT_TYPE):
     if world_boss_manager.is_active: return
-    res = world_boss_manager.start_event()
+    hours = context.job.data.get("duration_hours", 1) if context.job.data else 1
+    res = world_boss_manager.start_event(ends_at=datetime.now(timezone.utc) + timedelta(hours=hours))
     if res.get("success"):
         await broadcast_boss_announcement(context.application, res["location"])
-        hours = context.job.data.get("duration_hours", 1) if context.job.data else 1
         context.job_queue.run_once(end_world_boss_job, when=timedelta(hours=hours))
\ No newline at end of file
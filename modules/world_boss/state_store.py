@@ -0,0 +1,340 @@
+# modules/world_boss/state_store.py
+# Persistência incremental do World Boss (à prova de queda).
+#
+# Antes: cada ação reescrevia o world_boss_state.json INTEIRO (indent=2),
+# síncrono no event loop e sem troca atômica (queda no meio = arquivo cortado).
+# Agora:
+#   - capture(): no loop, só compara o que mudou (escopo = quem agiu) e monta
+#     UMA linha JSON com o delta. Barato.
+#   - thread de escrita: anexa as linhas em <arquivo>.log (em lote, com fsync)
+#     e mantém uma cópia "sombra" do estado completo.
+#   - a cada COMPACT_EVERY linhas (ou em start/end do evento) grava um
+#     snapshot: arquivo .tmp + fsync + os.replace (atômico) e zera o log.
+#   - load(): snapshot + replay do log (linha final cortada é ignorada).
+#
+# O snapshot continua no formato antigo do world_boss_state.json (+ "_seq"),
+# então arquivos antigos carregam normalmente.
+#
+# Módulo puro (só stdlib).
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import threading
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COMPACT_EVERY = int(os.getenv("WB_STATE_COMPACT_EVERY", "500"))
+STATE_FSYNC = os.getenv("WB_STATE_FSYNC", "1") != "0"
+
+SCALAR_FIELDS = ("is_active", "location", "environment_hazard", "hazard_turns", "last_hitter_id", "ends_at")
+
+_dumps = partial(json.dumps, ensure_ascii=False, separators=(",", ":"))
+_MISSING = object()
+
+
+def _entity_view(entity: dict) -> dict:
+    """loot_table é fixa durante o evento: só vai no snapshot completo."""
+    return {k: v for k, v in entity.items() if k != "loot_table"}
+
+
+def full_state(mgr) -> Dict[str, Any]:
+    """Estado completo no formato do world_boss_state.json."""
+    return {
+        "is_active": mgr.is_active,
+        "location": mgr.location,
+        "entities": mgr.entities,
+        "active_fighters": sorted(mgr.active_fighters),
+        "waiting_queue": list(mgr.waiting_queue),
+        "player_states": {str(k): v for k, v in mgr.player_states.items()},
+        "environment_hazard": mgr.environment_hazard,
+        "hazard_turns": mgr.hazard_turns,
+        "damage_leaderboard": mgr.damage_leaderboard,
+        "last_hitter_id": str(mgr.last_hitter_id) if mgr.last_hitter_id else None,
+        "ends_at": getattr(mgr, "ends_at", None),
+    }
+
+
+def apply_record(state: Dict[str, Any], rec: Dict[str, Any]) -> None:
+    """Aplica uma linha do log sobre o estado completo (in-place)."""
+    state.update(rec.get("s") or {})
+    entities = state.setdefault("entities", {})
+    for key, ent in (rec.get("e") or {}).items():
+        entities.setdefault(key, {}).update(ent)
+    players = state.setdefault("player_states", {})
+    for uid, st in (rec.get("p") or {}).items():
+        if st is None:
+            players.pop(uid, None)
+        else:
+            players[uid] = st
+    board = state.setdefault("damage_leaderboard", {})
+    for uid, dmg in (rec.get("d") or {}).items():
+        if dmg is None:
+            board.pop(uid, None)
+        else:
+            board[uid] = dmg
+    if "m" in rec:
+        state["active_fighters"] = rec["m"]["active"]
+        state["waiting_queue"] = rec["m"]["queue"]
+    state["_seq"] = rec["seq"]
+
+
+class BossStateStore:
+    def __init__(self, path: str, compact_every: int = COMPACT_EVERY, fsync: bool = STATE_FSYNC):
+        self.path = path
+        self.log_path = path + ".log"
+        self.compact_every = max(1, int(compact_every))
+        self.fsync = fsync
+
+        # Lado do loop: o que já foi enviado (para diff)
+        self._seq = 0
+        self._scalars: Dict[str, Any] = {}
+        self._enc_entities: Dict[str, str] = {}
+        self._enc_players: Dict[str, str] = {}
+        self._board: Dict[str, Any] = {}
+        self._membership: Optional[Tuple[List[str], List[str]]] = None
+
+        # Lado da thread de escrita
+        self._queue: "queue.Queue[Tuple[str, int, str]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._shadow: Dict[str, Any] = {}
+        self._log_records = 0
+
+        self.records = 0
+        self.bytes_written = 0
+        self.compactions = 0
+        self.write_errors = 0
+
+    # ==========================================================================
+    # LEITURA (startup)
+    # ==========================================================================
+    def load(self) -> Optional[Dict[str, Any]]:
+        state: Optional[Dict[str, Any]] = None
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+
+        replayed = 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        logger.warning("[WB_STATE] Linha final do log incompleta (queda na escrita): ignorada.")
+                        break
+                    if rec.get("seq", 0) <= (state or {}).get("_seq", 0):
+                        continue
+                    if state is None:
+                        state = {}
+                    apply_record(state, rec)
+                    replayed += 1
+
+        if state is None:
+            return None
+        self._seq = int(state.get("_seq", 0))
+        self._shadow = json.loads(_dumps(state))
+        self._log_records = replayed
+        if replayed:
+            logger.info(f"[WB_STATE] {replayed} ações recuperadas do log (seq={self._seq}).")
+        return state
+
+    def prime(self, mgr) -> None:
+        """Depois de carregar: o próximo capture() só grava o que mudar."""
+        self._scalars = self._scalar_values(mgr)
+        self._enc_entities = {k: _dumps(_entity_view(v)) for k, v in mgr.entities.items()}
+        self._enc_players = {str(k): _dumps(v) for k, v in mgr.player_states.items()}
+        self._board = dict(mgr.damage_leaderboard)
+        self._membership = (sorted(mgr.active_fighters), list(mgr.waiting_queue))
+
+    # ==========================================================================
+    # CAPTURA (event loop)
+    # ==========================================================================
+    @staticmethod
+    def _scalar_values(mgr) -> Dict[str, Any]:
+        values = {k: getattr(mgr, k, None) for k in SCALAR_FIELDS}
+        values["last_hitter_id"] = str(values["last_hitter_id"]) if values["last_hitter_id"] else None
+        return values
+
+    def capture(self, mgr, players: Optional[Iterable[Any]] = None, full: bool = False) -> bool:
+        """
+        Enfileira o que mudou desde a última captura.
+        players: quem pode ter mudado (None = todos). Retorna False se nada mudou.
+        """
+        if full:
+            self._seq += 1
+            self._submit("full", _dumps(full_state(mgr)))
+            self.prime(mgr)
+            return True
+
+        parts = []
+
+        scalars = self._scalar_values(mgr)
+        changed = {k: v for k, v in scalars.items() if self._scalars.get(k, _MISSING) != v}
+        if changed:
+            self._scalars.update(changed)
+            parts.append('"s":' + _dumps(changed))
+
+        ents = []
+        for key, ent in mgr.entities.items():
+            enc = _dumps(_entity_view(ent))
+            if self._enc_entities.get(key) != enc:
+                self._enc_entities[key] = enc
+                ents.append(f"{_dumps(key)}:{enc}")
+        if ents:
+            parts.append('"e":{' + ",".join(ents) + "}")
+
+        states = mgr.player_states
+        board = mgr.damage_leaderboard
+        if players is None:
+            scope = set(states) | set(self._enc_players) | set(board) | set(self._board)
+        else:
+            scope = {str(p) for p in players}
+
+        p_parts, d_changed = [], {}
+        for uid in scope:
+            st = states.get(uid)
+            enc = _dumps(st) if st is not None else None
+            if self._enc_players.get(uid) != enc:
+                if enc is None:
+                    self._enc_players.pop(uid, None)
+                else:
+                    self._enc_players[uid] = enc
+                p_parts.append(f"{_dumps(uid)}:{enc or 'null'}")
+            dmg = board.get(uid)
+            if self._board.get(uid) != dmg:
+                if dmg is None:
+                    self._board.pop(uid, None)
+                else:
+                    self._board[uid] = dmg
+                d_changed[uid] = dmg
+        if p_parts:
+            parts.append('"p":{' + ",".join(p_parts) + "}")
+        if d_changed:
+            parts.append('"d":' + _dumps(d_changed))
+
+        membership = (sorted(mgr.active_fighters), list(mgr.waiting_queue))
+        if membership != self._membership:
+            self._membership = membership
+            parts.append('"m":' + _dumps({"active": membership[0], "queue": membership[1]}))
+
+        if not parts:
+            return False
+        self._seq += 1
+        self._submit("delta", "{" + f'"seq":{self._seq},' + ",".join(parts) + "}\n")
+        return True
+
+    def _submit(self, kind: str, payload: str) -> None:
+        self._ensure_writer()
+        self._queue.put((kind, self._seq, payload))
+
+    # ==========================================================================
+    # THREAD DE ESCRITA
+    # ==========================================================================
+    def _ensure_writer(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer_loop, name="wb-state-writer", daemon=True)
+                self._thread.start()
+
+    def _writer_loop(self) -> None:
+        pending: List[str] = []
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            compact = False
+            for kind, seq, payload in batch:
+                if kind == "stop":
+                    stop = True
+                elif kind == "full":
+                    # Estado completo substitui tudo que veio antes
+                    pending.clear()
+                    self._shadow = json.loads(payload)
+                    self._shadow["_seq"] = seq
+                    compact = True
+                else:
+                    pending.append(payload)
+                    apply_record(self._shadow, json.loads(payload))
+
+            try:
+                if compact:
+                    self._write_snapshot()
+                if pending:
+                    self._append(pending)
+                    pending.clear()
+                if self._log_records >= self.compact_every or (stop and self._log_records):
+                    self._write_snapshot()
+            except Exception as e:
+                self.write_errors += 1
+                logger.error(f"[WB_STATE] Falha ao gravar estado do World Boss: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _append(self, lines: List[str]) -> None:
+        data = "".join(lines)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self._log_records += len(lines)
+        self.records += len(lines)
+        self.bytes_written += len(data)
+
+    def _write_snapshot(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._shadow, f, indent=2, ensure_ascii=False)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        # Queda aqui: o log antigo só tem seq <= snapshot e é ignorado no load
+        with open(self.log_path, "w", encoding="utf-8"):
+            pass
+        self._log_records = 0
+        self.compactions += 1
+
+    # ==========================================================================
+    # CONTROLE
+    # ==========================================================================
+    def flush(self) -> None:
+        """Bloqueia até tudo que foi capturado estar no disco."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Grava o pendente, compacta e encerra a thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(("stop", self._seq, ""))
+        self._thread.join()
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "seq": self._seq,
+            "queued": self._queue.qsize(),
+            "records": self.records,
+            "bytes": self.bytes_written,
+            "log_records": self._log_records,
+            "compactions": self.compactions,
+            "write_errors": self.write_errors,
+        }
@@ -0,0 +1,156 @@
+# pvp/battle_sim.py
+# Núcleo PURO da simulação PvP (sem banco, sem HTML, sem random global).
+#
+# - Entrada: dois Fighter (snapshot dos stats finais, já balanceados e com
+#   modificador de arena aplicado) + uma seed.
+# - Saída: BattleResult com uma lista compacta de eventos
+#   (turno, atacante 0|1, dano, crítico 0|1|2, hp do alvo depois).
+# - Mesma seed + mesmos Fighter = mesma luta (replay).
+# - simulate_batch: N confrontos de uma vez, com seeds derivadas de uma só
+#   (lote reproduzível). Roda no próprio processo: as lutas do bot são
+#   uma por vez (Arena, torneio com confirmação), sem lote grande para dividir.
+#
+# O texto da luta (HTML) é montado depois, só se alguém for mostrar:
+# pvp_battle.render_battle_log.
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+MAX_ROUNDS = 20
+CRIT_MULT = 1.6
+MEGA_MULT = 2.0
+MIN_DAMAGE = 1
+
+CRIT_NONE, CRIT_NORMAL, CRIT_MEGA = 0, 1, 2
+
+# (turno, atacante 0=p1|1=p2, dano, crítico, hp do alvo depois do golpe)
+Event = Tuple[int, int, int, int, int]
+
+
+def _f(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass(frozen=True)
+class Fighter:
+    user_id: Any
+    max_hp: int
+    attack: float
+    defense: float
+    initiative: float
+    crit_chance: float
+    mega_chance: float
+
+
+def fighter_from_stats(user_id: Any, stats: Dict[str, Any]) -> Fighter:
+    """Snapshot imutável dos stats (crítico calculado UMA vez por luta)."""
+    luck = int(_f(stats.get("luck", 5), 5))
+    if "crit_chance" in stats:
+        chance = _f(stats.get("crit_chance", 5.0), 5.0)
+    else:
+        chance = 100.0 * (1.0 - (0.99 ** max(0, luck)))
+        chance = max(1.0, min(chance, 40.0))
+    return Fighter(
+        user_id=user_id,
+        max_hp=int(_f(stats.get("max_hp", 1), 1)),
+        attack=_f(stats.get("attack", 0)),
+        defense=_f(stats.get("defense", 0)),
+        initiative=_f(stats.get("initiative", 0)),
+        crit_chance=chance,
+        mega_chance=min(25.0, luck / 2.0),
+    )
+
+
+def apply_arena_modifier(stats: Dict[str, Any], effect: Optional[str]) -> None:
+    """Modificador do dia (in-place)."""
+    if effect == "fury_day":
+        stats["attack"] = _f(stats.get("attack", 0)) * 1.20
+        stats["defense"] = _f(stats.get("defense", 0)) * 0.90
+    elif effect == "agility_day":
+        stats["dodge_chance"] = _f(stats.get("dodge_chance", 0)) + 15
+        stats["double_attack_chance"] = _f(stats.get("double_attack_chance", 0)) + 15
+    elif effect == "wall_day":
+        stats["defense"] = _f(stats.get("defense", 0)) * 1.5
+        stats["attack"] = _f(stats.get("attack", 0)) * 0.8
+    elif effect == "critical_day":
+        stats["crit_chance"] = _f(stats.get("crit_chance", 0)) + 20
+    elif effect == "glass_cannon_day":
+        stats["attack"] = _f(stats.get("attack", 0)) * 2.0
+        stats["defense"] = 0
+
+
+@dataclass
+class BattleResult:
+    winner_id: Any            # user_id do vencedor; 0 = empate
+    winner: int               # 0=p1, 1=p2, -1=empate
+    first: int                # quem abriu a luta (maior iniciativa)
+    rounds: int
+    seed: int
+    events: List[Event] = field(default_factory=list)
+
+
+def roll_damage(attacker: Fighter, defender: Fighter, rand) -> Tuple[int, int]:
+    """(dano, crítico). Consome 1 número aleatório, ou 2 se for crítico."""
+    crit = CRIT_NONE
+    mult = 1.0
+    if rand() * 100.0 <= attacker.crit_chance:
+        if rand() * 100.0 <= attacker.mega_chance:
+            mult, crit = MEGA_MULT, CRIT_MEGA
+        else:
+            mult, crit = CRIT_MULT, CRIT_NORMAL
+
+    boosted_attack = math.ceil(attacker.attack * mult)
+    defense = defender.defense if defender.defense > 0 else 0.0
+    damage = max(MIN_DAMAGE, int(boosted_attack * (100.0 / (100.0 + defense))))
+    return damage, crit
+
+
+def simulate(p1: Fighter, p2: Fighter, seed: int, keep_events: bool = True,
+             max_rounds: int = MAX_ROUNDS) -> BattleResult:
+    rand = random.Random(seed).random
+    fighters = (p1, p2)
+    hp = [p1.max_hp, p2.max_hp]
+    first = 1 if p2.initiative > p1.initiative else 0
+    order = (first, 1 - first)
+    events: List[Event] = []
+
+    for round_num in range(1, max_rounds + 1):
+        for actor in order:
+            target = 1 - actor
+            damage, crit = roll_damage(fighters[actor], fighters[target], rand)
+            hp[target] -= damage
+            if keep_events:
+                events.append((round_num, actor, damage, crit, hp[target]))
+            if hp[target] <= 0:
+                return BattleResult(fighters[actor].user_id, actor, first, round_num, seed, events)
+
+    return BattleResult(0, -1, first, max_rounds, seed, events)
+
+
+# ==============================================================================
+# LOTE
+# ==============================================================================
+def simulate_batch(
+    matchups: Sequence[Tuple],
+    seed: Optional[int] = None,
+    keep_events: bool = False,
+) -> List[BattleResult]:
+    """
+    matchups: [(p1, p2)] ou [(p1, p2, seed)]. Sem seed própria, cada luta
+    recebe uma derivada de `seed` (lote inteiro reproduzível).
+    Resultados na MESMA ordem da entrada.
+    """
+    base = random.Random(seed)
+    jobs = []
+    for m in matchups:
+        fight_seed = m[2] if len(m) > 2 and m[2] is not None else base.getrandbits(63)
+        jobs.append((m[0], m[1], fight_seed))
+
+    return [simulate(a, b, fs, keep_events) for a, b, fs in jobs]
@@ -0,0 +1,125 @@
+# pvp/elo_index.py
+# Índice em memória (pontos, jogador) para o matchmaking da Arena.
+#
+# Antes: cada busca rodava um aggregate com $convert em TODOS os usuários
+# (collection scan) + $sample. Agora: lista ordenada por (pontos, id);
+# a faixa [min_elo, max_elo] sai com dois bisect (O(log n)) e a amostra
+# aleatória é tirada por POSIÇÃO dentro da faixa (O(limit)).
+#
+# Módulo puro (sem pymongo/bson): o carregamento do banco fica em matchmaking.py.
+
+from __future__ import annotations
+
+import random
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Maior que qualquer id (str(ObjectId) é hex): fecha a faixa por cima
+_ID_MAX = "\uffff"
+
+
+def to_points(raw: Any) -> int:
+    """Mesmo contrato do $convert antigo: inválido/None -> 0."""
+    try:
+        return max(0, int(raw))
+    except (TypeError, ValueError):
+        try:
+            return max(0, int(float(raw)))
+        except (TypeError, ValueError):
+            return 0
+
+
+class EloIndex:
+    """Lista ordenada de (pontos, player_id) + mapa player_id -> (pontos, _id original)."""
+
+    def __init__(self):
+        self._keys: List[Tuple[int, str]] = []
+        self._members: Dict[str, Tuple[int, Any]] = {}
+        self._lock = threading.RLock()
+
+    def rebuild(self, entries: Iterable[Tuple[Any, Any]]) -> int:
+        """entries: (_id, pvp_points) já filtrados (só quem tem personagem)."""
+        members: Dict[str, Tuple[int, Any]] = {}
+        for raw_id, raw_points in entries:
+            if raw_id is None:
+                continue
+            members[str(raw_id)] = (to_points(raw_points), raw_id)
+        keys = sorted((pts, pid) for pid, (pts, _raw) in members.items())
+        with self._lock:
+            self._members = members
+            self._keys = keys
+        return len(keys)
+
+    def update(self, raw_id: Any, points: Any) -> None:
+        if raw_id is None:
+            return
+        pid = str(raw_id)
+        pts = to_points(points)
+        with self._lock:
+            old = self._members.get(pid)
+            if old is not None:
+                if old[0] == pts:
+                    return
+                self._discard((old[0], pid))
+            self._members[pid] = (pts, raw_id)
+            insort(self._keys, (pts, pid))
+
+    def remove(self, raw_id: Any) -> None:
+        pid = str(raw_id)
+        with self._lock:
+            old = self._members.pop(pid, None)
+            if old is not None:
+                self._discard((old[0], pid))
+
+    def _discard(self, key: Tuple[int, str]) -> None:
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def points_of(self, raw_id: Any) -> Optional[int]:
+        entry = self._members.get(str(raw_id))
+        return entry[0] if entry else None
+
+    def count_range(self, min_elo: int, max_elo: int) -> int:
+        with self._lock:
+            lo, hi = self._bounds(min_elo, max_elo)
+        return hi - lo
+
+    def _bounds(self, min_elo: int, max_elo: int) -> Tuple[int, int]:
+        lo = bisect_left(self._keys, (int(min_elo), ""))
+        hi = bisect_right(self._keys, (int(max_elo), _ID_MAX))
+        return lo, hi
+
+    def sample_range(
+        self,
+        min_elo: int,
+        max_elo: int,
+        limit: int,
+        exclude: Any = None,
+        rng: Optional[random.Random] = None,
+    ) -> List[Tuple[Any, int]]:
+        """Até `limit` jogadores aleatórios com min_elo <= pontos <= max_elo: [(_id, pontos)]."""
+        limit = max(0, int(limit))
+        if limit == 0:
+            return []
+        rng = rng or random
+        excluded = str(exclude) if exclude is not None else None
+
+        with self._lock:
+            lo, hi = self._bounds(min_elo, max_elo)
+            size = hi - lo
+            if size <= 0:
+                return []
+            # +1 para compensar o próprio jogador, se ele cair na amostra
+            take = min(size, limit + 1)
+            positions = range(lo, hi) if take == size else rng.sample(range(lo, hi), take)
+            picked = [self._keys[i] for i in positions]
+            out = [(self._members[pid][1], pts) for pts, pid in picked if pid != excluded]
+
+        if take == size:
+            rng.shuffle(out)
+        return out[:limit]
+
+    def __len__(self) -> int:
+        return len(self._keys)
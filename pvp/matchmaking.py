@@ -0,0 +1,140 @@
+# pvp/matchmaking.py
+# Matchmaking da Arena sobre o índice ELO em memória (pvp/elo_index.py).
+#
+# - Carrega (_id, pvp_points) de quem tem personagem com UMA leitura projetada
+#   (na primeira busca e de novo a cada MATCHMAKING_REBUILD_SECONDS).
+# - Resultado de luta atualiza o índice na hora (on_points_changed).
+# - Resets de temporada / limpeza geral do cache marcam o índice como velho
+#   (mark_stale) e a próxima busca recarrega.
+# - pvp_points vira int de verdade no banco (normalize_pvp_points) + índice,
+#   usado pelo ranking e pelo fallback por faixa se a memória estiver vazia.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from modules.database import run_db
+from modules.player.cache import subscribe_invalidation
+from modules.player.core import users_collection
+from .elo_index import EloIndex
+
+logger = logging.getLogger(__name__)
+
+MATCHMAKING_REBUILD_SECONDS = int(os.getenv("MATCHMAKING_REBUILD_SECONDS", "600"))
+
+_CHARACTER_FILTER = {"character_name": {"$exists": True, "$ne": ""}}
+
+_index = EloIndex()
+_loaded_at: Optional[float] = None
+_load_lock: Optional[asyncio.Lock] = None
+
+
+# ==============================================================================
+# BANCO: tipo + índice
+# ==============================================================================
+def normalize_pvp_points() -> int:
+    """Migração idempotente: pvp_points string/double/null -> int (inválido = 0)."""
+    if users_collection is None:
+        return 0
+    res = users_collection.update_many(
+        {"pvp_points": {"$exists": True, "$not": {"$type": ["int", "long"]}}},
+        [{"$set": {"pvp_points": {"$convert": {
+            "input": "$pvp_points", "to": "int", "onError": 0, "onNull": 0,
+        }}}}],
+    )
+    if res.modified_count:
+        logger.info(f"[PVP] {res.modified_count} jogadores com pvp_points normalizado para int.")
+    return res.modified_count
+
+
+def ensure_pvp_indexes() -> None:
+    if users_collection is None:
+        return
+    try:
+        users_collection.create_index([("pvp_points", -1)])
+    except Exception as e:
+        logger.warning(f"[PVP] Falha ao criar índice pvp_points: {e}")
+
+
+# ==============================================================================
+# ÍNDICE EM MEMÓRIA
+# ==============================================================================
+def _load_entries() -> list:
+    cursor = users_collection.find(_CHARACTER_FILTER, {"pvp_points": 1}, batch_size=2000)
+    return [(doc.get("_id"), doc.get("pvp_points")) for doc in cursor]
+
+
+def mark_stale(_key: Any = None) -> None:
+    """Força recarga na próxima busca (assinatura compatível com o barramento)."""
+    global _loaded_at
+    if _key is None:
+        _loaded_at = None
+
+
+async def refresh(force: bool = False) -> int:
+    global _loaded_at, _load_lock
+    if users_collection is None:
+        return 0
+    if _load_lock is None:
+        _load_lock = asyncio.Lock()
+    async with _load_lock:
+        fresh = _loaded_at is not None and time.monotonic() - _loaded_at < MATCHMAKING_REBUILD_SECONDS
+        if fresh and not force:
+            return len(_index)
+        t0 = time.perf_counter()
+        entries = await run_db(_load_entries)
+        count = _index.rebuild(entries)
+        _loaded_at = time.monotonic()
+        logger.info(f"[PVP] Índice de matchmaking: {count} jogadores em {(time.perf_counter() - t0) * 1000:.0f} ms.")
+        return count
+
+
+def on_points_changed(player_id: Any, points: Any) -> None:
+    _index.update(player_id, points)
+
+
+def index_size() -> int:
+    return len(_index)
+
+
+# ==============================================================================
+# BUSCA
+# ==============================================================================
+async def _find_in_db(min_elo: int, max_elo: int, my_id, limit: int) -> List[Dict[str, Any]]:
+    """Fallback: faixa pelo índice pvp_points (sem $convert, sem collection scan)."""
+    pipeline = [
+        {"$match": {"pvp_points": {"$gte": min_elo, "$lte": max_elo}, **_CHARACTER_FILTER}},
+        {"$sample": {"size": int(limit) + 1}},
+        {"$project": {"pvp_points": 1}},
+    ]
+    docs = await run_db(lambda: list(users_collection.aggregate(pipeline)))
+    my_str = str(my_id)
+    return [d for d in docs if d.get("_id") and str(d["_id"]) != my_str][:limit]
+
+
+async def find_opponents(min_elo: int, max_elo: int, my_id, limit: int = 10) -> List[Dict[str, Any]]:
+    """Até `limit` candidatos aleatórios na faixa: [{"_id", "pvp_points"}]."""
+    if users_collection is None:
+        return []
+    try:
+        await refresh()
+    except Exception as e:
+        logger.error(f"Erro ao carregar índice de matchmaking: {e}")
+
+    if len(_index):
+        picked = _index.sample_range(min_elo, max_elo, limit, exclude=my_id)
+        return [{"_id": raw_id, "pvp_points": pts} for raw_id, pts in picked]
+
+    try:
+        return await _find_in_db(min_elo, max_elo, my_id, limit)
+    except Exception as e:
+        logger.error(f"Erro matchmaking (users): {e}")
+        return []
+
+
+# Limpeza geral do cache de jogadores (resets, admin) -> recarrega o índice
+subscribe_invalidation(mark_stale)
@@ -21,11 +21,13 @@ from bson import ObjectId
 # --- Módulos do Sistema ---
 from modules import player_manager, file_ids
 from modules.player.core import players_collection  # usamos para obter database
+from modules.database import run_db
 
 from .pvp_config import ARENA_MODIFIERS, MONTHLY_RANKING_REWARDS
 from . import pvp_battle
 from . import pvp_utils
 from . import tournament_system
+from . import matchmaking
 from .ui import build_arena_screen
 from modules.game_data import regions as game_data_regions
 
@@ -220,7 +222,7 @@ async def _resolve_player_id(update: Update, context: ContextTypes.DEFAULT_TYPE,
             ]
             for q in queries:
                 try:
-                    doc = users_collection.find_one(q, {"_id": 1})
+                    doc = await run_db(users_collection.find_one, q, {"_id": 1})
                     if doc and doc.get("_id"):
                         return doc["_id"]
                 except Exception:
@@ -266,45 +268,12 @@ async def find_opponents(
     allow_zero_points: bool = False,
 ) -> list:
     """
-    Matchmaking na collection users.
-    Converte pvp_points para int e filtra docs com character_name.
+    Matchmaking: faixa de ELO no índice em memória (pvp/matchmaking.py).
+    Retorna docs parciais {"_id", "pvp_points"} (sem o próprio jogador).
     """
-    if users_collection is None:
-        return []
-
     min_elo = 0 if allow_zero_points else max(0, int(player_elo) - int(elo_delta))
     max_elo = int(player_elo) + int(elo_delta)
-
-    pipeline = [
-        {
-            "$addFields": {
-                "_pvp_points": {
-                    "$convert": {
-                        "input": "$pvp_points",
-                        "to": "int",
-                        "onError": 0,
-                        "onNull": 0,
-                    }
-                }
-            }
-        },
-        {
-            "$match": {
-                "_pvp_points": {"$gte": min_elo, "$lte": max_elo},
-                "character_name": {"$exists": True, "$ne": ""},
-            }
-        },
-        {"$sample": {"size": int(limit)}},
-    ]
-
-    try:
-        candidates = list(users_collection.aggregate(pipeline))
-    except Exception as e:
-        logger.error(f"Erro matchmaking (users): {e}")
-        return []
-
-    my_str = str(my_id)
-    return [c for c in candidates if c.get("_id") and str(c.get("_id")) != my_str]
+    return await matchmaking.find_opponents(min_elo, max_elo, my_id, limit=limit)
 
 
 # ==============================
@@ -541,7 +510,7 @@ async def procurar_oponente_callback(update: Update, context: ContextTypes.DEFAU
             col = signup_repo.col
 
             # busca apenas member_ids
-            docs = await asyncio.to_thread(
+            docs = await run_db(
                 lambda: list(col.find({"campaign_id": campaign_id}, {"member_ids": 1}))
             )
 
@@ -666,7 +635,7 @@ async def procurar_oponente_callback(update: Update, context: ContextTypes.DEFAU
                 {"$match": {"character_name": {"$exists": True, "$ne": ""}}},
                 {"$sample": {"size": 60}},
             ]
-            opponents = list(users_collection.aggregate(pipeline_any))
+            opponents = await run_db(lambda: list(users_collection.aggregate(pipeline_any)))
             opponents = [o for o in opponents if o.get("_id") and str(o.get("_id")) != str(user_id)]
         except Exception:
             opponents = []
@@ -741,12 +710,14 @@ async def procurar_oponente_callback(update: Update, context: ContextTypes.DEFAU
 
     player_manager.add_gold(pdata, gold_reward)
     await player_manager.save_player_data(user_id, pdata)
+    matchmaking.on_points_changed(user_id, new_points)
 
     # Atualiza Inimigo (passivo)
     enemy_delta = -15 if is_win else +25
     enemy_points = max(0, int(enemy_data.get("pvp_points", 0)) + enemy_delta)
     enemy_data["pvp_points"] = enemy_points
     await player_manager.save_player_data(enemy_id, enemy_data)
+    matchmaking.on_points_changed(enemy_id, enemy_points)
 
     # Mensagem
     result_text = "🏆 <b>VITÓRIA!</b>" if is_win else "💀 <b>DERROTA...</b>"
@@ -1011,7 +982,7 @@ async def ranking_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
             {"$sort": {"pvp_points": -1}},
             {"$limit": 15},
         ]
-        top_players = list(users_collection.aggregate(pipeline_top))
+        top_players = await run_db(lambda: list(users_collection.aggregate(pipeline_top)))
 
         lines = ["🏆 <b>Ranking da Arena de Eldora</b> 🏆\n"]
         if not top_players:
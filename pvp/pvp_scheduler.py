@@ -8,7 +8,9 @@ from telegram.ext import ContextTypes
 # Imports
 from modules.player.core import players_collection 
 from modules import player_manager, game_data
+from modules.database import run_db
 from pvp.pvp_config import MONTHLY_RANKING_REWARDS
+from pvp import matchmaking
 
 logger = logging.getLogger(__name__)
 
@@ -19,30 +21,43 @@ if players_collection is not None:
     except: pass
 
 async def entregar_premios_ranking(context_bot):
-    """Entrega prêmios usando o iterador híbrido."""
-    all_players = []
-    
-    # Itera de forma inteligente (pula duplicados de migração)
-    async for user_id, pdata in player_manager.iter_players():
-        pts = int(pdata.get("pvp_points", 0))
-        if pts > 0:
-            all_players.append({
-                "user_id": user_id,
-                "points": pts,
-                "pdata": pdata
-            })
-
-    all_players.sort(key=lambda x: x["points"], reverse=True)
-    
+    """Entrega prêmios aos primeiros do ranking (filtro/ordenação no servidor)."""
+    if not MONTHLY_RANKING_REWARDS:
+        return
+    max_rank = max(int(r) for r in MONTHLY_RANKING_REWARDS)
+
+    # pvp_points string/double escaparia do $gt numérico (e do sort):
+    # normaliza para int antes de ranquear
+    try:
+        await run_db(matchmaking.normalize_pvp_points)
+    except Exception as e:
+        logger.warning(f"[PvP] Falha ao normalizar pvp_points antes do ranking: {e}")
+
+    # Só quem pontuou, já ordenado, e só o necessário para ranquear
+    ranked = []
+    async for user_id, doc in player_manager.iter_players(
+        filter={"pvp_points": {"$gt": 0}},
+        projection={"pvp_points": 1},
+        sort=[("pvp_points", -1)],
+        limit=max_rank,
+    ):
+        ranked.append(user_id)
+
     count_premiados = 0
-    for i, player in enumerate(all_players):
+    for i, uid in enumerate(ranked):
         rank = i + 1
         rewards = MONTHLY_RANKING_REWARDS.get(rank)
         
         if rewards:
-            uid = player["user_id"]
-            pdata = player["pdata"]
-            
+            # Documento completo só para quem vai receber
+            pdata = await player_manager.get_player_data(uid)
+            if not pdata:
+                continue
+
+            # Tabela simples (rank -> gemas) ou dict de itens
+            if not isinstance(rewards, dict):
+                rewards = {"gems": int(rewards)}
+
             # Entrega Itens
             if "ouro" in rewards: player_manager.add_gold(pdata, rewards["ouro"])
             if "gems" in rewards: player_manager.add_gems(pdata, rewards["gems"])
@@ -86,14 +101,14 @@ async def executar_reset_pvp(context_bot, force_run=False):
     # Limpa Legado
     if players_collection is not None:
         try:
-            res = players_collection.update_many({}, {"$set": {"pvp_points": 0}})
+            res = await run_db(players_collection.update_many, {}, {"$set": {"pvp_points": 0}})
             count += res.modified_count
         except Exception as e: logger.error(f"Erro reset legacy: {e}")
 
     # Limpa Novo (ESSA PARTE FALTAVA NO SEU ARQUIVO)
     if users_collection is not None:
         try:
-            res = users_collection.update_many({}, {"$set": {"pvp_points": 0}})
+            res = await run_db(users_collection.update_many, {}, {"$set": {"pvp_points": 0}})
             count += res.modified_count
         except Exception as e: logger.error(f"Erro reset new: {e}")
 
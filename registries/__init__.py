@@ -2,13 +2,13 @@
 # (VERSÃO CORRIGIDA: Importação de Eventos + Registro do Claim Diário + Compatibilidade de callbacks)
 
 import logging
-from datetime import datetime, timezone
 
 from telegram import Update
 from telegram.ext import Application, TypeHandler, ContextTypes, CallbackQueryHandler
 from modules.auth_utils import get_current_player_id_async
 
 from modules import player_manager
+from modules.player import presence
 from handlers import runes_handler
 
 # --- IMPORTS DOS REGISTROS (SEUS MÓDULOS) ---
@@ -53,18 +53,16 @@ logger = logging.getLogger(__name__)
 
 
 async def update_last_seen(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handler global (Middleware) que atualiza 'last_seen'."""
+    """
+    Handler global (Middleware) que atualiza 'last_seen'.
+    Só anota em memória; o job de presença grava em lote (ver presence.py).
+    """
     if not update.effective_user:
         return
 
     user_id = get_current_player_id(update, context)
-    try:
-        pdata = await player_manager.get_player_data(user_id)
-        if pdata:
-            pdata["last_seen"] = datetime.now(timezone.utc).isoformat()
-            await player_manager.save_player_data(user_id, pdata)
-    except Exception as e:
-        logger.warning(f"Erro ao atualizar last_seen: {e}")
+    if user_id:
+        presence.touch(user_id)
 
 async def restore_session_from_persistent(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
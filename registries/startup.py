@@ -10,6 +10,7 @@ from config import ADMIN_ID, STARTUP_IMAGE_ID, JOB_TIMEZONE, EVENT_TIMES, WORLD_
 
 # ✅ File IDs (Mongo + cache)
 from modules import file_ids
+from modules.database import run_db, ensure_database_indexes
 
 # Jobs e Watchdogs Imports
 from handlers.jobs import (
@@ -21,6 +22,9 @@ from handlers.jobs import (
     end_world_boss_job,
     check_premium_expiry_job,
     job_pvp_monthly_reset,
+    player_cache_invalidation_job,
+    presence_flush_job,
+    update_metrics_job,
     # NOVO: guerra de clãs (jobs do sistema único)
     guild_war_finalize_job,
 )
@@ -55,6 +59,65 @@ async def run_system_startup_tasks(application: Application):
     except Exception as e:
         logger.error(f"Erro ao iniciar recover_active_hunts: {e}")
 
+    # 1a. BANCO: índices base (antes criados no import, com um round-trip
+    # bloqueante antes do bot conectar)
+    try:
+        await run_db(ensure_database_indexes)
+        from modules import clan_manager, gem_market_manager
+        await run_db(clan_manager.ensure_clan_indexes)
+        await run_db(gem_market_manager.ensure_gem_market_indexes)
+    except Exception as e:
+        logger.error(f"Erro ao preparar índices do banco: {e}")
+
+    # 1a. CAÇA: tabelas de spawn por região (sorteio do start_hunt e lista da
+    # auto-caçada prontos antes do 1º update)
+    try:
+        from modules import spawn_tables
+        logger.info(f"🐺 Tabelas de spawn compiladas: {spawn_tables.compile_all()} regiões.")
+    except Exception as e:
+        logger.error(f"Erro ao compilar tabelas de spawn: {e}")
+
+    # 1a. SKILLS: visões (skill, raridade) e canônicos prontos antes do 1º combate
+    try:
+        from modules.skills import skill_registry
+        logger.info(f"✨ Registro de skills compilado: {skill_registry.compile_registry()} visões.")
+    except Exception as e:
+        logger.error(f"Erro ao compilar registro de skills: {e}")
+
+    # 1a. SESSÕES: telegram_id -> jogador em memória antes do 1º update
+    try:
+        from modules import sessions
+        await run_db(sessions.warm_session_cache)
+    except Exception as e:
+        logger.error(f"Erro ao aquecer cache de sessões: {e}")
+
+    # 1b. MERCADO: IDs normalizados (migração idempotente) + índices de navegação
+    try:
+        from modules import market_manager
+        await run_db(market_manager.normalize_market_ids)
+        await run_db(market_manager.ensure_market_indexes)
+    except Exception as e:
+        logger.error(f"Erro ao preparar índices do mercado: {e}")
+
+    # 1b. PVP: pvp_points como int indexado + índice ELO em memória
+    try:
+        from pvp import matchmaking
+        await run_db(matchmaking.normalize_pvp_points)
+        await run_db(matchmaking.ensure_pvp_indexes)
+        await matchmaking.refresh(force=True)
+    except Exception as e:
+        logger.error(f"Erro ao preparar matchmaking PvP: {e}")
+
+    # 1c. BROADCASTS interrompidos pelo reinício: continua de onde parou
+    try:
+        from modules.broadcast import dispatcher
+        await run_db(dispatcher.ensure_broadcast_indexes)
+        resumed = await dispatcher.resume_pending_broadcasts(application.bot)
+        if resumed:
+            logger.info(f"📣 {resumed} broadcast(s) retomado(s).")
+    except Exception as e:
+        logger.error(f"Erro ao retomar broadcasts: {e}")
+
     # 2. MENSAGEM DE BOAS-VINDAS AO ADMIN
     if ADMIN_ID:
         try:
@@ -104,9 +167,43 @@ def setup_scheduler(application: Application):
     # -------------------------------------------------------------------------
     # WATCHDOGS contínuos
     # -------------------------------------------------------------------------
-    jq.run_repeating(check_premium_expiry_job, interval=60, first=10, name="premium_watchdog")
+    # Premium: job one-shot por expiração (heap) + varredura indexada como rede de segurança
+    try:
+        from modules.player import premium_expiry
+        from handlers.jobs import notify_premium_expired
+        premium_expiry.ensure_premium_indexes()
+        premium_expiry.attach(jq, notify_premium_expired)
+    except Exception as e:
+        logger.warning(f"⚠️ [SCHEDULER] Agendador de expiração premium: {e}")
+    jq.run_repeating(check_premium_expiry_job, interval=600, first=10, name="premium_watchdog")
     jq.run_repeating(regenerate_energy_job, interval=60, first=5, name="energy_regen")
 
+    # Barramento de invalidação do cache (web app -> bot)
+    try:
+        from modules.player.core import ensure_invalidation_indexes
+        ensure_invalidation_indexes()
+    except Exception as e:
+        logger.warning(f"⚠️ [SCHEDULER] Índice de invalidação do cache: {e}")
+    jq.run_repeating(player_cache_invalidation_job, interval=2, first=2, name="player_cache_invalidation")
+
+    # Presença: last_seen anotado em memória e gravado em lote
+    from modules.player import presence
+    try:
+        presence.ensure_presence_indexes()
+    except Exception as e:
+        logger.warning(f"⚠️ [SCHEDULER] Índice de presença: {e}")
+    jq.run_repeating(
+        presence_flush_job, interval=presence.PRESENCE_FLUSH_SECONDS,
+        first=presence.PRESENCE_FLUSH_SECONDS, name="presence_flush",
+    )
+
+    # Updates concorrentes: fila, em execução e latência por handler no log
+    from modules import update_processing
+    jq.run_repeating(
+        update_metrics_job, interval=update_processing.UPDATE_METRICS_SECONDS,
+        first=update_processing.UPDATE_METRICS_SECONDS, name="update_metrics",
+    )
+
     # -------------------------------------------------------------------------
     # JOBS diários (meia-noite)
     # -------------------------------------------------------------------------
@@ -184,7 +281,13 @@ def setup_scheduler(application: Application):
     if WORLD_BOSS_TIMES:
         for i, (sh, sm, eh, em) in enumerate(WORLD_BOSS_TIMES):
             try:
-                jq.run_daily(start_world_boss_job, time=dt_time(hour=sh, minute=sm, tzinfo=tz), name=f"start_boss_{i}")
+                duration = (eh * 60 + em) - (sh * 60 + sm)
+                if duration <= 0:
+                    duration += 1440
+                jq.run_daily(
+                    start_world_boss_job, time=dt_time(hour=sh, minute=sm, tzinfo=tz),
+                    name=f"start_boss_{i}", data={"duration_minutes": duration},
+                )
                 jq.run_daily(end_world_boss_job, time=dt_time(hour=eh, minute=em, tzinfo=tz), name=f"end_boss_{i}")
             except Exception as e:
                 logger.warning(f"⚠️ Falha ao agendar WorldBoss {i}: {e}")
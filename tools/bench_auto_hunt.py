@@ -0,0 +1,125 @@
+# tools/bench_auto_hunt.py
+# Auto-caçada: laço antigo (uma luta por vez) x resolução em lote
+# (modules/auto_hunt_resolver.py).
+#
+# 1. Equivalência ESTATÍSTICA: repete as duas versões muitas vezes e compara
+#    a distribuição de vitórias, XP, ouro e de cada item (média por teste z,
+#    variância por razão e forma pela estatística KS de duas amostras).
+# 2. Benchmark por caçada para N = 10, 100, 10.000.
+#
+# Uso: python tools/bench_auto_hunt.py [--trials 3000] [--seed 1]
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.auto_hunt_resolver import resolve_hunts, resolve_hunts_loop, scale_monster_stats
+
+PLAYER_LEVEL = 30
+PLAYER = {"max_hp": 420, "attack": 38}
+TEMPLATES = [
+    {"id": "lobo", "name": "Lobo", "max_hp": 60, "attack": 6, "xp_reward": 8, "gold_drop": 3, "min_level": 20,
+     "loot_table": [{"item_id": "pele_de_lobo", "drop_chance": 35, "min": 1, "max": 3},
+                    {"item_id": "presa", "drop_chance": 8}]},
+    {"id": "golem", "name": "Golem", "max_hp": 150, "attack": 12, "xp_reward": 40, "gold_drop": 20, "min_level": 25,
+     "loot_table": [{"item_id": "nucleo", "drop_chance": 100, "min": 1, "max": 1}]},
+    {"id": "slime", "name": "Slime", "hp": 25, "attack": 2, "xp_reward": 3, "min_level": 1,
+     "loot_table": [{"base_id": "gosma", "drop_chance": 60, "min": 2, "max": 40},
+                    {"item_id": "gema", "drop_chance": 0.5}]},
+    {"id": "dragao", "name": "Dragão", "max_hp": 5000, "attack": 300, "xp_reward": 500, "min_level": 30,
+     "loot_table": [{"item_id": "escama", "drop_chance": 100}]},
+]
+MONSTERS = [scale_monster_stats(t, PLAYER_LEVEL) for t in TEMPLATES]
+ITEMS = ["pele_de_lobo", "presa", "nucleo", "gosma", "gema", "escama"]
+
+
+def _metrics(summary: dict) -> dict:
+    row = {"wins": summary["wins"], "xp": summary["xp"], "gold": summary["gold"]}
+    for item in ITEMS:
+        row[item] = summary["items"].get(item, 0)
+    return row
+
+
+def _mean_var(xs):
+    mu = sum(xs) / len(xs)
+    return mu, sum((x - mu) ** 2 for x in xs) / max(1, len(xs) - 1)
+
+
+def _ks(a, b) -> float:
+    a, b = sorted(a), sorted(b)
+    i = j = 0
+    d = 0.0
+    while i < len(a) and j < len(b):
+        x = min(a[i], b[j])
+        while i < len(a) and a[i] == x:
+            i += 1
+        while j < len(b) and b[j] == x:
+            j += 1
+        d = max(d, abs(i / len(a) - j / len(b)))
+    return d
+
+
+def check_equivalence(n: int, trials: int, seed: int) -> bool:
+    rng_old, rng_new = random.Random(seed), random.Random(seed + 1)
+    old = [_metrics(resolve_hunts_loop(PLAYER, MONSTERS, n, rng_old)) for _ in range(trials)]
+    new = [_metrics(resolve_hunts(PLAYER, MONSTERS, n, rng_new)) for _ in range(trials)]
+
+    # Limites generosos o bastante para ~20 comparações (falso alarme ~0.1%)
+    ks_crit = 1.95 * math.sqrt(2.0 / trials)
+    ok = True
+    print(f"\n📐 Equivalência | N={n} | {trials} repetições por versão")
+    print(f"{'métrica':<14} {'média ant.':>11} {'média lote':>11} {'z':>6} {'var ratio':>10} {'KS':>7}")
+    for key in old[0]:
+        a = [r[key] for r in old]
+        b = [r[key] for r in new]
+        (ma, va), (mb, vb) = _mean_var(a), _mean_var(b)
+        se = math.sqrt(va / trials + vb / trials)
+        z = (mb - ma) / se if se else 0.0
+        ratio = (vb / va) if va else (1.0 if not vb else float("inf"))
+        ks = _ks(a, b)
+        bad = abs(z) > 4.0 or ks > ks_crit or (va and not 0.8 <= ratio <= 1.25) or (not va and vb)
+        ok = ok and not bad
+        print(f"{key:<14} {ma:11.2f} {mb:11.2f} {z:6.2f} {ratio:10.3f} {ks:7.4f}{'  ❌' if bad else ''}")
+    return ok
+
+
+def bench(n: int) -> tuple:
+    rounds = max(3, 20000 // n)
+    rng = random.Random(5)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        resolve_hunts_loop(PLAYER, MONSTERS, n, rng)
+    old = (time.perf_counter() - t0) / rounds * 1e6
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        resolve_hunts(PLAYER, MONSTERS, n, rng)
+    new = (time.perf_counter() - t0) / rounds * 1e6
+    return old, new
+
+
+def run(trials: int, seed: int) -> None:
+    ok = all([check_equivalence(n, trials, seed + n) for n in (10, 100)])
+
+    print("\n⏱️ Tempo por caçada")
+    print(f"{'N':>7} {'laço (µs)':>12} {'lote (µs)':>12} {'speedup':>9}")
+    for n in (10, 100, 10000):
+        old, new = bench(n)
+        print(f"{n:7d} {old:12.1f} {new:12.1f} {old / max(new, 1e-9):8.1f}x")
+
+    if not ok:
+        print("\n❌ Distribuições diferentes entre o laço e o lote!")
+        sys.exit(1)
+    print("\n✅ Mesma distribuição (vitórias, XP, ouro e loot).")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trials", type=int, default=3000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    run(args.trials, args.seed)
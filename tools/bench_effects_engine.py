@@ -0,0 +1,377 @@
+# tools/bench_effects_engine.py
+# Turno de um boss de raide com 50 efeitos ativos: engine antigo x
+# armazenamento compacto (modules/effects/engine.py + models.EffectSet).
+#   - ANTIGO: toda chamada (can_act, get_modifiers, dispatch, tick_turn)
+#             converte a lista de dicts em dataclasses e o save serializa de
+#             volta com to_dict(); cada instância nova gera um uuid4 e
+#             containers próprios de tags/rules/meta
+#   - NOVO:   registros com __slots__ num EffectSet, templates internados e
+#             agregado de modifiers em cache; dicts só na borda (serialize_effects)
+#
+# 1. Equivalência: mesmo roteiro (ticks, golpes, curas, efeitos novos,
+#    expirações, dispel) nos dois engines -> mesmo HP, mesmas mensagens e
+#    mesma lista serializada (sem o uid, que é gerado de forma diferente).
+# 2. Benchmark: turno do boss = tick_turn + can_act + N golpes (dispatch
+#    on_before_damage no boss) + 1 efeito reaplicado.
+#
+# Uso: python tools/bench_effects_engine.py [--turns 2000] [--hits 4]
+
+import argparse
+import copy
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.effects import engine
+from modules.effects.models import EVENT_ON_BEFORE_DAMAGE, EVENT_ON_HEAL, CombatContext
+from modules.effects.registry import (
+    MOD_CANNOT_ACT, MOD_DAMAGE_DEALT_MULT, MOD_DAMAGE_TAKEN_MULT, MOD_HEAL_RECEIVED_MULT,
+    MOD_SHIELD_FLAT, TICK_DAMAGE, TICK_HEAL, get_effect_template,
+)
+
+EFFECTS_KEY = engine.EFFECTS_KEY
+
+
+# ==============================================================================
+# REFERÊNCIA: engine antigo (dataclass + converte/serializa a cada chamada)
+# ==============================================================================
+@dataclass
+class LegacyInstance:
+    effect_id: str
+    kind: str
+    uid: str = field(default_factory=lambda: uuid4().hex)
+    source_id: Optional[str] = None
+    source_type: Optional[str] = None
+    duration_kind: str = "turns"
+    remaining: int = 0
+    permanent: bool = False
+    stacks: int = 1
+    potency: float = 1.0
+    dispellable: bool = True
+    tags: List[str] = field(default_factory=list)
+    rules: Dict[str, Any] = field(default_factory=dict)
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def is_expired(self) -> bool:
+        return False if self.permanent else self.remaining <= 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "effect_id": self.effect_id, "kind": self.kind, "uid": self.uid,
+            "source_id": self.source_id, "source_type": self.source_type,
+            "duration_kind": self.duration_kind, "remaining": self.remaining,
+            "permanent": self.permanent, "stacks": self.stacks, "potency": self.potency,
+            "dispellable": self.dispellable, "tags": list(self.tags),
+            "rules": dict(self.rules), "meta": dict(self.meta),
+        }
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any]) -> "LegacyInstance":
+        return LegacyInstance(
+            effect_id=str(d.get("effect_id", "")), kind=d.get("kind", "buff"),
+            uid=str(d.get("uid") or uuid4().hex), source_id=d.get("source_id"),
+            source_type=d.get("source_type"), duration_kind=d.get("duration_kind", "turns"),
+            remaining=int(d.get("remaining", 0)), permanent=bool(d.get("permanent", False)),
+            stacks=int(d.get("stacks", 1)), potency=float(d.get("potency", 1.0)),
+            dispellable=bool(d.get("dispellable", True)), tags=list(d.get("tags", []) or []),
+            rules=dict(d.get("rules", {}) or {}), meta=dict(d.get("meta", {}) or {}),
+        )
+
+
+class legacy:
+    @staticmethod
+    def ensure(entity):
+        raw = entity.get(EFFECTS_KEY)
+        if not raw:
+            entity[EFFECTS_KEY] = []
+            return []
+        out = [LegacyInstance.from_dict(it) for it in raw if isinstance(it, dict)]
+        entity[EFFECTS_KEY] = [e.to_dict() for e in out]
+        return out
+
+    @staticmethod
+    def save(entity, effects):
+        entity[EFFECTS_KEY] = [e.to_dict() for e in effects]
+
+    @staticmethod
+    def get_modifiers(entity):
+        out = {}
+        for e in sorted(legacy.ensure(entity), key=lambda e: int((e.rules or {}).get("priority", 100))):
+            tpl = get_effect_template(e.effect_id)
+            if not tpl:
+                continue
+            for k, v in (tpl.modifiers or {}).items():
+                if k in (MOD_DAMAGE_DEALT_MULT, MOD_DAMAGE_TAKEN_MULT, MOD_HEAL_RECEIVED_MULT):
+                    out[k] = float(out.get(k, 0.0)) + float(v)
+                elif k == MOD_CANNOT_ACT:
+                    if bool(v):
+                        out[k] = True
+                elif k == MOD_SHIELD_FLAT:
+                    out[k] = True
+                else:
+                    out[k] = v
+        return out
+
+    @staticmethod
+    def can_act(entity):
+        return not bool(legacy.get_modifiers(entity).get(MOD_CANNOT_ACT))
+
+    @staticmethod
+    def shield(target, damage):
+        if damage <= 0:
+            return 0
+        effects = legacy.ensure(target)
+        changed = False
+        for e in effects:
+            if e.effect_id != "shield":
+                continue
+            val = int(e.meta.get("shield_value", 0))
+            if val <= 0:
+                continue
+            absorbed = min(val, damage)
+            val -= absorbed
+            damage -= absorbed
+            e.meta["shield_value"] = val
+            changed = True
+            if val <= 0:
+                e.remaining = 0
+            if damage <= 0:
+                break
+        if changed:
+            legacy.save(target, effects)
+        return damage
+
+    @staticmethod
+    def dispatch(event, ctx):
+        if event == EVENT_ON_BEFORE_DAMAGE:
+            dmg = int(ctx.damage)
+            d = float(legacy.get_modifiers(ctx.source).get(MOD_DAMAGE_DEALT_MULT, 0.0))
+            if d != 0.0:
+                dmg = int(round(dmg * (1.0 + d)))
+            t = float(legacy.get_modifiers(ctx.target).get(MOD_DAMAGE_TAKEN_MULT, 0.0))
+            if t != 0.0:
+                dmg = int(round(dmg * (1.0 + t)))
+            ctx.damage = max(0, int(legacy.shield(ctx.target, dmg)))
+        elif event == EVENT_ON_HEAL:
+            heal = int(ctx.heal)
+            h = float(legacy.get_modifiers(ctx.target).get(MOD_HEAL_RECEIVED_MULT, 0.0))
+            if h != 0.0:
+                heal = int(round(heal * (1.0 + h)))
+            ctx.heal = max(0, int(heal))
+
+    @staticmethod
+    def apply_effect(target, effect_id, *, duration_turns=0, stacks=1, potency=1.0, meta=None, source_id=None):
+        tpl = get_effect_template(effect_id)
+        effects = legacy.ensure(target)
+        existing = [e for e in effects if e.effect_id == effect_id]
+        if existing:
+            e = existing[0]
+            max_stacks = max(1, int(tpl.max_stacks or 1))
+            if e.stacks < max_stacks:
+                e.stacks = min(max_stacks, e.stacks + int(stacks))
+            e.potency = max(float(e.potency), float(potency))
+            if not e.permanent:
+                e.remaining = max(e.remaining, int(duration_turns))
+            e.dispellable = tpl.dispellable
+            if meta:
+                e.meta.update(meta)
+        else:
+            inst = LegacyInstance(
+                effect_id=tpl.effect_id, kind=tpl.kind, source_id=source_id, source_type="skill",
+                remaining=int(duration_turns), stacks=max(1, int(stacks)), potency=float(potency),
+                dispellable=tpl.dispellable, tags=list(tpl.tags or []),
+                rules={"max_stacks": int(tpl.max_stacks or 1), "stack_mode": tpl.stack_mode or "refresh_duration",
+                       "exclusive_group": tpl.exclusive_group, "priority": int(tpl.priority or 100)},
+                meta=dict(meta or {}),
+            )
+            if tpl.effect_id == "shield":
+                inst.meta["shield_value"] = int(round(float(potency)))
+            effects.append(inst)
+        legacy.save(target, effects)
+
+    @staticmethod
+    def tick_turn(entity, battle, *, apply_to_hp_key="hp"):
+        msgs = []
+        effects = legacy.ensure(entity)
+        if not effects:
+            return msgs
+        for e in list(effects):
+            if e.is_expired():
+                continue
+            tpl = get_effect_template(e.effect_id)
+            if not tpl or not tpl.tick:
+                continue
+            td = tpl.tick.get(TICK_DAMAGE)
+            if td and td.get("at") == "on_turn_start":
+                dot_tick = e.meta.get("dot_tick")
+                if dot_tick is not None:
+                    dmg = int(dot_tick) * max(1, int(e.stacks))
+                else:
+                    dmg = int(round((int(td.get("base", 0)) + int(td.get("per_stack", 0)) * max(0, e.stacks)) * float(e.potency)))
+                if dmg > 0:
+                    ctx = CombatContext(event=EVENT_ON_BEFORE_DAMAGE, source=entity, target=entity, battle=battle, damage=dmg)
+                    legacy.dispatch(EVENT_ON_BEFORE_DAMAGE, ctx)
+                    final = int(ctx.damage)
+                    entity[apply_to_hp_key] = max(0, int(entity.get(apply_to_hp_key, 0)) - final)
+                    if final > 0:
+                        msgs.append(f"⛔ {tpl.name}: -{final} HP")
+            th = tpl.tick.get(TICK_HEAL)
+            if th and th.get("at") == "on_turn_start":
+                heal = int(round((int(th.get("base", 0)) + int(th.get("per_stack", 0)) * max(0, e.stacks)) * float(e.potency)))
+                if heal > 0:
+                    ctx = CombatContext(event=EVENT_ON_HEAL, source=entity, target=entity, battle=battle, heal=heal)
+                    legacy.dispatch(EVENT_ON_HEAL, ctx)
+                    final = int(ctx.heal)
+                    hp = int(entity.get(apply_to_hp_key, 0))
+                    max_hp = int(entity.get("hp_max", entity.get("max_hp", 0)) or 0)
+                    entity[apply_to_hp_key] = min(max_hp, hp + final) if max_hp > 0 else hp + final
+                    if final > 0:
+                        msgs.append(f"✅ {tpl.name}: +{final} HP")
+        for e in effects:
+            if not e.permanent and e.duration_kind == "turns":
+                e.remaining -= 1
+        kept = []
+        for e in effects:
+            if e.is_expired():
+                tpl = get_effect_template(e.effect_id)
+                msgs.append(f"⌛ {tpl.name if tpl else e.effect_id} terminou")
+            else:
+                kept.append(e)
+        legacy.save(entity, kept)
+        return msgs
+
+
+# ==============================================================================
+# CENÁRIO: boss de raide com 50 efeitos (um por jogador/fonte)
+# ==============================================================================
+_MIX = ("bleed", "poison", "poison", "bleed", "regen", "heal_reduction", "poison", "bleed", "regen", "poison")
+
+
+def make_boss(n_effects: int = 50, *, long_lived: bool = False) -> Dict[str, Any]:
+    boss = {"name": "Boss da Raide", "hp": 10**9, "max_hp": 10**9, "hp_max": 10**9, EFFECTS_KEY: []}
+    for i in range(n_effects):
+        eid = _MIX[i % len(_MIX)]
+        tpl = get_effect_template(eid)
+        meta = {"dot_tick": 5 + i} if eid in ("bleed", "poison") and i % 3 else {}
+        boss[EFFECTS_KEY].append(LegacyInstance(
+            effect_id=eid, kind=tpl.kind, uid=f"fx{i}", source_id=f"p{i}", source_type="skill",
+            remaining=10**9 if long_lived else 2 + i % 7, stacks=1 + i % 4, potency=1.0 + (i % 5) / 10,
+            dispellable=True, tags=list(tpl.tags),
+            rules={"max_stacks": int(tpl.max_stacks or 1), "stack_mode": tpl.stack_mode,
+                   "exclusive_group": tpl.exclusive_group, "priority": int(tpl.priority or 100)},
+            meta=meta,
+        ).to_dict())
+    return boss
+
+
+def _no_uid(effects) -> List[Dict[str, Any]]:
+    return [{k: v for k, v in d.items() if k != "uid"} for d in copy.deepcopy(effects)]
+
+
+# ==============================================================================
+# 1. EQUIVALÊNCIA
+# ==============================================================================
+def _script(api, boss, player, turns: int):
+    out = []
+    for t in range(turns):
+        out.append(api.tick_turn(boss, {}, apply_to_hp_key="hp"))
+        out.append(api.can_act(boss))
+        for hit in (100, 250, 7):
+            ctx = CombatContext(event=EVENT_ON_BEFORE_DAMAGE, source=player, target=boss, battle={}, damage=hit)
+            api.dispatch(EVENT_ON_BEFORE_DAMAGE, ctx)
+            out.append(ctx.damage)
+        # golpe do boss no jogador com escudo
+        ctx = CombatContext(event=EVENT_ON_BEFORE_DAMAGE, source=boss, target=player, battle={}, damage=90)
+        api.dispatch(EVENT_ON_BEFORE_DAMAGE, ctx)
+        out.append(ctx.damage)
+        ctx = CombatContext(event=EVENT_ON_HEAL, source=boss, target=boss, battle={}, heal=500)
+        api.dispatch(EVENT_ON_HEAL, ctx)
+        out.append(ctx.heal)
+        if t % 3 == 0:
+            api.apply_effect(boss, "poison", duration_turns=3, stacks=2, meta={"dot_tick": 11}, source_id="px")
+        if t % 4 == 1:
+            api.apply_effect(boss, "stun", duration_turns=1, source_id="py")
+        if t % 5 == 2:
+            api.apply_effect(boss, "heal_reduction", duration_turns=2, potency=0.3, source_id="pz")
+        out.append(boss["hp"])
+        out.append(sorted(api.get_modifiers(boss).items()))
+    return out
+
+
+class _new:
+    tick_turn = staticmethod(engine.tick_turn)
+    can_act = staticmethod(engine.can_act)
+    dispatch = staticmethod(engine.dispatch)
+    get_modifiers = staticmethod(engine.get_modifiers)
+
+    @staticmethod
+    def apply_effect(target, effect_id, **kw):
+        engine.apply_effect(target, effect_id, source_type="skill", **kw)
+
+
+def check_equivalence(turns: int = 12) -> int:
+    old_boss, new_boss = make_boss(), make_boss()
+    old_player = {"hp": 1000, EFFECTS_KEY: []}
+    new_player = {"hp": 1000, EFFECTS_KEY: []}
+    legacy.apply_effect(old_player, "shield", duration_turns=50, potency=400)
+    engine.apply_effect(new_player, "shield", duration_turns=50, potency=400, source_type="skill")
+
+    old = _script(legacy, old_boss, old_player, turns)
+    new = _script(_new, new_boss, new_player, turns)
+    assert old == new, "resultado do roteiro divergiu"
+
+    engine.serialize_effects(new_boss)
+    engine.serialize_effects(new_player)
+    assert type(new_boss[EFFECTS_KEY]) is list
+    assert _no_uid(old_boss[EFFECTS_KEY]) == _no_uid(new_boss[EFFECTS_KEY])
+    assert _no_uid(old_player[EFFECTS_KEY]) == _no_uid(new_player[EFFECTS_KEY])
+
+    # dispel e cópias continuam no formato persistido
+    assert engine.dispel(new_boss, tags=["poison"]) > 0
+    assert type(copy.deepcopy(new_boss)[EFFECTS_KEY]) is list
+    return len(old)
+
+
+# ==============================================================================
+# 2. BENCHMARK
+# ==============================================================================
+def _turns(api, turns: int, hits: int) -> float:
+    boss = make_boss(long_lived=True)
+    player = {"hp": 10**9, EFFECTS_KEY: []}
+    t0 = time.perf_counter()
+    for _ in range(turns):
+        api.tick_turn(boss, {}, apply_to_hp_key="hp")
+        api.can_act(boss)
+        for _ in range(hits):
+            ctx = CombatContext(event=EVENT_ON_BEFORE_DAMAGE, source=player, target=boss, battle={}, damage=100)
+            api.dispatch(EVENT_ON_BEFORE_DAMAGE, ctx)
+        api.apply_effect(boss, "bleed", duration_turns=3, stacks=1, source_id="p0")
+    wall = time.perf_counter() - t0
+    assert len(boss[EFFECTS_KEY]) == 50
+    return wall
+
+
+def run(turns: int, hits: int) -> None:
+    checked = check_equivalence()
+    print(f"✅ Equivalência: {checked} resultados do roteiro idênticos (HP, mensagens, modifiers, lista serializada).\n")
+
+    old = _turns(legacy, turns, hits)
+    new = _turns(_new, turns, hits)
+    print(f"🐉 Turno do boss de raide | 50 efeitos | tick + can_act + {hits} golpes + 1 reaplicação | {turns} turnos")
+    print(f"{'modo':<10} {'µs/turno':>10} {'turnos/s':>10}")
+    for name, wall in (("antigo", old), ("novo", new)):
+        print(f"{name:<10} {wall / turns * 1e6:10.1f} {turns / wall:10,.0f}")
+    print(f"speedup: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--turns", type=int, default=2000)
+    ap.add_argument("--hits", type=int, default=4)
+    args = ap.parse_args()
+    run(args.turns, args.hits)
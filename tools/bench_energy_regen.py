@@ -0,0 +1,96 @@
+# tools/bench_energy_regen.py
+# Benchmark do regen de energia com 100k jogadores sintéticos:
+#   - ANTIGO: lê todos os documentos + 1 update_one por jogador abaixo do máximo
+#   - NOVO:   1 update_many com pipeline (build_energy_regen_update)
+#
+# Precisa de um Mongo DESCARTÁVEL (nunca aponte para produção!):
+#   BENCH_MONGO_URI=mongodb://localhost:27017 python tools/bench_energy_regen.py [--players 100000]
+# Usa o banco "eldora_bench" e apaga a coleção no final.
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient, InsertOne
+
+from modules.player.actions import build_energy_regen_update, get_player_max_energy
+from modules.player.premium import PremiumManager
+
+BENCH_URI = os.environ.get("BENCH_MONGO_URI", "mongodb://localhost:27017")
+TIERS = ["free"] * 8 + ["premium", "vip", "lenda"]
+
+
+def _inventory(n: int) -> dict:
+    # Documentos "de verdade" têm inventário; é isso que o loop antigo lia
+    return {f"item_{i}": {"base_id": f"item_{i}", "qty": i} for i in range(n)}
+
+
+def seed(col, n: int) -> None:
+    col.drop()
+    now = datetime.now(timezone.utc)
+    ops = []
+    for i in range(n):
+        tier = random.choice(TIERS)
+        exp = None
+        if tier != "free":
+            exp = (now + timedelta(days=random.choice([-3, 10, 30]))).isoformat()
+        ops.append(InsertOne({
+            "character_name": f"bench_{i}",
+            "premium_tier": tier,
+            "premium_expires_at": exp,
+            "energy": random.randint(0, 30),
+            "inventory": _inventory(40),
+        }))
+        if len(ops) >= 5000:
+            col.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        col.bulk_write(ops, ordered=False)
+
+
+def old_tick(col, regenerate_non_premium: bool) -> int:
+    writes = 0
+    for pdata in col.find({}):
+        max_e = int(get_player_max_energy(pdata))
+        if int(pdata.get("energy", 0)) >= max_e:
+            continue
+        if PremiumManager(pdata).is_premium() or regenerate_non_premium:
+            col.update_one({"_id": pdata["_id"]}, {"$inc": {"energy": 1}})
+            writes += 1
+    return writes
+
+
+def new_tick(col, regenerate_non_premium: bool) -> int:
+    flt, pipeline = build_energy_regen_update(regenerate_non_premium)
+    return col.update_many(flt, pipeline).modified_count
+
+
+def run(n: int) -> None:
+    client = MongoClient(BENCH_URI)
+    col = client["eldora_bench"]["energy_regen"]
+
+    print(f"⚡ Regen de energia | {n} jogadores | {BENCH_URI}\n")
+    results = {}
+    for label, fn in (("antigo (loop)", old_tick), ("novo (pipeline)", new_tick)):
+        seed(col, n)
+        t0 = time.perf_counter()
+        writes = fn(col, True)
+        elapsed = time.perf_counter() - t0
+        results[label] = elapsed
+        print(f"{label:<18} {elapsed:8.2f}s  | {writes} jogadores regenerados")
+
+    col.drop()
+    old_s, new_s = results["antigo (loop)"], results["novo (pipeline)"]
+    print(f"\n✅ Speedup: {old_s / max(new_s, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=100_000)
+    args = ap.parse_args()
+    run(args.players)
@@ -0,0 +1,123 @@
+# tools/bench_market_contention.py
+# Stress de concorrência no mercado: MUITOS compradores atacando UM anúncio.
+#   - ANTIGO: ler anúncio -> ler comprador -> gravar comprador -> gravar
+#             anúncio -> ler vendedor -> gravar vendedor (passos soltos)
+#   - NOVO:   market_manager.purchase_listing (reserva atômica + $inc)
+#
+# Confere: unidades vendidas x estoque (oversell), ouro total conservado e
+# itens entregues. Precisa de um Mongo DESCARTÁVEL (nunca aponte para produção!):
+#   BENCH_MONGO_URI=mongodb://localhost:27017 python tools/bench_market_contention.py [--buyers 200] [--stock 50]
+# Usa o banco "eldora_bench" e apaga as coleções no final.
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+
+from modules import market_manager
+from modules.database import run_db
+from modules.player import core as player_core
+
+BENCH_URI = os.environ.get("BENCH_MONGO_URI", "mongodb://localhost:27017")
+PRICE = 100
+BASE_ID = "minerio_de_ferro"
+
+
+def seed(bdb, buyers: int, stock: int):
+    bdb["users"].drop()
+    bdb["market_listings"].drop()
+    seller = bdb["users"].insert_one({"character_name": "vendedor", "gold": 0, "inventory": {}}).inserted_id
+    buyer_ids = bdb["users"].insert_many([
+        {"character_name": f"comprador_{i}", "gold": PRICE * 3, "inventory": {}} for i in range(buyers)
+    ]).inserted_ids
+    bdb["market_listings"].insert_one({
+        "id": 1, "seller_id": str(seller), "item": {"type": "stack", "base_id": BASE_ID, "qty": 1},
+        "unit_price": PRICE, "quantity": stock, "active": True, "target_buyer_id": None,
+    })
+    return str(seller), [str(b) for b in buyer_ids]
+
+
+async def legacy_purchase(bdb, buyer_id: str):
+    """Reprodução do fluxo antigo, passo a passo (cada passo = 1 ida ao banco)."""
+    from bson import ObjectId
+    users, listings = bdb["users"], bdb["market_listings"]
+
+    listing = await run_db(listings.find_one, {"id": 1})
+    if not listing.get("active") or listing["quantity"] < 1:
+        raise ValueError("esgotado")
+    buyer = await run_db(users.find_one, {"_id": ObjectId(buyer_id)})
+    if buyer["gold"] < PRICE:
+        raise ValueError("saldo")
+    inv = buyer.get("inventory", {})
+    inv[BASE_ID] = inv.get(BASE_ID, 0) + 1
+    await run_db(users.update_one, {"_id": buyer["_id"]}, {"$set": {"gold": buyer["gold"] - PRICE, "inventory": inv}})
+    new_qty = listing["quantity"] - 1
+    await run_db(listings.update_one, {"_id": listing["_id"]}, {"$set": {"quantity": new_qty, "active": new_qty > 0}})
+    seller = await run_db(users.find_one, {"_id": ObjectId(listing["seller_id"])})
+    await run_db(users.update_one, {"_id": seller["_id"]}, {"$set": {"gold": seller["gold"] + PRICE}})
+
+
+async def atomic_purchase(bdb, buyer_id: str):
+    await market_manager.purchase_listing(buyer_id=buyer_id, listing_id=1, quantity=1)
+
+
+async def hammer(fn, bdb, buyer_ids):
+    results = await asyncio.gather(*(fn(bdb, b) for b in buyer_ids), return_exceptions=True)
+    return sum(1 for r in results if not isinstance(r, BaseException))
+
+
+def audit(bdb, buyers: int, stock: int) -> dict:
+    docs = list(bdb["users"].find({}, {"gold": 1, "inventory": 1}))
+    gold = sum(int(d.get("gold", 0)) for d in docs)
+    delivered = sum(int((d.get("inventory") or {}).get(BASE_ID, 0)) for d in docs)
+    listing = bdb["market_listings"].find_one({"id": 1})
+    return {
+        "delivered": delivered,
+        "oversold": max(0, delivered - stock),
+        "gold_drift": gold - buyers * PRICE * 3,
+        "left": listing["quantity"],
+    }
+
+
+def run(buyers: int, stock: int) -> None:
+    client = MongoClient(BENCH_URI)
+    bdb = client["eldora_bench"]
+
+    # Aponta o mercado e o core para o banco de bench
+    market_manager.market_col = bdb["market_listings"]
+    market_manager.db = bdb
+    player_core.users_collection = bdb["users"]
+
+    print(f"🛒 Contenção no mercado | {buyers} compradores x 1 anúncio ({stock} un.) | {BENCH_URI}\n")
+    print(f"{'fluxo':<10} {'tempo':>8} {'ok':>5} {'entregues':>10} {'oversell':>9} {'ouro Δ':>8} {'sobra':>6}")
+    failed = False
+    for label, fn in (("antigo", legacy_purchase), ("atômico", atomic_purchase)):
+        _, buyer_ids = seed(bdb, buyers, stock)
+        player_core.clear_all_player_cache()
+        t0 = time.perf_counter()
+        ok = asyncio.run(hammer(fn, bdb, buyer_ids))
+        elapsed = time.perf_counter() - t0
+        a = audit(bdb, buyers, stock)
+        print(f"{label:<10} {elapsed:7.2f}s {ok:5d} {a['delivered']:10d} {a['oversold']:9d} {a['gold_drift']:8d} {a['left']:6d}")
+        if label == "atômico" and (a["oversold"] or a["gold_drift"] or a["delivered"] + a["left"] != stock):
+            failed = True
+
+    bdb["users"].drop()
+    bdb["market_listings"].drop()
+    if failed:
+        print("\n❌ Fluxo atômico vendeu além do estoque ou perdeu/criou ouro!")
+        sys.exit(1)
+    print("\n✅ Fluxo atômico: sem oversell, ouro conservado.")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--buyers", type=int, default=200)
+    ap.add_argument("--stock", type=int, default=50)
+    args = ap.parse_args()
+    run(args.buyers, args.stock)
@@ -0,0 +1,119 @@
+# tools/bench_mongo_startup.py
+# Startup e conexões abertas com o Mongo:
+#   - ANTIGO: cada módulo (core, database, sessions, clãs, mercado, mercado de
+#             gemas, jobs, auth) criava o PRÓPRIO MongoClient no import, e
+#             alguns já faziam create_index/ping ali (round-trip bloqueante)
+#   - NOVO:   modules.database.create_client uma vez (connect=False); todos
+#             usam get_db() e o pool só abre na primeira operação
+#
+# Mede o tempo até "módulos importados" e, depois de uma rajada de operações
+# em paralelo (--ops, --concurrency), quantas conexões cada modo abriu.
+# Precisa de um Mongo acessível (use um descartável):
+#   BENCH_MONGO_URI=mongodb://localhost:27017 python tools/bench_mongo_startup.py [--ops 2000] [--concurrency 32]
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient, monitoring
+
+from modules import database
+
+BENCH_URI = os.environ.get("BENCH_MONGO_URI", "mongodb://localhost:27017")
+BENCH_DB = "eldora_bench"
+# Um cliente por módulo que tinha conexão própria; True = fazia round-trip no import
+LEGACY_MODULES = {
+    "player.core": True,
+    "database": True,
+    "sessions": False,
+    "clan_manager": True,
+    "gem_market_manager": True,
+    "market_manager": False,
+    "jobs": False,
+    "auth_handler": False,
+}
+
+
+class ConnectionCounter(monitoring.ConnectionPoolListener):
+    def __init__(self) -> None:
+        self.created = 0
+
+    def connection_created(self, event) -> None:
+        self.created += 1
+
+    def pool_created(self, event) -> None: pass
+    def pool_ready(self, event) -> None: pass
+    def pool_cleared(self, event) -> None: pass
+    def pool_closed(self, event) -> None: pass
+    def connection_ready(self, event) -> None: pass
+    def connection_closed(self, event) -> None: pass
+    def connection_check_out_started(self, event) -> None: pass
+    def connection_check_out_failed(self, event) -> None: pass
+    def connection_checked_out(self, event) -> None: pass
+    def connection_checked_in(self, event) -> None: pass
+
+
+def _burst(collections, ops: int, concurrency: int) -> float:
+    """Leituras curtas espalhadas pelos 'módulos' (round-robin)."""
+    def one(i):
+        collections[i % len(collections)].find_one({"_id": i})
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(ops)))
+    return time.perf_counter() - t0
+
+
+def run_legacy(ops: int, concurrency: int):
+    counter = ConnectionCounter()
+    t0 = time.perf_counter()
+    clients = []
+    for name, touches_db in LEGACY_MODULES.items():
+        c = MongoClient(BENCH_URI, event_listeners=[counter])
+        if touches_db:
+            c[BENCH_DB].command("ping")
+        clients.append(c)
+    startup = time.perf_counter() - t0
+    at_startup = counter.created
+
+    burst = _burst([c[BENCH_DB]["bench_probe"] for c in clients], ops, concurrency)
+    for c in clients:
+        c.close()
+    return startup, at_startup, burst, counter.created
+
+
+def run_shared(ops: int, concurrency: int):
+    counter = ConnectionCounter()
+    t0 = time.perf_counter()
+    client = database.create_client(BENCH_URI, tlsCAFile=None, event_listeners=[counter])
+    bdb = client[BENCH_DB]
+    collections = [bdb["bench_probe"] for _ in LEGACY_MODULES]
+    startup = time.perf_counter() - t0
+    at_startup = counter.created
+
+    burst = _burst(collections, ops, concurrency)
+    client.close()
+    return startup, at_startup, burst, counter.created
+
+
+def run(ops: int, concurrency: int) -> None:
+    old = run_legacy(ops, concurrency)
+    new = run_shared(ops, concurrency)
+
+    print(f"🍃 Mongo | {len(LEGACY_MODULES)} módulos, {ops} operações, {concurrency} em paralelo\n")
+    print(f"{'modo':<24} {'startup ms':>11} {'conex. startup':>15} {'rajada ms':>10} {'conex. total':>13}")
+    for name, (startup, at_startup, burst, total) in (("antigo (1 cliente/mód.)", old),
+                                                       ("novo (cliente único)", new)):
+        print(f"{name:<24} {startup * 1000:11.1f} {at_startup:15d} {burst * 1000:10.1f} {total:13d}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ops", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=32)
+    args = ap.parse_args()
+    run(args.ops, args.concurrency)
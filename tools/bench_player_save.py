@@ -0,0 +1,120 @@
+# tools/bench_player_save.py
+# Benchmark: replace_one (documento inteiro) x update parcial ($set/$unset/$inc)
+# para um jogador com 500 itens no inventário.
+#
+# Não toca no banco real: usa uma coleção falsa que mede os bytes BSON
+# enviados e simula a latência de rede (RTT + bytes / banda).
+#
+# Uso: python tools/bench_player_save.py [--items 500] [--saves 200]
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bson
+
+from modules.player.changeset import take_snapshot, build_update
+
+RTT_MS = 40.0                 # ida e volta até o Atlas
+BANDWIDTH_BYTES_S = 2_000_000  # ~16 Mbit/s de upload efetivo
+
+
+class FakeCollection:
+    """Conta bytes e soma a latência simulada de cada escrita."""
+
+    def __init__(self):
+        self.bytes_sent = 0
+        self.simulated_s = 0.0
+        self.calls = 0
+
+    def _charge(self, *payloads):
+        size = sum(len(bson.encode(p)) for p in payloads)
+        self.bytes_sent += size
+        self.simulated_s += RTT_MS / 1000.0 + size / BANDWIDTH_BYTES_S
+        self.calls += 1
+
+    def replace_one(self, flt, doc, upsert=False):
+        self._charge(flt, doc)
+
+    def update_one(self, flt, update):
+        self._charge(flt, update)
+
+
+def make_player(n_items: int) -> dict:
+    inventory = {}
+    for i in range(n_items):
+        uid = uuid.uuid4().hex
+        inventory[uid] = {
+            "base_id": f"espada_{i % 37}",
+            "rarity": ["comum", "raro", "epico", "lendario"][i % 4],
+            "tier": 1 + i % 5,
+            "enchantments": {"attack": {"value": i % 13}, "luck": {"value": i % 7}},
+            "durability": [20, 20],
+            "sockets": [None, None],
+        }
+    inventory["pocao_cura_leve"] = 42
+    return {
+        "_id": "bench",
+        "character_name": "Bench",
+        "level": 50, "xp": 12345, "gold": 100000, "gems": 12,
+        "energy": 15, "max_energy": 20,
+        "inventory": inventory,
+        "equipment": {"arma": next(iter(inventory))},
+        "invested": {"attack": 10, "defense": 5},
+    }
+
+
+def mutate(pdata: dict, i: int) -> None:
+    # Mutação típica de um clique de combate/mercado
+    pdata["gold"] += 17
+    pdata["xp"] += 5
+    pdata["energy"] = max(0, pdata["energy"] - 1)
+    pdata["inventory"]["pocao_cura_leve"] -= 1
+    pdata["last_seen"] = f"2026-01-01T00:00:{i % 60:02d}+00:00"
+
+
+def run(n_items: int, saves: int) -> None:
+    base = make_player(n_items)
+
+    # --- Caminho antigo: replace_one sempre ---
+    col = FakeCollection()
+    pdata = take_snapshot(base)
+    t0 = time.perf_counter()
+    for i in range(saves):
+        mutate(pdata, i)
+        col.replace_one({"_id": pdata["_id"]}, pdata, upsert=True)
+    cpu_old = time.perf_counter() - t0
+    old = (col.bytes_sent, col.simulated_s, cpu_old)
+
+    # --- Caminho novo: diff contra a foto + update_one parcial ---
+    col = FakeCollection()
+    pdata = take_snapshot(base)
+    snapshot = take_snapshot(pdata)
+    t0 = time.perf_counter()
+    for i in range(saves):
+        mutate(pdata, i)
+        update = build_update(snapshot, pdata)
+        if update:
+            col.update_one({"_id": pdata["_id"]}, update)
+        snapshot = take_snapshot(pdata)
+    cpu_new = time.perf_counter() - t0
+    new = (col.bytes_sent, col.simulated_s, cpu_new)
+
+    print(f"📦 Jogador com {n_items} itens | {saves} saves\n")
+    print(f"{'modo':<12}{'bytes/save':>14}{'latência/save (ms)':>22}{'cpu/save (ms)':>16}")
+    for label, (b, sim, cpu) in (("replace_one", old), ("parcial", new)):
+        lat_ms = (sim + cpu) / saves * 1000
+        print(f"{label:<12}{b / saves:>14.0f}{lat_ms:>22.2f}{cpu / saves * 1000:>16.3f}")
+    print(f"\n✅ Redução de bytes: {old[0] / max(1, new[0]):.1f}x")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=500)
+    ap.add_argument("--saves", type=int, default=200)
+    args = ap.parse_args()
+    run(args.items, args.saves)
@@ -0,0 +1,122 @@
+# tools/bench_player_stats.py
+# Benchmark do cálculo de status com e sem as tabelas pré-compiladas
+# (modules/player/stats.py: compile_stat_tables / reset_stat_tables).
+#
+# Mede o custo por chamada de:
+#   - baseline da classe por nível
+#   - curva pontos -> efeito do balance.py
+#   - perfil da classe (ancestralidade, mágica/agilidade, razões de evolução)
+#   - _compute_player_total_stats completo (sem o cache de fingerprint)
+# e confere que os dois caminhos dão o MESMO resultado.
+#
+# Uso: python tools/bench_player_stats.py [--players 2000] [--rounds 5]
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import balance
+from modules.game_data.classes import CLASSES_DATA
+from modules.player import stats
+
+STATS = ("max_hp", "attack", "defense", "initiative", "luck", "inteligencia")
+
+
+def make_players(n: int):
+    rng = random.Random(42)
+    classes = list(CLASSES_DATA) or ["guerreiro"]
+    out = []
+    for i in range(n):
+        out.append({
+            "user_id": f"bench_{i}",
+            "level": rng.randint(1, 120),
+            "class_key": rng.choice(classes),
+            "invested": {k: rng.randint(0, 150) for k in rng.sample(STATS, 3)},
+        })
+    return out
+
+
+def _per_call(fn, calls: int) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) / calls * 1e6
+
+
+def bench_primitives(players, rounds: int) -> dict:
+    keys = [(stats._get_class_key_normalized(p), (p["class_key"] or "").lower(), p["level"]) for p in players]
+    calls = len(keys) * rounds
+
+    def baseline():
+        for _ in range(rounds):
+            for ckey, _real, lvl in keys:
+                stats._baseline_row(ckey, lvl)
+
+    def profile():
+        for _ in range(rounds):
+            for ckey, real, _lvl in keys:
+                stats._class_profile(ckey, real)
+
+    def curve():
+        if not balance:
+            return
+        for _ in range(rounds):
+            for (_ckey, real, lvl) in keys:
+                stats._effect_lookup("attack", lvl, real)
+
+    return {
+        "baseline": _per_call(baseline, calls),
+        "perfil": _per_call(profile, calls),
+        "curva": _per_call(curve, calls),
+    }
+
+
+async def bench_total(players, rounds: int):
+    results = [await stats._compute_player_total_stats(p) for p in players]
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for p in players:
+            await stats._compute_player_total_stats(p)
+    per_call = (time.perf_counter() - t0) / (len(players) * rounds) * 1e6
+    return per_call, results
+
+
+def run(n: int, rounds: int) -> None:
+    players = make_players(n)
+
+    t0 = time.perf_counter()
+    stats.compile_stat_tables()
+    compile_ms = (time.perf_counter() - t0) * 1000
+
+    new_prim = bench_primitives(players, rounds)
+    new_total, new_results = asyncio.run(bench_total(players, rounds))
+
+    stats.reset_stat_tables()
+    old_prim = bench_primitives(players, rounds)
+    old_total, old_results = asyncio.run(bench_total(players, rounds))
+
+    stats.compile_stat_tables()
+
+    print(f"🧮 Status | {n} jogadores x {rounds} rodadas | compilação: {compile_ms:.1f} ms\n")
+    print(f"{'etapa':<12} {'antes (µs)':>12} {'depois (µs)':>12} {'speedup':>9}")
+    for k in new_prim:
+        o, nw = old_prim[k], new_prim[k]
+        print(f"{k:<12} {o:12.2f} {nw:12.2f} {o / max(nw, 1e-9):8.1f}x")
+    print(f"{'total':<12} {old_total:12.2f} {new_total:12.2f} {old_total / max(new_total, 1e-9):8.1f}x")
+
+    if old_results != new_results:
+        print("\n❌ Resultados DIFERENTES entre tabela e cálculo direto!")
+        sys.exit(1)
+    print("\n✅ Resultados idênticos.")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=2000)
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+    run(args.players, args.rounds)
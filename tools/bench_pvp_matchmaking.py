@@ -0,0 +1,158 @@
+# tools/bench_pvp_matchmaking.py
+# Benchmark do matchmaking da Arena com muitos jogadores (padrão: 100k).
+#   - ANTIGO: varre todos, converte pvp_points (como o $convert do aggregate),
+#             filtra a faixa e sorteia (custo O(n) por busca)
+#   - NOVO:   pvp/elo_index.EloIndex.sample_range (bisect + amostra por posição)
+#
+# Confere que todo candidato sorteado está na faixa e não é o próprio jogador.
+#
+# Uso: python tools/bench_pvp_matchmaking.py [--players 100000] [--searches 2000]
+#
+# Com --mongo mede também no banco (aggregate antigo x faixa no índice
+# pvp_points). Precisa de um Mongo DESCARTÁVEL (nunca aponte para produção!):
+#   BENCH_MONGO_URI=mongodb://localhost:27017 python tools/bench_pvp_matchmaking.py --mongo
+# Usa o banco "eldora_bench" e apaga a coleção no final.
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pvp.elo_index import EloIndex, to_points
+
+BENCH_URI = os.environ.get("BENCH_MONGO_URI", "mongodb://localhost:27017")
+# Mesma escada de buscas do pvp_handler
+TIERS = ((10, 500), (15, 2000))
+
+
+def make_players(n: int):
+    rng = random.Random(7)
+    docs = []
+    for i in range(n):
+        pts = int(rng.expovariate(1 / 600))
+        # Legado: parte dos documentos tem pvp_points como texto/None
+        raw = str(pts) if i % 17 == 0 else (None if i % 53 == 0 else pts)
+        docs.append({"_id": f"{i:024x}", "pvp_points": raw, "character_name": f"heroi_{i}"})
+    return docs
+
+
+def legacy_find(docs, elo: int, my_id: str, limit: int, delta: int, rng):
+    lo, hi = max(0, elo - delta), elo + delta
+    pool = [d for d in docs if d.get("character_name") and lo <= to_points(d.get("pvp_points")) <= hi]
+    picked = rng.sample(pool, min(limit, len(pool)))
+    return [d["_id"] for d in picked if d["_id"] != my_id]
+
+
+def index_find(index: EloIndex, elo: int, my_id: str, limit: int, delta: int, rng):
+    lo, hi = max(0, elo - delta), elo + delta
+    return [raw_id for raw_id, _pts in index.sample_range(lo, hi, limit, exclude=my_id, rng=rng)]
+
+
+def _time_searches(fn, target, queries, rng) -> float:
+    t0 = time.perf_counter()
+    for elo, my_id in queries:
+        for limit, delta in TIERS:
+            if fn(target, elo, my_id, limit, delta, rng):
+                break
+    return (time.perf_counter() - t0) / len(queries) * 1e6
+
+
+def run_memory(docs, searches: int) -> bool:
+    rng = random.Random(11)
+    queries = [(to_points(d["pvp_points"]), d["_id"]) for d in rng.sample(docs, searches)]
+    legacy_queries = queries[: max(1, searches // 20)]
+
+    index = EloIndex()
+    t0 = time.perf_counter()
+    index.rebuild((d["_id"], d["pvp_points"]) for d in docs)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    old = _time_searches(legacy_find, docs, legacy_queries, rng)
+    new = _time_searches(index_find, index, queries, rng)
+
+    t0 = time.perf_counter()
+    for elo, my_id in queries:
+        index.update(my_id, elo + 25)
+    upd = (time.perf_counter() - t0) / len(queries) * 1e6
+
+    print(f"⚔️ Matchmaking | {len(docs)} jogadores | índice montado em {build_ms:.0f} ms\n")
+    print(f"{'busca':<10} {'µs/busca':>12}")
+    print(f"{'antiga':<10} {old:12.1f}   ({len(legacy_queries)} buscas)")
+    print(f"{'índice':<10} {new:12.1f}   ({len(queries)} buscas)   speedup {old / max(new, 1e-9):.0f}x")
+    print(f"{'update':<10} {upd:12.1f}   (resultado de luta)")
+
+    points = {d["_id"]: to_points(d["pvp_points"]) for d in docs}
+    points.update({my_id: elo + 25 for elo, my_id in queries})
+    for elo, my_id in queries[:200]:
+        lo, hi = max(0, elo - 500), elo + 500
+        for raw_id, pts in index.sample_range(lo, hi, 10, exclude=my_id, rng=rng):
+            if raw_id == my_id or not lo <= pts <= hi or points[raw_id] != pts:
+                return False
+    return True
+
+
+def run_mongo(docs, searches: int) -> None:
+    from pymongo import MongoClient
+
+    client = MongoClient(BENCH_URI)
+    col = client["eldora_bench"]["users"]
+    col.drop()
+    col.insert_many([dict(d) for d in docs])
+    rng = random.Random(13)
+    queries = [(to_points(d["pvp_points"]), d["_id"]) for d in rng.sample(docs, min(searches, 200))]
+
+    def old_agg(elo):
+        return list(col.aggregate([
+            {"$addFields": {"_pvp_points": {"$convert": {"input": "$pvp_points", "to": "int", "onError": 0, "onNull": 0}}}},
+            {"$match": {"_pvp_points": {"$gte": max(0, elo - 500), "$lte": elo + 500},
+                        "character_name": {"$exists": True, "$ne": ""}}},
+            {"$sample": {"size": 10}},
+        ]))
+
+    def new_agg(elo):
+        return list(col.aggregate([
+            {"$match": {"pvp_points": {"$gte": max(0, elo - 500), "$lte": elo + 500},
+                        "character_name": {"$exists": True, "$ne": ""}}},
+            {"$sample": {"size": 11}},
+            {"$project": {"pvp_points": 1}},
+        ]))
+
+    t0 = time.perf_counter()
+    for elo, _ in queries:
+        old_agg(elo)
+    old = (time.perf_counter() - t0) / len(queries) * 1000
+
+    col.update_many(
+        {"pvp_points": {"$exists": True, "$not": {"$type": ["int", "long"]}}},
+        [{"$set": {"pvp_points": {"$convert": {"input": "$pvp_points", "to": "int", "onError": 0, "onNull": 0}}}}],
+    )
+    col.create_index([("pvp_points", -1)])
+    t0 = time.perf_counter()
+    for elo, _ in queries:
+        new_agg(elo)
+    new = (time.perf_counter() - t0) / len(queries) * 1000
+
+    print(f"\n🗄️ Mongo ({BENCH_URI}) | {len(queries)} buscas")
+    print(f"{'aggregate antigo':<22} {old:8.2f} ms/busca")
+    print(f"{'faixa indexada (int)':<22} {new:8.2f} ms/busca   speedup {old / max(new, 1e-9):.1f}x")
+    col.drop()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=100000)
+    ap.add_argument("--searches", type=int, default=2000)
+    ap.add_argument("--mongo", action="store_true")
+    args = ap.parse_args()
+
+    docs = make_players(args.players)
+    ok = run_memory(docs, args.searches)
+    if args.mongo:
+        run_mongo(docs, args.searches)
+    if not ok:
+        print("\n❌ Índice devolveu candidato fora da faixa / o próprio jogador!")
+        sys.exit(1)
+    print("\n✅ Candidatos sempre dentro da faixa.")
@@ -0,0 +1,69 @@
+# tools/bench_pvp_sim.py
+# Throughput do simulador PvP puro (pvp/battle_sim.py), em lutas/segundo:
+#   - simulate com eventos (o que a Arena usa antes de montar o texto)
+#   - simulate sem eventos (só o vencedor: torneios / ranking)
+#   - simulate_batch (seeds derivadas de uma só)
+# Confere também o replay: mesma seed = mesma luta, mesmo lote = mesmo resultado.
+#
+# Uso: python tools/bench_pvp_sim.py [--fights 50000]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pvp.battle_sim import fighter_from_stats, simulate, simulate_batch
+
+
+def make_matchups(n: int):
+    rng = random.Random(3)
+    pool = []
+    for i in range(500):
+        pool.append(fighter_from_stats(f"p{i}", {
+            "max_hp": rng.randint(100, 5000), "attack": rng.randint(10, 600),
+            "defense": rng.randint(0, 400), "initiative": rng.randint(0, 60), "luck": rng.randint(0, 150),
+        }))
+    return [(rng.choice(pool), rng.choice(pool)) for _ in range(n)]
+
+
+def _rate(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - t0)
+
+
+def run(n: int) -> None:
+    matchups = make_matchups(n)
+    seeded = [(a, b, i) for i, (a, b) in enumerate(matchups)]
+
+    rows = [
+        ("com eventos", _rate(lambda: [simulate(a, b, s) for a, b, s in seeded], n)),
+        ("sem eventos", _rate(lambda: [simulate(a, b, s, keep_events=False) for a, b, s in seeded], n)),
+        ("lote", _rate(lambda: simulate_batch(matchups, seed=1), n)),
+    ]
+
+    print(f"⚔️ Simulador PvP | {n} lutas\n")
+    print(f"{'modo':<14} {'lutas/s':>12}")
+    for label, rate in rows:
+        print(f"{label:<14} {rate:12,.0f}")
+
+    a, b, s = seeded[0]
+    same_fight = simulate(a, b, s) == simulate(a, b, s)
+    first = simulate_batch(matchups[:5000], seed=9)
+    again = simulate_batch(matchups[:5000], seed=9)
+    same_batch = [(r.winner_id, r.seed) for r in first] == [(r.winner_id, r.seed) for r in again]
+
+    if not (same_fight and same_batch):
+        print("\n❌ Replay quebrado: mesma seed deu resultado diferente!")
+        sys.exit(1)
+    print("\n✅ Replay determinístico (luta e lote).")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fights", type=int, default=50000)
+    args = ap.parse_args()
+    run(args.fights)
@@ -0,0 +1,146 @@
+# tools/bench_skill_registry.py
+# Uso de skill: montagem por ação x registro compilado
+# (modules/skills/skill_registry.py).
+#   - ANTIGO: get_skill_data_with_rarity copia + mescla o dict a cada chamada;
+#             processar_acao_combate chama adapt_skill_to_canon a cada ação
+#   - NOVO:   visões somente leitura pré-compiladas por (skill, raridade)
+#
+# 1. Equivalência: para TODA skill do SKILL_DATA e toda raridade (mais uma
+#    raridade inexistente e jogador sem a skill), visão == mescla antiga e
+#    canônico == adapt_skill_to_canon.
+# 2. Benchmark: preparo da skill por ação (o que um turno faz: dados com
+#    raridade + canônico) e processar_acao_combate inteiro.
+#
+# Uso: python tools/bench_skill_registry.py [--actions 50000]
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.game_data.skills import SKILL_DATA
+from modules.skills import skill_registry
+from modules.skills.skill_canonical_adapter import adapt_skill_to_canon
+
+RARITIES = ("comum", "rara", "epica", "lendaria", "inexistente", None)
+
+
+# ==============================================================================
+# REFERÊNCIA: caminho antigo
+# ==============================================================================
+def legacy_skill_data(player_data: dict, skill_id: str):
+    base_skill = SKILL_DATA.get(skill_id)
+    if not base_skill:
+        return None
+    if "rarity_effects" not in base_skill:
+        return base_skill.copy()
+    player_skills = player_data.get("skills", {})
+    rarity = "comum"
+    if isinstance(player_skills, dict):
+        inst = player_skills.get(skill_id)
+        if inst:
+            rarity = inst.get("rarity", "comum")
+    merged = base_skill.copy()
+    merged.update(base_skill["rarity_effects"].get(rarity, base_skill["rarity_effects"].get("comum", {})))
+    return merged
+
+
+def legacy_canonical(skill_id: str, rarity):
+    return adapt_skill_to_canon(skills_db=SKILL_DATA, skill_id=skill_id, rarity=rarity)
+
+
+def _players():
+    for skill_id in SKILL_DATA:
+        yield skill_id, {"skills": {}}
+        for rarity in RARITIES:
+            yield skill_id, {"skills": {skill_id: {"rarity": rarity}}}
+
+
+# ==============================================================================
+# 1. EQUIVALÊNCIA
+# ==============================================================================
+def check_equivalence() -> int:
+    checked = 0
+    for skill_id, pdata in _players():
+        assert skill_registry.player_skill_view(pdata, skill_id) == legacy_skill_data(pdata, skill_id), skill_id
+        rarity = pdata["skills"].get(skill_id, {}).get("rarity", "comum")
+        assert skill_registry.canonical(skill_id, rarity) == legacy_canonical(skill_id, rarity), (skill_id, rarity)
+        checked += 1
+    assert skill_registry.player_skill_view({}, "skill_que_nao_existe") is None
+    return checked
+
+
+# ==============================================================================
+# 2. BENCHMARK
+# ==============================================================================
+def _actions(n: int):
+    active = [sid for sid, s in SKILL_DATA.items() if isinstance(s, dict) and s.get("type") != "passive"]
+    rarities = ("comum", "epica", "lendaria")
+    out = []
+    for i in range(n):
+        sid = active[i % len(active)]
+        out.append((sid, {"skills": {sid: {"rarity": rarities[i % 3]}}}))
+    return out
+
+
+def _prep_old(actions) -> float:
+    t0 = time.perf_counter()
+    for sid, pdata in actions:
+        info = legacy_skill_data(pdata, sid)
+        legacy_canonical(sid, pdata["skills"][sid]["rarity"])
+        info.get("mana_cost", 0)
+    return time.perf_counter() - t0
+
+
+def _prep_new(actions) -> float:
+    t0 = time.perf_counter()
+    for sid, pdata in actions:
+        info = skill_registry.player_skill_view(pdata, sid)
+        skill_registry.canonical(sid, pdata["skills"][sid]["rarity"])
+        info.get("mana_cost", 0)
+    return time.perf_counter() - t0
+
+
+async def _combat(actions) -> float:
+    from modules.combat import combat_engine
+    attacker = {"attack": 120, "magic_attack": 80, "initiative": 20, "luck": 10, "max_hp": 900}
+    target = {"defense": 40, "max_hp": 5000, "hp": 5000, "initiative": 10, "luck": 5}
+    t0 = time.perf_counter()
+    for sid, pdata in actions:
+        await combat_engine.processar_acao_combate(pdata, attacker, target, sid)
+    return time.perf_counter() - t0
+
+
+def run(n: int) -> None:
+    t0 = time.perf_counter()
+    compiled = skill_registry.compile_registry()
+    compile_ms = (time.perf_counter() - t0) * 1000
+    checked = check_equivalence()
+    print(f"✅ Equivalência: {checked} combinações (skill x raridade) idênticas.")
+    print(f"🧱 {compiled} visões compiladas em {compile_ms:.1f} ms ({skill_registry.registry_stats()})\n")
+
+    actions = _actions(n)
+    old, new = _prep_old(actions), _prep_new(actions)
+    print(f"✨ Preparo da skill por ação | {n} ações")
+    print(f"antigo {old / n * 1e6:8.2f} µs | novo {new / n * 1e6:8.2f} µs | speedup {old / new:.1f}x\n")
+
+    try:
+        with mock.patch.object(skill_registry, "canonical", legacy_canonical):
+            old = asyncio.run(_combat(actions))
+        new = asyncio.run(_combat(actions))
+    except ImportError as e:
+        print(f"(processar_acao_combate indisponível aqui: {e})")
+        return
+    print(f"⚔️ processar_acao_combate inteiro | {n} ações")
+    print(f"antigo {old / n * 1e6:8.2f} µs | novo {new / n * 1e6:8.2f} µs | economia {(old - new) / n * 1e6:.2f} µs/ação")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--actions", type=int, default=50000)
+    args = ap.parse_args()
+    run(args.actions)
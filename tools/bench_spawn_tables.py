@@ -0,0 +1,197 @@
+# tools/bench_spawn_tables.py
+# Seleção de monstro do start_hunt: caminho antigo x tabelas de spawn
+# pré-compiladas (modules/spawn_tables.py).
+#   - ANTIGO: lê REGIONS_DATA/MONSTERS_DATA, filtra e copia a lista, sorteia,
+#             aplica elite (cópia + multiplicadores + loot) e escala por nível
+#   - NOVO:   spawn_tables.roll_encounter (sorteio ponderado + cópia rasa +
+#             stats memorizados por nível alvo)
+#
+# 1. Equivalência: para cada região, monstro, elite e sorteio de nível
+#    (-1/0/+1), os combat_details do caminho novo são IGUAIS aos do antigo.
+# 2. Benchmark: seleções por segundo (caça manual) e a lista da auto-caçada.
+#
+# Uso: python tools/bench_spawn_tables.py [--picks 200000] [--seed 1]
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import game_data, spawn_tables
+from modules.auto_hunt_resolver import scale_monster_stats as auto_scale
+
+LEVELS = (1, 5, 12, 25, 40, 60)
+
+
+# ==============================================================================
+# REFERÊNCIA: caminho antigo (handlers/hunt_handler.py + auto_hunt_engine.py)
+# ==============================================================================
+def legacy_pick(region_key: str, player_level: int) -> dict:
+    reg_info = (getattr(game_data, "REGIONS_DATA", {}) or {}).get(region_key, {}) or {}
+    region_min_lvl = int(reg_info.get("min_level", 1))
+    calc_level = max(player_level, region_min_lvl)
+
+    lst = (getattr(game_data, "MONSTERS_DATA", {}) or {}).get(region_key)
+    if isinstance(lst, list) and lst:
+        pool = [e for e in lst if isinstance(e, dict)]
+        if pool:
+            chosen = dict(random.choice(pool))
+            chosen["min_level"] = max(int(chosen.get("min_level", 1)), region_min_lvl)
+            return chosen
+
+    base_hp = 20 + calc_level * 5
+    return {
+        "id": f"generic_{region_key}", "name": "Criatura Sombria",
+        "hp": base_hp, "max_hp": base_hp, "attack": 3 + calc_level // 2, "defense": 2,
+        "initiative": 4, "luck": 3, "xp_reward": 5 + (calc_level // 2),
+        "gold_drop": 2 + (calc_level // 3), "loot_table": [], "min_level": region_min_lvl,
+    }
+
+
+def legacy_elite(mon: dict) -> dict:
+    m = dict(mon)
+    m["name"] = f"{m.get('name') or 'Inimigo'} (🅴🅻I🆃🅴) 👑"
+    m["_elite"] = True
+    if "max_hp" not in m and "hp" in m:
+        m["max_hp"] = m["hp"]
+    m["min_level"] = int(m.get("min_level", 1)) + 3
+    mults = spawn_tables.ELITE_MULTS
+    for k_mon, k_mult in [("max_hp", "hp"), ("attack", "attack"), ("defense", "defense"),
+                          ("xp_reward", "xp"), ("gold_drop", "gold")]:
+        base = int(m.get(k_mon, 0))
+        if base == 0 and k_mon in ["attack", "defense"]:
+            base = 5
+        m[k_mon] = int(base * mults[k_mult])
+    m["hp"] = m["max_hp"]
+    m["initiative"] = int(m.get("initiative", 0)) + mults["initiative_add"]
+    m["luck"] = int(m.get("luck", 0)) + mults["luck_add"]
+    m["loot_table"] = [
+        {**it, "drop_chance": min(100.0, float(it.get("drop_chance", 0.0)) + mults["loot_bonus_pct"])}
+        for it in (m.get("loot_table") or [])
+    ]
+    return m
+
+
+def legacy_build(mon: dict, player_level: int) -> dict:
+    m = mon.copy()
+    if "max_hp" not in m and "hp" in m:
+        m["max_hp"] = m["hp"]
+    elif "max_hp" not in m:
+        m["max_hp"] = 10
+    min_lvl = m.get("min_level", 1)
+    max_lvl = m.get("max_level", player_level + 2)
+    target_lvl = max(min_lvl, min(player_level + random.randint(-1, 1), max_lvl))
+    m["level"] = target_lvl
+    raw_name = re.sub(r"^\d+\s+", "", m.get("name", "Inimigo").replace("Lv.", "").strip())
+    m["name"] = f"Lv.{target_lvl} {raw_name}"
+    if target_lvl <= 1:
+        m["hp"] = m["max_hp"]
+    else:
+        bonus = 1 + (target_lvl * 0.03)
+        m["max_hp"] = int((int(m.get("max_hp", 10)) * bonus) + (target_lvl * 3))
+        m["hp"] = m["max_hp"]
+        m["attack"] = int((int(m.get("attack", 2)) * bonus) + (target_lvl * 0.6))
+        m["defense"] = int((int(m.get("defense", 0)) * bonus) + (target_lvl * 0.1))
+        m["xp_reward"] = int((int(m.get("xp_reward", 5)) * bonus) + (target_lvl * 1.5))
+        m["gold_drop"] = int((int(m.get("gold_drop", 1)) * bonus) + (target_lvl * 0.3))
+    return {
+        "id": m.get("id"), "name": m.get("name"), "level": m.get("level", 1),
+        "hp": int(m.get("hp", 1)), "max_hp": int(m.get("max_hp", 1)),
+        "attack": int(m.get("attack", 1)), "defense": int(m.get("defense", 0)),
+        "initiative": int(m.get("initiative", 0)), "luck": int(m.get("luck", 0)),
+        "gold_drop": int(m.get("gold_drop", 0)), "xp_reward": int(m.get("xp_reward", 0)),
+        "loot_table": m.get("loot_table", []),
+        "is_elite": bool(m.get("_elite", False) or m.get("is_elite", False)),
+        "is_boss": bool(m.get("is_boss", False)), "skills": m.get("skills", []),
+    }
+
+
+def legacy_select(region_key: str, player_level: int, luck: int):
+    tpl = legacy_pick(region_key, player_level)
+    is_elite = spawn_tables.roll_is_elite(luck)
+    if is_elite:
+        tpl = legacy_elite(tpl)
+    return tpl, legacy_build(tpl, player_level), is_elite
+
+
+def legacy_auto_hunt(region_key: str, level: int):
+    monster_list = game_data.MONSTERS_DATA.get(region_key) or spawn_tables.AUTO_HUNT_FALLBACK
+    return [auto_scale(t, level) for t in monster_list if isinstance(t, dict)]
+
+
+# ==============================================================================
+# 1. EQUIVALÊNCIA
+# ==============================================================================
+def check_equivalence(regions) -> int:
+    checked = 0
+    for region_key in regions:
+        table = spawn_tables.get_table(region_key)
+        for idx, base in enumerate(table.templates):
+            for elite in (False, True):
+                old_tpl = legacy_elite(base) if elite else dict(base)
+                for level in LEVELS:
+                    for delta in (-1, 0, 1):
+                        with mock.patch("random.randint", return_value=delta):
+                            old = legacy_build(old_tpl, level)
+                            new = table.combat_details(idx, elite, level)
+                        assert old == new, (region_key, base.get("id"), elite, level, delta, old, new)
+                        checked += 1
+        for level in LEVELS + (200,):
+            assert legacy_auto_hunt(region_key, level) == spawn_tables.auto_hunt_monsters(region_key, level)
+    return checked
+
+
+# ==============================================================================
+# 2. BENCHMARK
+# ==============================================================================
+def _time(fn, picks: int, regions) -> float:
+    n = len(regions)
+    t0 = time.perf_counter()
+    for i in range(picks):
+        fn(regions[i % n], LEVELS[i % len(LEVELS)], 10)
+    return time.perf_counter() - t0
+
+
+def run(picks: int, seed: int) -> None:
+    random.seed(seed)
+    t0 = time.perf_counter()
+    compiled = spawn_tables.compile_all()
+    compile_ms = (time.perf_counter() - t0) * 1000
+
+    regions = sorted(r for r in game_data.MONSTERS_DATA if not r.startswith("_"))
+    checked = check_equivalence(regions)
+    print(f"✅ Equivalência: {checked} combinações (região x monstro x elite x nível x sorteio) idênticas.")
+    print(f"🧱 {compiled} regiões compiladas em {compile_ms:.1f} ms\n")
+
+    old = _time(legacy_select, picks, regions)
+    new = _time(spawn_tables.roll_encounter, picks, regions)
+    print(f"🎯 start_hunt (seleção do monstro) | {picks} sorteios em {len(regions)} regiões")
+    print(f"{'modo':<10} {'µs/sorteio':>11} {'sorteios/s':>12}")
+    for name, wall in (("antigo", old), ("novo", new)):
+        print(f"{name:<10} {wall / picks * 1e6:11.2f} {picks / wall:12,.0f}")
+    print(f"speedup: {old / new:.1f}x\n")
+
+    reps = max(1, picks // 50)
+    t0 = time.perf_counter()
+    for i in range(reps):
+        legacy_auto_hunt(regions[i % len(regions)], LEVELS[i % len(LEVELS)])
+    old = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for i in range(reps):
+        spawn_tables.auto_hunt_monsters(regions[i % len(regions)], LEVELS[i % len(LEVELS)])
+    new = time.perf_counter() - t0
+    print(f"🤖 auto-caçada (lista escalada) | {reps} conclusões")
+    print(f"antigo {old / reps * 1e6:8.2f} µs | novo {new / reps * 1e6:8.2f} µs | speedup {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--picks", type=int, default=200000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    run(args.picks, args.seed)
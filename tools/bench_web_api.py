@@ -0,0 +1,142 @@
+# tools/bench_web_api.py
+# Latência das rotas do web app que chamam código async do jogo.
+#   - ANTIGO: Flask em thread própria; cada chamada async da view fazia
+#             asyncio.run (um event loop novo por chamada)
+#   - NOVO:   modules/web_server.WsgiBridge no loop do "bot"; a view chama
+#             run_async, que executa a corrotina no loop já rodando
+#
+# A view simula /api/cacar: 3 chamadas async por requisição (stats, combate,
+# save), cada uma com alguns awaits. Mede p50/p95 por requisição com
+# --concurrency requisições em paralelo. Com o Flask instalado usa um app
+# Flask de verdade; senão um app WSGI mínimo (mesmo caminho de ponte).
+#
+# Uso: python tools/bench_web_api.py [--requests 2000] [--concurrency 16]
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import web_server
+
+CALLS_PER_REQUEST = 3
+
+
+async def game_call(n: int) -> int:
+    """Stand-in de get_player_total_stats / processar_acao_combate / save."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+    return n + 1
+
+
+def make_wsgi_app(runner):
+    def view() -> bytes:
+        total = 0
+        for i in range(CALLS_PER_REQUEST):
+            total += runner(game_call(i))
+        return json.dumps({"sucesso": True, "total": total}).encode()
+
+    try:
+        from flask import Flask
+    except ImportError:
+        def app(environ, start_response):
+            body = view()
+            start_response("200 OK", [("Content-Type", "application/json"), ("Content-Length", str(len(body)))])
+            return [body]
+        return app, "wsgi mínimo"
+
+    flask_app = Flask("bench")
+    flask_app.add_url_rule("/api/cacar", "cacar", lambda: (view(), 200, {"Content-Type": "application/json"}),
+                           methods=["POST"])
+    return flask_app.wsgi_app, "flask"
+
+
+def _environ() -> dict:
+    return web_server._environ(
+        {"type": "http", "method": "POST", "path": "/api/cacar", "query_string": b"",
+         "headers": [(b"content-type", b"application/json")]},
+        b'{"user_id": "x"}',
+    )
+
+
+def run_legacy(requests: int, concurrency: int):
+    """Views em threads (como o Flask threaded), asyncio.run a cada chamada."""
+    app, kind = make_wsgi_app(web_server._run_in_new_loop)
+    latencies = []
+    lock = threading.Lock()
+
+    def one(_):
+        t0 = time.perf_counter()
+        result = app(_environ(), lambda status, headers, exc_info=None: None)
+        b"".join(result)
+        dt = time.perf_counter() - t0
+        with lock:
+            latencies.append(dt)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    return time.perf_counter() - t0, latencies, kind
+
+
+async def _run_bridge(requests: int, concurrency: int):
+    web_server.set_bot_loop(asyncio.get_running_loop())
+    app, kind = make_wsgi_app(web_server.run_async)
+    bridge = web_server.WsgiBridge(app, workers=concurrency)
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+    scope = {"type": "http", "method": "POST", "path": "/api/cacar", "query_string": b"",
+             "headers": [(b"content-type", b"application/json")]}
+
+    async def one():
+        async with sem:
+            sent = []
+
+            async def receive():
+                return {"type": "http.request", "body": b'{"user_id": "x"}', "more_body": False}
+
+            async def send(message):
+                sent.append(message)
+
+            t0 = time.perf_counter()
+            await bridge(scope, receive, send)
+            latencies.append(time.perf_counter() - t0)
+            assert sent[0]["status"] == 200
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    wall = time.perf_counter() - t0
+    bridge.close()
+    web_server.set_bot_loop(None)
+    return wall, latencies, kind
+
+
+def _pct(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+def run(requests: int, concurrency: int) -> None:
+    wall_old, lat_old, kind = run_legacy(requests, concurrency)
+    wall_new, lat_new, _ = asyncio.run(_run_bridge(requests, concurrency))
+
+    print(f"🌐 Web API ({kind}) | {requests} requisições, {concurrency} em paralelo, "
+          f"{CALLS_PER_REQUEST} chamadas async por requisição\n")
+    print(f"{'modo':<22} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, wall, lat in (("antigo (loop/chamada)", wall_old, lat_old),
+                            ("novo (loop do bot)", wall_new, lat_new)):
+        print(f"{name:<22} {requests / wall:9,.0f} {_pct(lat, 0.5):8.2f} {_pct(lat, 0.95):8.2f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=16)
+    args = ap.parse_args()
+    run(args.requests, args.concurrency)
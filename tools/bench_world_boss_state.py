@@ -0,0 +1,154 @@
+# tools/bench_world_boss_state.py
+# Persistência do World Boss com muitos lutadores simultâneos (padrão: 200).
+#   - ANTIGO: a cada ação, json.dump do estado INTEIRO (indent=2) no loop
+#   - NOVO:   modules/world_boss/state_store.BossStateStore (delta no loop,
+#             escrita/compactação numa thread)
+#
+# Mede ações/s (com o custo de persistência no loop) e confere a recuperação:
+# recarrega do disco (snapshot + log, inclusive com uma linha final cortada)
+# e compara com o estado em memória.
+#
+# Uso: python tools/bench_world_boss_state.py [--fighters 200] [--actions 20]
+# (actions = ações por lutador; tudo num diretório temporário)
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.world_boss.state_store import BossStateStore, full_state
+
+
+def make_manager(fighters: int):
+    loot = [(f"item_{i}", 0.9) for i in range(48)]
+    mgr = SimpleNamespace(
+        is_active=True, location="floresta_sombria", ends_at=None,
+        environment_hazard=False, hazard_turns=0, last_hitter_id=None,
+        entities={
+            "boss": {"name": "Lorde", "hp": 10**9, "max_hp": 10**9, "alive": True,
+                     "stats": {"attack": 80, "defense": 40, "initiative": 5, "luck": 20},
+                     "turn_counter": 0, "loot_table": loot},
+            "witch_heal": {"name": "Cura", "hp": 0, "max_hp": 10000, "alive": False,
+                           "stats": {"attack": 50}, "turn_counter": 0},
+            "witch_debuff": {"name": "Caos", "hp": 0, "max_hp": 10000, "alive": False,
+                             "stats": {"attack": 50}, "turn_counter": 0},
+        },
+        active_fighters=set(), waiting_queue=[], player_states={}, damage_leaderboard={},
+    )
+    for i in range(fighters):
+        uid = f"{i:024x}"
+        mgr.active_fighters.add(uid)
+        mgr.player_states[uid] = {"hp": 5000, "max_hp": 5000, "mp": 300, "max_mp": 300,
+                                  "current_target": "boss", "log": "Entrou na batalha!\n" * 5}
+    return mgr
+
+
+def act(mgr, uid: str, rng: random.Random):
+    """Uma ação no formato do engine: dano no boss + turno do boss. Retorna o escopo."""
+    dmg = rng.randint(50, 500)
+    boss = mgr.entities["boss"]
+    boss["hp"] -= dmg
+    mgr.damage_leaderboard[uid] = mgr.damage_leaderboard.get(uid, 0) + dmg
+    mgr.last_hitter_id = uid
+    state = mgr.player_states[uid]
+    state["log"] = (state["log"] + f"\nVocê causou {dmg}").split("\n", 1)[-1]
+    boss["turn_counter"] += 1
+    if boss["turn_counter"] % 3 == 0:
+        mgr.environment_hazard = True
+        for fid in mgr.active_fighters:
+            mgr.player_states[fid]["hp"] -= 1
+        return list(mgr.active_fighters)
+    state["hp"] -= rng.randint(1, 30)
+    return [uid]
+
+
+def legacy_save(mgr, path: str):
+    data = full_state(mgr)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+async def run_fighters(mgr, persist, actions: int, seed: int) -> float:
+    rng = random.Random(seed)
+    persist_time = 0.0
+
+    async def fighter(uid):
+        nonlocal persist_time
+        for _ in range(actions):
+            scope = act(mgr, uid, rng)
+            t0 = time.perf_counter()
+            persist(scope)
+            persist_time += time.perf_counter() - t0
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(fighter(uid) for uid in sorted(mgr.active_fighters)))
+    return persist_time
+
+
+def _normalize(state: dict) -> dict:
+    state = json.loads(json.dumps(state))
+    state.pop("_seq", None)
+    state["active_fighters"] = sorted(state.get("active_fighters", []))
+    return state
+
+
+def run(fighters: int, actions: int) -> None:
+    total = fighters * actions
+    with tempfile.TemporaryDirectory() as tmp:
+        # --- ANTIGO ---
+        mgr = make_manager(fighters)
+        path_old = os.path.join(tmp, "old.json")
+        t0 = time.perf_counter()
+        loop_old = asyncio.run(run_fighters(mgr, lambda scope: legacy_save(mgr, path_old), actions, 1))
+        wall_old = time.perf_counter() - t0
+
+        # --- NOVO ---
+        mgr = make_manager(fighters)
+        path_new = os.path.join(tmp, "new.json")
+        store = BossStateStore(path_new)
+        store.capture(mgr, full=True)
+        t0 = time.perf_counter()
+        loop_new = asyncio.run(run_fighters(mgr, lambda scope: store.capture(mgr, players=scope), actions, 1))
+        wall_new = time.perf_counter() - t0
+        t1 = time.perf_counter()
+        store.flush()
+        drain = time.perf_counter() - t1
+        st = store.stats()
+
+        # --- RECUPERAÇÃO (processo "caiu" sem compactar) ---
+        expected = _normalize(full_state(mgr))
+        recovered = _normalize(BossStateStore(path_new).load())
+        with open(path_new + ".log", "a", encoding="utf-8") as f:
+            f.write('{"seq":999999999,"p":{"x":')  # escrita cortada no meio
+        torn = _normalize(BossStateStore(path_new).load())
+        store.close()
+        closed = _normalize(BossStateStore(path_new).load())
+
+    print(f"👹 World Boss | {fighters} lutadores x {actions} ações = {total} ações\n")
+    print(f"{'modo':<8} {'ações/s':>10} {'loop µs/ação':>14}")
+    print(f"{'antigo':<8} {total / wall_old:10,.0f} {loop_old / total * 1e6:14.1f}")
+    print(f"{'novo':<8} {total / wall_new:10,.0f} {loop_new / total * 1e6:14.1f}"
+          f"   (thread: +{drain * 1000:.0f} ms p/ esvaziar, {st['compactions']} compactações, "
+          f"{st['bytes'] / max(1, st['records']):.0f} B/ação)")
+
+    checks = {"recuperação": recovered == expected, "linha cortada": torn == expected, "close": closed == expected}
+    print("\n" + " | ".join(f"{k}: {'ok' if v else 'FALHOU'}" for k, v in checks.items()))
+    if not all(checks.values()):
+        print("\n❌ Estado recuperado diferente do estado em memória!")
+        sys.exit(1)
+    print("✅ Estado recuperado idêntico.")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fighters", type=int, default=200)
+    ap.add_argument("--actions", type=int, default=20)
+    args = ap.parse_args()
+    run(args.fighters, args.actions)
@@ -0,0 +1,106 @@
+# tools/check_update_gate.py
+# Confere o KeyedGate (modules/keyed_locks.py), que limita os updates em
+# execução no UserOrderedApplication:
+#   - um jogador com o handler travado e N cliques enfileirados NÃO atrasa
+#     o update de outro jogador (a vaga só é pedida depois do lock dele);
+#   - updates do mesmo jogador continuam na ordem de chegada;
+#   - nunca passam de `limit` executando ao mesmo tempo.
+# Para comparar, roda o mesmo cenário com a ordem antiga (vaga antes do lock,
+# como o semáforo do concurrent_updates do PTB 20.3).
+#
+# Uso: python tools/check_update_gate.py [--limit 4] [--queued 20]
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.keyed_locks import KeyedGate, KeyedLocks
+
+BLOCK_SECONDS = 0.5
+
+
+class _SlotFirst:
+    """Ordem antiga: vaga global primeiro, lock do usuário depois."""
+
+    def __init__(self, limit: int) -> None:
+        self.locks = KeyedLocks()
+        self._slots = asyncio.Semaphore(limit)
+
+    async def acquire(self, key) -> None:
+        await self._slots.acquire()
+        await self.locks.acquire(key)
+
+    def release(self, key) -> None:
+        self.locks.release(key)
+        self._slots.release()
+
+
+async def _scenario(gate, limit: int, queued: int):
+    running = peak = 0
+    order = []
+    unblock = asyncio.Event()
+
+    async def update(key, n, blocks=False):
+        nonlocal running, peak
+        await gate.acquire(key)
+        running += 1
+        peak = max(peak, running)
+        try:
+            if key == "lento":
+                order.append(n)
+            if blocks:
+                await unblock.wait()
+            await asyncio.sleep(0)
+        finally:
+            running -= 1
+            gate.release(key)
+
+    tasks = [asyncio.create_task(update("lento", 0, blocks=True))]
+    tasks += [asyncio.create_task(update("lento", n)) for n in range(1, queued + 1)]
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    other = asyncio.create_task(update("outro", 0))
+    asyncio.get_running_loop().call_later(BLOCK_SECONDS, unblock.set)
+    await other
+    other_latency = time.perf_counter() - started
+    await asyncio.gather(*tasks)
+    return other_latency, order, peak
+
+
+def run(limit: int, queued: int) -> None:
+    old_latency, _, _ = asyncio.run(_scenario(_SlotFirst(limit), limit, queued))
+    new_latency, order, peak = asyncio.run(_scenario(KeyedGate(limit), limit, queued))
+
+    print(f"🚦 limit={limit} | 1 jogador travado {BLOCK_SECONDS}s com {queued} cliques na fila\n")
+    print(f"{'ordem':<22} {'espera do outro jogador':>24}")
+    print(f"{'vaga antes do lock':<22} {old_latency * 1000:>21.0f}ms")
+    print(f"{'lock antes da vaga':<22} {new_latency * 1000:>21.0f}ms")
+
+    ok = True
+    if new_latency >= BLOCK_SECONDS / 2:
+        print("\n❌ O jogador travado atrasou o update de outro jogador!")
+        ok = False
+    if order != list(range(queued + 1)):
+        print(f"\n❌ Ordem do mesmo jogador quebrada: {order}")
+        ok = False
+    if peak > limit:
+        print(f"\n❌ {peak} updates executando com limit={limit}!")
+        ok = False
+    if not ok:
+        sys.exit(1)
+    print("\n✅ Sem bloqueio entre jogadores, ordem por jogador mantida, limite respeitado.")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--limit", type=int, default=4)
+    ap.add_argument("--queued", type=int, default=20)
+    args = ap.parse_args()
+    if args.limit < 2:
+        ap.error("--limit precisa ser >= 2 (com 1 vaga o travado ocupa a única)")
+    run(args.limit, args.queued)
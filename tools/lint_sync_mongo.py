@@ -0,0 +1,125 @@
+# tools/lint_sync_mongo.py
+# Lint: falha se houver chamada SÍNCRONA do pymongo dentro de `async def`.
+#
+# Dentro de corrotinas, toda ida ao banco deve passar pelo executor dedicado
+# de modules/database.py (run_db):
+#     await run_db(col.find_one, {...})
+#     await run_db(lambda: list(col.find({...}).limit(30)))
+#
+# Chamadas dentro de lambdas / funções síncronas aninhadas são permitidas
+# (é assim que se manda um bloco inteiro para o run_db).
+#
+# Uso: python tools/lint_sync_mongo.py        (exit 1 se achar violações)
+
+import ast
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pastas do bot (scripts avulsos da raiz e tools/ ficam de fora)
+SCAN_DIRS = ("modules", "handlers", "pvp", "kingdom_defense", "registries", "dungeons", "parties", "ui")
+SCAN_FILES = ("main.py", "api.py")
+IGNORE_DIRS = {"__pycache__", ".git", ".venv", "venv"}
+
+MONGO_METHODS = {
+    "find", "find_one", "aggregate", "count_documents", "estimated_document_count", "distinct",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "bulk_write", "create_index",
+    "find_one_and_update", "find_one_and_replace", "find_one_and_delete",
+}
+
+# Não dá para saber pelo nome se o receptor é uma coleção (col_users, clans,
+# WAR_PRESENCE_COL, db.clans...): QUALQUER chamada `x.<método do pymongo>(...)`
+# em corrotina é violação. Exceções:
+#   - chamada com await direto (o método já é corrotina, não é o pymongo)
+#   - receptor literal de string ("abc".find(...))
+
+
+def _receiver_name(node: ast.AST) -> str:
+    try:
+        return ast.unparse(node)
+    except Exception:
+        return "?"
+
+
+class _Visitor(ast.NodeVisitor):
+    def __init__(self):
+        self._stack = []  # True = dentro de async def
+        self.hits = []
+
+    def _scoped(self, node, is_async):
+        self._stack.append(is_async)
+        self.generic_visit(node)
+        self._stack.pop()
+
+    def visit_AsyncFunctionDef(self, node):
+        self._scoped(node, True)
+
+    def visit_FunctionDef(self, node):
+        self._scoped(node, False)
+
+    def visit_Lambda(self, node):
+        self._scoped(node, False)
+
+    def visit_Await(self, node):
+        # `await x.find_one(...)`: API assíncrona, não bloqueia
+        if isinstance(node.value, ast.Call):
+            call = node.value
+            self.visit(call.func.value if isinstance(call.func, ast.Attribute) else call.func)
+            for arg in call.args:
+                self.visit(arg)
+            for kw in call.keywords:
+                self.visit(kw)
+            return
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        if (
+            self._stack and self._stack[-1]
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr in MONGO_METHODS
+            and not (isinstance(node.func.value, ast.Constant) and isinstance(node.func.value.value, str))
+        ):
+            recv = _receiver_name(node.func.value)
+            self.hits.append((node.lineno, f"{recv}.{node.func.attr}(...)"))
+        self.generic_visit(node)
+
+
+def iter_files():
+    for name in SCAN_FILES:
+        path = os.path.join(ROOT, name)
+        if os.path.exists(path):
+            yield path
+    for d in SCAN_DIRS:
+        for root, dirs, files in os.walk(os.path.join(ROOT, d)):
+            dirs[:] = [x for x in dirs if x not in IGNORE_DIRS]
+            for f in files:
+                if f.endswith(".py"):
+                    yield os.path.join(root, f)
+
+
+def lint() -> int:
+    total = 0
+    for path in iter_files():
+        with open(path, "r", encoding="utf-8") as fh:
+            try:
+                tree = ast.parse(fh.read(), filename=path)
+            except SyntaxError as e:
+                print(f"⚠️  {path}: não compila ({e})")
+                continue
+        v = _Visitor()
+        v.visit(tree)
+        for lineno, what in v.hits:
+            print(f"{os.path.relpath(path, ROOT)}:{lineno}: chamada síncrona do Mongo em corrotina: {what}")
+            total += 1
+
+    if total:
+        print(f"\n❌ {total} chamada(s) bloqueando o event loop. Use run_db.")
+        return 1
+    print("✅ Nenhuma chamada síncrona do Mongo dentro de corrotinas.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(lint())